@@ -43,6 +43,15 @@ class Backtester:
         self._cache_repo = cache_repo
         self._viewpoint_config = viewpoint_config
 
+    def close(self) -> None:
+        """释放回测使用的 fetcher、天气缓存刷新线程、天文缓存与缓存数据库连接"""
+        self._fetcher.close()
+        self._fetcher.cache.close()
+        close_astro = getattr(self._scheduler.astro, "close", None)
+        if close_astro is not None:
+            close_astro()
+        self._cache_repo.close()
+
     def run(
         self,
         viewpoint_id: str,
@@ -0,0 +1,403 @@
+"""gmp/bench/runner.py — 离线分阶段基准测试
+
+按给定规模生成合成观景台/线路，经 Open-Meteo 替身 (无网络；进程内
+MockTransport 或本地 HTTP 服务) 跑完整流程，各阶段分别计时:
+
+- fetch:   FetchPlanner 冷缓存预取全部本地/目标/光路坐标
+           (请求 → 解码 → 解析 → 校验 → 写缓存)
+- cache:   同一批坐标再取一次，全部命中缓存
+- warmup:  首轮 Scheduler.run (填充天文缓存等一次性开销)
+- scoring: 第二轮 Scheduler.run，所有数据均已缓存，仅剩评分
+- routes:  线路聚合 (站点结果复用 scoring 阶段的 ResultMemo)
+- output:  生成 forecast/timeline 并写入 JSON 文件
+
+每个阶段附带该阶段内的 metrics 计时/计数 (fetcher.requests、cache.hits 等)。
+结果 JSON 按键排序输出，可直接在提交之间 diff 或用 compare() 对比。
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from gmp.bench.server import OpenMeteoServer
+from gmp.bench.synthetic import (
+    OpenMeteoStandIn,
+    StandInConfig,
+    synthetic_routes,
+    synthetic_viewpoints,
+    write_config_dirs,
+)
+from gmp.cache.repository import create_cache_repository
+from gmp.cache.weather_cache import WeatherCache
+from gmp.core import metrics
+from gmp.core.config_loader import ConfigManager, RouteConfig, ViewpointConfig
+from gmp.core.fetch_planner import FetchPlanner
+from gmp.core.scheduler import GMPScheduler, ResultMemo
+from gmp.data.astro_cache import CachedAstro
+from gmp.data.geo_utils import GeoUtils
+from gmp.output.forecast_reporter import ForecastReporter
+from gmp.output.json_file_writer import JSONFileWriter
+from gmp.output.timeline_reporter import TimelineReporter
+from gmp.scoring.engine import ScoreEngine
+
+if TYPE_CHECKING:
+    from gmp.core.models import PipelineResult
+
+logger = structlog.get_logger()
+
+_CST = timezone(timedelta(hours=8))
+
+# 结果文件格式版本 — 阶段划分或字段含义变化时递增，compare() 拒绝跨版本对比
+BENCH_VERSION = 3
+
+STAGES = ("fetch", "cache", "warmup", "scoring", "routes", "output")
+
+
+def _stage(name: str, items: int, fn: Callable[[], Any]) -> dict:
+    """执行一个阶段，返回耗时与阶段内 metrics"""
+    with metrics.scope() as stage_metrics:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+    logger.info("bench.stage", stage=name, seconds=round(elapsed, 3), items=items)
+    return {
+        "seconds": round(elapsed, 4),
+        "items": items,
+        "per_item_ms": round(elapsed / items * 1000, 3) if items else 0.0,
+        **stage_metrics.snapshot(),
+    }
+
+
+class BenchEnvironment:
+    """一套接入 Open-Meteo 替身的完整组件栈 + 合成配置
+
+    各阶段方法可单独调用 (pytest-benchmark 套件按阶段计时)，
+    依赖顺序: fetch → cache_read → score → run_routes → write_output。
+
+    Args:
+        viewpoints: 合成观景台数量
+        workdir: 缓存库、合成配置与输出文件所在目录
+        days: 预测天数
+        routes: 合成线路数量，None → viewpoints // 10 (至少 1)
+        seed: 合成数据种子 (相同种子生成相同的观景台/线路/天气)
+        config_path: 引擎配置 (Plugin 参数、缓存后端、fetcher.batch_size 等)
+        standin: API 替身 (上游延迟/错误/配额)，None 使用无延迟的默认替身
+        upstream: 替身 HTTP 服务的 fetcher 配置 (OpenMeteoServer.fetcher_config())，
+            None → 经 httpx.MockTransport 在进程内调用 standin
+    """
+
+    def __init__(
+        self,
+        viewpoints: int,
+        workdir: str | Path,
+        days: int = 7,
+        routes: int | None = None,
+        seed: int = 0,
+        config_path: str = "config/engine_config.yaml",
+        standin: OpenMeteoStandIn | None = None,
+        upstream: dict[str, str] | None = None,
+    ) -> None:
+        from gmp.main import _create_fetcher, _register_plugins
+
+        workdir = Path(workdir)
+        self.days = days
+        self.seed = seed
+
+        # 1. 合成配置
+        vp_dicts = synthetic_viewpoints(viewpoints, seed)
+        route_count = max(1, viewpoints // 10) if routes is None else routes
+        route_dicts = synthetic_routes([v["id"] for v in vp_dicts], route_count, seed)
+        vp_dir, route_dir = write_config_dirs(workdir / "config", vp_dicts, route_dicts)
+        viewpoint_config = ViewpointConfig()
+        viewpoint_config.load(str(vp_dir))
+        route_config = RouteConfig()
+        route_config.load(str(route_dir))
+
+        # 2. 组件栈 (与 gmp.main._create_core_components 相同，fetcher 接入替身)
+        config_manager = ConfigManager(config_path)
+        self._repo = create_cache_repository(
+            str(workdir / "bench.db"),
+            backend=config_manager.config.cache_backend,
+            sqlite_config=config_manager.get_cache_sqlite_config(),
+        )
+        cache = WeatherCache(
+            self._repo,
+            config_manager.config.data_freshness,
+            config_manager.get_cache_memory_config(),
+        )
+        self.standin = standin or OpenMeteoStandIn()
+        # 与 generate-all 相同的工厂 (fetcher.engine / 节流 / 主机级限流均按配置)，
+        # 仅替换上游: 传输层或 base_url 指向替身；主机级令牌桶改用 workdir 内的
+        # 独立文件，不消耗真实 API 的配额
+        fetcher_config = {**config_manager.get_fetcher_config(), **(upstream or {})}
+        if fetcher_config.get("host_rate_limit"):
+            fetcher_config["host_rate_limit"] = {
+                **fetcher_config["host_rate_limit"],
+                "db_path": str(workdir / "rate_limit.db"),
+            }
+        self.engine = fetcher_config.get("engine", "sync")
+        self.fetcher = _create_fetcher(
+            cache,
+            fetcher_config,
+            transport=self.standin.transport() if upstream is None else None,
+        )
+        engine = ScoreEngine()
+        _register_plugins(engine, config_manager)
+        astro_config = config_manager.get_astro_config()
+        self.scheduler = GMPScheduler(
+            config=config_manager,
+            viewpoint_config=viewpoint_config,
+            route_config=route_config,
+            fetcher=self.fetcher,
+            score_engine=engine,
+            astro=CachedAstro(
+                precision=astro_config.get("precision", 2),
+                backend=astro_config.get("backend", "ephem"),
+            ),
+            geo=GeoUtils(),
+        )
+        self._forecast_reporter = ForecastReporter(display_names=engine.display_names)
+        self._timeline_reporter = TimelineReporter()
+        self._json_writer = JSONFileWriter(
+            output_dir=str(workdir / "output"), archive_dir=str(workdir / "archive")
+        )
+        self._memo = ResultMemo()
+
+        self.viewpoints = viewpoint_config.list_all()
+        self.routes = route_config.list_all()
+        # 全部观景台 run() 将请求的坐标 (本地/目标/光路，全局去重)
+        self._planner = FetchPlanner(self.scheduler, self.fetcher)
+        self.plan = self._planner.plan([vp.id for vp in self.viewpoints], days)
+        self.coords = list(self.plan.points)
+        self.results: dict[str, PipelineResult] = {}
+        self.route_results: dict[str, list[PipelineResult]] = {}
+
+    def fetch(self) -> None:
+        """按预取计划批量获取全部坐标 (冷缓存时全部走 API 替身)"""
+        self._planner.execute(self.plan)
+
+    def cache_read(self) -> None:
+        """同一批坐标按预取分组再取一次 (fetch 之后全部命中缓存)"""
+        for (past_days, columns), coords in self.plan.groups().items():
+            self.fetcher.fetch_multi_points(
+                coords, days=self.days, past_days=past_days, columns=columns
+            )
+
+    def score(self) -> None:
+        """所有观景台跑一轮 Scheduler.run，结果存入 results"""
+        self._memo = ResultMemo()
+        for vp in self.viewpoints:
+            self.results[vp.id] = self._memo.get_or_run(
+                ResultMemo.key(vp.id, self.days, None),
+                lambda vp_id=vp.id: self.scheduler.run(vp_id, days=self.days),
+            )
+
+    def run_routes(self) -> None:
+        """线路聚合，站点结果复用最近一次 score() 的备忘录"""
+        for route in self.routes:
+            self.route_results[route.id] = self.scheduler.run_route(
+                route.id, days=self.days, memo=self._memo
+            )
+
+    def write_output(self) -> None:
+        """生成 forecast/timeline 并写入 JSON (与 BatchGenerator 的全量写入相同)"""
+        for vp_id, result in self.results.items():
+            forecast = self._forecast_reporter.generate(result)
+            timeline: dict = {}
+            for fd in result.forecast_days:
+                tl = self._timeline_reporter.generate(result, date.fromisoformat(fd.date))
+                self._json_writer.write_viewpoint_timeline(vp_id, fd.date, tl)
+                timeline = timeline or tl
+            self._json_writer.write_viewpoint(vp_id, forecast, timeline)
+        for route in self.routes:
+            self._json_writer.write_route(
+                route.id,
+                self._forecast_reporter.generate_route(self.route_results[route.id], route),
+            )
+
+    def close(self) -> None:
+        self.fetcher.close()
+        self._repo.close()
+
+
+def run_bench(
+    viewpoints: int,
+    days: int = 7,
+    routes: int | None = None,
+    seed: int = 0,
+    config_path: str = "config/engine_config.yaml",
+    workdir: str | Path | None = None,
+    latency_ms: float = 0.0,
+    http: bool = False,
+) -> dict:
+    """对 viewpoints 个合成观景台跑一轮分阶段基准
+
+    参数见 BenchEnvironment；workdir 为 None 时使用临时目录 (结束后删除)。
+    latency_ms 为替身上游的单请求延迟；http=True 时启动本地替身 HTTP 服务，
+    请求经真实 socket 发出 (否则走进程内 MockTransport)。
+
+    Returns:
+        {"scale": {...}, "stages": {阶段: {...}}, "wall_seconds": float}
+    """
+    if workdir is None:
+        with tempfile.TemporaryDirectory(prefix="gmp-bench-") as tmp:
+            return run_bench(
+                viewpoints, days, routes, seed, config_path, tmp, latency_ms, http
+            )
+
+    standin = OpenMeteoStandIn(config=StandInConfig(latency_ms=latency_ms, seed=seed))
+    server = OpenMeteoServer(standin=standin).start() if http else None
+    env = BenchEnvironment(
+        viewpoints, workdir, days=days, routes=routes, seed=seed,
+        config_path=config_path, standin=standin,
+        upstream=server.fetcher_config() if server is not None else None,
+    )
+    n_vp, n_route = len(env.viewpoints), len(env.routes)
+    metrics.reset()
+    started = time.perf_counter()
+    try:
+        stages = {
+            "fetch": _stage("fetch", len(env.coords), env.fetch),
+            "cache": _stage("cache", len(env.coords), env.cache_read),
+            "warmup": _stage("warmup", n_vp, env.score),
+            "scoring": _stage("scoring", n_vp, env.score),
+            "routes": _stage("routes", n_route, env.run_routes),
+            "output": _stage("output", n_vp + n_route, env.write_output),
+        }
+    finally:
+        env.close()
+        if server is not None:
+            server.stop()
+
+    return {
+        "scale": {
+            "viewpoints": n_vp,
+            "routes": n_route,
+            "days": days,
+            "seed": seed,
+            "unique_points": len(env.coords),
+            "api_requests": env.standin.request_count,
+            "transport": "http" if http else "mock",
+            "engine": env.engine,
+            "latency_ms": latency_ms,
+        },
+        "stages": stages,
+        "wall_seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def run_suite(
+    scales: Iterable[int],
+    days: int = 7,
+    seed: int = 0,
+    config_path: str = "config/engine_config.yaml",
+    progress_callback: Callable[[str], None] | None = None,
+    latency_ms: float = 0.0,
+    http: bool = False,
+) -> dict:
+    """按多个规模依次运行 run_bench，汇总为可保存的结果文档"""
+    _report = progress_callback or (lambda _msg: None)
+    runs = []
+    for scale in scales:
+        _report(f"⏱️  基准: {scale} 个观景台, {days} 天")
+        runs.append(run_bench(
+            scale, days=days, seed=seed, config_path=config_path,
+            latency_ms=latency_ms, http=http,
+        ))
+    return {
+        "version": BENCH_VERSION,
+        "generated_at": datetime.now(_CST).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "runs": runs,
+    }
+
+
+def write_results(path: str | Path, data: dict) -> None:
+    """结果写为按键排序的 JSON (便于 diff)"""
+    Path(path).write_text(
+        json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """按 (规模, 阶段) 对比两份结果的耗时
+
+    Returns:
+        [{"viewpoints", "stage", "baseline_s", "current_s", "ratio"}]，
+        仅包含两份结果都有的规模
+
+    Raises:
+        ValueError: 结果文件版本不一致
+    """
+    if baseline.get("version") != current.get("version"):
+        raise ValueError(
+            f"基准结果版本不一致: {baseline.get('version')} != {current.get('version')}"
+        )
+    base_runs = {run["scale"]["viewpoints"]: run for run in baseline["runs"]}
+    rows = []
+    for run in current["runs"]:
+        base = base_runs.get(run["scale"]["viewpoints"])
+        if base is None:
+            continue
+        for stage in STAGES:
+            if stage not in run["stages"] or stage not in base["stages"]:
+                continue
+            before = base["stages"][stage]["seconds"]
+            after = run["stages"][stage]["seconds"]
+            rows.append({
+                "viewpoints": run["scale"]["viewpoints"],
+                "stage": stage,
+                "baseline_s": before,
+                "current_s": after,
+                "ratio": round(after / before, 3) if before else None,
+            })
+    return rows
+
+
+def format_summary(data: dict) -> str:
+    """run_suite() 结果 → 每个规模一张阶段耗时表"""
+    lines: list[str] = []
+    for run in data["runs"]:
+        scale = run["scale"]
+        lines.append(
+            f"规模: {scale['viewpoints']} 观景台 / {scale['routes']} 线路 / "
+            f"{scale['days']} 天 — {scale['unique_points']} 个坐标, "
+            f"{scale['api_requests']} 次 API 请求, 总计 {run['wall_seconds']:.3f}s"
+        )
+        lines.append("  阶段           耗时(s)        数量    单项(ms)")
+        for stage in STAGES:
+            s = run["stages"].get(stage)
+            if s is None:
+                continue
+            lines.append(
+                f"  {stage:<10}{s['seconds']:>12.3f}{s['items']:>12,}{s['per_item_ms']:>12.3f}"
+            )
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+def format_compare(rows: list[dict]) -> str:
+    """compare() 结果 → 文本表 (ratio > 1 表示变慢)"""
+    lines = ["      规模  阶段           基线(s)     当前(s)    比值"]
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        lines.append(
+            f"{row['viewpoints']:>10}  {row['stage']:<10}"
+            f"{row['baseline_s']:>12.3f}{row['current_s']:>12.3f}{ratio:>8}"
+        )
+    return "\n".join(lines)
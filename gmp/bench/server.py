@@ -0,0 +1,130 @@
+"""gmp/bench/server.py — 本地 Open-Meteo 替身 HTTP 服务
+
+以 ThreadingHTTPServer 提供 /v1/forecast 与 /v1/archive (响应逻辑见
+gmp.bench.synthetic.OpenMeteoStandIn)，MeteoFetcher 将 base_url /
+archive_base_url 指向本服务即可在无网络环境下经真实 socket 压测
+并发、批量合并、重试与节流逻辑。另提供 GET /stats 返回请求统计。
+
+    standin = OpenMeteoStandIn(config=StandInConfig(latency_ms=80, quota_per_minute=600))
+    with OpenMeteoServer(standin=standin) as server:
+        fetcher = MeteoFetcher(cache, server.fetcher_config())
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import structlog
+
+from gmp.bench.synthetic import OpenMeteoStandIn
+
+logger = structlog.get_logger()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET 请求 → OpenMeteoStandIn.respond → JSON 响应"""
+
+    server: _StandInHTTPServer
+    protocol_version = "HTTP/1.1"  # keep-alive，与 httpx 连接池复用行为一致
+
+    def do_GET(self) -> None:  # noqa: N802 — BaseHTTPRequestHandler 约定
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            self._send(200, {}, self.server.standin.stats())
+            return
+        status, headers, body = self.server.standin.respond(
+            url.path, dict(parse_qsl(url.query))
+        )
+        self._send(status, headers, body)
+
+    def _send(self, status: int, headers: dict[str, str], body: Any) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug("standin_server.request", message=format % args)
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], standin: OpenMeteoStandIn) -> None:
+        super().__init__(address, _Handler)
+        self.standin = standin
+
+
+class OpenMeteoServer:
+    """本地 Open-Meteo 替身服务
+
+    Args:
+        host: 监听地址
+        port: 监听端口 (0 = 由系统分配空闲端口)
+        standin: 响应逻辑与上游行为 (延迟/错误率/配额)，None 使用默认替身
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        standin: OpenMeteoStandIn | None = None,
+    ) -> None:
+        self.standin = standin or OpenMeteoStandIn()
+        self._httpd = _StandInHTTPServer((host, port), self.standin)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fetcher_config(self) -> dict[str, str]:
+        """指向本服务的 MeteoFetcher 配置 (base_url / archive_base_url)"""
+        return {
+            "base_url": f"{self.url}/v1/forecast",
+            "archive_base_url": f"{self.url}/v1/archive",
+        }
+
+    def start(self) -> OpenMeteoServer:
+        """在后台线程中开始服务"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever,
+                kwargs={"poll_interval": 0.05},
+                name="gmp-standin-server",
+                daemon=True,
+            )
+            self._thread.start()
+            logger.info("standin_server.started", url=self.url)
+        return self
+
+    def serve_forever(self) -> None:
+        """在当前线程阻塞服务 (CLI 使用，Ctrl-C 退出)"""
+        logger.info("standin_server.started", url=self.url)
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        """停止服务并释放端口"""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> OpenMeteoServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
@@ -0,0 +1,440 @@
+"""gmp/bench/synthetic.py — 合成观景台/线路与确定性逐小时天气
+
+为基准测试生成任意规模的输入:
+- 观景台/线路: 按 seed 确定性生成，写成与 config/ 相同格式的 YAML 目录
+- 天气: 每个 (坐标, 日期) 的 24 小时数据只由 ROUND(2) 坐标与日期决定，
+  与请求跨度无关，缓存合并/增量请求得到的数据与一次性请求一致
+- 录制数据: 真实 Open-Meteo 响应 JSON 可覆盖对应坐标/日期的合成值
+- Open-Meteo 替身: 按 /v1/forecast、/v1/archive 的请求参数 (含多坐标列表)
+  组装响应，可注入延迟/错误/429 配额；经 httpx.MockTransport 进程内接入，
+  或由 gmp.bench.server 以本地 HTTP 服务提供
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+import numpy as np
+import yaml
+
+_CST = timezone(timedelta(hours=8))
+
+# 川西范围 (纬度, 经度)
+_LAT_RANGE = (28.0, 33.5)
+_LON_RANGE = (99.0, 104.0)
+
+# 合成目标山峰数量 — 多个观景台共用同一批目标 (与真实配置中贡嘎/幺妹峰的情况一致)
+_TARGET_POOL_SIZE = 16
+
+# 除 sunrise/sunset 外按概率附加的能力
+_OPTIONAL_CAPABILITIES = {
+    "cloud_sea": 0.4,
+    "stargazing": 0.45,
+    "frost": 0.15,
+    "snow_tree": 0.1,
+}
+
+# 替身可返回的 hourly 字段 (Open-Meteo 字段名)
+_HOURLY_NAMES = (
+    "temperature_2m",
+    "relative_humidity_2m",
+    "cloud_cover",
+    "cloud_cover_low",
+    "cloud_cover_mid",
+    "cloud_cover_high",
+    "cloud_base",
+    "precipitation_probability",
+    "visibility",
+    "wind_speed_10m",
+    "snowfall",
+    "rain",
+    "showers",
+    "weather_code",
+)
+
+_WEATHER_CODES = np.array([0, 1, 2, 3, 45, 61, 71])
+_WEATHER_CODE_P = np.array([0.3, 0.2, 0.15, 0.15, 0.08, 0.07, 0.05])
+
+
+# ==================== 观景台 / 线路 ====================
+
+
+def synthetic_viewpoints(count: int, seed: int = 0) -> list[dict]:
+    """生成 count 个观景台配置 (与 config/viewpoints/*.yaml 同结构的 dict)"""
+    rng = random.Random(seed)
+    pool = [
+        {
+            "name": f"合成雪山{i + 1:02d}",
+            "lat": round(rng.uniform(*_LAT_RANGE), 3),
+            "lon": round(rng.uniform(*_LON_RANGE), 3),
+            "altitude": rng.randrange(5000, 7500),
+        }
+        for i in range(_TARGET_POOL_SIZE)
+    ]
+
+    viewpoints = []
+    for i in range(count):
+        primary = rng.choice(pool)
+        # 观景台位于主目标 ±0.5° 范围内
+        lat = round(primary["lat"] + rng.uniform(-0.5, 0.5), 6)
+        lon = round(primary["lon"] + rng.uniform(-0.5, 0.5), 6)
+        capabilities = ["sunrise", "sunset"] + [
+            cap for cap, p in _OPTIONAL_CAPABILITIES.items() if rng.random() < p
+        ]
+        targets = [{**primary, "weight": "primary", "applicable_events": None}]
+        if rng.random() < 0.3:
+            secondary = rng.choice(pool)
+            if secondary is not primary:
+                targets.append(
+                    {**secondary, "weight": "secondary", "applicable_events": None}
+                )
+        viewpoints.append({
+            "id": f"bench_vp_{i:05d}",
+            "name": f"合成观景台{i:05d}",
+            "location": {
+                "lat": lat,
+                "lon": lon,
+                "altitude": rng.randrange(2800, 4800),
+            },
+            "capabilities": capabilities,
+            "targets": targets,
+        })
+    return viewpoints
+
+
+def synthetic_routes(
+    viewpoint_ids: list[str],
+    count: int,
+    seed: int = 0,
+    stops: int = 4,
+) -> list[dict]:
+    """在给定观景台中生成 count 条线路配置 (每条 stops 站，站点可在线路间重复)"""
+    rng = random.Random(seed + 1)
+    stops = min(stops, len(viewpoint_ids))
+    return [
+        {
+            "id": f"bench_route_{i:04d}",
+            "name": f"合成线路{i:04d}",
+            "stops": [
+                {"viewpoint_id": vp_id, "order": order}
+                for order, vp_id in enumerate(rng.sample(viewpoint_ids, stops), 1)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def write_config_dirs(
+    root: str | Path,
+    viewpoints: list[dict],
+    routes: list[dict],
+) -> tuple[Path, Path]:
+    """将合成配置写成 viewpoints/ 与 routes/ YAML 目录，返回两个目录路径"""
+    root = Path(root)
+    vp_dir = root / "viewpoints"
+    route_dir = root / "routes"
+    for path, items in ((vp_dir, viewpoints), (route_dir, routes)):
+        path.mkdir(parents=True, exist_ok=True)
+        for item in items:
+            (path / f"{item['id']}.yaml").write_text(
+                yaml.safe_dump(item, allow_unicode=True, sort_keys=False),
+                encoding="utf-8",
+            )
+    return vp_dir, route_dir
+
+
+# ==================== 天气 ====================
+
+
+def _day_seed(lat: float, lon: float, day: date) -> int:
+    """(ROUND(2) 坐标, 日期) → 稳定种子 (不受 PYTHONHASHSEED 影响)"""
+    return zlib.crc32(f"{lat:.2f},{lon:.2f},{day.isoformat()}".encode())
+
+
+def _hourly_day(lat: float, lon: float, day: date) -> dict[str, np.ndarray]:
+    """单个 (坐标, 日期) 的 24 小时数据 (Open-Meteo 字段名)"""
+    rng = np.random.default_rng(_day_seed(lat, lon, day))
+    hours = np.arange(24)
+    # 日变化: 14 时最暖，午后对流云增多
+    diurnal = np.cos((hours - 14) / 24 * 2 * np.pi)
+    base_temp = rng.uniform(-18, 14)
+    low = np.clip(rng.uniform(0, 90) + rng.normal(0, 12, 24) + 15 * diurnal, 0, 100)
+    mid = np.clip(rng.uniform(0, 70) + rng.normal(0, 10, 24), 0, 100)
+    high = np.clip(rng.uniform(0, 60) + rng.normal(0, 10, 24), 0, 100)
+    total = np.maximum(np.maximum(low, mid), high)
+    precip_prob = np.clip(total * rng.uniform(0.2, 0.9) + rng.normal(0, 5, 24), 0, 100)
+    raining = precip_prob > 60
+    temp = base_temp + 6 * diurnal + rng.normal(0, 0.8, 24)
+    cloud_base = rng.uniform(500, 6000, 24)
+    # 约 10% 的小时无云底高度 (API 返回 null)
+    cloud_base[rng.random(24) < 0.1] = np.nan
+
+    return {
+        "temperature_2m": temp.round(1),
+        "relative_humidity_2m": np.clip(40 + total * 0.5 + rng.normal(0, 8, 24), 5, 100).round(),
+        "cloud_cover": total.round(),
+        "cloud_cover_low": low.round(),
+        "cloud_cover_mid": mid.round(),
+        "cloud_cover_high": high.round(),
+        "cloud_base": cloud_base.round(),
+        "precipitation_probability": precip_prob.round(),
+        "visibility": rng.uniform(2000, 60000, 24).round(),
+        "wind_speed_10m": np.abs(rng.normal(12, 7, 24)).round(1),
+        "snowfall": np.where(raining & (temp < 0), rng.uniform(0, 1.5, 24), 0).round(2),
+        "rain": np.where(raining & (temp >= 0), rng.uniform(0, 3, 24), 0).round(2),
+        "showers": np.where(raining, rng.uniform(0, 0.5, 24), 0).round(2),
+        "weather_code": rng.choice(_WEATHER_CODES, 24, p=_WEATHER_CODE_P),
+    }
+
+
+def _to_json_list(values: np.ndarray) -> list:
+    """ndarray → JSON 列表 (NaN → None, 整数值字段保持 int)"""
+    if values.dtype.kind in "iu":
+        return values.tolist()
+    return [None if np.isnan(v) else v for v in values.tolist()]
+
+
+Recordings = Mapping[tuple[float, float], Mapping[date, Mapping[str, list]]]
+
+
+def load_recordings(paths: list[str | Path]) -> dict:
+    """读取录制的 Open-Meteo 响应 JSON (单个对象或多坐标数组)
+
+    Returns:
+        {(ROUND(2) 纬度, 经度): {日期: {字段: 24 小时值}}}，不足 24 小时的日期跳过
+    """
+    recordings: dict[tuple[float, float], dict[date, dict[str, list]]] = {}
+    for path in paths:
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        for item in raw if isinstance(raw, list) else [raw]:
+            hourly = item["hourly"]
+            rows: dict[date, list[int]] = {}
+            for i, ts in enumerate(hourly["time"]):
+                rows.setdefault(date.fromisoformat(ts[:10]), []).append(i)
+            days = recordings.setdefault(
+                (round(item["latitude"], 2), round(item["longitude"], 2)), {}
+            )
+            for day, idx in rows.items():
+                if len(idx) != 24:
+                    continue
+                days[day] = {
+                    name: [values[i] for i in idx]
+                    for name, values in hourly.items() if name != "time"
+                }
+    return recordings
+
+
+def hourly_payload(
+    lat: float,
+    lon: float,
+    start: date,
+    end: date,
+    fields: list[str],
+    recordings: Recordings | None = None,
+) -> dict:
+    """单坐标 [start, end] 的 Open-Meteo 格式响应对象
+
+    recordings 中有该坐标该日期的录制数据时优先使用 (缺少的字段仍为合成值)。
+    """
+    lat, lon = round(lat, 2), round(lon, 2)
+    recorded = (recordings or {}).get((lat, lon), {})
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    hourly: dict[str, list] = {
+        "time": [f"{d.isoformat()}T{h:02d}:00" for d in days for h in range(24)],
+    }
+    per_day = []
+    for d in days:
+        synthetic = {
+            name: _to_json_list(values) for name, values in _hourly_day(lat, lon, d).items()
+        }
+        per_day.append({**synthetic, **recorded.get(d, {})})
+    for name in fields:
+        hourly[name] = [v for day in per_day for v in day[name]]
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "timezone": "GMT",
+        "hourly": hourly,
+    }
+
+
+def _request_span(params: Mapping[str, str], today: date) -> tuple[date, date]:
+    """按 start_date/end_date 或 forecast_days/past_days 参数确定日期跨度"""
+    if "start_date" in params:
+        return (
+            date.fromisoformat(params["start_date"]),
+            date.fromisoformat(params.get("end_date", params["start_date"])),
+        )
+    forecast_days = int(params.get("forecast_days", 7))
+    past_days = int(params.get("past_days", 0))
+    return today - timedelta(days=past_days), today + timedelta(days=forecast_days - 1)
+
+
+def forecast_response(
+    params: Mapping[str, str],
+    today: date | None = None,
+    recordings: Recordings | None = None,
+) -> dict | list[dict]:
+    """按 /v1/forecast (或 /v1/archive) 请求参数组装响应
+
+    latitude/longitude 为逗号分隔列表时返回与坐标顺序一致的数组，
+    单坐标返回单个对象 (与 Open-Meteo 一致)。
+
+    Raises:
+        ValueError: 缺少坐标参数、经纬度数量不一致或字段未知
+    """
+    if "latitude" not in params or "longitude" not in params:
+        raise ValueError("缺少 latitude/longitude 参数")
+    lats = [float(v) for v in str(params["latitude"]).split(",")]
+    lons = [float(v) for v in str(params["longitude"]).split(",")]
+    if len(lats) != len(lons):
+        raise ValueError(f"latitude/longitude 数量不一致: {len(lats)} != {len(lons)}")
+
+    fields = [f for f in str(params.get("hourly", "")).split(",") if f]
+    unknown = set(fields) - set(_HOURLY_NAMES)
+    if unknown:
+        raise ValueError(f"未知 hourly 字段: {', '.join(sorted(unknown))}")
+    start, end = _request_span(params, today or datetime.now(_CST).date())
+    payloads = [
+        hourly_payload(lat, lon, start, end, fields, recordings)
+        for lat, lon in zip(lats, lons)
+    ]
+    return payloads[0] if len(payloads) == 1 else payloads
+
+
+@dataclass
+class StandInConfig:
+    """Open-Meteo 替身的上游行为
+
+    Attributes:
+        latency_ms: 每个请求的固定延迟
+        jitter_ms: 在固定延迟上叠加 [0, jitter_ms) 的均匀随机延迟
+        error_rate: 返回 500 的概率 (0-1)
+        quota_per_minute: 60 秒滑动窗口内允许的请求数，超出返回 429 (0 = 不限)
+        retry_after: 429 响应的 Retry-After 秒数，None → 窗口内最早请求过期所需秒数
+        seed: 延迟抖动与错误注入的随机种子
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    quota_per_minute: int = 0
+    retry_after: int | None = None
+    seed: int = 0
+
+
+# 替身支持的端点 (与 MeteoFetcher 默认的 base_url / archive_base_url 路径一致)
+_ENDPOINTS = ("/v1/forecast", "/v1/archive")
+
+
+class OpenMeteoStandIn:
+    """Open-Meteo 替身 — 同一套响应逻辑供两种接入方式使用:
+
+    - transport(): httpx.MockTransport，进程内注入 MeteoFetcher
+    - gmp.bench.server.OpenMeteoServer: 本地 HTTP 服务，经真实 socket 访问
+
+    线程安全；按 StandInConfig 注入延迟、500 错误与每分钟配额 (429 + Retry-After)。
+    """
+
+    def __init__(
+        self,
+        today: date | None = None,
+        config: StandInConfig | None = None,
+        recordings: Recordings | None = None,
+    ) -> None:
+        self._today = today
+        self._config = config or StandInConfig()
+        self._recordings = recordings
+        self._rng = random.Random(self._config.seed)
+        self._lock = threading.Lock()
+        self._window: deque[float] = deque()
+        self._stats = {
+            "requests": 0,
+            "coordinates": 0,
+            "rate_limited": 0,
+            "errors": 0,
+            "bad_requests": 0,
+        }
+
+    @property
+    def request_count(self) -> int:
+        """收到的请求总数 (含 429/500)"""
+        with self._lock:
+            return self._stats["requests"]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def respond(
+        self, path: str, params: Mapping[str, str]
+    ) -> tuple[int, dict[str, str], Any]:
+        """处理一次 GET 请求 → (状态码, 响应头, JSON body)"""
+        cfg = self._config
+        with self._lock:
+            self._stats["requests"] += 1
+            delay = cfg.latency_ms + self._rng.random() * cfg.jitter_ms
+            failed = self._rng.random() < cfg.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if not path.endswith(_ENDPOINTS):
+            return 404, {}, {"error": True, "reason": f"Not found: {path}"}
+
+        retry_after = self._admit()
+        if retry_after is not None:
+            return (
+                429,
+                {"Retry-After": str(retry_after)},
+                {"error": True, "reason": "Minutely API request limit exceeded"},
+            )
+        if failed:
+            with self._lock:
+                self._stats["errors"] += 1
+            return 500, {}, {"error": True, "reason": "Injected upstream error"}
+
+        try:
+            body = forecast_response(params, self._today, self._recordings)
+        except (ValueError, KeyError) as e:
+            with self._lock:
+                self._stats["bad_requests"] += 1
+            return 400, {}, {"error": True, "reason": str(e)}
+        with self._lock:
+            self._stats["coordinates"] += len(body) if isinstance(body, list) else 1
+        return 200, {}, body
+
+    def _admit(self) -> int | None:
+        """配额检查: 放行返回 None，超额返回 Retry-After 秒数"""
+        quota = self._config.quota_per_minute
+        if quota <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if len(self._window) < quota:
+                self._window.append(now)
+                return None
+            self._stats["rate_limited"] += 1
+            if self._config.retry_after is not None:
+                return self._config.retry_after
+            return max(1, math.ceil(60 - (now - self._window[0])))
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        status, headers, body = self.respond(request.url.path, dict(request.url.params))
+        return httpx.Response(status, headers=headers, json=body)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
@@ -0,0 +1,399 @@
+"""gmp/cache/blob_repository.py — 列式压缩存储的天气缓存
+
+BlobCacheRepository 与 CacheRepository 接口一致，但天气数据存于
+weather_blob 表：每个 (坐标, 日期, fetched_at) 一行，全部逐小时字段
+打包为一个 float64 矩阵 (首行为 forecast_hour)，经字节重排后 zlib 压缩。
+
+相比逐小时一行的 weather_cache:
+- 行数减少为 1/24，索引随之缩小
+- 读取时整块解码为 NumPy 数组直接构建 DataFrame，无逐行 dict 转换
+
+同一 (坐标, 日期) 被部分小时覆盖写入时保留多个版本，读取时按小时取
+最新版本；新写入完全覆盖的旧版本在写入时删除。每个版本记录写入时的
+fields_mask，读取时随所取版本逐小时还原。
+"""
+
+from __future__ import annotations
+
+import zlib
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from gmp.cache.repository import (
+    _BULK_COORDS_PER_QUERY,
+    _QUERY_COLUMNS,
+    _WEATHER_DATA_COLUMNS,
+    DEFAULT_API_SOURCE,
+    CacheRepository,
+    _frame_fields_mask,
+)
+
+logger = structlog.get_logger()
+
+# payload 格式版本，字段列表变化时递增
+_BLOB_VERSION = 1
+
+# 以 INTEGER 存于 weather_cache 的字段，解码后无缺失值时还原为 int64
+_INTEGER_COLUMNS = (
+    "forecast_hour",
+    "cloud_cover_total",
+    "cloud_cover_low",
+    "cloud_cover_medium",
+    "cloud_cover_high",
+    "precipitation_probability",
+    "weather_code",
+)
+
+_ALL_HOURS_MASK = (1 << 24) - 1
+
+
+def encode_payload(hours: np.ndarray, values: np.ndarray) -> bytes:
+    """(hours, 字段矩阵) → 压缩 payload
+
+    Args:
+        hours: shape (n,) 的小时数组
+        values: shape (len(_WEATHER_DATA_COLUMNS), n) 的 float64 矩阵，缺失为 NaN
+    """
+    matrix = np.vstack([hours.astype("<f8"), values.astype("<f8")])
+    # 字节重排: 同一字节位的数据相邻，压缩率显著高于原始 float64 排列
+    shuffled = matrix.reshape(-1).view(np.uint8).reshape(-1, 8).T
+    return bytes([_BLOB_VERSION]) + zlib.compress(shuffled.tobytes(), 6)
+
+
+def decode_payload(payload: bytes) -> np.ndarray:
+    """压缩 payload → shape (1 + 字段数, n) 的 float64 矩阵 (首行为小时)"""
+    if payload[0] != _BLOB_VERSION:
+        raise ValueError(f"不支持的 weather_blob payload 版本: {payload[0]}")
+    raw = np.frombuffer(zlib.decompress(payload[1:]), dtype=np.uint8)
+    values = np.ascontiguousarray(raw.reshape(8, -1).T).view("<f8")
+    return values.reshape(1 + len(_WEATHER_DATA_COLUMNS), -1)
+
+
+class BlobCacheRepository(CacheRepository):
+    """weather_cache 的列式压缩存储实现"""
+
+    def _create_tables(self) -> None:
+        """在基础表之外创建 weather_blob 表"""
+        super()._create_tables()
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS weather_blob (
+                lat_rounded REAL NOT NULL,
+                lon_rounded REAL NOT NULL,
+                forecast_date DATE NOT NULL,
+                fetched_at DATETIME NOT NULL,
+                api_source TEXT DEFAULT 'open-meteo',
+                hours_mask INTEGER NOT NULL,
+                fields_mask INTEGER,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (lat_rounded, lon_rounded, forecast_date, fetched_at)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._conn.commit()
+        self._add_fields_mask("weather_blob")
+
+    # ==================== 读取 ====================
+
+    def query_weather(
+        self,
+        lat: float,
+        lon: float,
+        target_date: date,
+        hours: list[int] | None = None,
+    ) -> list[dict] | None:
+        """查询单日天气缓存，返回格式与 CacheRepository.query_weather 一致"""
+        df = self.query_weather_range(lat, lon, target_date, target_date)
+        if hours is not None:
+            df = df[df["forecast_hour"].isin(hours)]
+        if df.empty:
+            return None
+        return df.astype(object).where(df.notna(), None).to_dict("records")
+
+    def query_weather_range(
+        self,
+        lat: float,
+        lon: float,
+        start_date: date,
+        end_date: date,
+    ) -> pd.DataFrame:
+        """查询单坐标在 [start_date, end_date] 内的全部天气缓存"""
+        sql = """
+            SELECT lat_rounded, lon_rounded, forecast_date, fetched_at,
+                   api_source, fields_mask, payload
+            FROM weather_blob
+            WHERE lat_rounded = ? AND lon_rounded = ?
+              AND forecast_date BETWEEN ? AND ?
+            ORDER BY forecast_date, fetched_at DESC
+        """
+        params = [
+            round(lat, 2),
+            round(lon, 2),
+            start_date.isoformat(),
+            end_date.isoformat(),
+        ]
+        return self._rows_to_frame(self._fetch_tuples(sql, params))
+
+    def query_weather_bulk(
+        self,
+        coords: list[tuple[float, float]],
+        start_date: date,
+        end_date: date,
+    ) -> pd.DataFrame:
+        """查询多坐标在 [start_date, end_date] 内的全部天气缓存"""
+        unique = list(dict.fromkeys((round(lat, 2), round(lon, 2)) for lat, lon in coords))
+        rows: list = []
+        for i in range(0, len(unique), _BULK_COORDS_PER_QUERY):
+            chunk = unique[i:i + _BULK_COORDS_PER_QUERY]
+            values = ", ".join("(?, ?)" for _ in chunk)
+            sql = f"""
+                SELECT lat_rounded, lon_rounded, forecast_date, fetched_at,
+                       api_source, fields_mask, payload
+                FROM weather_blob
+                WHERE (lat_rounded, lon_rounded) IN (VALUES {values})
+                  AND forecast_date BETWEEN ? AND ?
+                ORDER BY lat_rounded, lon_rounded, forecast_date, fetched_at DESC
+            """
+            params: list = [v for coord in chunk for v in coord]
+            params += [start_date.isoformat(), end_date.isoformat()]
+            rows.extend(self._fetch_tuples(sql, params))
+        return self._rows_to_frame(rows)
+
+    def _fetch_tuples(self, sql: str, params: list) -> list[tuple]:
+        """执行查询，返回普通元组行"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(sql, params).fetchall()
+
+    # ==================== 写入 ====================
+
+    def upsert_weather_batch(
+        self,
+        lat: float,
+        lon: float,
+        target_date: date,
+        rows: list[dict],
+    ) -> None:
+        """批量写入单坐标单日数据"""
+        df = pd.DataFrame(rows).assign(
+            lat_rounded=lat, lon_rounded=lon, forecast_date=target_date.isoformat()
+        )
+        self.upsert_weather_frame(df)
+
+    def upsert_weather_frame(self, df: pd.DataFrame) -> int:
+        """整表批量写入，每个 (坐标, 日期, fetched_at) 编码为一行
+
+        列要求与 CacheRepository.upsert_weather_frame 相同。
+
+        Returns:
+            写入的小时行数
+        """
+        if df.empty:
+            return 0
+
+        keys = pd.DataFrame({
+            "lat_rounded": df["lat_rounded"].round(2).to_numpy(),
+            "lon_rounded": df["lon_rounded"].round(2).to_numpy(),
+            "forecast_date": [
+                d if isinstance(d, str) else d.isoformat() for d in df["forecast_date"]
+            ],
+            "fetched_at": df["fetched_at"].to_numpy(),
+            "api_source": (
+                df["api_source"].to_numpy() if "api_source" in df.columns
+                else DEFAULT_API_SOURCE
+            ),
+        })
+        hours = df["forecast_hour"].to_numpy(dtype=np.int64)
+        field_masks = _frame_fields_mask(df)
+        values = np.vstack([
+            pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+            if col in df.columns else np.full(len(df), np.nan)
+            for col in _WEATHER_DATA_COLUMNS
+        ])
+
+        with self._lock, self._conn:
+            for key, idx in keys.groupby(list(keys.columns), sort=False).indices.items():
+                self._write_version(
+                    key, hours[idx], values[:, idx],
+                    _common_mask(field_masks[i] for i in idx),
+                )
+        return len(df)
+
+    def _write_version(
+        self,
+        key: tuple,
+        hours: np.ndarray,
+        values: np.ndarray,
+        fields: int | None,
+    ) -> None:
+        """写入一个 (坐标, 日期, fetched_at) 版本 (调用方持有锁与事务)
+
+        - 小时被新版本完全覆盖的旧版本删除
+        - 相同 fetched_at 的已有版本与新数据按小时合并 (新数据优先)，
+          fields_mask 取两者共同的字段
+        """
+        lat, lon, date_str, fetched_at, api_source = key
+        hours, values = _dedupe_hours(hours, values)
+        mask = _hours_mask(hours)
+
+        existing = self._conn.execute(
+            """
+            SELECT fetched_at, hours_mask, fields_mask, payload FROM weather_blob
+            WHERE lat_rounded = ? AND lon_rounded = ? AND forecast_date = ?
+            """,
+            (lat, lon, date_str),
+        ).fetchall()
+        for old_fetched_at, old_mask, old_fields, payload in existing:
+            if old_mask & ~mask & _ALL_HOURS_MASK == 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM weather_blob
+                    WHERE lat_rounded = ? AND lon_rounded = ?
+                      AND forecast_date = ? AND fetched_at = ?
+                    """,
+                    (lat, lon, date_str, old_fetched_at),
+                )
+            elif old_fetched_at == fetched_at:
+                old = decode_payload(payload)
+                keep = ~np.isin(old[0], hours)
+                hours = np.concatenate([old[0][keep].astype(np.int64), hours])
+                values = np.hstack([old[1:, keep], values])
+                hours, values = _dedupe_hours(hours, values)
+                mask |= old_mask
+                fields = _common_mask([fields, old_fields])
+
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO weather_blob
+                (lat_rounded, lon_rounded, forecast_date, fetched_at,
+                 api_source, hours_mask, fields_mask, payload)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (lat, lon, date_str, fetched_at, api_source, mask, fields,
+             encode_payload(hours, values)),
+        )
+
+    # ==================== 解码 ====================
+
+    @staticmethod
+    def _rows_to_frame(rows: list) -> pd.DataFrame:
+        """weather_blob 行 (已按坐标/日期分组, fetched_at 降序) → DataFrame
+
+        同一 (坐标, 日期) 多个版本时，每个小时取 fetched_at 最新的版本。
+        """
+        if not rows:
+            return pd.DataFrame(columns=_QUERY_COLUMNS)
+
+        matrices: list[np.ndarray] = []
+        key_cols: dict[str, list] = {
+            "lat_rounded": [], "lon_rounded": [], "forecast_date": [],
+            "fetched_at": [], "api_source": [], "fields_mask": [],
+        }
+        i = 0
+        while i < len(rows):
+            lat, lon, date_str = rows[i][0], rows[i][1], rows[i][2]
+            j = i
+            while j < len(rows) and rows[j][:3] == rows[i][:3]:
+                j += 1
+            matrix, fetched_at, api_source, fields = _merge_versions(rows[i:j])
+            n = matrix.shape[1]
+            matrices.append(matrix)
+            key_cols["lat_rounded"].append(np.full(n, lat))
+            key_cols["lon_rounded"].append(np.full(n, lon))
+            key_cols["forecast_date"].append(np.full(n, date_str, dtype=object))
+            key_cols["fetched_at"].append(fetched_at)
+            key_cols["api_source"].append(api_source)
+            key_cols["fields_mask"].append(fields)
+            i = j
+
+        matrix = np.hstack(matrices)
+        data: dict[str, np.ndarray] = {
+            col: np.concatenate(parts) for col, parts in key_cols.items()
+        }
+        data["forecast_hour"] = matrix[0]
+        for k, col in enumerate(_WEATHER_DATA_COLUMNS, start=1):
+            data[col] = matrix[k]
+
+        frame = pd.DataFrame(data, columns=_QUERY_COLUMNS)
+        # 旧版本行的 fields_mask 为 NULL: 有缺失时为 float64 + NaN
+        frame["fields_mask"] = pd.to_numeric(frame["fields_mask"])
+        for col in _INTEGER_COLUMNS:
+            if not frame[col].isna().any():
+                frame[col] = frame[col].astype(np.int64)
+        return frame
+
+
+def _hours_mask(hours: np.ndarray) -> int:
+    """小时数组 → 24 位掩码"""
+    mask = 0
+    for h in hours.tolist():
+        mask |= 1 << int(h)
+    return mask
+
+
+def _dedupe_hours(hours: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """按小时升序排列，重复小时保留最后出现的一条"""
+    # 反转后 unique 取首次出现 = 原序列最后一次出现
+    rev_hours = hours[::-1]
+    uniq, first = np.unique(rev_hours, return_index=True)
+    idx = len(hours) - 1 - first
+    return uniq.astype(np.int64), values[:, idx]
+
+
+def _common_mask(masks) -> int | None:
+    """多个 fields_mask 的交集，任一为 NULL (未记录) 时为 NULL"""
+    result = -1
+    for mask in masks:
+        if mask is None:
+            return None
+        result &= mask
+    return None if result == -1 else result
+
+
+def _merge_versions(
+    versions: list,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """合并同一 (坐标, 日期) 的多个版本 (fetched_at 降序)
+
+    Returns:
+        (矩阵, 逐小时 fetched_at, 逐小时 api_source, 逐小时 fields_mask)
+    """
+    if len(versions) == 1:
+        _, _, _, fetched_at, api_source, fields, payload = versions[0]
+        matrix = decode_payload(payload)
+        n = matrix.shape[1]
+        return (
+            matrix,
+            np.full(n, fetched_at, dtype=object),
+            np.full(n, api_source, dtype=object),
+            np.full(n, fields, dtype=object),
+        )
+
+    seen: set[int] = set()
+    parts: list[np.ndarray] = []
+    stamps: list[np.ndarray] = []
+    sources: list[np.ndarray] = []
+    field_masks: list[np.ndarray] = []
+    for _, _, _, fetched_at, api_source, fields, payload in versions:
+        matrix = decode_payload(payload)
+        keep = np.array([int(h) not in seen for h in matrix[0]], dtype=bool)
+        seen.update(int(h) for h in matrix[0])
+        if keep.any():
+            n = int(keep.sum())
+            parts.append(matrix[:, keep])
+            stamps.append(np.full(n, fetched_at, dtype=object))
+            sources.append(np.full(n, api_source, dtype=object))
+            field_masks.append(np.full(n, fields, dtype=object))
+
+    matrix = np.hstack(parts)
+    order = np.argsort(matrix[0], kind="stable")
+    return (
+        matrix[:, order],
+        np.concatenate(stamps)[order],
+        np.concatenate(sources)[order],
+        np.concatenate(field_masks)[order],
+    )
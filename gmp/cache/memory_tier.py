@@ -0,0 +1,119 @@
+"""gmp/cache/memory_tier.py — 进程内 LRU 内存缓存层
+
+位于 WeatherCache 与 SQLite 之间，以 (lat_rounded, lon_rounded, date) 为键
+缓存单日 DataFrame。同一进程内重复读取相同坐标/日期时跳过 SQLite 查询
+与 DataFrame 重建。容量上限按条目数计，超出时淘汰最久未使用的条目；
+条目超过 TTL 视为未命中并移除。
+
+读取 SQLite 与写回内存层之间可能有并发写入：读取方先取 generation，
+put 时若该键在此之后被 invalidate 过则放弃写入，旧数据不会被放回内存层。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import pandas as pd
+
+MemoryKey = tuple[float, float, date]
+
+
+class MemoryTier:
+    """线程安全的 LRU + TTL DataFrame 缓存"""
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 900.0) -> None:
+        """
+        Args:
+            max_entries: 最多缓存的 (坐标, 日期) 条目数，必须 > 0
+            ttl_seconds: 条目存活时间 (秒)，<= 0 表示不过期
+        """
+        if max_entries <= 0:
+            raise ValueError(f"max_entries 必须 > 0, 收到: {max_entries}")
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict[MemoryKey, tuple[float, pd.DataFrame]] = OrderedDict()
+        # 失效代数: 每次 invalidate 递增，记录各键最近一次失效时的代数；
+        # 记录过多时整体清空并抬高 _floor (早于 _floor 的读取一律不写回)
+        self._generation = 0
+        self._floor = 0
+        self._invalidated: dict[MemoryKey, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key(lat: float, lon: float, target_date: date) -> MemoryKey:
+        """构造缓存键，坐标 ROUND(2)"""
+        return (round(lat, 2), round(lon, 2), target_date)
+
+    def get(self, key: MemoryKey) -> pd.DataFrame | None:
+        """命中返回 DataFrame (共享对象，调用方不得原地修改)，否则 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, df = entry
+            if self._ttl > 0 and time.monotonic() - stored_at > self._ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return df
+
+    @property
+    def generation(self) -> int:
+        """当前失效代数，读取 SQLite 前获取并传给 put"""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: MemoryKey, df: pd.DataFrame, generation: int | None = None) -> None:
+        """写入条目，超出容量时淘汰最久未使用的条目
+
+        Args:
+            generation: 读取 df 前取得的 generation；该键在此之后被
+                invalidate 过时放弃写入。None 表示不检查。
+        """
+        with self._lock:
+            if generation is not None and (
+                generation < self._floor
+                or self._invalidated.get(key, -1) > generation
+            ):
+                return
+            self._entries[key] = (time.monotonic(), df)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys: list[MemoryKey]) -> None:
+        """移除指定条目 (数据写入 SQLite 并提交后调用)"""
+        with self._lock:
+            self._generation += 1
+            if len(self._invalidated) + len(keys) > 4 * self._max_entries:
+                self._invalidated.clear()
+                self._floor = self._generation
+            for key in keys:
+                self._entries.pop(key, None)
+                self._invalidated[key] = self._generation
+
+    def stats(self) -> dict:
+        """返回命中/未命中/淘汰计数及当前条目数"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -7,8 +7,11 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+from collections.abc import Iterable
 from datetime import date
 
+import pandas as pd
 import structlog
 
 logger = structlog.get_logger()
@@ -30,6 +33,9 @@ _WEATHER_DATA_COLUMNS = [
     "weather_code",
 ]
 
+# 天气字段 → fields_mask 中的位
+FIELD_BITS = {col: 1 << i for i, col in enumerate(_WEATHER_DATA_COLUMNS)}
+
 # query_weather 返回的字段
 _QUERY_COLUMNS = [
     "lat_rounded",
@@ -38,20 +44,106 @@ _QUERY_COLUMNS = [
     "forecast_hour",
     "fetched_at",
     "api_source",
+    "fields_mask",
     *_WEATHER_DATA_COLUMNS,
 ]
 
+# 写入 weather_cache 的字段 (坐标/时间键 + 天气数据)，顺序即 _UPSERT_SQL 参数顺序
+_UPSERT_COLUMNS = [
+    "lat_rounded",
+    "lon_rounded",
+    "forecast_date",
+    "forecast_hour",
+    "fetched_at",
+    "api_source",
+    "fields_mask",
+    *_WEATHER_DATA_COLUMNS,
+]
+
+# api_source 列默认值 (与建表 DEFAULT 一致)
+DEFAULT_API_SOURCE = "open-meteo"
+
+# 固定列的 INSERT OR REPLACE 语句，executemany 复用同一条预编译语句
+_UPSERT_SQL = (
+    f"INSERT OR REPLACE INTO weather_cache ({', '.join(_UPSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _UPSERT_COLUMNS)})"
+)
+
+_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+# 批量读取时单条 SQL 最多携带的坐标数 (每个坐标 2 个参数，低于 SQLite 999 参数上限)
+_BULK_COORDS_PER_QUERY = 400
+
+
+def fields_mask(columns: Iterable[str]) -> int:
+    """天气字段名 → fields_mask (非天气字段忽略)"""
+    mask = 0
+    for col in columns:
+        mask |= FIELD_BITS.get(col, 0)
+    return mask
+
+
+def _frame_fields_mask(df: pd.DataFrame) -> list:
+    """逐行 fields_mask: 优先取 df 的 fields_mask 列 (缺失值为 NULL)，
+    否则为 df 所含的天气字段 (写入方提供了该列即视为已获取，值可以为空)
+    """
+    if "fields_mask" in df.columns:
+        return [None if pd.isna(m) else int(m) for m in df["fields_mask"]]
+    return [fields_mask(df.columns)] * len(df)
+
 
 class CacheRepository:
     """SQLite 缓存数据库底层操作"""
 
-    def __init__(self, db_path: str) -> None:
-        """连接 SQLite，自动创建表"""
-        self._conn = sqlite3.connect(db_path)
+    def __init__(self, db_path: str, sqlite_config: dict | None = None) -> None:
+        """连接 SQLite，自动创建表
+
+        Args:
+            db_path: 数据库文件路径 (或 ":memory:")
+            sqlite_config: 可选 SQLite 调优，未配置的项保持 SQLite 默认值
+                - wal: 是否启用 WAL 日志模式
+                - synchronous: OFF | NORMAL | FULL | EXTRA
+                - cache_size_mb: 页缓存大小 (MB)
+                - mmap_size_mb: 内存映射读取大小 (MB)
+        """
+        # 连接可被后台刷新线程共用，所有访问由 _lock 串行化
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._apply_pragmas(sqlite_config or {})
         self._create_tables()
         logger.debug("cache_repository.init", db_path=db_path)
 
+    def _apply_pragmas(self, sqlite_config: dict) -> None:
+        """按配置设置 journal_mode / synchronous / cache_size / mmap_size"""
+        applied: dict = {}
+        if sqlite_config.get("wal"):
+            # :memory: 数据库不支持 WAL，SQLite 会返回 "memory"
+            row = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()
+            applied["journal_mode"] = row[0]
+
+        synchronous = sqlite_config.get("synchronous")
+        if synchronous is not None:
+            mode = str(synchronous).upper()
+            if mode not in _SYNCHRONOUS_MODES:
+                raise ValueError(f"无效的 synchronous 模式: {synchronous}")
+            self._conn.execute(f"PRAGMA synchronous={mode}")
+            applied["synchronous"] = mode
+
+        cache_size_mb = sqlite_config.get("cache_size_mb")
+        if cache_size_mb is not None:
+            # 负值表示以 KiB 为单位
+            self._conn.execute(f"PRAGMA cache_size=-{int(cache_size_mb) * 1024}")
+            applied["cache_size_mb"] = int(cache_size_mb)
+
+        mmap_size_mb = sqlite_config.get("mmap_size_mb")
+        if mmap_size_mb is not None:
+            self._conn.execute(f"PRAGMA mmap_size={int(mmap_size_mb) * 1024 * 1024}")
+            applied["mmap_size_mb"] = int(mmap_size_mb)
+
+        if applied:
+            logger.debug("cache_repository.pragmas", **applied)
+
     # ==================== 建表 ====================
 
     def _create_tables(self) -> None:
@@ -66,6 +158,7 @@ class CacheRepository:
                 forecast_hour INTEGER NOT NULL,
                 fetched_at DATETIME NOT NULL,
                 api_source TEXT DEFAULT 'open-meteo',
+                fields_mask INTEGER,
                 raw_response_json TEXT,
                 temperature_2m REAL,
                 cloud_cover_total INTEGER,
@@ -83,6 +176,8 @@ class CacheRepository:
                 UNIQUE(lat_rounded, lon_rounded, forecast_date, forecast_hour)
             );
 
+            -- UNIQUE(lat_rounded, lon_rounded, forecast_date, forecast_hour)
+            -- 自带同列顺序的索引，区间/批量读取直接走该索引
             CREATE INDEX IF NOT EXISTS idx_coords
                 ON weather_cache(lat_rounded, lon_rounded);
             CREATE INDEX IF NOT EXISTS idx_date
@@ -114,6 +209,15 @@ class CacheRepository:
                 ON prediction_history(viewpoint_id);
         """
         )
+        self._add_fields_mask("weather_cache")
+
+    def _add_fields_mask(self, table: str) -> None:
+        """旧版表补 fields_mask 列 (旧行为 NULL，读取方按非空值判断)"""
+        columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+        if "fields_mask" not in columns:
+            logger.info("cache_repository.add_fields_mask", table=table)
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN fields_mask INTEGER")
+            self._conn.commit()
 
     # ==================== weather_cache 操作 ====================
 
@@ -155,42 +259,81 @@ class CacheRepository:
             """
             params = [lat_r, lon_r, date_str]
 
-        rows = self._conn.execute(sql, params).fetchall()
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
         if not rows:
             return None
         return [dict(row) for row in rows]
 
-    def upsert_weather(
+    def query_weather_range(
         self,
         lat: float,
         lon: float,
-        target_date: date,
-        hour: int,
-        data: dict,
-    ) -> None:
-        """INSERT OR REPLACE 天气数据。坐标自动 ROUND(2)。"""
-        lat_r = round(lat, 2)
-        lon_r = round(lon, 2)
-        date_str = target_date.isoformat()
+        start_date: date,
+        end_date: date,
+    ) -> pd.DataFrame:
+        """查询单坐标在 [start_date, end_date] 内的全部天气缓存
+
+        一次 SELECT，结果直接由游标构建 DataFrame，
+        按 forecast_date, forecast_hour 排序。无数据返回空 DataFrame。
+        """
+        sql = f"""
+            SELECT {', '.join(_QUERY_COLUMNS)}
+            FROM weather_cache
+            WHERE lat_rounded = ? AND lon_rounded = ?
+              AND forecast_date BETWEEN ? AND ?
+            ORDER BY forecast_date, forecast_hour
+        """
+        params = [
+            round(lat, 2),
+            round(lon, 2),
+            start_date.isoformat(),
+            end_date.isoformat(),
+        ]
+        return self._query_frame(sql, params)
+
+    def query_weather_bulk(
+        self,
+        coords: list[tuple[float, float]],
+        start_date: date,
+        end_date: date,
+    ) -> pd.DataFrame:
+        """查询多坐标在 [start_date, end_date] 内的全部天气缓存
+
+        坐标自动 ROUND(2) 去重，按 _BULK_COORDS_PER_QUERY 分段查询后合并，
+        按坐标、日期、小时排序。无数据返回空 DataFrame。
+        """
+        unique = list(dict.fromkeys((round(lat, 2), round(lon, 2)) for lat, lon in coords))
+        frames: list[pd.DataFrame] = []
+        for i in range(0, len(unique), _BULK_COORDS_PER_QUERY):
+            chunk = unique[i:i + _BULK_COORDS_PER_QUERY]
+            values = ", ".join("(?, ?)" for _ in chunk)
+            sql = f"""
+                SELECT {', '.join(_QUERY_COLUMNS)}
+                FROM weather_cache
+                WHERE (lat_rounded, lon_rounded) IN (VALUES {values})
+                  AND forecast_date BETWEEN ? AND ?
+                ORDER BY lat_rounded, lon_rounded, forecast_date, forecast_hour
+            """
+            params: list = [v for coord in chunk for v in coord]
+            params += [start_date.isoformat(), end_date.isoformat()]
+            frames.append(self._query_frame(sql, params))
+
+        if not frames:
+            return pd.DataFrame(columns=_QUERY_COLUMNS)
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def _query_frame(self, sql: str, params: list) -> pd.DataFrame:
+        """执行查询，以元组行直接构建 DataFrame (跳过 sqlite3.Row → dict 转换)"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(sql, params).fetchall()
+        return pd.DataFrame.from_records(rows, columns=_QUERY_COLUMNS)
 
-        values = {
-            "lat_rounded": lat_r,
-            "lon_rounded": lon_r,
-            "forecast_date": date_str,
-            "forecast_hour": hour,
-            "fetched_at": data["fetched_at"],
-        }
-        for col in _WEATHER_DATA_COLUMNS:
-            if col in data:
-                values[col] = data[col]
-
-        columns = ", ".join(values.keys())
-        placeholders = ", ".join("?" for _ in values)
-        sql = f"INSERT OR REPLACE INTO weather_cache ({columns}) VALUES ({placeholders})"
-        self._conn.execute(sql, list(values.values()))
-        self._conn.commit()
-
-    def _upsert_weather_no_commit(
+    def upsert_weather(
         self,
         lat: float,
         lon: float,
@@ -198,26 +341,8 @@ class CacheRepository:
         hour: int,
         data: dict,
     ) -> None:
-        """INSERT OR REPLACE 天气数据（不 commit），供批量操作使用。"""
-        lat_r = round(lat, 2)
-        lon_r = round(lon, 2)
-        date_str = target_date.isoformat()
-
-        values = {
-            "lat_rounded": lat_r,
-            "lon_rounded": lon_r,
-            "forecast_date": date_str,
-            "forecast_hour": hour,
-            "fetched_at": data["fetched_at"],
-        }
-        for col in _WEATHER_DATA_COLUMNS:
-            if col in data:
-                values[col] = data[col]
-
-        columns = ", ".join(values.keys())
-        placeholders = ", ".join("?" for _ in values)
-        sql = f"INSERT OR REPLACE INTO weather_cache ({columns}) VALUES ({placeholders})"
-        self._conn.execute(sql, list(values.values()))
+        """INSERT OR REPLACE 天气数据。坐标自动 ROUND(2)。"""
+        self.upsert_weather_batch(lat, lon, target_date, [{**data, "forecast_hour": hour}])
 
     def upsert_weather_batch(
         self,
@@ -226,11 +351,54 @@ class CacheRepository:
         target_date: date,
         rows: list[dict],
     ) -> None:
-        """批量写入 (一天24条)。使用事务优化性能。"""
-        for row in rows:
-            hour = row["forecast_hour"]
-            self._upsert_weather_no_commit(lat, lon, target_date, hour, row)
-        self._conn.commit()
+        """批量写入 (一天24条)。单事务 executemany。
+
+        未给出 fields_mask 的行按行内所含的天气字段记录。
+        """
+        key = (round(lat, 2), round(lon, 2), target_date.isoformat())
+        params = [
+            (*key, row["forecast_hour"], row["fetched_at"],
+             row.get("api_source", DEFAULT_API_SOURCE),
+             row.get("fields_mask", fields_mask(row)),
+             *(row.get(col) for col in _WEATHER_DATA_COLUMNS))
+            for row in rows
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT_SQL, params)
+
+    def upsert_weather_frame(self, df: pd.DataFrame) -> int:
+        """整表批量写入，可包含多个坐标、多天。坐标自动 ROUND(2)。
+
+        df 须包含 lat_rounded, lon_rounded, forecast_date, forecast_hour,
+        fetched_at 列；缺失的天气字段写入 NULL，缺失 api_source 写入默认值，
+        多余的列忽略。fields_mask 记录 df 所含的天气字段 (df 自带 fields_mask
+        列时沿用该列)，读取方据此区分 "未请求" 与 "已获取但为空"。
+        全部行在同一事务内通过 executemany 写入。
+
+        Returns:
+            写入行数
+        """
+        if df.empty:
+            return 0
+
+        columns: list[list] = [
+            df["lat_rounded"].round(2).tolist(),
+            df["lon_rounded"].round(2).tolist(),
+            [d if isinstance(d, str) else d.isoformat() for d in df["forecast_date"]],
+        ]
+        for col in _UPSERT_COLUMNS[3:]:
+            if col == "fields_mask":
+                columns.append(_frame_fields_mask(df))
+            elif col in df.columns:
+                columns.append(df[col].tolist())
+            elif col == "api_source":
+                columns.append([DEFAULT_API_SOURCE] * len(df))
+            else:
+                columns.append([None] * len(df))
+
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT_SQL, zip(*columns))
+        return len(df)
 
     # ==================== prediction_history 操作 ====================
 
@@ -251,8 +419,8 @@ class CacheRepository:
         values = [record.get(c) for c in columns]
         placeholders = ", ".join("?" for _ in columns)
         sql = f"INSERT INTO prediction_history ({', '.join(columns)}) VALUES ({placeholders})"
-        self._conn.execute(sql, values)
-        self._conn.commit()
+        with self._lock, self._conn:
+            self._conn.execute(sql, values)
 
     def get_predictions(
         self,
@@ -266,21 +434,43 @@ class CacheRepository:
                 WHERE viewpoint_id = ? AND target_date = ?
                 ORDER BY created_at
             """
-            rows = self._conn.execute(
-                sql, [viewpoint_id, target_date.isoformat()]
-            ).fetchall()
+            params = [viewpoint_id, target_date.isoformat()]
         else:
             sql = """
                 SELECT * FROM prediction_history
                 WHERE viewpoint_id = ?
                 ORDER BY created_at
             """
-            rows = self._conn.execute(sql, [viewpoint_id]).fetchall()
+            params = [viewpoint_id]
 
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
         return [dict(row) for row in rows]
 
     # ==================== 生命周期 ====================
 
     def close(self) -> None:
         """关闭连接"""
-        self._conn.close()
+        with self._lock:
+            self._conn.close()
+
+
+def create_cache_repository(
+    db_path: str,
+    backend: str = "rows",
+    sqlite_config: dict | None = None,
+) -> CacheRepository:
+    """按 backend 创建缓存仓库
+
+    Args:
+        db_path: 数据库文件路径
+        backend: "rows" (逐小时一行) | "blob" (每坐标每日一行的列式压缩存储)
+        sqlite_config: SQLite 调优配置，见 CacheRepository
+    """
+    if backend == "rows":
+        return CacheRepository(db_path, sqlite_config)
+    if backend == "blob":
+        from gmp.cache.blob_repository import BlobCacheRepository
+
+        return BlobCacheRepository(db_path, sqlite_config)
+    raise ValueError(f"未知的缓存存储后端: {backend}")
@@ -0,0 +1,109 @@
+"""gmp/cache/revalidator.py — 过期缓存的后台刷新
+
+stale-while-revalidate 模式下，WeatherCache 先返回过期数据，
+再将 (坐标, 日期) 提交给 BackgroundRevalidator 在后台线程重新获取。
+同一 (坐标, 日期) 在刷新完成前只会排队一次。
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Callable
+
+import structlog
+
+logger = structlog.get_logger()
+
+RefreshFn = Callable[[float, float, list[date]], None]
+
+
+class BackgroundRevalidator:
+    """以线程池执行刷新函数，按 (lat_rounded, lon_rounded, date) 去重"""
+
+    def __init__(self, refresh_fn: RefreshFn, max_workers: int = 1) -> None:
+        """
+        Args:
+            refresh_fn: refresh_fn(lat, lon, dates) 重新获取并写入缓存
+            max_workers: 后台刷新线程数
+        """
+        self._refresh_fn = refresh_fn
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="gmp-revalidate",
+        )
+        self._pending: set[tuple[float, float, date]] = set()
+        self._futures: set[Future] = set()
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.refreshed = 0
+        self.failed = 0
+
+    def submit(self, lat: float, lon: float, dates: list[date]) -> bool:
+        """提交刷新任务。所有日期都已在排队时返回 False。"""
+        lat_r, lon_r = round(lat, 2), round(lon, 2)
+        with self._lock:
+            new_dates = sorted(
+                d for d in set(dates) if (lat_r, lon_r, d) not in self._pending
+            )
+            if not new_dates:
+                return False
+            self._pending.update((lat_r, lon_r, d) for d in new_dates)
+            self.queued += 1
+            future = self._executor.submit(self._run, lat_r, lon_r, new_dates)
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return True
+
+    def wait(self) -> None:
+        """阻塞直到所有已提交的刷新完成"""
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        """等待排队中的刷新完成并释放线程池"""
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        """返回排队/成功/失败计数"""
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+                "pending": len(self._pending),
+            }
+
+    def _run(self, lat: float, lon: float, dates: list[date]) -> None:
+        try:
+            self._refresh_fn(lat, lon, dates)
+        except Exception as exc:
+            # 后台刷新失败不影响前台，下次读取仍会再次触发
+            with self._lock:
+                self.failed += 1
+            logger.warning(
+                "weather_cache.revalidate_failed",
+                lat=lat,
+                lon=lon,
+                dates=[d.isoformat() for d in dates],
+                error=str(exc),
+            )
+        else:
+            with self._lock:
+                self.refreshed += 1
+            logger.debug(
+                "weather_cache.revalidated",
+                lat=lat,
+                lon=lon,
+                dates=[d.isoformat() for d in dates],
+            )
+        finally:
+            with self._lock:
+                self._pending.difference_update((lat, lon, d) for d in dates)
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
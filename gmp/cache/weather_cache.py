@@ -1,7 +1,16 @@
 """gmp/cache/weather_cache.py — 缓存管理层
 
 在 CacheRepository (底层 DB 操作) 之上，提供 DataFrame 级别的缓存接口，
-以及数据新鲜度判断和 get_or_fetch 模式。
+以及数据新鲜度判断和 get_or_fetch 模式。可选的 MemoryTier 作为进程内
+LRU 层，重复读取相同 (坐标, 日期) 时跳过 SQLite。
+
+读取按 fetched_at 与数据源 TTL 判断新鲜度 (freshness.mode):
+- off: 不检查，缓存数据永久有效
+- strict: 过期日期视为未命中，由调用方重新获取
+- stale_while_revalidate: 直接返回过期数据，同时提交后台刷新
+
+未配置 mode 时保持原有行为: 读取不检查新鲜度，is_fresh 按
+"北京时间同一天获取" 判断 forecast 数据。
 """
 
 from __future__ import annotations
@@ -12,12 +21,23 @@ from typing import Callable
 import pandas as pd
 import structlog
 
-from gmp.cache.repository import CacheRepository
+from gmp.cache.memory_tier import MemoryTier
+from gmp.cache.repository import DEFAULT_API_SOURCE, CacheRepository
+from gmp.cache.revalidator import BackgroundRevalidator, RefreshFn
+from gmp.core import metrics
 
 logger = structlog.get_logger()
 
 _CST = timezone(timedelta(hours=8))
 
+_FRESHNESS_MODES = ("off", "strict", "stale_while_revalidate")
+
+# 数据源 → weather_cache.api_source 列取值
+_API_SOURCES = {
+    "forecast": DEFAULT_API_SOURCE,
+    "archive": "open-meteo-archive",
+}
+
 
 class WeatherCache:
     """DataFrame 级别的天气缓存管理"""
@@ -26,18 +46,35 @@ class WeatherCache:
         self,
         repository: CacheRepository,
         freshness_config: dict | None = None,
+        memory_config: dict | None = None,
     ) -> None:
         """
         Args:
             repository: 底层数据库操作实例
             freshness_config: 新鲜度配置
-                示例: {"forecast_valid_hours": 24, "archive_never_stale": True}
+                示例: {"forecast_valid_hours": 24, "archive_never_stale": True,
+                       "mode": "strict", "revalidate_workers": 1}
+            memory_config: 内存 LRU 层配置，None 或 max_entries <= 0 时不启用
+                示例: {"max_entries": 4096, "ttl_seconds": 900}
         """
         self._repo = repository
         self._config = freshness_config or {
             "forecast_valid_hours": 24,
             "archive_never_stale": True,
         }
+        # 未配置 mode 时沿用旧语义: 读取不过滤, is_fresh 按自然日判断
+        self._ttl_based = "mode" in self._config
+        self._mode = self._config.get("mode", "off")
+        if self._mode not in _FRESHNESS_MODES:
+            raise ValueError(f"无效的 freshness.mode: {self._mode}")
+        self._revalidator: BackgroundRevalidator | None = None
+        self._memory: MemoryTier | None = None
+        memory_config = memory_config or {}
+        if memory_config.get("max_entries", 0) > 0:
+            self._memory = MemoryTier(
+                max_entries=memory_config["max_entries"],
+                ttl_seconds=memory_config.get("ttl_seconds", 900),
+            )
 
     def get(
         self,
@@ -47,29 +84,309 @@ class WeatherCache:
         hours: list[int] | None = None,
     ) -> pd.DataFrame | None:
         """获取缓存数据，返回 DataFrame 或 None"""
-        rows = self._repo.query_weather(lat, lon, target_date, hours)
-        if rows is None:
-            return None
-        df = pd.DataFrame(rows)
+        df = self._load_day(lat, lon, target_date, hours)
+        if df is not None:
+            df = self._apply_freshness(lat, lon, df)
+        self._count(1, 0 if df is None else 1)
+        return df
+
+    def get_range(
+        self,
+        lat: float,
+        lon: float,
+        start_date: date,
+        end_date: date,
+    ) -> pd.DataFrame | None:
+        """获取单坐标 [start_date, end_date] 的缓存 (单次查询)，无数据返回 None"""
+        requested = (end_date - start_date).days + 1
+        if self._memory is not None:
+            frames = self._memory_range(lat, lon, start_date, end_date)
+            if frames is not None:
+                df = self._apply_freshness(
+                    lat, lon, pd.concat(frames, ignore_index=True)
+                )
+                self._count(requested, self._days_in(df))
+                return df
+
+        generation = self._memory.generation if self._memory is not None else None
+        df = self._repo.query_weather_range(lat, lon, start_date, end_date)
         if df.empty:
+            self._count(requested, 0)
             return None
+        self._remember(lat, lon, df, generation)
+        df = self._apply_freshness(lat, lon, df)
+        self._count(requested, self._days_in(df))
         return df
 
+    def get_bulk(
+        self,
+        coords: list[tuple[float, float]],
+        start_date: date,
+        end_date: date,
+    ) -> dict[tuple[float, float], pd.DataFrame]:
+        """获取多坐标 [start_date, end_date] 的缓存 (单次查询)
+
+        Returns:
+            {(lat_rounded, lon_rounded): DataFrame}，无数据的坐标不出现在结果中
+        """
+        result: dict[tuple[float, float], pd.DataFrame] = {}
+        pending = coords
+        if self._memory is not None:
+            pending = []
+            for lat, lon in coords:
+                frames = self._memory_range(lat, lon, start_date, end_date)
+                if frames is None:
+                    pending.append((lat, lon))
+                else:
+                    result[(round(lat, 2), round(lon, 2))] = pd.concat(
+                        frames, ignore_index=True
+                    )
+
+        if pending:
+            generation = self._memory.generation if self._memory is not None else None
+            df = self._repo.query_weather_bulk(pending, start_date, end_date)
+            for (lat, lon), group in df.groupby(["lat_rounded", "lon_rounded"], sort=False):
+                group = group.reset_index(drop=True)
+                self._remember(lat, lon, group, generation)
+                result[(lat, lon)] = group
+
+        checked = {
+            coord: self._apply_freshness(*coord, df) for coord, df in result.items()
+        }
+        found = {coord: df for coord, df in checked.items() if df is not None}
+        self._count(
+            len(coords) * ((end_date - start_date).days + 1),
+            sum(self._days_in(df) for df in found.values()),
+        )
+        return found
+
     def set(
         self,
         lat: float,
         lon: float,
         target_date: date,
         data: pd.DataFrame,
+        data_source: str = "forecast",
     ) -> None:
-        """将 DataFrame 写入缓存。空 DataFrame 不写入。"""
+        """将 DataFrame 写入缓存。空 DataFrame 不写入。
+
+        内存层在写入提交后才失效: 提交前失效的话，并发读取会把 SQLite
+        中的旧行重新放回内存层。
+        """
         if data.empty:
             return
+        self._repo.upsert_weather_frame(
+            data.assign(
+                lat_rounded=round(lat, 2),
+                lon_rounded=round(lon, 2),
+                forecast_date=target_date.isoformat(),
+                fetched_at=datetime.now(timezone.utc).isoformat(),
+                api_source=_API_SOURCES[data_source],
+            )
+        )
+        if self._memory is not None:
+            self._memory.invalidate([MemoryTier.key(lat, lon, target_date)])
+
+    def set_many(
+        self,
+        frames: dict[tuple[float, float], pd.DataFrame],
+        data_source: str = "forecast",
+    ) -> None:
+        """多坐标、多天数据一次事务写入缓存
+
+        Args:
+            frames: {(lat, lon): DataFrame}，DataFrame 须含 forecast_date 列，
+                按行内 forecast_date 写入对应日期。空 DataFrame 跳过。
+            data_source: "forecast" | "archive"，决定新鲜度 TTL
+
+        内存层失效时机同 set (写入提交之后)。
+        """
         now = datetime.now(timezone.utc).isoformat()
-        rows = data.to_dict("records")
-        for row in rows:
-            row["fetched_at"] = now
-        self._repo.upsert_weather_batch(lat, lon, target_date, rows)
+        api_source = _API_SOURCES[data_source]
+        parts = [
+            df.assign(
+                lat_rounded=round(lat, 2),
+                lon_rounded=round(lon, 2),
+                fetched_at=now,
+                api_source=api_source,
+            )
+            for (lat, lon), df in frames.items()
+            if not df.empty
+        ]
+        if not parts:
+            return
+        self._repo.upsert_weather_frame(
+            parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+        )
+        if self._memory is not None:
+            self._memory.invalidate([
+                MemoryTier.key(lat, lon, self._to_date(d))
+                for (lat, lon), df in frames.items()
+                for d in df["forecast_date"].unique()
+            ])
+
+    def set_revalidator(self, refresh_fn: RefreshFn) -> None:
+        """注册过期数据的后台刷新函数，仅 stale_while_revalidate 模式生效
+
+        Args:
+            refresh_fn: refresh_fn(lat, lon, dates) 重新获取并写入缓存
+        """
+        if self._mode != "stale_while_revalidate" or self._revalidator is not None:
+            return
+        self._revalidator = BackgroundRevalidator(
+            refresh_fn, max_workers=self._config.get("revalidate_workers", 1)
+        )
+
+    def wait_revalidation(self) -> None:
+        """等待已提交的后台刷新全部完成"""
+        if self._revalidator is not None:
+            self._revalidator.wait()
+
+    def close(self) -> None:
+        """等待后台刷新完成并停止刷新线程"""
+        if self._revalidator is not None:
+            self._revalidator.close()
+
+    def memory_stats(self) -> dict | None:
+        """内存层命中/未命中/淘汰计数，未启用时返回 None"""
+        if self._memory is None:
+            return None
+        return self._memory.stats()
+
+    def _load_day(
+        self,
+        lat: float,
+        lon: float,
+        target_date: date,
+        hours: list[int] | None,
+    ) -> pd.DataFrame | None:
+        """读取单日数据 (内存层优先)，不做新鲜度检查"""
+        if self._memory is not None:
+            df = self._memory.get(MemoryTier.key(lat, lon, target_date))
+            if df is not None:
+                if hours is None:
+                    return df
+                return df[df["forecast_hour"].isin(hours)].reset_index(drop=True)
+            generation = self._memory.generation
+
+        rows = self._repo.query_weather(lat, lon, target_date, hours)
+        if rows is None:
+            return None
+        df = pd.DataFrame(rows)
+        if df.empty:
+            return None
+        if self._memory is not None and hours is None:
+            self._memory.put(MemoryTier.key(lat, lon, target_date), df, generation)
+        return df
+
+    def _apply_freshness(
+        self,
+        lat: float,
+        lon: float,
+        df: pd.DataFrame,
+    ) -> pd.DataFrame | None:
+        """按 freshness.mode 处理过期日期
+
+        strict 模式剔除含过期行的日期 (全部过期返回 None)；
+        stale_while_revalidate 模式原样返回并提交后台刷新。
+        """
+        if self._mode == "off":
+            return df
+        stale_dates = self._stale_dates(df)
+        if not stale_dates:
+            return df
+
+        logger.debug(
+            "weather_cache.stale",
+            lat=lat,
+            lon=lon,
+            dates=sorted(stale_dates),
+            mode=self._mode,
+        )
+        if self._mode == "stale_while_revalidate":
+            if self._revalidator is not None:
+                self._revalidator.submit(
+                    lat, lon, [self._to_date(d) for d in stale_dates]
+                )
+            return df
+
+        fresh = df[~df["forecast_date"].isin(stale_dates)]
+        if fresh.empty:
+            return None
+        return fresh.reset_index(drop=True)
+
+    def _stale_dates(self, df: pd.DataFrame) -> set[str]:
+        """返回含过期行的 forecast_date 集合
+
+        同一次写入的行共享 fetched_at，只需对去重后的时间戳判断。
+        """
+        stamps = df.drop_duplicates("fetched_at")
+        stale_at = [
+            fetched_at
+            for fetched_at, api_source in zip(stamps["fetched_at"], stamps["api_source"])
+            if not self.is_fresh(
+                datetime.fromisoformat(fetched_at),
+                "archive" if api_source == _API_SOURCES["archive"] else "forecast",
+            )
+        ]
+        if not stale_at:
+            return set()
+        return set(df.loc[df["fetched_at"].isin(stale_at), "forecast_date"])
+
+    def _memory_range(
+        self,
+        lat: float,
+        lon: float,
+        start_date: date,
+        end_date: date,
+    ) -> list[pd.DataFrame] | None:
+        """区间内每一天都在内存层时返回按日期排列的 DataFrame 列表，否则 None"""
+        frames: list[pd.DataFrame] = []
+        d = start_date
+        while d <= end_date:
+            df = self._memory.get(MemoryTier.key(lat, lon, d))
+            if df is None:
+                return None
+            frames.append(df)
+            d += timedelta(days=1)
+        return frames
+
+    def _remember(
+        self,
+        lat: float,
+        lon: float,
+        df: pd.DataFrame,
+        generation: int | None,
+    ) -> None:
+        """将区间查询结果按日期拆分放入内存层
+
+        generation 为查询前取得的失效代数，查询期间被写入的日期不放入。
+        """
+        if self._memory is None:
+            return
+        for d, group in df.groupby("forecast_date", sort=False):
+            self._memory.put(
+                MemoryTier.key(lat, lon, self._to_date(d)),
+                group.reset_index(drop=True),
+                generation,
+            )
+
+    @staticmethod
+    def _days_in(df: pd.DataFrame | None) -> int:
+        """DataFrame 覆盖的日期数"""
+        if df is None or "forecast_date" not in df.columns:
+            return 0 if df is None else 1
+        return int(df["forecast_date"].nunique())
+
+    @staticmethod
+    def _count(requested: int, hits: int) -> None:
+        """按 (坐标, 日期) 记录缓存命中/未命中 (区间外的历史日期不计入未命中)"""
+        metrics.incr("cache.hits", hits)
+        metrics.incr("cache.misses", max(0, requested - hits))
+
+    @staticmethod
+    def _to_date(value: date | str) -> date:
+        return date.fromisoformat(value) if isinstance(value, str) else value
 
     def get_or_fetch(
         self,
@@ -109,11 +426,22 @@ class WeatherCache:
     ) -> bool:
         """判断数据是否新鲜
 
-        - forecast: fetched_at 为今日 → True
-        - archive: 永远 True
+        - archive: archive_never_stale 为 True 时永远新鲜
+        - 配置了 freshness.mode: 获取时间距今不超过 {data_source}_valid_hours
+          (未配置时使用 forecast_valid_hours)，不带时区的 fetched_at 按本地时间处理
+        - 未配置 mode: fetched_at 为今日 (北京时间) → True
         """
-        if data_source == "archive":
+        if data_source == "archive" and self._config.get("archive_never_stale", True):
             return True
-        # forecast: 同一天视为新鲜
-        today = datetime.now(_CST).date()
-        return fetched_at.date() == today
+        if not self._ttl_based:
+            # 同一天视为新鲜
+            if fetched_at.tzinfo is not None:
+                fetched_at = fetched_at.astimezone(_CST)
+            return fetched_at.date() == datetime.now(_CST).date()
+        valid_hours = self._config.get(
+            f"{data_source}_valid_hours", self._config.get("forecast_valid_hours", 24)
+        )
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.astimezone()
+        age = datetime.now(timezone.utc) - fetched_at
+        return age <= timedelta(hours=valid_hours)
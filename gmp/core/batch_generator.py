@@ -5,17 +5,24 @@
 
 from __future__ import annotations
 
+import threading
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta, timezone
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import structlog
 
+from gmp.core import metrics
+from gmp.core.fingerprint import forecast_day_to_dict
+from gmp.core.scheduler import ResultMemo
 from gmp.scoring.engine import _UNIVERSAL_CAPABILITIES
 
 
 if TYPE_CHECKING:
     from gmp.core.config_loader import RouteConfig, ViewpointConfig
+    from gmp.core.fetch_planner import FetchPlanner
     from gmp.core.models import PipelineResult
     from gmp.core.scheduler import GMPScheduler
     from gmp.output.forecast_reporter import ForecastReporter
@@ -26,6 +33,8 @@ logger = structlog.get_logger()
 
 _CST = timezone(timedelta(hours=8))
 
+_T = TypeVar("_T")
+
 
 class BatchGenerator:
     """批量生成编排器 — 遍历观景台/线路、调用 Scheduler、写入文件"""
@@ -39,6 +48,7 @@ class BatchGenerator:
         timeline_reporter: TimelineReporter,
         json_writer: JSONFileWriter,
         output_dir: str = "public/data",
+        planner: FetchPlanner | None = None,
     ) -> None:
         self._scheduler = scheduler
         self._viewpoint_config = viewpoint_config
@@ -47,6 +57,7 @@ class BatchGenerator:
         self._timeline_reporter = timeline_reporter
         self._json_writer = json_writer
         self._output_dir = output_dir
+        self._planner = planner
 
     def generate_all(
         self,
@@ -55,9 +66,25 @@ class BatchGenerator:
         fail_fast: bool = False,
         no_archive: bool = False,
         progress_callback: Callable[[str], None] | None = None,
+        workers: int = 1,
+        incremental: bool = True,
+        prefetch: bool = True,
     ) -> dict:
         """批量生成所有观景台+线路的预测
 
+        workers > 1 时观景台/线路在线程池中并发处理 (共用同一个限流 fetcher)，
+        进度按完成顺序输出，index.json 与返回列表仍按配置顺序排列。
+        观景台结果记入本次运行的 ResultMemo，线路阶段直接复用，仅做聚合。
+        incremental=True 时读取上次运行保存的输入指纹 (JSONFileWriter 的
+        state_dir，不在发布目录中)，输入指纹未变的日期跳过评分与 timeline
+        写入；全部未变的观景台不重写任何文件。
+        配置了 FetchPlanner 且 prefetch=True 时，评分前先对全部观景台与线路站点
+        的坐标全局去重并批量预取，逐站评分全部命中缓存；预取统计写入
+        meta.json 的 fetch_plan 字段。
+
+        运行开始时清空进程级指标，结束时将各阶段计时/计数写入 meta.json 的
+        profile 字段并记录 batch.profile 日志。
+
         Returns:
             {
                 "viewpoints_processed": int,
@@ -66,8 +93,12 @@ class BatchGenerator:
                 "failed_routes": list[str],
                 "output_dir": str,
                 "archive_dir": str | None,
+                "profile": dict,  # metrics.snapshot() + wall_seconds
+                "fetch_plan": dict | None,  # FetchPlanner.execute() 统计
             }
         """
+        metrics.reset()
+        started = time.perf_counter()
         failed_viewpoints: list[str] = []
         failed_routes: list[str] = []
         successful_viewpoints: list[str] = []
@@ -77,6 +108,8 @@ class BatchGenerator:
         all_routes = self._route_config.list_all()
         total = len(all_viewpoints) + len(all_routes)
         current = 0
+        progress_lock = threading.Lock()
+        memo = ResultMemo()
 
         _report = progress_callback or (lambda _msg: None)
         _report(
@@ -84,37 +117,64 @@ class BatchGenerator:
             f"{len(all_routes)} 条线路, 预测 {days} 天"
         )
 
-        # 1. 遍历所有 viewpoints
+        def _progress(kind: str, item: Any, ok: bool) -> None:
+            nonlocal current
+            with progress_lock:
+                current += 1
+                if ok:
+                    _report(f"📊 [{current}/{total}] ✅ {kind} {item.id} ({item.name})")
+                else:
+                    _report(
+                        f"📊 [{current}/{total}] ❌ {kind} {item.id} ({item.name}) — 失败"
+                    )
+
+        # 0. 全局预取: 观景台 + 线路站点的坐标统一去重后批量获取
+        fetch_plan: dict | None = None
+        if self._planner is not None and prefetch:
+            fetch_plan = self._planner.run(
+                [vp.id for vp in all_viewpoints]
+                + [s.viewpoint_id for route in all_routes for s in route.stops],
+                days,
+                events,
+            )
+            _report(
+                f"🧭 预取: {fetch_plan['unique_points']} 个唯一坐标 "
+                f"(去重前 {fetch_plan['references']}), "
+                f"{fetch_plan['requests']} 次请求"
+            )
+
+        # 1. 处理所有 viewpoints
+        with metrics.timer("batch.viewpoints"):
+            vp_results = self._run_items(
+                all_viewpoints,
+                lambda vp: self._process_viewpoint(
+                    vp.id, days, events, fail_fast, memo, incremental
+                ),
+                workers,
+                lambda vp, result: _progress("观景台", vp, result is not None),
+            )
         for vp in all_viewpoints:
-            current += 1
-            result = self._process_viewpoint(vp.id, days, events, fail_fast)
-            if result is not None:
+            if vp_results[vp.id] is not None:
                 successful_viewpoints.append(vp.id)
-                _report(
-                    f"📊 [{current}/{total}] ✅ 观景台 {vp.id} ({vp.name})"
-                )
             else:
                 failed_viewpoints.append(vp.id)
-                _report(
-                    f"📊 [{current}/{total}] ❌ 观景台 {vp.id} ({vp.name}) — 失败"
-                )
 
-        # 2. 遍历所有 routes
-        for route in all_routes:
-            current += 1
-            route_result = self._process_route(
-                route.id, days, events, fail_fast
+        # 2. 处理所有 routes
+        with metrics.timer("batch.routes"):
+            route_results = self._run_items(
+                all_routes,
+                lambda route: self._process_route(
+                    route.id, days, events, fail_fast, memo
+                ),
+                workers,
+                lambda route, result: _progress("线路", route, result is not None),
             )
-            if route_result is not None:
+        for route in all_routes:
+            if route_results[route.id] is not None:
                 successful_routes.append(route.id)
-                _report(
-                    f"📊 [{current}/{total}] ✅ 线路 {route.id} ({route.name})"
-                )
             else:
                 failed_routes.append(route.id)
-                _report(
-                    f"📊 [{current}/{total}] ❌ 线路 {route.id} ({route.name}) — 失败"
-                )
+        logger.info("batch.result_memo", **memo.stats())
 
         # 3. 生成 index.json (富对象格式，含 name/location/capabilities)
         vp_index = []
@@ -156,25 +216,33 @@ class BatchGenerator:
             routes=route_index,
         )
 
-        # 4. 生成 meta.json
+        # 4. 生成 poster.json
+        from gmp.output.poster_generator import PosterGenerator
+
+        with metrics.timer("batch.poster"):
+            poster_gen = PosterGenerator(self._output_dir)
+            poster_data = poster_gen.generate(
+                self._viewpoint_config, days=days
+            )
+            self._json_writer.write_poster(poster_data)
+
+        # 5. 生成 meta.json (含本次运行各阶段指标)
+        profile = {
+            **metrics.snapshot(),
+            "wall_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info("batch.profile", **profile)
         now = datetime.now(_CST)
         self._json_writer.write_meta(
             {
                 "generated_at": now.isoformat(),
                 "viewpoints_count": len(successful_viewpoints),
                 "routes_count": len(successful_routes),
+                "profile": profile,
+                "fetch_plan": fetch_plan,
             }
         )
 
-        # 5. 生成 poster.json
-        from gmp.output.poster_generator import PosterGenerator
-
-        poster_gen = PosterGenerator(self._output_dir)
-        poster_data = poster_gen.generate(
-            self._viewpoint_config, days=days
-        )
-        self._json_writer.write_poster(poster_data)
-
         # 6. 归档
         archive_dir: str | None = None
         if not no_archive:
@@ -190,20 +258,70 @@ class BatchGenerator:
             "failed_routes": failed_routes,
             "output_dir": self._output_dir,
             "archive_dir": archive_dir,
+            "profile": profile,
+            "fetch_plan": fetch_plan,
         }
 
+    @staticmethod
+    def _run_items(
+        items: list[Any],
+        process: Callable[[Any], _T],
+        workers: int,
+        on_done: Callable[[Any, _T], None],
+    ) -> dict[str, _T]:
+        """逐个或在线程池中处理 items，返回 {item.id: 结果}
+
+        on_done 在每项完成时调用 (并发时按完成顺序)；process 抛出的异常
+        (fail_fast) 取消尚未开始的任务后向上传播。
+        """
+        results: dict[str, _T] = {}
+        if workers <= 1 or len(items) <= 1:
+            for item in items:
+                results[item.id] = process(item)
+                on_done(item, results[item.id])
+            return results
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="gmp-batch"
+        ) as pool:
+            futures = {pool.submit(process, item): item for item in items}
+            try:
+                for future in as_completed(futures):
+                    item = futures[future]
+                    results[item.id] = future.result()
+                    on_done(item, results[item.id])
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        return results
+
     def _process_viewpoint(
         self,
         viewpoint_id: str,
         days: int,
         events: list[str] | None,
         fail_fast: bool = False,
+        memo: ResultMemo | None = None,
+        incremental: bool = False,
     ) -> PipelineResult | None:
         """处理单个观景台：评分 + 文件生成，失败返回 None"""
         try:
-            result = self._scheduler.run(
-                viewpoint_id, days=days, events=events
+            previous = (
+                self._json_writer.read_viewpoint_fingerprints(viewpoint_id)
+                if incremental else None
             )
+            if memo is None:
+                result = self._scheduler.run(
+                    viewpoint_id, days=days, events=events, previous=previous
+                )
+            else:
+                result = memo.get_or_run(
+                    ResultMemo.key(viewpoint_id, days, events),
+                    lambda: self._scheduler.run(
+                        viewpoint_id, days=days, events=events, previous=previous
+                    ),
+                )
         except Exception:
             if fail_fast:
                 raise
@@ -214,18 +332,27 @@ class BatchGenerator:
             )
             return None
 
+        # 所有日期均复用上次结果 → 输出文件与上次一致，无需重写
+        reused = set(result.meta.get("reused_days") or [])
+        if reused and all(fd.date in reused for fd in result.forecast_days):
+            logger.debug("batch.viewpoint_unchanged", viewpoint=viewpoint_id)
+            return result
+
         # 生成 forecast + timeline 并写入文件
         forecast = self._forecast_reporter.generate(result)
 
-        # 多日 timeline：每天生成 timeline_{date}.json
+        # 多日 timeline：每天生成 timeline_{date}.json (复用的日期文件不变，跳过写入)
         today = datetime.now(_CST).date()
         timeline: dict | None = None
         for fd in result.forecast_days:
             fd_date = date.fromisoformat(fd.date)
+            if fd.date in reused and fd_date != today:
+                continue
             tl = self._timeline_reporter.generate(result, fd_date)
-            self._json_writer.write_viewpoint_timeline(
-                viewpoint_id, fd.date, tl
-            )
+            if fd.date not in reused:
+                self._json_writer.write_viewpoint_timeline(
+                    viewpoint_id, fd.date, tl
+                )
             if fd_date == today:
                 timeline = tl
 
@@ -238,6 +365,19 @@ class BatchGenerator:
             viewpoint_id, forecast, timeline or {}
         )
 
+        fingerprints = result.meta.get("fingerprints") or {}
+        self._json_writer.write_viewpoint_fingerprints(
+            viewpoint_id,
+            {
+                fd.date: {
+                    "fingerprint": fingerprints[fd.date],
+                    "day": forecast_day_to_dict(fd),
+                }
+                for fd in result.forecast_days
+                if fd.date in fingerprints
+            },
+        )
+
         return result
 
     def _process_route(
@@ -246,11 +386,12 @@ class BatchGenerator:
         days: int,
         events: list[str] | None,
         fail_fast: bool = False,
+        memo: ResultMemo | None = None,
     ) -> dict | None:
-        """处理单条线路：评分 + 文件生成，失败返回 None"""
+        """处理单条线路：聚合站点结果 + 文件生成，失败返回 None"""
         try:
             results = self._scheduler.run_route(
-                route_id, days=days, events=events
+                route_id, days=days, events=events, memo=memo
             )
         except Exception:
             if fail_fast:
@@ -31,6 +31,22 @@ def _default_confidence() -> dict:
     return {"high": [1, 2], "medium": [3, 4], "low": [5, 16]}
 
 
+def _default_fetcher() -> dict:
+    return {}
+
+
+def _default_cache_sqlite() -> dict:
+    return {}
+
+
+def _default_cache_memory() -> dict:
+    return {}
+
+
+def _default_astro() -> dict:
+    return {}
+
+
 @dataclass
 class EngineConfig:
     """全局引擎配置 — 字段定义见设计文档 §7.3
@@ -42,6 +58,7 @@ class EngineConfig:
     """
 
     db_path: str = "data/gmp.db"
+    cache_backend: str = "rows"
     output_dir: str = "public/data"
     archive_dir: str = "archive"
     log_level: str = "INFO"
@@ -53,9 +70,13 @@ class EngineConfig:
     light_path_count: int = 10
     light_path_interval_km: float = 10.0
     data_freshness: dict = field(default_factory=_default_data_freshness)
+    cache_sqlite: dict = field(default_factory=_default_cache_sqlite)
+    cache_memory: dict = field(default_factory=_default_cache_memory)
     safety: dict = field(default_factory=_default_safety)
     scoring: dict = field(default_factory=_default_scoring)
     confidence: dict = field(default_factory=_default_confidence)
+    fetcher: dict = field(default_factory=_default_fetcher)
+    astro: dict = field(default_factory=_default_astro)
     summary_mode: str = "rule"
     backtest_max_history_days: int = 365
 
@@ -99,6 +120,7 @@ class ConfigManager:
 
         return EngineConfig(
             db_path=cache.get("db_path", _DEFAULTS.db_path),
+            cache_backend=cache.get("backend", _DEFAULTS.cache_backend),
             output_dir=data.get("output_dir", _DEFAULTS.output_dir),
             archive_dir=data.get("archive_dir", _DEFAULTS.archive_dir),
             log_level=data.get("log_level", _DEFAULTS.log_level),
@@ -120,9 +142,13 @@ class ConfigManager:
             data_freshness=cache.get(
                 "freshness", _default_data_freshness()
             ),
+            cache_sqlite=cache.get("sqlite", _default_cache_sqlite()),
+            cache_memory=cache.get("memory", _default_cache_memory()),
             safety=data.get("safety", _default_safety()),
             scoring=data.get("scoring", _default_scoring()),
             confidence=data.get("confidence", _default_confidence()),
+            fetcher=data.get("fetcher", _default_fetcher()),
+            astro=data.get("astro", _default_astro()),
             summary_mode=summary.get("mode", _DEFAULTS.summary_mode),
             backtest_max_history_days=backtest.get(
                 "max_history_days", _DEFAULTS.backtest_max_history_days
@@ -157,6 +183,22 @@ class ConfigManager:
         """返回置信度映射配置。"""
         return self.config.confidence
 
+    def get_fetcher_config(self) -> dict:
+        """返回 MeteoFetcher 配置 (超时/重试/节流/批量请求)。"""
+        return self.config.fetcher
+
+    def get_cache_sqlite_config(self) -> dict:
+        """返回 SQLite 缓存调优配置 (WAL / synchronous / cache_size / mmap_size)。"""
+        return self.config.cache_sqlite
+
+    def get_cache_memory_config(self) -> dict:
+        """返回 WeatherCache 内存 LRU 层配置 (max_entries / ttl_seconds)。"""
+        return self.config.cache_memory
+
+    def get_astro_config(self) -> dict:
+        """返回天文计算配置 (backend / precision / db_path)。"""
+        return self.config.astro
+
     def get_output_config(self) -> dict:
         """返回输出路径配置。"""
         return {
@@ -57,3 +57,12 @@ class InvalidDateError(GMPError):
 
 class ServiceUnavailableError(GMPError):
     """外部服务不可用（API 失败且无缓存）"""
+
+
+class RateBudgetExceededError(GMPError):
+    """主机级请求日配额已用尽"""
+
+    def __init__(self, name: str, per_day: int) -> None:
+        self.name = name
+        self.per_day = per_day
+        super().__init__(f"{name} 今日请求配额已用尽 ({per_day}/天)")
@@ -0,0 +1,149 @@
+"""gmp/core/fetch_planner.py — 批量生成的全局天气预取规划
+
+每次 GMPScheduler.run 各自获取本地/目标/光路坐标，去重只发生在单次
+fetch_multi_points 内部；而大量观景台共用同一目标山峰 (贡嘎、雅拉、幺妹峰)，
+光路采样点也相互重叠。
+
+FetchPlanner 在评分前遍历全部观景台 (含线路站点) 与其活跃 Plugin，
+汇总 run() 将请求的全部坐标，ROUND(2) 全局去重后按 (past_days, 列投影) 分组，
+每组一次 prefetch 按 batch_size 均分批次请求并写入缓存。同一坐标被多个
+观景台以不同投影引用时取列的并集，保证各自的 run() 都能命中缓存。
+之后的逐站评分全部命中缓存。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import structlog
+
+from gmp.core import metrics
+
+if TYPE_CHECKING:
+    from gmp.core.scheduler import GMPScheduler
+    from gmp.data.meteo_fetcher import MeteoFetcher
+
+logger = structlog.get_logger()
+
+Coord = tuple[float, float]
+# 列投影，None = 全部字段
+Columns = frozenset[str] | None
+
+
+@dataclass
+class FetchPlan:
+    """全局去重后的预取计划"""
+
+    days: int
+    # ROUND(2) 坐标 → 所需 past_days (同一坐标取最大值)
+    points: dict[Coord, int] = field(default_factory=dict)
+    # ROUND(2) 坐标 → 列投影 (同一坐标取并集，任一引用需要全部字段则为 None)
+    columns: dict[Coord, Columns] = field(default_factory=dict)
+    # 去重前的坐标引用数 (各观景台 run() 将分别请求的坐标总数)
+    references: int = 0
+    viewpoints: int = 0
+    # 规划失败 (如配置缺失) 的观景台，评分阶段按原逻辑自行获取
+    failed_viewpoints: list[str] = field(default_factory=list)
+
+    def add(self, coord: Coord, past_days: int, columns: list[str] | None) -> None:
+        """合并一次坐标引用"""
+        if coord in self.points:
+            self.points[coord] = max(self.points[coord], past_days)
+            known = self.columns[coord]
+            self.columns[coord] = (
+                None if known is None or columns is None else known | frozenset(columns)
+            )
+        else:
+            self.points[coord] = past_days
+            self.columns[coord] = None if columns is None else frozenset(columns)
+
+    def groups(self) -> dict[tuple[int, Columns], list[Coord]]:
+        """按 (past_days, 列投影) 分组 (每组一次 prefetch)"""
+        grouped: dict[tuple[int, Columns], list[Coord]] = {}
+        for coord, past_days in self.points.items():
+            grouped.setdefault((past_days, self.columns[coord]), []).append(coord)
+        return grouped
+
+
+class FetchPlanner:
+    """全局预取规划器 — 规划 (plan) + 执行 (execute)"""
+
+    def __init__(self, scheduler: GMPScheduler, fetcher: MeteoFetcher) -> None:
+        self._scheduler = scheduler
+        self._fetcher = fetcher
+
+    def plan(
+        self,
+        viewpoint_ids: Iterable[str],
+        days: int,
+        events: list[str] | None = None,
+    ) -> FetchPlan:
+        """汇总各观景台 run() 将请求的坐标并全局去重 (不发起请求)"""
+        plan = FetchPlan(days=days)
+        for viewpoint_id in dict.fromkeys(viewpoint_ids):
+            try:
+                required = self._scheduler.required_points(viewpoint_id, events)
+            except Exception:
+                logger.warning(
+                    "fetch_planner.viewpoint_failed",
+                    viewpoint=viewpoint_id,
+                    exc_info=True,
+                )
+                plan.failed_viewpoints.append(viewpoint_id)
+                continue
+            plan.viewpoints += 1
+            plan.references += len(required)
+            for (lat, lon), past_days, columns in required:
+                plan.add((round(lat, 2), round(lon, 2)), past_days, columns)
+        return plan
+
+    def execute(self, plan: FetchPlan) -> dict:
+        """按计划预取，返回统计
+
+        单组预取失败只记录警告 — 评分阶段对缺失数据按原逻辑逐站获取。
+
+        Returns:
+            {"viewpoints", "references", "unique_points", "cache_hits",
+             "requests", "failed_groups"}
+        """
+        stats = {
+            "viewpoints": plan.viewpoints,
+            "references": plan.references,
+            "unique_points": len(plan.points),
+            "cache_hits": 0,
+            "requests": 0,
+            "failed_groups": 0,
+        }
+        with metrics.timer("planner.prefetch"):
+            for (past_days, columns), coords in plan.groups().items():
+                try:
+                    result = self._fetcher.prefetch(
+                        coords, plan.days, past_days, columns=columns
+                    )
+                except Exception:
+                    logger.warning(
+                        "fetch_planner.prefetch_failed",
+                        points=len(coords),
+                        past_days=past_days,
+                        exc_info=True,
+                    )
+                    stats["failed_groups"] += 1
+                    continue
+                stats["cache_hits"] += result["cache_hits"]
+                stats["requests"] += result["requests"]
+
+        logger.info("fetch_planner.done", **stats)
+        return stats
+
+    def run(
+        self,
+        viewpoint_ids: Iterable[str],
+        days: int,
+        events: list[str] | None = None,
+    ) -> dict:
+        """plan + execute"""
+        with metrics.timer("planner.plan"):
+            plan = self.plan(viewpoint_ids, days, events)
+        return self.execute(plan)
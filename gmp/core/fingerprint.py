@@ -0,0 +1,82 @@
+"""gmp/core/fingerprint.py — 增量生成的输入指纹
+
+每个 (观景台, 日期) 的指纹由以下输入决定:
+- 配置摘要 (EngineConfig + 观景台配置)
+- 当日活跃 Plugin 与置信度
+- 天文日期 (日出日落等仅取决于坐标与日期)
+- 当日各天气切片 (本地 / 目标 / 光路点) 的 fetched_at 集合
+
+指纹未变的日期直接复用上次输出的 ForecastDay，跳过 Plugin 评分与文件写入。
+刚从 API 获取、尚未带 fetched_at 的数据无法判定，指纹为 None (总是重新评分)。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+from collections.abc import Iterable
+from datetime import date
+from typing import Any
+
+import pandas as pd
+
+from gmp.core.models import ForecastDay, ScoreResult
+
+# 指纹版本 — 评分逻辑或 ForecastDay 序列化方式变化时递增，旧指纹全部失效
+FINGERPRINT_VERSION = 1
+
+
+def _encode(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    return str(obj)
+
+
+def digest(*parts: Any) -> str:
+    """任意 JSON 可表达对象 (含 dataclass/date) 的稳定 SHA-256 摘要"""
+    payload = json.dumps(
+        [FINGERPRINT_VERSION, *parts],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=_encode,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fetched_at_stamps(frames: Iterable[tuple[str, pd.DataFrame]]) -> list | None:
+    """[(标签, 当日切片)] → [(标签, 排序去重的 fetched_at)]
+
+    任一非空切片缺少 fetched_at 列或含空 fetched_at (缓存日期与刚获取的
+    数据合并后，刚获取的行为 NaN) 时返回 None。
+    """
+    stamps = []
+    for label, df in frames:
+        if df.empty:
+            stamps.append((label, []))
+            continue
+        if "fetched_at" not in df.columns or df["fetched_at"].isna().any():
+            return None
+        stamps.append((label, sorted(df["fetched_at"].astype(str).unique())))
+    return stamps
+
+
+def forecast_day_to_dict(day: ForecastDay) -> dict:
+    """ForecastDay → 可 JSON 序列化的 dict"""
+    return dataclasses.asdict(day)
+
+
+def forecast_day_from_dict(data: dict) -> ForecastDay:
+    """forecast_day_to_dict 的逆操作"""
+    best = data.get("best_event")
+    return ForecastDay(
+        date=data["date"],
+        summary=data["summary"],
+        best_event=ScoreResult(**best) if best is not None else None,
+        events=[ScoreResult(**e) for e in data["events"]],
+        confidence=data["confidence"],
+    )
@@ -0,0 +1,208 @@
+"""gmp/core/metrics.py — 轻量运行指标 (计时器 + 计数器)
+
+进程级注册表，各层直接调用模块函数记录:
+
+    from gmp.core import metrics
+
+    with metrics.timer("fetcher.request"):
+        ...
+    metrics.incr("cache.hits", 3)
+
+计时器记录次数/总耗时/最大耗时，计数器为累加值；均线程安全。
+scope() 在当前线程内额外收集一份局部指标 (用于单次 run 的 cache_stats)；
+在其他线程 / 事件循环上代为执行的工作可通过 current_scopes() + adopt()
+把记录归入调用方的 scope。计时器名按 "层.项" 命名，报告按总耗时排序 (外层计时包含内层)。
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+import unicodedata
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+class Metrics:
+    """计时器与计数器集合"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # name → [次数, 总秒数, 最大秒数]
+        self._timers: dict[str, list[float]] = {}
+        self._counters: dict[str, float] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        """记录一次耗时"""
+        with self._lock:
+            entry = self._timers.get(name)
+            if entry is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """计数器累加"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """{"timers": {name: {count, total_s, avg_ms, max_ms}}, "counters": {name: value}}"""
+        with self._lock:
+            timers = {
+                name: {
+                    "count": int(count),
+                    "total_s": round(total, 4),
+                    "avg_ms": round(total / count * 1000, 3),
+                    "max_ms": round(peak * 1000, 3),
+                }
+                for name, (count, total, peak) in sorted(self._timers.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        return {"timers": timers, "counters": counters}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+_registry = Metrics()
+# 新线程从空上下文开始 (与线程局部变量语义相同)；asyncio Task 各自复制上下文，
+# 同一事件循环上并发的协程互不影响
+_scopes_var: ContextVar[tuple[Metrics, ...]] = ContextVar("metrics_scopes", default=())
+
+
+def _scopes() -> tuple[Metrics, ...]:
+    return _scopes_var.get()
+
+
+def observe(name: str, seconds: float) -> None:
+    """记录一次耗时 (全局 + 当前线程的所有 scope)"""
+    _registry.observe(name, seconds)
+    for scope_metrics in _scopes():
+        scope_metrics.observe(name, seconds)
+
+
+def incr(name: str, value: float = 1) -> None:
+    """计数器累加 (全局 + 当前线程的所有 scope)"""
+    _registry.incr(name, value)
+    for scope_metrics in _scopes():
+        scope_metrics.incr(name, value)
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """计时上下文，异常退出同样计入"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def timed(name: str) -> Callable[[_F], _F]:
+    """函数计时装饰器"""
+    def decorator(fn: _F) -> _F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timer(name):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+@contextmanager
+def scope() -> Iterator[Metrics]:
+    """在当前线程内额外收集一份局部指标 (其他线程的记录不计入)"""
+    local_metrics = Metrics()
+    token = _scopes_var.set(_scopes() + (local_metrics,))
+    try:
+        yield local_metrics
+    finally:
+        _scopes_var.reset(token)
+
+
+def current_scopes() -> tuple[Metrics, ...]:
+    """当前线程 (上下文) 生效的 scope，交给 adopt() 在其他线程上重新进入"""
+    return _scopes()
+
+
+@contextmanager
+def adopt(scopes: tuple[Metrics, ...]) -> Iterator[None]:
+    """在当前上下文中额外记录到给定 scope (如事件循环线程代调用方执行请求)
+
+    已生效的 scope 不重复加入 (上下文可能已随任务调度传递过来)。
+    """
+    active = _scopes()
+    token = _scopes_var.set(active + tuple(s for s in scopes if s not in active))
+    try:
+        yield
+    finally:
+        _scopes_var.reset(token)
+
+
+def snapshot() -> dict:
+    """全局指标快照"""
+    return _registry.snapshot()
+
+
+def reset() -> None:
+    """清空全局指标 (批量运行开始时调用)"""
+    _registry.reset()
+
+
+def _fit(text: str, width: int, left: bool = False) -> str:
+    """按终端显示宽度 (中文占 2 列) 对齐"""
+    shown = sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+    pad = " " * max(0, width - shown)
+    return text + pad if left else pad + text
+
+
+def format_report(data: dict, wall_seconds: float | None = None) -> str:
+    """将 snapshot() 结果格式化为按阶段的文本报告
+
+    Args:
+        data: snapshot() 返回值
+        wall_seconds: 整体墙钟耗时，给出时附加占比列
+    """
+    timers = sorted(
+        data.get("timers", {}).items(), key=lambda kv: kv[1]["total_s"], reverse=True
+    )
+    width = max([len(name) for name, _ in timers] + [4])
+    columns = ["次数", "总耗时(s)", "平均(ms)", "最大(ms)"]
+    if wall_seconds:
+        columns.append("占比")
+    lines = ["  ".join([_fit("阶段", width, left=True), *(_fit(c, 10) for c in columns)])]
+    for name, t in timers:
+        cells = [
+            f"{t['count']:,}",
+            f"{t['total_s']:.3f}",
+            f"{t['avg_ms']:.1f}",
+            f"{t['max_ms']:.1f}",
+        ]
+        if wall_seconds:
+            cells.append(f"{t['total_s'] / wall_seconds:.1%}")
+        lines.append("  ".join([_fit(name, width, left=True), *(_fit(c, 10) for c in cells)]))
+
+    counters = data.get("counters", {})
+    if counters:
+        cwidth = max(len(name) for name in counters)
+        lines += ["", "计数器"]
+        for name, value in counters.items():
+            shown = f"{value:,.0f}" if float(value).is_integer() else f"{value:,.3f}"
+            lines.append(f"{_fit(name, cwidth, left=True)}  {_fit(shown, 12)}")
+    if wall_seconds:
+        lines += ["", f"总耗时: {wall_seconds:.3f}s (外层阶段包含内层阶段耗时)"]
+    return "\n".join(lines)
@@ -146,7 +146,7 @@ class PipelineResult:
     meta: dict
     # meta 字段说明:
     #   generated_at: str (ISO datetime)
-    #   cache_stats: dict (缓存命中/未命中统计)
+    #   cache_stats: dict (本次 run 的天气缓存命中/未命中 (坐标×日期) 与 API 请求数)
     #   data_freshness: str ("fresh" | "degraded")
 
 
@@ -7,24 +7,35 @@
 from __future__ import annotations
 
 
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
 from typing import TYPE_CHECKING, Any
 
 import structlog
 
+from gmp.core import metrics
 from gmp.core.exceptions import (
     APITimeoutError,
     RouteNotFoundError,
     ServiceUnavailableError,
 )
+from gmp.core.fingerprint import (
+    digest,
+    fetched_at_stamps,
+    forecast_day_from_dict,
+)
 from gmp.core.models import (
     ForecastDay,
     PipelineResult,
     ScoreResult,
     days_ahead_to_confidence,
 )
+from gmp.data.astro_cache import CachedAstro
 from gmp.output.summary_generator import SummaryGenerator
-from gmp.scoring.models import DataContext, DataRequirement
+from gmp.scoring.engine import supports_batch
+from gmp.scoring.models import DataContext, DataRequirement, WeatherBlock
 
 if TYPE_CHECKING:
     from gmp.core.config_loader import ConfigManager, RouteConfig, ViewpointConfig
@@ -34,12 +45,158 @@ if TYPE_CHECKING:
     from gmp.data.meteo_fetcher import MeteoFetcher
     from gmp.scoring.engine import ScoreEngine
 
+import numpy as np
 import pandas as pd
 
 logger = structlog.get_logger()
 
 _CST = timezone(timedelta(hours=8))
 
+Coord = tuple[float, float]
+
+
+def _partition_by_date(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """按 forecast_date 将多日 DataFrame 一次性切分为 {date_str: 当日切片}
+
+    行按日期稳定排序 (已有序时不复制) 后以连续 iloc 区间切片，
+    各日切片共享底层数据 (写时复制)，不再逐日做字符串比较与 .copy()。
+    """
+    if df.empty or "forecast_date" not in df.columns:
+        return {}
+    dates = df["forecast_date"]
+    if not dates.is_monotonic_increasing:
+        df = df.sort_values("forecast_date", kind="stable")
+        dates = df["forecast_date"]
+    values = dates.to_numpy()
+    _uniq, starts = np.unique(values, return_index=True)
+    bounds = [*starts.tolist(), len(values)]
+    return {
+        str(values[start]): df.iloc[start:end]
+        for start, end in zip(bounds[:-1], bounds[1:])
+    }
+
+
+@dataclass
+class _WeatherByDate:
+    """单站一次运行的天气按日期预切分结果 (本地 / 目标 / 光路)"""
+
+    local: dict[str, pd.DataFrame] = field(default_factory=dict)
+    targets: dict[Coord, dict[str, pd.DataFrame]] = field(default_factory=dict)
+    light_path: list[dict] | None = None
+
+    @classmethod
+    def build(
+        cls,
+        local_weather: pd.DataFrame,
+        target_weather_all: dict[Coord, pd.DataFrame],
+        light_path_weather: list[dict] | None = None,
+    ) -> _WeatherByDate:
+        light_path = None
+        if light_path_weather is not None:
+            light_path = [
+                {
+                    **entry,
+                    "weather": {
+                        coord: _partition_by_date(df) if "forecast_date" in df.columns else df
+                        for coord, df in entry["weather"].items()
+                    },
+                }
+                for entry in light_path_weather
+            ]
+        return cls(
+            local=_partition_by_date(local_weather),
+            targets={
+                coord: _partition_by_date(df)
+                for coord, df in target_weather_all.items()
+            },
+            light_path=light_path,
+        )
+
+    def local_day(self, date_str: str) -> pd.DataFrame:
+        return self.local.get(date_str, _EMPTY_FRAME)
+
+    def target_day(self, coord: Coord, date_str: str) -> pd.DataFrame | None:
+        parts = self.targets.get(coord)
+        return parts.get(date_str) if parts is not None else None
+
+    def light_path_day(self, date_str: str) -> list[dict] | None:
+        """各光路点当日切片；缺少 forecast_date 列的数据原样透传"""
+        if self.light_path is None:
+            return None
+        return [
+            {
+                **entry,
+                "weather": {
+                    coord: parts.get(date_str, _EMPTY_FRAME) if isinstance(parts, dict) else parts
+                    for coord, parts in entry["weather"].items()
+                },
+            }
+            for entry in self.light_path
+        ]
+
+
+_EMPTY_FRAME = pd.DataFrame()
+
+MemoKey = tuple[str, int, tuple[str, ...] | None]
+
+
+class ResultMemo:
+    """单次批量运行内的 PipelineResult 备忘录
+
+    以 (viewpoint_id, days, events) 为键，观景台处理与线路处理共用，
+    线路站点直接复用已算好的结果，不再重复获取天气与评分。
+    失败同样被记住并在复用时重新抛出，避免对失败站点重复请求。
+    同一键并发请求时只计算一次，其余线程等待其结果。
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[MemoKey, PipelineResult | BaseException] = {}
+        self._key_locks: dict[MemoKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        viewpoint_id: str, days: int, events: list[str] | None
+    ) -> MemoKey:
+        """构造备忘键，events 排序后转为元组 (None 保持 None)"""
+        return (viewpoint_id, days, tuple(sorted(events)) if events is not None else None)
+
+    def get_or_run(
+        self, key: MemoKey, run_fn: Callable[[], PipelineResult]
+    ) -> PipelineResult:
+        """命中返回已记住的结果 (或重新抛出已记住的异常)，否则执行 run_fn 并记住"""
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                found = key in self._entries
+                entry = self._entries.get(key)
+                if found:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if not found:
+                try:
+                    entry = run_fn()
+                except Exception as exc:
+                    entry = exc
+                with self._lock:
+                    self._entries[key] = entry
+        if isinstance(entry, BaseException):
+            raise entry
+        return entry
+
+    def stats(self) -> dict:
+        """返回命中/未命中计数及条目数"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
 
 class GMPScheduler:
     """核心评分编排器 — 串联 Plugin 收集→数据获取→评分"""
@@ -61,6 +218,7 @@ class GMPScheduler:
         self._score_engine = score_engine
         self._astro = astro
         self._geo = geo
+        self._config_digest: str | None = None
         self._summary_gen = SummaryGenerator(
             mode=getattr(config.config, "summary_mode", "rule"),
             display_names=score_engine.display_names,
@@ -70,13 +228,44 @@ class GMPScheduler:
     # Public API
     # ------------------------------------------------------------------
 
+    @property
+    def astro(self) -> AstroUtils:
+        """评分使用的天文计算实例 (通常为带缓存的 CachedAstro)"""
+        return self._astro
+
     def run(
         self,
         viewpoint_id: str,
         days: int = 7,
         events: list[str] | None = None,
+        previous: dict[str, dict] | None = None,
+    ) -> PipelineResult:
+        """单站点多日预测 — 核心主流程
+
+        Args:
+            previous: 上次输出的 {date_str: {"fingerprint", "day"}}，
+                输入指纹未变的日期直接复用其 ForecastDay，不再评分。
+                本次各日指纹与复用的日期记入 meta["fingerprints"] / meta["reused_days"]。
+
+        本次运行 (当前线程) 的天气缓存命中统计记入 meta["cache_stats"]。
+        """
+        with metrics.scope() as run_metrics, metrics.timer("scheduler.run"):
+            result = self._run_viewpoint(viewpoint_id, days, events, previous)
+        result.meta["cache_stats"] = {
+            "hits": int(run_metrics.counter("cache.hits")),
+            "misses": int(run_metrics.counter("cache.misses")),
+            "api_requests": int(run_metrics.counter("fetcher.requests")),
+        }
+        return result
+
+    def _run_viewpoint(
+        self,
+        viewpoint_id: str,
+        days: int,
+        events: list[str] | None,
+        previous: dict[str, dict] | None,
     ) -> PipelineResult:
-        """单站点多日预测 — 核心主流程"""
+        """run() 主体"""
         # 1. 获取 Viewpoint 配置
         viewpoint = self._viewpoint_config.get(viewpoint_id)
 
@@ -94,6 +283,13 @@ class GMPScheduler:
         # 3. 聚合数据需求
         aggregated_req = self._score_engine.collect_requirements(active_plugins)
 
+        # 天文缓存: 一次批量算好 days 天的日出日落，逐日循环直接命中
+        if aggregated_req.needs_astro and isinstance(self._astro, CachedAstro):
+            self._astro.get_sun_events_bulk(
+                [(viewpoint.location.lat, viewpoint.location.lon)],
+                [today + timedelta(days=i) for i in range(days)],
+            )
+
         # 4. L1: 获取本地天气 (一次性获取 days 天)
         data_freshness = "fresh"
         local_weather = self._fetcher.fetch_hourly(
@@ -110,7 +306,7 @@ class GMPScheduler:
             target_coords = [(t.lat, t.lon) for t in viewpoint.targets]
             try:
                 target_weather_all = self._fetcher.fetch_multi_points(
-                    target_coords, days=days
+                    target_coords, days=days, columns=aggregated_req.target_columns
                 )
             except Exception:
                 logger.warning("scheduler.target_weather_failed", viewpoint=viewpoint_id)
@@ -127,52 +323,62 @@ class GMPScheduler:
                 active_plugins=active_plugins,
                 sun_events=day0_sun,
                 days=days,
+                columns=aggregated_req.light_path_columns,
             )
 
-        # 5. 逐日循环评分
-        forecast_days: list[ForecastDay] = []
-        for day_offset in range(days):
-            target_date = today + timedelta(days=day_offset)
-            days_ahead = day_offset + 1
-            confidence = days_ahead_to_confidence(
-                days_ahead,
-                config=self._config.get_confidence_config(),
+        # 5. 一次性按日期切分本地/目标/光路天气
+        weather_by_date = _WeatherByDate.build(
+            local_weather, target_weather_all, light_path_weather_pre
+        )
+        dates = [today + timedelta(days=i) for i in range(days)]
+        confidences = [
+            days_ahead_to_confidence(
+                i + 1, config=self._config.get_confidence_config()
             )
+            for i in range(days)
+        ]
 
-            try:
-                day_result = self._score_single_day(
-                    viewpoint=viewpoint,
-                    target_date=target_date,
-                    active_plugins=active_plugins,
-                    aggregated_req=aggregated_req,
-                    local_weather=local_weather,
-                    target_weather_all=target_weather_all,
-                    light_path_weather_pre=light_path_weather_pre,
-                    confidence=confidence,
-                    data_freshness=data_freshness,
-                )
-            except Exception:
-                logger.warning(
-                    "scheduler.day_failed",
-                    viewpoint=viewpoint_id,
-                    date=str(target_date),
-                    exc_info=True,
-                )
-                day_result = ForecastDay(
-                    date=target_date.isoformat(),
-                    summary="数据获取失败",
-                    best_event=None,
-                    events=[],
-                    confidence=confidence,
-                )
-
-            forecast_days.append(day_result)
+        # 6. 输入指纹未变的日期复用上次结果，其余逐日评分
+        fingerprints = self._day_fingerprints(
+            viewpoint, dates, confidences, active_plugins, weather_by_date
+        )
+        reused = self._reusable_days(dates, fingerprints, previous)
+        pending = [i for i in range(days) if i not in reused]
+        scored = self._score_days(
+            viewpoint=viewpoint,
+            dates=[dates[i] for i in pending],
+            confidences=[confidences[i] for i in pending],
+            active_plugins=active_plugins,
+            aggregated_req=aggregated_req,
+            weather_by_date=weather_by_date,
+            data_freshness=data_freshness,
+            failure_event="scheduler.day_failed",
+            failure_summary="数据获取失败",
+        )
+        forecast_days = [
+            reused[i] if i in reused else None for i in range(days)
+        ]
+        for i, day in zip(pending, scored):
+            forecast_days[i] = day
+        if reused:
+            logger.debug(
+                "scheduler.days_reused",
+                viewpoint=viewpoint_id,
+                reused=len(reused),
+                scored=len(pending),
+            )
 
-        # 6. 构建 meta
+        # 7. 构建 meta
         meta = {
             "generated_at": datetime.now(_CST).isoformat(),
             "data_freshness": data_freshness,
             "hourly_weather": self._extract_hourly_weather(local_weather),
+            "fingerprints": {
+                d.isoformat(): fp
+                for d, fp in zip(dates, fingerprints)
+                if fp is not None
+            },
+            "reused_days": [dates[i].isoformat() for i in sorted(reused)],
         }
 
         return PipelineResult(
@@ -186,14 +392,27 @@ class GMPScheduler:
         route_id: str,
         days: int = 7,
         events: list[str] | None = None,
+        memo: ResultMemo | None = None,
     ) -> list[PipelineResult]:
-        """线路多站预测"""
+        """线路多站预测
+
+        传入 memo 时站点结果从备忘录复用 (批量生成中观景台阶段已算好)，
+        仅在未命中时调用 run()。
+        """
         route = self._route_config.get(route_id)
 
         results: list[PipelineResult] = []
         for stop in route.stops:
             try:
-                result = self.run(stop.viewpoint_id, days=days, events=events)
+                if memo is None:
+                    result = self.run(stop.viewpoint_id, days=days, events=events)
+                else:
+                    result = memo.get_or_run(
+                        ResultMemo.key(stop.viewpoint_id, days, events),
+                        lambda vp_id=stop.viewpoint_id: self.run(
+                            vp_id, days=days, events=events
+                        ),
+                    )
                 results.append(result)
             except Exception:
                 logger.warning(
@@ -206,6 +425,43 @@ class GMPScheduler:
 
         return results
 
+    def required_points(
+        self,
+        viewpoint_id: str,
+        events: list[str] | None = None,
+    ) -> list[tuple[Coord, int, list[str] | None]]:
+        """run() 将为该观景台请求的坐标 [(坐标, past_days, 列投影)]，不发起任何请求
+
+        与 run() 使用相同的 Plugin 筛选、数据需求聚合与光路采样，
+        供 FetchPlanner 在批量评分前统一规划并预取。列投影 None = 全部字段。
+        """
+        viewpoint = self._viewpoint_config.get(viewpoint_id)
+        today = datetime.now(_CST).date()
+        active_plugins = self._score_engine.filter_active_plugins(
+            capabilities=viewpoint.capabilities,
+            target_date=today,
+            events_filter=events,
+        )
+        if not active_plugins:
+            return []
+
+        aggregated_req = self._score_engine.collect_requirements(active_plugins)
+        lat, lon = viewpoint.location.lat, viewpoint.location.lon
+        points: list[tuple[Coord, int, list[str] | None]] = [
+            ((lat, lon), 1 if aggregated_req.past_hours > 0 else 0, None)
+        ]
+        if aggregated_req.needs_l2_target:
+            columns = aggregated_req.target_columns
+            points.extend(((t.lat, t.lon), 0, columns) for t in viewpoint.targets)
+        if aggregated_req.needs_l2_light_path:
+            columns = aggregated_req.light_path_columns
+            day0_sun = self._astro.get_sun_events(lat, lon, today)
+            for _, path_points in self._light_path_points(
+                viewpoint, active_plugins, day0_sun
+            ):
+                points.extend((coord, 0, columns) for coord in path_points)
+        return points
+
     def run_with_data(
         self,
         viewpoint_id: str,
@@ -252,37 +508,21 @@ class GMPScheduler:
                 if tkey in weather_data:
                     target_weather_all[tkey] = weather_data[tkey]
 
-        # 使用 _score_single_day 评分
         confidence = days_ahead_to_confidence(
             0,  # 回测 → days_ahead=0
             config=self._config.get_confidence_config(),
         )
-
-        try:
-            day_result = self._score_single_day(
-                viewpoint=viewpoint,
-                target_date=target_date,
-                active_plugins=active_plugins,
-                aggregated_req=aggregated_req,
-                local_weather=local_weather,
-                target_weather_all=target_weather_all,
-                confidence=confidence,
-                data_freshness="archive",
-            )
-        except Exception:
-            logger.warning(
-                "scheduler.run_with_data_failed",
-                viewpoint=viewpoint_id,
-                date=str(target_date),
-                exc_info=True,
-            )
-            day_result = ForecastDay(
-                date=target_date.isoformat(),
-                summary="数据处理失败",
-                best_event=None,
-                events=[],
-                confidence=confidence,
-            )
+        forecast_days = self._score_days(
+            viewpoint=viewpoint,
+            dates=[target_date],
+            confidences=[confidence],
+            active_plugins=active_plugins,
+            aggregated_req=aggregated_req,
+            weather_by_date=_WeatherByDate.build(local_weather, target_weather_all),
+            data_freshness="archive",
+            failure_event="scheduler.run_with_data_failed",
+            failure_summary="数据处理失败",
+        )
 
         meta = {
             "generated_at": datetime.now(_CST).isoformat(),
@@ -292,7 +532,7 @@ class GMPScheduler:
 
         return PipelineResult(
             viewpoint=viewpoint,
-            forecast_days=[day_result],
+            forecast_days=forecast_days,
             meta=meta,
         )
 
@@ -301,33 +541,185 @@ class GMPScheduler:
     # Internal
     # ------------------------------------------------------------------
 
-    def _score_single_day(
+    def _score_days(
         self,
         *,
         viewpoint: Viewpoint,
-        target_date: date,
+        dates: list[date],
+        confidences: list[str],
         active_plugins: list,
         aggregated_req: DataRequirement,
-        local_weather: pd.DataFrame,
-        target_weather_all: dict[tuple[float, float], pd.DataFrame],
-        light_path_weather_pre: list[dict] | None = None,
-        confidence: str,
+        weather_by_date: _WeatherByDate,
         data_freshness: str,
-    ) -> ForecastDay:
-        """评分单日 — 构建 DataContext 并遍历 Plugin"""
-        # 切片当天本地天气 (forecast_date 为字符串，需转换 target_date)
-        target_date_str = target_date.isoformat()
-        day_weather = local_weather[
-            local_weather["forecast_date"] == target_date_str
-        ].copy()
-        if day_weather.empty:
+        failure_event: str,
+        failure_summary: str,
+    ) -> list[ForecastDay]:
+        """多日评分 — 逐日构建 DataContext，再按 Plugin 评分
+
+        实现了 score_batch 的 Plugin 对所有有数据的日期一次批量评分
+        (失败时回退逐日 score)，其余 Plugin 逐日调用 score。
+        """
+        forecast_days: list[ForecastDay | None] = [None] * len(dates)
+        contexts: dict[int, DataContext] = {}
+
+        def _failed(i: int) -> ForecastDay:
+            logger.warning(
+                failure_event,
+                viewpoint=viewpoint.id,
+                date=str(dates[i]),
+                exc_info=True,
+            )
             return ForecastDay(
-                date=target_date.isoformat(),
-                summary="无可用天气数据",
+                date=dates[i].isoformat(),
+                summary=failure_summary,
                 best_event=None,
                 events=[],
-                confidence=confidence,
+                confidence=confidences[i],
+            )
+
+        for i, target_date in enumerate(dates):
+            try:
+                ctx = self._build_context(
+                    viewpoint=viewpoint,
+                    target_date=target_date,
+                    aggregated_req=aggregated_req,
+                    weather_by_date=weather_by_date,
+                    data_freshness=data_freshness,
+                )
+            except Exception:
+                forecast_days[i] = _failed(i)
+                continue
+            if ctx is None:
+                forecast_days[i] = ForecastDay(
+                    date=target_date.isoformat(),
+                    summary="无可用天气数据",
+                    best_event=None,
+                    events=[],
+                    confidence=confidences[i],
+                )
+                continue
+            contexts[i] = ctx
+
+        # 遍历 Plugin 评分
+        indices = list(contexts)
+        day_events: dict[int, list[ScoreResult]] = {i: [] for i in indices}
+        block: WeatherBlock | None = None
+        for plugin in active_plugins if indices else []:
+            results: list[ScoreResult | None] | None = None
+            if supports_batch(plugin):
+                if block is None:
+                    block = WeatherBlock([contexts[i] for i in indices])
+                try:
+                    with metrics.timer(f"plugin.{plugin.event_type}.score_batch"):
+                        results = plugin.score_batch(block)
+                    if len(results) != len(indices):
+                        raise ValueError(
+                            f"score_batch 返回 {len(results)} 个结果, "
+                            f"期望 {len(indices)} 个"
+                        )
+                except Exception:
+                    results = None
+                    logger.warning(
+                        "scheduler.plugin_batch_failed",
+                        plugin=plugin.event_type,
+                        viewpoint=viewpoint.id,
+                        exc_info=True,
+                    )
+            if results is None:
+                results = [self._score_plugin(plugin, contexts[i]) for i in indices]
+            for i, result in zip(indices, results, strict=True):
+                if result is not None:
+                    result.confidence = confidences[i]
+                    day_events[i].append(result)
+
+        for i in indices:
+            try:
+                forecast_days[i] = self._assemble_day(
+                    dates[i], day_events[i], confidences[i]
+                )
+            except Exception:
+                forecast_days[i] = _failed(i)
+
+        return forecast_days
+
+    def _day_fingerprints(
+        self,
+        viewpoint: Viewpoint,
+        dates: list[date],
+        confidences: list[str],
+        active_plugins: list,
+        weather_by_date: _WeatherByDate,
+    ) -> list[str | None]:
+        """各日输入指纹，无法判定 (无本地天气 / 数据缺少 fetched_at) 为 None"""
+        if self._config_digest is None:
+            self._config_digest = digest(getattr(self._config, "config", None))
+        base = digest(
+            self._config_digest,
+            viewpoint,
+            sorted(p.event_type for p in active_plugins),
+        )
+
+        fingerprints: list[str | None] = []
+        for target_date, confidence in zip(dates, confidences):
+            date_str = target_date.isoformat()
+            local = weather_by_date.local_day(date_str)
+            if local.empty:
+                fingerprints.append(None)
+                continue
+            frames = [("local", local)]
+            frames += [
+                (f"target:{lat},{lon}", parts.get(date_str, _EMPTY_FRAME))
+                for (lat, lon), parts in sorted(weather_by_date.targets.items())
+            ]
+            for j, entry in enumerate(weather_by_date.light_path_day(date_str) or []):
+                frames += [
+                    (f"light_path[{j}]:{coord}", df)
+                    for coord, df in entry["weather"].items()
+                ]
+            stamps = fetched_at_stamps(frames)
+            fingerprints.append(
+                None if stamps is None
+                else digest(base, date_str, confidence, stamps)
             )
+        return fingerprints
+
+    @staticmethod
+    def _reusable_days(
+        dates: list[date],
+        fingerprints: list[str | None],
+        previous: dict[str, dict] | None,
+    ) -> dict[int, ForecastDay]:
+        """指纹与上次一致的日期 → 上次的 ForecastDay"""
+        if not previous:
+            return {}
+        reused: dict[int, ForecastDay] = {}
+        for i, (target_date, fp) in enumerate(zip(dates, fingerprints)):
+            entry = previous.get(target_date.isoformat())
+            if fp is None or not isinstance(entry, dict) or entry.get("fingerprint") != fp:
+                continue
+            try:
+                reused[i] = forecast_day_from_dict(entry["day"])
+            except (KeyError, TypeError):
+                logger.warning(
+                    "scheduler.fingerprint_entry_invalid", date=target_date.isoformat()
+                )
+        return reused
+
+    def _build_context(
+        self,
+        *,
+        viewpoint: Viewpoint,
+        target_date: date,
+        aggregated_req: DataRequirement,
+        weather_by_date: _WeatherByDate,
+        data_freshness: str,
+    ) -> DataContext | None:
+        """构建单日 DataContext，当天无本地天气时返回 None"""
+        # 取当天本地天气切片 (forecast_date 为字符串，需转换 target_date)
+        target_date_str = target_date.isoformat()
+        day_weather = weather_by_date.local_day(target_date_str)
+        if day_weather.empty:
+            return None
 
         # 天文数据 (按需)
         sun_events = None
@@ -348,23 +740,20 @@ class GMPScheduler:
                 sun_events, moon_status
             )
 
-        # L2 光路天气 — 使用循环外预获取的数据
-        light_path_weather = light_path_weather_pre
+        # L2 光路天气 — 循环外预获取并预切分的当日数据
+        light_path_weather = weather_by_date.light_path_day(target_date_str)
 
-        # L2 目标天气 — 切片当天
+        # L2 目标天气 — 当日切片
         target_weather: dict[str, pd.DataFrame] | None = None
         if aggregated_req.needs_l2_target and viewpoint.targets:
             target_weather = {}
             for target in viewpoint.targets:
                 key = (round(target.lat, 2), round(target.lon, 2))
-                if key in target_weather_all:
-                    tw = target_weather_all[key]
-                    day_tw = tw[tw["forecast_date"] == target_date_str].copy()
-                    if not day_tw.empty:
-                        target_weather[target.name] = day_tw
-
-        # 构建 DataContext
-        ctx = DataContext(
+                day_tw = weather_by_date.target_day(key, target_date_str)
+                if day_tw is not None and not day_tw.empty:
+                    target_weather[target.name] = day_tw
+
+        return DataContext(
             date=target_date,
             viewpoint=viewpoint,
             local_weather=day_weather,
@@ -376,23 +765,25 @@ class GMPScheduler:
             data_freshness=data_freshness,
         )
 
-        # 遍历 Plugin 评分
-        events: list[ScoreResult] = []
-        for plugin in active_plugins:
-            try:
-                result = plugin.score(ctx)
-                if result is not None:
-                    result.confidence = confidence
-                    events.append(result)
-            except Exception:
-                logger.warning(
-                    "scheduler.plugin_score_failed",
-                    plugin=plugin.event_type,
-                    date=str(target_date),
-                    exc_info=True,
-                )
+    @staticmethod
+    def _score_plugin(plugin: Any, ctx: DataContext) -> ScoreResult | None:
+        """单日单 Plugin 评分，异常记录后返回 None"""
+        try:
+            with metrics.timer(f"plugin.{plugin.event_type}.score"):
+                return plugin.score(ctx)
+        except Exception:
+            logger.warning(
+                "scheduler.plugin_score_failed",
+                plugin=plugin.event_type,
+                date=str(ctx.date),
+                exc_info=True,
+            )
+            return None
 
-        # 生成 summary
+    def _assemble_day(
+        self, target_date: date, events: list[ScoreResult], confidence: str
+    ) -> ForecastDay:
+        """汇总单日评分结果 → ForecastDay"""
         summary = self._summary_gen.generate(events)
         best_event = max(events, key=lambda e: e.total_score) if events else None
 
@@ -411,35 +802,19 @@ class GMPScheduler:
         active_plugins: list,
         sun_events: Any,
         days: int,
+        columns: list[str] | None = None,
     ) -> list[dict] | None:
-        """根据活跃 Plugin 判断需要哪个方向的光路"""
-        from gmp.core.models import SunEvents as SunEventsType
-
-        light_path_cfg = self._config.get_light_path_config()
-        count = light_path_cfg.get("count", 10)
-        interval_km = light_path_cfg.get("interval_km", 10.0)
-
-        azimuths_to_fetch: list[float] = []
-        for p in active_plugins:
-            if p.event_type == "sunrise_golden_mountain":
-                azimuths_to_fetch.append(sun_events.sunrise_azimuth)
-            elif p.event_type == "sunset_golden_mountain":
-                azimuths_to_fetch.append(sun_events.sunset_azimuth)
-
-        if not azimuths_to_fetch:
+        """根据活跃 Plugin 判断需要哪个方向的光路 (columns 为光路点列投影)"""
+        paths = self._light_path_points(viewpoint, active_plugins, sun_events)
+        if not paths:
             return None
 
         all_path_weather: list[dict] = []
-        for azimuth in azimuths_to_fetch:
-            path_points = self._geo.calculate_light_path_points(
-                viewpoint.location.lat,
-                viewpoint.location.lon,
-                azimuth,
-                count=count,
-                interval_km=interval_km,
-            )
+        for azimuth, path_points in paths:
             try:
-                path_data = self._fetcher.fetch_multi_points(path_points, days=days)
+                path_data = self._fetcher.fetch_multi_points(
+                    path_points, days=days, columns=columns
+                )
                 all_path_weather.append({
                     "azimuth": azimuth,
                     "points": path_points,
@@ -454,6 +829,38 @@ class GMPScheduler:
 
         return all_path_weather if all_path_weather else None
 
+    def _light_path_points(
+        self,
+        viewpoint: Viewpoint,
+        active_plugins: list,
+        sun_events: Any,
+    ) -> list[tuple[float, list[Coord]]]:
+        """活跃金山 Plugin 对应的光路方位角及采样点 [(方位角, 采样点)]"""
+        light_path_cfg = self._config.get_light_path_config()
+        count = light_path_cfg.get("count", 10)
+        interval_km = light_path_cfg.get("interval_km", 10.0)
+
+        azimuths: list[float] = []
+        for p in active_plugins:
+            if p.event_type == "sunrise_golden_mountain":
+                azimuths.append(sun_events.sunrise_azimuth)
+            elif p.event_type == "sunset_golden_mountain":
+                azimuths.append(sun_events.sunset_azimuth)
+
+        return [
+            (
+                azimuth,
+                self._geo.calculate_light_path_points(
+                    viewpoint.location.lat,
+                    viewpoint.location.lon,
+                    azimuth,
+                    count=count,
+                    interval_km=interval_km,
+                ),
+            )
+            for azimuth in azimuths
+        ]
+
     def _extract_hourly_weather(
         self, local_weather: pd.DataFrame
     ) -> dict[str, dict[int, dict]]:
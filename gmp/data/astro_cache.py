@@ -0,0 +1,276 @@
+"""gmp/data/astro_cache.py — 带缓存的天文计算层
+
+包装 AstroUtils，按 (lat_rounded, lon_rounded, date) 缓存日出日落结果。
+相距 1–2 km 的观景台坐标 ROUND(2) 后共用同一条目 (日出时刻差异 < 数秒)。
+星历不随时间变化，可选持久化到 SQLite 小表，进程重启后直接复用。
+磁盘表按计算后端区分条目 (两种后端结果相差可达 ~2 分钟)，切换
+astro.backend 后不会读到另一后端的结果。
+
+计算后端可选:
+- ephem: 逐个 ephem.Observer 搜索 (AstroUtils，默认)
+- noaa: 向量化 NOAA 算法 (gmp.data.solar_noaa)，一次计算整批缺失条目；
+  极昼/极夜等不可达条目回退到 ephem
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import date, datetime
+from pathlib import Path
+
+import structlog
+
+from gmp.core import metrics
+from gmp.core.models import MoonStatus, StargazingWindow, SunEvents
+from gmp.data.astro_utils import AstroUtils
+from gmp.data.solar_noaa import sun_events_bulk
+
+logger = structlog.get_logger()
+
+SunKey = tuple[float, float, date]
+
+_BACKENDS = ("ephem", "noaa")
+
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS sun_events (
+    backend TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    date TEXT NOT NULL,
+    sunrise TEXT NOT NULL,
+    sunset TEXT NOT NULL,
+    sunrise_azimuth REAL NOT NULL,
+    sunset_azimuth REAL NOT NULL,
+    astronomical_dawn TEXT NOT NULL,
+    astronomical_dusk TEXT NOT NULL,
+    PRIMARY KEY (backend, lat, lon, date)
+) WITHOUT ROWID
+"""
+
+_INSERT_SQL = (
+    "INSERT OR REPLACE INTO sun_events "
+    "(backend, lat, lon, date, sunrise, sunset, sunrise_azimuth, sunset_azimuth, "
+    "astronomical_dawn, astronomical_dusk) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class CachedAstro:
+    """AstroUtils 的缓存包装 — 接口与 AstroUtils 一致，另提供批量 API"""
+
+    def __init__(
+        self,
+        astro: AstroUtils | None = None,
+        precision: int = 2,
+        db_path: str | None = None,
+        backend: str = "ephem",
+    ) -> None:
+        """
+        Args:
+            astro: 实际计算实现，默认 AstroUtils()
+            precision: 坐标取整位数 (2 ≈ 1 km)
+            db_path: 持久化 SQLite 路径，None 表示仅进程内缓存
+            backend: 日出日落计算后端 ephem | noaa
+        """
+        if backend not in _BACKENDS:
+            raise ValueError(
+                f"未知天文计算后端: {backend}, 可选: {', '.join(_BACKENDS)}"
+            )
+        self._backend = backend
+        self._astro = astro or AstroUtils()
+        self._precision = precision
+        self._sun: dict[SunKey, SunEvents] = {}
+        self._moon: dict[tuple[float, float, str], MoonStatus] = {}
+        self._lock = threading.RLock()
+        self._conn: sqlite3.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if db_path is not None:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._migrate()
+            self._conn.execute(_CREATE_TABLE_SQL)
+            self._conn.commit()
+
+    def key(self, lat: float, lon: float, target_date: date) -> SunKey:
+        """构造缓存键，坐标按 precision 取整"""
+        return (
+            round(lat, self._precision),
+            round(lon, self._precision),
+            target_date,
+        )
+
+    # ------------------------------------------------------------------
+    # AstroUtils 兼容接口
+    # ------------------------------------------------------------------
+
+    def get_sun_events(self, lat: float, lon: float, target_date: date) -> SunEvents:
+        """日出日落+天文晨暮曦 (以取整坐标计算并缓存)"""
+        key = self.key(lat, lon, target_date)
+        return self.get_sun_events_bulk([(lat, lon)], [target_date])[key]
+
+    def get_moon_status(self, lat: float, lon: float, dt: datetime) -> MoonStatus:
+        """月球状态 (按取整坐标 + 时刻缓存于进程内)"""
+        lat_r, lon_r, _ = self.key(lat, lon, dt.date())
+        moon_key = (lat_r, lon_r, dt.isoformat())
+        with self._lock:
+            cached = self._moon.get(moon_key)
+        if cached is not None:
+            return cached
+        status = self._astro.get_moon_status(lat_r, lon_r, dt)
+        with self._lock:
+            self._moon[moon_key] = status
+        return status
+
+    def determine_stargazing_window(
+        self, sun_events: SunEvents, moon_status: MoonStatus,
+    ) -> StargazingWindow:
+        """观星窗口判定 (纯函数，直接委托)"""
+        return self._astro.determine_stargazing_window(sun_events, moon_status)
+
+    # ------------------------------------------------------------------
+    # 批量接口
+    # ------------------------------------------------------------------
+
+    def get_sun_events_bulk(
+        self,
+        coords: Iterable[tuple[float, float]],
+        dates: Iterable[date],
+    ) -> dict[SunKey, SunEvents]:
+        """一次计算 坐标 × 日期 矩阵
+
+        依次查进程内缓存 → 磁盘表 → 计算，新结果写回两级缓存。
+
+        Returns:
+            {(lat_rounded, lon_rounded, date): SunEvents}
+        """
+        dates = list(dict.fromkeys(dates))
+        keys = list(dict.fromkeys(
+            self.key(lat, lon, d) for lat, lon in coords for d in dates
+        ))
+
+        result: dict[SunKey, SunEvents] = {}
+        with self._lock:
+            missing = []
+            for k in keys:
+                cached = self._sun.get(k)
+                if cached is None:
+                    missing.append(k)
+                else:
+                    result[k] = cached
+            self.hits += len(keys) - len(missing)
+
+            if missing and self._conn is not None:
+                loaded = self._load(missing)
+                self.disk_hits += len(loaded)
+                self._sun.update(loaded)
+                result.update(loaded)
+                missing = [k for k in missing if k not in loaded]
+            self.misses += len(missing)
+        metrics.incr("astro_cache.hits", len(keys) - len(missing))
+        metrics.incr("astro_cache.misses", len(missing))
+
+        if not missing:
+            return result
+
+        with metrics.timer(f"astro.bulk_{self._backend}"):
+            computed = self._compute(missing)
+        with self._lock:
+            self._sun.update(computed)
+            if self._conn is not None:
+                self._save(computed)
+        result.update(computed)
+        return result
+
+    def stats(self) -> dict:
+        """返回命中/未命中/磁盘命中计数及条目数"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._sun),
+            }
+
+    def close(self) -> None:
+        """关闭磁盘表连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _compute(self, keys: list[SunKey]) -> dict[SunKey, SunEvents]:
+        """按后端计算缺失条目"""
+        if self._backend == "noaa":
+            events = sun_events_bulk(
+                [k[0] for k in keys], [k[1] for k in keys], [k[2] for k in keys]
+            )
+            return {
+                k: ev if ev is not None else self._astro.get_sun_events(*k)
+                for k, ev in zip(keys, events)
+            }
+        return {k: self._astro.get_sun_events(*k) for k in keys}
+
+    # ------------------------------------------------------------------
+    # 磁盘表
+    # ------------------------------------------------------------------
+
+    def _migrate(self) -> None:
+        """旧版表 (主键不含 backend) 无法区分后端结果，直接丢弃后重建"""
+        columns = [
+            row[1] for row in self._conn.execute("PRAGMA table_info(sun_events)")
+        ]
+        if columns and "backend" not in columns:
+            logger.info("astro_cache.drop_legacy_table")
+            self._conn.execute("DROP TABLE sun_events")
+
+    def _load(self, keys: list[SunKey]) -> dict[SunKey, SunEvents]:
+        wanted = set(keys)
+        lats = sorted({k[0] for k in keys})
+        lons = sorted({k[1] for k in keys})
+        day_strs = sorted({k[2].isoformat() for k in keys})
+        rows = self._conn.execute(
+            "SELECT lat, lon, date, sunrise, sunset, sunrise_azimuth, sunset_azimuth, "
+            "astronomical_dawn, astronomical_dusk FROM sun_events "
+            "WHERE backend = ? AND lat BETWEEN ? AND ? "
+            "AND lon BETWEEN ? AND ? AND date BETWEEN ? AND ?",
+            (
+                self._backend, lats[0], lats[-1], lons[0], lons[-1],
+                day_strs[0], day_strs[-1],
+            ),
+        ).fetchall()
+        loaded: dict[SunKey, SunEvents] = {}
+        for lat, lon, day, sunrise, sunset, sr_az, ss_az, dawn, dusk in rows:
+            k = (lat, lon, date.fromisoformat(day))
+            if k in wanted:
+                loaded[k] = SunEvents(
+                    sunrise=datetime.fromisoformat(sunrise),
+                    sunset=datetime.fromisoformat(sunset),
+                    sunrise_azimuth=sr_az,
+                    sunset_azimuth=ss_az,
+                    astronomical_dawn=datetime.fromisoformat(dawn),
+                    astronomical_dusk=datetime.fromisoformat(dusk),
+                )
+        return loaded
+
+    def _save(self, entries: dict[SunKey, SunEvents]) -> None:
+        try:
+            self._conn.executemany(
+                _INSERT_SQL,
+                [
+                    (
+                        self._backend, lat, lon, day.isoformat(),
+                        ev.sunrise.isoformat(), ev.sunset.isoformat(),
+                        ev.sunrise_azimuth, ev.sunset_azimuth,
+                        ev.astronomical_dawn.isoformat(),
+                        ev.astronomical_dusk.isoformat(),
+                    )
+                    for (lat, lon, day), ev in entries.items()
+                ],
+            )
+            self._conn.commit()
+        except sqlite3.Error as exc:
+            # 持久化失败不影响本次计算结果
+            logger.warning("astro_cache.save_failed", error=str(exc))
@@ -8,6 +8,7 @@ from datetime import date, datetime, timedelta, timezone
 
 import ephem
 
+from gmp.core import metrics
 from gmp.core.models import MoonStatus, StargazingWindow, SunEvents
 
 # UTC+8 时区
@@ -18,6 +19,7 @@ class AstroUtils:
     """天文计算工具 — 日出日落、月相、观星窗口"""
 
     @staticmethod
+    @metrics.timed("astro.sun_events")
     def get_sun_events(lat: float, lon: float, target_date: date) -> SunEvents:
         """计算指定坐标和日期的日出日落+天文晨暮曦。
 
@@ -75,6 +77,7 @@ class AstroUtils:
         )
 
     @staticmethod
+    @metrics.timed("astro.moon_status")
     def get_moon_status(lat: float, lon: float, dt: datetime) -> MoonStatus:
         """计算指定时刻的月球状态。
 
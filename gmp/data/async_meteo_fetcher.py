@@ -0,0 +1,192 @@
+"""gmp/data/async_meteo_fetcher.py — 基于 asyncio 的 Open-Meteo 数据获取
+
+AsyncMeteoFetcher 与 MeteoFetcher 对外接口完全一致 (同步调用)，
+内部在独立线程的事件循环上使用 httpx.AsyncClient 发起请求:
+- Semaphore 限制同时在途的请求数
+- AsyncTokenBucket 替代 _throttle 控制请求速率
+- 多组坐标请求并发执行，总耗时由限流速率而非单次延迟决定
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+import httpx
+import pandas as pd
+import structlog
+
+from gmp.cache.weather_cache import WeatherCache
+from gmp.core import metrics
+from gmp.core.exceptions import APITimeoutError
+from gmp.data.meteo_fetcher import MeteoFetcher, _decode_json
+from gmp.data.rate_limiter import AsyncTokenBucket
+
+logger = structlog.get_logger()
+
+_T = TypeVar("_T")
+
+
+class AsyncMeteoFetcher(MeteoFetcher):
+    """并发版 Open-Meteo 气象数据获取器"""
+
+    def __init__(
+        self,
+        cache: WeatherCache,
+        config: dict[str, Any] | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """
+        Args:
+            cache: WeatherCache 缓存实例
+            config: 在 MeteoFetcher 配置基础上增加:
+                - max_concurrency: 同时在途的最大请求数
+                - burst: 令牌桶容量 (允许的突发请求数)
+            transport: 自定义 httpx 异步传输层 (如 httpx.MockTransport /
+                基准测试的本地 API 替身)，None 使用真实网络
+        """
+        super().__init__(cache, config)
+        cfg = config or {}
+        self._max_concurrency = max(1, int(cfg.get("max_concurrency", 8)))
+        self._bucket: AsyncTokenBucket | None = None
+        if self._min_request_interval > 0:
+            self._bucket = AsyncTokenBucket(
+                rate=1.0 / self._min_request_interval,
+                capacity=cfg.get("burst", 1),
+            )
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=self._connect_timeout,
+                read=self._read_timeout,
+                write=5.0,
+                pool=5.0,
+            ),
+            transport=transport,
+        )
+        # 事件循环运行在后台线程，同步调用方通过 _run 提交协程
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="gmp-meteo-fetcher",
+            daemon=True,
+        )
+        self._loop_thread.start()
+
+    def close(self) -> None:
+        """关闭连接池并停止后台事件循环"""
+        if self._loop.is_closed():
+            return
+        # 后台刷新仍需事件循环发请求，先等待其完成
+        self._cache.wait_revalidation()
+        self._run(self._async_client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        super().close()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _create_client(self, transport: httpx.BaseTransport | None) -> None:
+        """请求全部经 _async_client 发出，不创建同步连接池"""
+        return None
+
+    def _run(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        """在后台事件循环上执行协程并阻塞等待结果
+
+        事件循环线程上记录的请求/耗时指标同时计入调用方线程的 metrics.scope()
+        (如 GMPScheduler.run 的 cache_stats)。
+        """
+        scopes = metrics.current_scopes()
+
+        async def _in_caller_scopes() -> _T:
+            with metrics.adopt(scopes):
+                return await coro
+
+        return asyncio.run_coroutine_threadsafe(_in_caller_scopes(), self._loop).result()
+
+    def _call_api(self, url: str, params: dict[str, Any]) -> dict:
+        """同步入口 — 委托给 _call_api_async"""
+        return self._run(self._call_api_async(url, params))
+
+    def _fetch_batches(
+        self,
+        batches: list[tuple[list[tuple[float, float]], dict[str, Any]]],
+    ) -> dict[tuple[float, float], pd.DataFrame]:
+        """所有分组请求并发发出，响应按原顺序解析写入缓存"""
+        if not batches:
+            return {}
+
+        async def _gather() -> list[dict | list]:
+            return await asyncio.gather(*(
+                self._call_api_async(
+                    self._base_url, self._batch_params(coords, span_params)
+                )
+                for coords, span_params in batches
+            ))
+
+        raws = self._run(_gather())
+        result: dict[tuple[float, float], pd.DataFrame] = {}
+        for (coords, _), raw in zip(batches, raws):
+            result.update(self._process_batch(coords, raw))
+        return result
+
+    async def _call_api_async(self, url: str, params: dict[str, Any]) -> dict:
+        """HTTP GET 调用 + 令牌桶限流 (进程内 + 主机级) + 并发上限 + 重试 + 429 处理"""
+        for attempt in range(1 + self._retries):
+            if self._bucket is not None:
+                waited = await self._bucket.acquire()
+                if waited > 0:
+                    logger.debug(
+                        "meteo_fetcher.throttle", sleep_seconds=round(waited, 3)
+                    )
+                    metrics.observe("fetcher.throttle_sleep", waited)
+            if self._host_limiter is not None:
+                # SQLite 事务可能等待其他进程的写锁，放到线程池避免阻塞事件循环
+                waited = await asyncio.to_thread(self._host_limiter.reserve)
+                if waited > 0:
+                    await asyncio.sleep(waited)
+                self._record_host_wait(waited)
+            try:
+                async with self._semaphore:
+                    metrics.incr("fetcher.requests")
+                    start = time.perf_counter()
+                    try:
+                        response = await self._async_client.get(url, params=params)
+                    finally:
+                        metrics.observe("fetcher.request", time.perf_counter() - start)
+                metrics.incr("fetcher.bytes", len(response.content))
+                response.raise_for_status()
+                with metrics.timer("fetcher.decode"):
+                    return _decode_json(response.content)
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code == 429:
+                    metrics.incr("fetcher.rate_limited")
+                    retry_after = int(
+                        exc.response.headers.get("Retry-After", self._retry_delay * 2)
+                    )
+                    logger.warning(
+                        "meteo_fetcher.rate_limited",
+                        retry_after=retry_after,
+                        attempt=attempt + 1,
+                    )
+                    await asyncio.sleep(retry_after)
+                    continue
+                raise
+            except httpx.TimeoutException:
+                metrics.incr("fetcher.timeouts")
+                logger.warning(
+                    "meteo_fetcher.timeout",
+                    url=url,
+                    attempt=attempt + 1,
+                    max_retries=self._retries,
+                )
+                if attempt < self._retries:
+                    await asyncio.sleep(self._retry_delay)
+
+        raise APITimeoutError("open-meteo", self._read_timeout)
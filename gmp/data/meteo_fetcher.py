@@ -6,17 +6,30 @@
 
 from __future__ import annotations
 
+import json
+import threading
 import time
 import warnings
+from collections.abc import Collection
 from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
 import httpx
+import numpy as np
 import pandas as pd
 import structlog
 
+from gmp.cache.repository import FIELD_BITS
 from gmp.cache.weather_cache import WeatherCache
+from gmp.core import metrics
 from gmp.core.exceptions import APITimeoutError, DataDegradedWarning
+from gmp.data.rate_limiter import HostRateLimiter
+from gmp.data.single_flight import SingleFlight
+
+try:
+    import orjson
+except ImportError:  # 可选依赖: 未安装时使用标准库 json 解码
+    orjson = None
 
 logger = structlog.get_logger()
 
@@ -62,6 +75,47 @@ _COLUMNS = [
     "weather_code",
 ]
 
+# 逐小时数据列 (不含 forecast_date / forecast_hour)
+_DATA_COLUMNS = _COLUMNS[2:]
+
+# GMP 内部列名 → Open-Meteo 字段名 (列投影请求用)
+_API_FIELDS = {
+    _COLUMN_RENAME.get(api_field, api_field): api_field
+    for api_field in _HOURLY_FIELDS.split(",")
+}
+
+
+def _decode_json(content: bytes) -> Any:
+    """解码响应体 (已安装 orjson 时使用 orjson，否则标准库 json)"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _to_array(values: list) -> np.ndarray:
+    """JSON 数值列表 → 定型数组，含 null 时为 float64 (null → NaN)"""
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        arr = np.asarray(values, dtype=np.float64)
+    return arr
+
+
+def _fill_missing(df: pd.DataFrame, col: str, default: float) -> None:
+    """原地将 df[col] 的缺失值替换为 default"""
+    values = df[col].to_numpy()
+    missing = pd.isna(values)
+    if missing.any():
+        df[col] = np.where(missing, default, values)
+
+
+def _clip_range(df: pd.DataFrame, col: str, low: float, high: float) -> None:
+    """原地将 df[col] 截断到 [low, high] (NaN 保持不变)"""
+    values = df[col].to_numpy()
+    if values.dtype.kind not in "iuf":
+        df[col] = df[col].clip(low, high)
+    elif ((values < low) | (values > high)).any():
+        df[col] = np.clip(values, low, high)
+
 
 class MeteoFetcher:
     """Open-Meteo 气象数据获取器"""
@@ -70,6 +124,7 @@ class MeteoFetcher:
         self,
         cache: WeatherCache,
         config: dict[str, Any] | None = None,
+        transport: httpx.BaseTransport | None = None,
     ) -> None:
         """
         Args:
@@ -82,6 +137,11 @@ class MeteoFetcher:
                 - retries: 重试次数
                 - retry_delay: 重试间隔秒数
                 - min_request_interval: 最小请求间隔秒数 (防频率限制)
+                - batch_size: 单次请求合并的最大坐标数 (1 = 逐点请求)
+                - host_rate_limit: 主机级共享配额 {db_path, per_minute,
+                  per_day, burst}，同机所有进程共用 (省略则仅进程内节流)
+            transport: 自定义 httpx 传输层 (如基准测试的本地 API 替身)，
+                None 使用真实网络
         """
         cfg = config or {}
         self._cache = cache
@@ -99,20 +159,27 @@ class MeteoFetcher:
         # 频率限制：默认 0.12s 间隔 ≈ 500 req/min，低于 Open-Meteo 免费层 600/min
         self._min_request_interval = cfg.get("min_request_interval", 0.12)
         self._last_request_time: float = 0.0
+        self._throttle_lock = threading.Lock()
+        # 跨进程配额：多个 CLI / 回测进程同时运行时共同受每分钟与每日预算约束
+        self._host_limiter = HostRateLimiter.from_config(cfg.get("host_rate_limit"))
+        # 多坐标合并请求：Open-Meteo 支持逗号分隔的 latitude/longitude 列表
+        self._batch_size = max(1, int(cfg.get("batch_size", 1)))
+        # 并发线程同时缺失相同 (坐标, 跨度, 字段) 时只发起一次请求
+        self._flights = SingleFlight()
         # 连接池复用
-        self._client = httpx.Client(
-            timeout=httpx.Timeout(
-                connect=self._connect_timeout,
-                read=self._read_timeout,
-                write=5.0,
-                pool=5.0,
-            ),
-        )
+        self._client = self._create_client(transport)
+        # stale-while-revalidate: 缓存返回过期数据时由本实例在后台重新获取
+        self._cache.set_revalidator(self._revalidate)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
+    @property
+    def cache(self) -> WeatherCache:
+        """读写使用的 WeatherCache (本实例为其后台刷新函数)"""
+        return self._cache
+
     def fetch_hourly(
         self,
         lat: float,
@@ -122,53 +189,62 @@ class MeteoFetcher:
     ) -> pd.DataFrame:
         """获取逐小时天气预报。
 
-        1. 先查缓存
-        2. 缓存未命中 → 调用 API
-        3. 解析响应 → DataFrame
-        4. 数据校验
-        5. 写入缓存
-        6. 返回 DataFrame
+        1. 单次区间查询读取缓存
+        2. 全部命中 → 直接返回
+        3. 计算缺失日期的最小跨度，仅请求该跨度
+           (其他线程正在获取相同跨度时等待并共享其结果)
+        4. 解析响应 → 数据校验 → 写入缓存
+        5. 与跨度之外的缓存日期合并返回
         """
-        # 1) 尝试缓存 — 需要所有 days 天全部命中才使用
+        # 1) 区间查询缓存，得到缺失跨度
         today = datetime.now(_CST).date()
-        all_cached: list[pd.DataFrame] = []
-        all_hit = True
-        for offset in range(days):
-            d = today + timedelta(days=offset)
-            cached = self._cache.get(lat, lon, d)
-            if cached is not None:
-                all_cached.append(cached)
-            else:
-                all_hit = False
-                break
-
-        if all_hit and all_cached:
+        frame = self._cache.get_range(
+            lat, lon, today, today + timedelta(days=days - 1)
+        )
+        cached, span = self._split_cached(frame, today, days)
+        if span is None:
             logger.debug("meteo_fetcher.cache_hit", lat=lat, lon=lon, days=days)
-            return pd.concat(all_cached, ignore_index=True)
-
-        # 2) 构建请求参数
-        params: dict[str, Any] = {
-            "latitude": lat,
-            "longitude": lon,
-            "hourly": _HOURLY_FIELDS,
-            "forecast_days": days,
-        }
-        if past_days > 0:
-            params["past_days"] = past_days
-
-        # 3) 调用 API
-        raw = self._call_api(self._base_url, params)
-
-        # 4) 解析 + 校验
-        df = self._parse_response(raw)
-        df = self._validate_data(df)
-
-        # 5) 写入缓存 — 按日期分组存储
-        for d, group in df.groupby("forecast_date"):
-            cache_date = date.fromisoformat(d) if isinstance(d, str) else d
-            self._cache.set(lat, lon, cache_date, group)
-
-        return df
+            return self._merge_days(cached)
+
+        key = self._flight_key((lat, lon), span, past_days, _HOURLY_FIELDS)
+        own, shared = self._flights.claim([key])
+        if shared:
+            metrics.incr("fetcher.coalesced")
+            return self._merge_days(cached, span, shared[key].result().copy())
+
+        try:
+            # 2) 构建请求参数 — 仅请求缺失跨度
+            params: dict[str, Any] = {
+                "latitude": lat,
+                "longitude": lon,
+                "hourly": _HOURLY_FIELDS,
+                **self._span_params(span, today, past_days),
+            }
+
+            # 3) 调用 API
+            raw = self._call_api(self._base_url, params)
+
+            # 4) 解析 + 校验
+            df = self._parse_response(raw)
+            df = self._validate_data(df)
+
+            # 5) 写入缓存 — 按日期分组存储
+            self._store(lat, lon, df)
+        except BaseException as exc:
+            self._flights.fail(own, exc)
+            raise
+        self._flights.resolve(own, {key: df})
+
+        if cached:
+            logger.debug(
+                "meteo_fetcher.partial_cache_hit",
+                lat=lat,
+                lon=lon,
+                cached_days=len(cached),
+                fetch_start=span[0].isoformat(),
+                fetch_end=span[1].isoformat(),
+            )
+        return self._merge_days(cached, span, df)
 
     def fetch_historical(
         self,
@@ -194,20 +270,89 @@ class MeteoFetcher:
         df = self._parse_response(raw)
         df = self._validate_data(df)
 
-        self._cache.set(lat, lon, target_date, df)
+        self._cache.set(lat, lon, target_date, df, data_source="archive")
         return df
 
     def fetch_multi_points(
         self,
         coords: list[tuple[float, float]],
         days: int = 7,
+        past_days: int = 0,
+        columns: Collection[str] | None = None,
     ) -> dict[tuple[float, float], pd.DataFrame]:
         """批量获取多坐标天气（光路点 + 目标点）。
 
-        坐标先 ROUND(2) 去重以减少 API 调用。
+        坐标先 ROUND(2) 去重以减少 API 调用，全部坐标的缓存由一次批量查询读取。
+        缓存未命中的坐标按 batch_size 均分为最少的批次，每批合并为一次多坐标请求。
+        past_days 仅在缺失跨度从今天开始时附带请求 (同 fetch_hourly)。
+
+        columns 为列投影 (内部列名，见 DataRequirement.target_columns)：
+        只请求这些字段，缓存中这些列有值的日期即视为命中；返回的 DataFrame
+        未请求的列为 NaN。None 请求全部字段。
+        """
+        result, _ = self._fetch_points(coords, days, past_days, columns, collect=True)
+        return result
+
+    def prefetch(
+        self,
+        coords: list[tuple[float, float]],
+        days: int = 7,
+        past_days: int = 0,
+        columns: Collection[str] | None = None,
+    ) -> dict[str, int]:
+        """只预热缓存，不组装返回数据 (FetchPlanner 统一预取用)
+
+        columns 同 fetch_multi_points。
+
+        Returns:
+            {"points": 去重后坐标数, "cache_hits": 已全部命中的坐标数,
+             "requests": 发起的多坐标请求数}
+        """
+        _, stats = self._fetch_points(coords, days, past_days, columns, collect=False)
+        return stats
+
+    def close(self) -> None:
+        """等待后台刷新完成，关闭 HTTP 连接池"""
+        self._cache.wait_revalidation()
+        if self._client is not None:
+            self._client.close()
+        if self._host_limiter is not None:
+            self._host_limiter.close()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _create_client(self, transport: httpx.BaseTransport | None) -> httpx.Client | None:
+        """创建同步连接池 (AsyncMeteoFetcher 覆盖为不创建)"""
+        return httpx.Client(
+            timeout=httpx.Timeout(
+                connect=self._connect_timeout,
+                read=self._read_timeout,
+                write=5.0,
+                pool=5.0,
+            ),
+            transport=transport,
+        )
+
+    def _fetch_points(
+        self,
+        coords: list[tuple[float, float]],
+        days: int,
+        past_days: int,
+        columns: Collection[str] | None,
+        collect: bool,
+    ) -> tuple[dict[tuple[float, float], pd.DataFrame], dict[str, int]]:
+        """fetch_multi_points / prefetch 主体
+
+        collect=False 时跳过按坐标合并缓存与新数据 (只写缓存)。
         """
+        if columns is not None:
+            unknown = set(columns) - _API_FIELDS.keys()
+            if unknown:
+                raise ValueError(f"未知的天气列: {', '.join(sorted(unknown))}")
         if not coords:
-            return {}
+            return {}, {"points": 0, "cache_hits": 0, "requests": 0}
 
         # 去重
         unique: dict[tuple[float, float], None] = {}
@@ -215,27 +360,318 @@ class MeteoFetcher:
             rounded = (round(lat, 2), round(lon, 2))
             unique[rounded] = None
 
+        # 1) 批量查缓存，未完全命中的坐标按 (缺失跨度, 请求字段) 分组
+        today = datetime.now(_CST).date()
+        frames = self._cache.get_bulk(
+            list(unique), today, today + timedelta(days=days - 1)
+        )
         result: dict[tuple[float, float], pd.DataFrame] = {}
-        for lat, lon in unique:
-            df = self.fetch_hourly(lat, lon, days=days)
-            result[(lat, lon)] = df
+        pending: dict[tuple[float, float], tuple[dict, tuple[date, date]]] = {}
+        keys: dict[tuple[float, float], tuple] = {}
+        for coord in unique:
+            frame = frames.get(coord)
+            cached, span = self._split_cached(frame, today, days, columns)
+            if span is None:
+                if collect:
+                    result[coord] = self._merge_days(cached)
+            else:
+                pending[coord] = (cached, span)
+                fields = self._request_fields(columns, frame)
+                keys[coord] = self._flight_key(coord, span, past_days, fields)
+
+        # 2) 其他线程正在获取的相同 (坐标, 跨度, 字段) 不再请求，稍后等待其结果；
+        #    其余坐标按 (跨度, 字段) 分组，分批合并请求
+        own, shared = self._flights.claim(keys.values())
+        groups: dict[tuple[tuple[date, date], str], list[tuple[float, float]]] = {}
+        for coord, key in keys.items():
+            if key in own:
+                _, _, span, _, fields = key
+                groups.setdefault((span, fields), []).append(coord)
+        batches: list[tuple[list[tuple[float, float]], dict[str, Any]]] = []
+        for (span, fields), group in groups.items():
+            span_params = {**self._span_params(span, today, past_days), "hourly": fields}
+            for chunk in self._balanced_chunks(group, self._batch_size):
+                batches.append((chunk, span_params))
+        try:
+            fetched = self._fetch_batches(batches)
+        except BaseException as exc:
+            self._flights.fail(own, exc)
+            raise
+        self._flights.resolve(own, {keys[coord]: df for coord, df in fetched.items()})
+
+        # 3) 先完成自己负责的坐标再等待其他线程 (交叉等待不会死锁)
+        for coord, key in keys.items():
+            if key in shared:
+                shared_df = shared[key].result()
+                if collect:
+                    fetched[coord] = shared_df.copy()
+        if shared:
+            metrics.incr("fetcher.coalesced", len(shared))
+
+        stats = {
+            "points": len(unique),
+            "cache_hits": len(unique) - len(pending),
+            "requests": len(batches),
+        }
+        logger.debug("meteo_fetcher.multi_points", coalesced=len(shared), **stats)
+        if not collect:
+            return {}, stats
+
+        for coord, (cached, span) in pending.items():
+            result[coord] = self._merge_days(cached, span, fetched[coord])
+        # 保持与输入一致的坐标顺序
+        return {coord: result[coord] for coord in unique}, stats
+
+    @staticmethod
+    def _flight_key(
+        coord: tuple[float, float],
+        span: tuple[date, date],
+        past_days: int,
+        fields: str,
+    ) -> tuple:
+        """single-flight key: ROUND(2) 坐标 + 缺失跨度 + past_days + 请求字段"""
+        return (round(coord[0], 2), round(coord[1], 2), span, past_days, fields)
+
+    @staticmethod
+    def _balanced_chunks(
+        items: list[tuple[float, float]], size: int
+    ) -> list[list[tuple[float, float]]]:
+        """按最少批数均分 (如 101 个坐标、batch_size=50 → 34/34/33 而非 50/50/1)
+
+        批数不变，各批大小接近，并发获取时不会被单个最大批拖慢。
+        """
+        n_batches = -(-len(items) // size)
+        if n_batches <= 1:
+            return [items]
+        base, extra = divmod(len(items), n_batches)
+        chunks = []
+        start = 0
+        for i in range(n_batches):
+            end = start + base + (1 if i < extra else 0)
+            chunks.append(items[start:end])
+            start = end
+        return chunks
+
+    @staticmethod
+    def _split_cached(
+        frame: pd.DataFrame | None,
+        today: date,
+        days: int,
+        columns: Collection[str] | None = None,
+    ) -> tuple[dict[date, pd.DataFrame], tuple[date, date] | None]:
+        """将区间查询结果按日期拆分，找出从今天起 days 天内的缺失日期
+
+        列投影请求写入的缓存行中未请求的列为 NULL：columns (None = 全部列)
+        中任一列当日未获取过的日期同样视为缺失 (已获取但上游返回空值的列
+        视为命中，见 _fetched_columns)。
+
+        Returns:
+            (命中的 {日期: DataFrame}, 缺失日期跨度 (首个缺失日, 最后缺失日))
+            全部命中时跨度为 None。
+        """
+        cached: dict[date, pd.DataFrame] = {}
+        if frame is not None:
+            complete = MeteoFetcher._complete_dates(frame, columns)
+            for d, group in frame.groupby("forecast_date", sort=True):
+                if d not in complete:
+                    continue
+                cache_date = date.fromisoformat(d) if isinstance(d, str) else d
+                cached[cache_date] = group.reset_index(drop=True)
+
+        missing = [
+            d for d in (today + timedelta(days=offset) for offset in range(days))
+            if d not in cached
+        ]
+
+        span = (missing[0], missing[-1]) if missing else None
+        return cached, span
+
+    @staticmethod
+    def _complete_dates(
+        frame: pd.DataFrame,
+        columns: Collection[str] | None,
+    ) -> set:
+        """columns 中每列当日都至少有一行已获取的 forecast_date 集合"""
+        required = _DATA_COLUMNS if columns is None else columns
+        need = [c for c in required if c in frame.columns]
+        codes, dates = pd.factorize(frame["forecast_date"])
+        if not need:
+            return set(dates)
+        filled = np.zeros((len(dates), len(need)), dtype=bool)
+        np.logical_or.at(filled, codes, MeteoFetcher._fetched_columns(frame, need))
+        return {d for d, ok in zip(dates, filled.all(axis=1)) if ok}
+
+    @staticmethod
+    def _fetched_columns(frame: pd.DataFrame, columns: list[str]) -> np.ndarray:
+        """逐行、逐列是否已获取 → shape (行数, len(columns)) 的布尔矩阵
+
+        缓存行的 fields_mask 记录写入时请求的字段：上游对某些坐标/时效
+        整列返回 null (如 cloud_base) 时该列仍视为已获取，不会每次重新请求。
+        旧版缓存行 fields_mask 为空，退回按值非空判断。
+        """
+        fetched = frame[columns].notna().to_numpy()
+        if "fields_mask" not in frame.columns:
+            return fetched
+        masks = pd.to_numeric(frame["fields_mask"]).fillna(0).to_numpy(dtype=np.int64)
+        bits = np.array([FIELD_BITS.get(c, 0) for c in columns], dtype=np.int64)
+        return fetched | ((masks[:, None] & bits) != 0)
+
+    @staticmethod
+    def _request_fields(
+        columns: Collection[str] | None,
+        cached: pd.DataFrame | None,
+    ) -> str:
+        """列投影 → hourly 请求参数
+
+        缓存中该坐标已获取过的列一并请求：重新获取会整行覆盖缓存，
+        不同投影交替请求同一坐标时不会互相清掉对方的列。
+        """
+        if columns is None:
+            return _HOURLY_FIELDS
+        wanted = set(columns)
+        if cached is not None and not cached.empty:
+            present = [c for c in _DATA_COLUMNS if c in cached.columns]
+            fetched = MeteoFetcher._fetched_columns(cached, present).any(axis=0)
+            wanted.update(c for c, ok in zip(present, fetched) if ok)
+        return ",".join(api for col, api in _API_FIELDS.items() if col in wanted)
+
+    @staticmethod
+    def _span_params(
+        span: tuple[date, date],
+        today: date,
+        past_days: int = 0,
+    ) -> dict[str, Any]:
+        """缺失跨度 → 请求参数
+
+        跨度从今天开始 → forecast_days (+ past_days)；
+        否则 → start_date/end_date 仅请求缺失的日期。
+        """
+        start, end = span
+        if start == today:
+            params: dict[str, Any] = {"forecast_days": (end - today).days + 1}
+            if past_days > 0:
+                params["past_days"] = past_days
+            return params
+        return {"start_date": start.isoformat(), "end_date": end.isoformat()}
+
+    @staticmethod
+    def _merge_days(
+        cached: dict[date, pd.DataFrame],
+        span: tuple[date, date] | None = None,
+        fetched: pd.DataFrame | None = None,
+    ) -> pd.DataFrame:
+        """合并跨度之外的缓存日期与新获取的数据，按日期/小时排序"""
+        frames = [
+            df for d, df in sorted(cached.items())
+            if span is None or not span[0] <= d <= span[1]
+        ]
+        if fetched is None:
+            return pd.concat(frames, ignore_index=True)
+        if not frames:
+            return fetched
+
+        merged = pd.concat([*frames, fetched], ignore_index=True)
+        return merged.sort_values(
+            ["forecast_date", "forecast_hour"], kind="stable", ignore_index=True
+        )
+
+    def _revalidate(self, lat: float, lon: float, dates: list[date]) -> None:
+        """重新获取过期的缓存日期并写回缓存 (由 WeatherCache 后台线程调用)"""
+        today = datetime.now(_CST).date()
+        params: dict[str, Any] = {
+            "latitude": lat,
+            "longitude": lon,
+            "hourly": _HOURLY_FIELDS,
+            **self._span_params((min(dates), max(dates)), today),
+        }
+        df = self._validate_data(
+            self._parse_response(self._call_api(self._base_url, params))
+        )
+        self._store(lat, lon, df)
+
+    def _store(self, lat: float, lon: float, df: pd.DataFrame) -> None:
+        """整段数据按行内 forecast_date 一次写入缓存"""
+        self._cache.set_many({(lat, lon): df})
+
+    def _fetch_batches(
+        self,
+        batches: list[tuple[list[tuple[float, float]], dict[str, Any]]],
+    ) -> dict[tuple[float, float], pd.DataFrame]:
+        """逐组发起多坐标请求 (AsyncMeteoFetcher 覆盖为并发执行)
 
+        Args:
+            batches: [(坐标列表, 日期跨度参数)]
+        """
+        result: dict[tuple[float, float], pd.DataFrame] = {}
+        for coords, span_params in batches:
+            raw = self._call_api(self._base_url, self._batch_params(coords, span_params))
+            result.update(self._process_batch(coords, raw))
         return result
 
-    # ------------------------------------------------------------------
-    # Internal
-    # ------------------------------------------------------------------
+    @staticmethod
+    def _batch_params(
+        coords: list[tuple[float, float]],
+        span_params: dict[str, Any],
+    ) -> dict[str, Any]:
+        """构建多坐标请求参数 (逗号分隔的 latitude/longitude 列表)
+
+        span_params 可携带 hourly (列投影)，覆盖默认的全部字段。
+        """
+        return {
+            "latitude": ",".join(str(lat) for lat, _ in coords),
+            "longitude": ",".join(str(lon) for _, lon in coords),
+            "hourly": _HOURLY_FIELDS,
+            **span_params,
+        }
+
+    def _process_batch(
+        self,
+        coords: list[tuple[float, float]],
+        raw: dict | list,
+    ) -> dict[tuple[float, float], pd.DataFrame]:
+        """拆分多坐标响应，校验后整批一次写入缓存"""
+        frames = self._split_response(raw)
+        if len(frames) != len(coords):
+            raise ValueError(
+                f"多坐标响应数量不匹配: 请求 {len(coords)} 个, 返回 {len(frames)} 个"
+            )
+
+        result: dict[tuple[float, float], pd.DataFrame] = {
+            coord: self._validate_data(df) for coord, df in zip(coords, frames)
+        }
+        self._cache.set_many(result)
+        return result
 
     def _throttle(self) -> None:
-        """请求节流 — 确保两次 API 调用间隔 ≥ min_request_interval"""
-        if self._min_request_interval <= 0:
-            return
-        now = time.monotonic()
-        elapsed = now - self._last_request_time
-        if elapsed < self._min_request_interval:
-            sleep_time = self._min_request_interval - elapsed
-            logger.debug("meteo_fetcher.throttle", sleep_seconds=round(sleep_time, 3))
-            time.sleep(sleep_time)
+        """请求节流 — 确保两次 API 调用的发起间隔 ≥ min_request_interval
+
+        多线程共用同一实例时，各线程在锁内预约下一个发起时刻，再在锁外等待。
+        配置了 host_rate_limit 时再从主机级令牌桶取得令牌。
+
+        Raises:
+            RateBudgetExceededError: 主机级日配额已用尽
+        """
+        if self._min_request_interval > 0:
+            with self._throttle_lock:
+                now = time.monotonic()
+                slot = max(now, self._last_request_time + self._min_request_interval)
+                self._last_request_time = slot
+            sleep_time = slot - now
+            if sleep_time > 0:
+                logger.debug(
+                    "meteo_fetcher.throttle", sleep_seconds=round(sleep_time, 3)
+                )
+                metrics.observe("fetcher.throttle_sleep", sleep_time)
+                time.sleep(sleep_time)
+        if self._host_limiter is not None:
+            self._record_host_wait(self._host_limiter.acquire())
+
+    @staticmethod
+    def _record_host_wait(waited: float) -> None:
+        """记录主机级令牌桶的等待时长 (每次请求都记录，含 0)"""
+        if waited > 0:
+            logger.debug("meteo_fetcher.host_throttle", sleep_seconds=round(waited, 3))
+        metrics.observe("fetcher.host_wait", waited)
 
     def _call_api(self, url: str, params: dict[str, Any]) -> dict:
         """HTTP GET 调用 + 节流 + 重试 + 超时 + 429 处理"""
@@ -244,12 +680,16 @@ class MeteoFetcher:
         for attempt in range(1 + self._retries):
             self._throttle()
             try:
-                response = self._client.get(url, params=params)
-                self._last_request_time = time.monotonic()
+                metrics.incr("fetcher.requests")
+                with metrics.timer("fetcher.request"):
+                    response = self._client.get(url, params=params)
+                metrics.incr("fetcher.bytes", len(response.content))
                 response.raise_for_status()
-                return response.json()
+                with metrics.timer("fetcher.decode"):
+                    return _decode_json(response.content)
             except httpx.HTTPStatusError as exc:
                 if exc.response.status_code == 429:
+                    metrics.incr("fetcher.rate_limited")
                     retry_after = int(
                         exc.response.headers.get("Retry-After", self._retry_delay * 2)
                     )
@@ -263,7 +703,7 @@ class MeteoFetcher:
                 raise
             except httpx.TimeoutException as exc:
                 last_exc = exc
-                self._last_request_time = time.monotonic()
+                metrics.incr("fetcher.timeouts")
                 logger.warning(
                     "meteo_fetcher.timeout",
                     url=url,
@@ -275,6 +715,16 @@ class MeteoFetcher:
 
         raise APITimeoutError("open-meteo", self._read_timeout)
 
+    def _split_response(self, response: dict | list) -> list[pd.DataFrame]:
+        """拆分多坐标响应 → 每个坐标一个 DataFrame
+
+        Open-Meteo 对多坐标请求返回 JSON 数组（顺序与请求坐标一致），
+        单坐标请求返回单个对象。
+        """
+        if isinstance(response, dict):
+            return [self._parse_response(response)]
+        return [self._parse_response(item) for item in response]
+
     def _parse_response(self, response: dict) -> pd.DataFrame:
         """解析 Open-Meteo JSON 响应 → DataFrame
 
@@ -282,46 +732,26 @@ class MeteoFetcher:
         - cloud_cover → cloud_cover_total
         - cloud_cover_mid → cloud_cover_medium
         - cloud_base → cloud_base_altitude
+
+        各字段直接转为定型 NumPy 数组 (整数列保持 int64，含 null 的列为
+        float64 + NaN)，与逐值构建 DataFrame 的结果一致。
         """
         hourly = response["hourly"]
 
-        # 提取时间 → forecast_date + forecast_hour
-        timestamps = hourly["time"]
-        dates = []
-        hours = []
-        for ts in timestamps:
-            dt = datetime.fromisoformat(ts)
-            dates.append(dt.date().isoformat())
-            hours.append(dt.hour)
-
-        # 构建 DataFrame
-        data: dict[str, Any] = {
-            "forecast_date": dates,
-            "forecast_hour": hours,
+        # 时间 "YYYY-MM-DDTHH:MM" → datetime64，整列一次解析后拆出日期与小时
+        stamps = np.asarray(hourly["time"], dtype="datetime64[m]")
+        days = stamps.astype("datetime64[D]")
+        data: dict[str, np.ndarray] = {
+            "forecast_date": np.datetime_as_string(days, unit="D"),
+            "forecast_hour": ((stamps - days) // np.timedelta64(1, "h")).astype(np.int64),
         }
 
-        # 映射和拷贝字段
-        for api_field in [
-            "temperature_2m",
-            "relative_humidity_2m",
-            "cloud_cover",
-            "cloud_cover_low",
-            "cloud_cover_mid",
-            "cloud_cover_high",
-            "cloud_base",
-            "precipitation_probability",
-            "visibility",
-            "wind_speed_10m",
-            "snowfall",
-            "rain",
-            "showers",
-            "weather_code",
-        ]:
-            col_name = _COLUMN_RENAME.get(api_field, api_field)
-            data[col_name] = hourly[api_field]
+        # 映射字段 (列投影请求只返回部分字段)
+        for col_name, api_field in _API_FIELDS.items():
+            if api_field in hourly:
+                data[col_name] = _to_array(hourly[api_field])
 
-        df = pd.DataFrame(data)
-        return df[_COLUMNS]
+        return pd.DataFrame(data, columns=[c for c in _COLUMNS if c in data], copy=False)
 
     def _validate_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """数据校验: clip 异常值, None 填充默认值
@@ -333,21 +763,35 @@ class MeteoFetcher:
         - precipitation_probability: clip 0-100
         - cloud_cover*: clip 0-100
         - temperature_2m: 超出 -60~60 → DataDegradedWarning
-        """
-        df = df.copy()
 
+        列投影响应只含部分列，仅校验存在的列 (未请求的列保持缺失，
+        不能以默认值填充，否则缓存会误判为已获取)。
+
+        原地修改并返回 df (调用方传入的是刚解析出的 DataFrame)；
+        无缺失/越界值的列不重新赋值。
+        """
         # None 替换
-        df["cloud_base_altitude"] = df["cloud_base_altitude"].fillna(10000)
-        df["visibility"] = df["visibility"].fillna(0)
-        df["wind_speed_10m"] = df["wind_speed_10m"].fillna(0)
+        for col, default in (
+            ("cloud_base_altitude", 10000),
+            ("visibility", 0),
+            ("wind_speed_10m", 0),
+        ):
+            if col in df.columns:
+                _fill_missing(df, col, default)
 
         # clip 范围
-        df["precipitation_probability"] = df["precipitation_probability"].clip(0, 100)
-        for col in ["cloud_cover_total", "cloud_cover_low", "cloud_cover_medium", "cloud_cover_high"]:
-            df[col] = df[col].clip(0, 100)
+        for col in [
+            "precipitation_probability",
+            "cloud_cover_total",
+            "cloud_cover_low",
+            "cloud_cover_medium",
+            "cloud_cover_high",
+        ]:
+            if col in df.columns:
+                _clip_range(df, col, 0, 100)
 
         # 温度异常检测
-        temp = df["temperature_2m"]
+        temp = df.get("temperature_2m", pd.Series(dtype=float))
         if ((temp < -60) | (temp > 60)).any():
             warnings.warn(
                 "temperature_2m 包含超出 -60°C~60°C 范围的值，标记为 degraded",
@@ -357,6 +801,7 @@ class MeteoFetcher:
 
         # relative_humidity_2m: clip 0-100, None → 50 (保守中间值)
         if "relative_humidity_2m" in df.columns:
-            df["relative_humidity_2m"] = df["relative_humidity_2m"].fillna(50).clip(0, 100)
+            _fill_missing(df, "relative_humidity_2m", 50)
+            _clip_range(df, "relative_humidity_2m", 0, 100)
 
         return df
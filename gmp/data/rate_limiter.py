@@ -0,0 +1,188 @@
+"""gmp/data/rate_limiter.py — API 请求限流器
+
+令牌桶限流，供 MeteoFetcher 系列获取器控制 Open-Meteo 请求速率。
+
+- AsyncTokenBucket: 进程内 asyncio 令牌桶
+- HostRateLimiter: 以 SQLite 文件为共享状态的主机级令牌桶，
+  同一台机器上的所有进程 / 获取器实例共用每分钟与每日请求配额
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from gmp.core.exceptions import RateBudgetExceededError
+
+_CST = timezone(timedelta(hours=8))
+
+
+class AsyncTokenBucket:
+    """asyncio 令牌桶 — 以 rate 个/秒补充令牌，最多积攒 capacity 个
+
+    acquire() 采用"预约"方式：先扣减令牌再按欠额睡眠，
+    扣减过程中没有 await，因此同一事件循环内的并发协程无需加锁。
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        """
+        Args:
+            rate: 令牌补充速率 (个/秒)，必须 > 0
+            capacity: 桶容量 (允许的突发请求数)
+        """
+        if rate <= 0:
+            raise ValueError(f"rate 必须 > 0, 收到: {rate}")
+        self._rate = rate
+        self._capacity = max(1.0, capacity)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> float:
+        """获取一个令牌，返回等待的秒数"""
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+        self._tokens -= 1
+
+        if self._tokens >= 0:
+            return 0.0
+        wait = -self._tokens / self._rate
+        await asyncio.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """主机级令牌桶 — 状态存于 SQLite 表，跨进程共享
+
+    每次 reserve() 在 BEGIN IMMEDIATE 事务内按墙钟时间补充令牌、扣减一个
+    并累加当日计数，事务提交后由调用方在锁外等待欠额对应的时长。
+    SQLite 的写锁保证多个进程的预约串行化；日配额按北京时间自然日重置。
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        per_minute: float,
+        per_day: int | None = None,
+        burst: float = 1.0,
+        name: str = "open-meteo",
+        busy_timeout: float = 10.0,
+    ) -> None:
+        """
+        Args:
+            db_path: 共享状态 SQLite 文件路径 (":memory:" 仅限单进程测试)
+            per_minute: 每分钟请求配额，必须 > 0
+            per_day: 每日请求配额，None 表示不限
+            burst: 桶容量 (允许的突发请求数)
+            name: 令牌桶名称，同一文件内不同名称互不影响
+            busy_timeout: 等待其他进程释放写锁的最长秒数
+        """
+        if per_minute <= 0:
+            raise ValueError(f"per_minute 必须 > 0, 收到: {per_minute}")
+        self._rate = per_minute / 60.0
+        self._capacity = max(1.0, burst)
+        self._per_day = per_day
+        self._name = name
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: 手动控制事务边界 (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(
+            db_path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS rate_bucket (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    day TEXT NOT NULL,
+                    day_count INTEGER NOT NULL
+                )"""
+            )
+
+    @classmethod
+    def from_config(cls, cfg: dict[str, Any] | None) -> HostRateLimiter | None:
+        """由 fetcher.host_rate_limit 配置创建，未配置或 per_minute 缺失时返回 None"""
+        if not cfg or not cfg.get("per_minute"):
+            return None
+        return cls(
+            db_path=cfg.get("db_path", "data/rate_limit.db"),
+            per_minute=cfg["per_minute"],
+            per_day=cfg.get("per_day"),
+            burst=cfg.get("burst", 1),
+            name=cfg.get("name", "open-meteo"),
+        )
+
+    def reserve(self) -> float:
+        """预约一个令牌，返回调用方需要等待的秒数 (不睡眠)
+
+        Raises:
+            RateBudgetExceededError: 当日配额已用尽 (不扣减令牌)
+        """
+        now = time.time()
+        today = datetime.fromtimestamp(now, _CST).date().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated, day, day_count FROM rate_bucket WHERE name = ?",
+                    (self._name,),
+                ).fetchone()
+                if row is None:
+                    tokens, day_count = self._capacity, 0
+                else:
+                    tokens, updated, day, day_count = row
+                    # 墙钟回拨时不补充令牌
+                    tokens = min(
+                        self._capacity,
+                        tokens + max(0.0, now - updated) * self._rate,
+                    )
+                    if day != today:
+                        day_count = 0
+                if self._per_day is not None and day_count >= self._per_day:
+                    raise RateBudgetExceededError(self._name, self._per_day)
+                tokens -= 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_bucket VALUES (?, ?, ?, ?, ?)",
+                    (self._name, tokens, now, today, day_count + 1),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return -tokens / self._rate if tokens < 0 else 0.0
+
+    def acquire(self) -> float:
+        """获取一个令牌 (必要时睡眠)，返回等待的秒数"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def used_today(self) -> int:
+        """当日 (北京时间) 已预约的请求数"""
+        today = datetime.now(_CST).date().isoformat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT day, day_count FROM rate_bucket WHERE name = ?",
+                (self._name,),
+            ).fetchone()
+        if row is None or row[0] != today:
+            return 0
+        return row[1]
+
+    def close(self) -> None:
+        """关闭 SQLite 连接"""
+        with self._lock:
+            self._conn.close()
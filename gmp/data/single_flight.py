@@ -0,0 +1,66 @@
+"""gmp/data/single_flight.py — 相同请求的并发合并 (single-flight)
+
+多个线程同时未命中缓存、需要获取同一份数据时，只有第一个登记的线程
+(leader) 真正发起请求，其余线程等待并共享其结果或异常。
+
+调用方按 "登记 → 获取自己负责的 key → resolve/fail → 等待其他 key" 的
+顺序使用：先完成自己负责的 key 再等待别人，多个 key 交叉登记时不会死锁。
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Hashable, Iterable, Mapping
+from concurrent.futures import Future
+from typing import Any
+
+
+class SingleFlight:
+    """按 key 登记进行中的获取，相同 key 的后来者等待同一个 Future"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def claim(
+        self, keys: Iterable[Hashable]
+    ) -> tuple[dict[Hashable, Future], dict[Hashable, Future]]:
+        """登记一组 key
+
+        Returns:
+            (本线程负责获取的 {key: Future}, 其他线程正在获取的 {key: Future})
+        """
+        own: dict[Hashable, Future] = {}
+        shared: dict[Hashable, Future] = {}
+        with self._lock:
+            for key in keys:
+                future = self._calls.get(key)
+                if future is None:
+                    future = self._calls[key] = Future()
+                    own[key] = future
+                else:
+                    shared[key] = future
+        return own, shared
+
+    def resolve(self, own: Mapping[Hashable, Future], results: Mapping[Hashable, Any]) -> None:
+        """完成本线程负责的 key，结果交给等待者 (缺失的 key 结果为 None)"""
+        self._release(own)
+        for key, future in own.items():
+            future.set_result(results.get(key))
+
+    def fail(self, own: Mapping[Hashable, Future], exc: BaseException) -> None:
+        """本线程负责的获取失败，等待者收到同一异常"""
+        self._release(own)
+        for future in own.values():
+            future.set_exception(exc)
+
+    def in_flight(self) -> int:
+        """进行中的 key 数"""
+        with self._lock:
+            return len(self._calls)
+
+    def _release(self, own: Mapping[Hashable, Future]) -> None:
+        # 先注销再发布结果: 之后到达的调用方直接读缓存 (数据已在发布前写入)
+        with self._lock:
+            for key in own:
+                self._calls.pop(key, None)
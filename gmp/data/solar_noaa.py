@@ -0,0 +1,175 @@
+"""gmp/data/solar_noaa.py — 向量化 NOAA 太阳位置算法
+
+基于 NOAA Solar Calculator (Meeus 简化式) 以 NumPy 数组一次计算任意多组
+(lat, lon, date) 的日出日落、方位角与天文晨暮曦，用于替代逐个
+ephem.Observer 的搜索。事件时刻以"太阳中心几何天顶距"定义:
+
+- 日出/日落: 91.62° — 与 AstroUtils 的 ephem 定义一致 (horizon=-0:34 之上
+  ephem 还按默认气压叠加大气折射，日出时太阳中心几何高度约 -1.62°)
+- 天文晨暮曦: 108° (太阳中心 -18°)
+
+纬度 ±55° 以内与 ephem 的差异: 时刻一般 < 10 秒 (晨暮曦跨本地午夜时 < 2 分钟)，
+方位角 < 0.05°。
+极昼/极夜 (该天顶距不可达) 时对应元素为 NaN/NaT，由调用方回退到 ephem。
+日期为 UTC+8 本地日期，与 AstroUtils 一致 (取该日本地 00:00 后的首次事件)。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from gmp.core.models import SunEvents
+
+_CST = timezone(timedelta(hours=8))
+
+_SUNRISE_ZENITH = 91.62
+_TWILIGHT_ZENITH = 108.0
+
+# JD of 1970-01-01T00:00Z
+_UNIX_EPOCH_JD = 2440587.5
+
+# 以事件时刻重新计算赤纬/时差的迭代次数 (2 次即收敛到秒级)
+_ITERATIONS = 2
+
+
+def _solar_position(jd: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """返回 (赤纬°, 时差 分钟)"""
+    t = (jd - 2451545.0) / 36525.0
+    l0 = np.mod(280.46646 + t * (36000.76983 + t * 0.0003032), 360.0)
+    m = np.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    e = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    center = (
+        np.sin(m) * (1.914602 - t * (0.004817 + 0.000014 * t))
+        + np.sin(2 * m) * (0.019993 - 0.000101 * t)
+        + np.sin(3 * m) * 0.000289
+    )
+    omega = np.radians(125.04 - 1934.136 * t)
+    app_long = np.radians(l0 + center - 0.00569 - 0.00478 * np.sin(omega))
+    mean_obliq = 23.0 + (26.0 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60.0) / 60.0
+    obliq = np.radians(mean_obliq + 0.00256 * np.cos(omega))
+
+    decl = np.degrees(np.arcsin(np.sin(obliq) * np.sin(app_long)))
+
+    y = np.tan(obliq / 2.0) ** 2
+    l0r = np.radians(l0)
+    eot = 4.0 * np.degrees(
+        y * np.sin(2 * l0r)
+        - 2 * e * np.sin(m)
+        + 4 * e * y * np.sin(m) * np.cos(2 * l0r)
+        - 0.5 * y * y * np.sin(4 * l0r)
+        - 1.25 * e * e * np.sin(2 * m)
+    )
+    return decl, eot
+
+
+def _event_minutes(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    jd0: np.ndarray,
+    zenith: float,
+    rising: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """事件时刻 (相对 jd0 即 UTC 00:00 的分钟数) 及该时刻的赤纬"""
+    lat_r = np.radians(lat)
+    cos_z = np.cos(np.radians(zenith))
+    sign = -1.0 if rising else 1.0
+    minutes = 720.0 - 4.0 * lon
+    decl = np.zeros_like(minutes)
+    for _ in range(_ITERATIONS + 1):
+        decl, eot = _solar_position(jd0 + minutes / 1440.0)
+        decl_r = np.radians(decl)
+        cos_ha = (cos_z - np.sin(lat_r) * np.sin(decl_r)) / (
+            np.cos(lat_r) * np.cos(decl_r)
+        )
+        with np.errstate(invalid="ignore"):
+            ha = np.degrees(np.arccos(cos_ha))
+        minutes = 720.0 - 4.0 * lon - eot + sign * 4.0 * ha
+    return minutes, decl
+
+
+def _event_azimuth(lat: np.ndarray, decl: np.ndarray, zenith: float, rising: bool) -> np.ndarray:
+    """太阳位于给定天顶距时的方位角 (北=0°, 顺时针)"""
+    lat_r = np.radians(lat)
+    z = np.radians(zenith)
+    cos_az = (np.sin(np.radians(decl)) - np.sin(lat_r) * np.cos(z)) / (
+        np.cos(lat_r) * np.sin(z)
+    )
+    az = np.degrees(np.arccos(np.clip(cos_az, -1.0, 1.0)))
+    return az if rising else 360.0 - az
+
+
+def sun_events_arrays(
+    lats: Sequence[float] | np.ndarray,
+    lons: Sequence[float] | np.ndarray,
+    dates: Sequence[date] | np.ndarray,
+) -> dict[str, np.ndarray]:
+    """批量计算日出日落/方位角/天文晨暮曦
+
+    Args:
+        lats, lons, dates: 等长数组，dates 为 UTC+8 本地日期
+
+    Returns:
+        {"sunrise", "sunset", "astronomical_dawn", "astronomical_dusk"}:
+            datetime64[ms] (UTC)，不可达为 NaT；
+        {"sunrise_azimuth", "sunset_azimuth"}: 度，不可达为 NaN
+    """
+    lat = np.asarray(lats, dtype=float)
+    lon = np.asarray(lons, dtype=float)
+    day = np.asarray(dates, dtype="datetime64[D]")
+    jd0 = day.astype(np.int64) + _UNIX_EPOCH_JD
+    # UTC+8 本地日: 事件相对 UTC 00:00 的分钟数落在 [-480, 960)
+    local_start = -480.0
+
+    out: dict[str, np.ndarray] = {}
+    for name, zenith, rising in (
+        ("sunrise", _SUNRISE_ZENITH, True),
+        ("sunset", _SUNRISE_ZENITH, False),
+        ("astronomical_dawn", _TWILIGHT_ZENITH, True),
+        ("astronomical_dusk", _TWILIGHT_ZENITH, False),
+    ):
+        minutes, decl = _event_minutes(lat, lon, jd0, zenith, rising)
+        minutes = np.where(minutes < local_start, minutes + 1440.0, minutes)
+        minutes = np.where(minutes >= local_start + 1440.0, minutes - 1440.0, minutes)
+        valid = np.isfinite(minutes)
+        ms = np.where(valid, np.round(minutes * 60000.0), 0).astype(np.int64)
+        stamps = day.astype("datetime64[ms]") + ms.astype("timedelta64[ms]")
+        out[name] = np.where(valid, stamps, np.datetime64("NaT", "ms"))
+        if zenith == _SUNRISE_ZENITH:
+            az = _event_azimuth(lat, decl, zenith, rising)
+            out[f"{name}_azimuth"] = np.where(valid, az, np.nan)
+    return out
+
+
+def _to_cst(stamp: np.datetime64) -> datetime:
+    ms = int(stamp.astype("datetime64[ms]").astype(np.int64))
+    return datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc).astimezone(_CST)
+
+
+def sun_events_bulk(
+    lats: Sequence[float],
+    lons: Sequence[float],
+    dates: Sequence[date],
+) -> list[SunEvents | None]:
+    """sun_events_arrays 的 SunEvents 版本；任一事件不可达的元素为 None"""
+    arrays = sun_events_arrays(lats, lons, dates)
+    invalid = np.zeros(len(arrays["sunrise"]), dtype=bool)
+    for name in ("sunrise", "sunset", "astronomical_dawn", "astronomical_dusk"):
+        invalid |= np.isnat(arrays[name])
+
+    results: list[SunEvents | None] = []
+    for i in range(len(invalid)):
+        if invalid[i]:
+            results.append(None)
+            continue
+        results.append(SunEvents(
+            sunrise=_to_cst(arrays["sunrise"][i]),
+            sunset=_to_cst(arrays["sunset"][i]),
+            sunrise_azimuth=float(arrays["sunrise_azimuth"][i]),
+            sunset_azimuth=float(arrays["sunset_azimuth"][i]),
+            astronomical_dawn=_to_cst(arrays["astronomical_dawn"][i]),
+            astronomical_dusk=_to_cst(arrays["astronomical_dusk"][i]),
+        ))
+    return results
@@ -7,6 +7,8 @@ from __future__ import annotations
 
 import json
 import unicodedata
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime as _DateTime
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -14,8 +16,9 @@ from typing import TYPE_CHECKING
 import click
 import structlog
 
-from gmp.cache.repository import CacheRepository
+from gmp.cache.repository import CacheRepository, create_cache_repository
 from gmp.cache.weather_cache import WeatherCache
+from gmp.core import metrics
 from gmp.core.config_loader import ConfigManager, RouteConfig, ViewpointConfig
 from gmp.core.exceptions import (
     GMPError,
@@ -25,7 +28,7 @@ from gmp.core.exceptions import (
 )
 from gmp.core.logging import setup_logging
 from gmp.core.scheduler import GMPScheduler
-from gmp.data.astro_utils import AstroUtils
+from gmp.data.astro_cache import CachedAstro
 from gmp.data.geo_utils import GeoUtils
 from gmp.data.meteo_fetcher import MeteoFetcher
 from gmp.output.cli_formatter import CLIFormatter
@@ -42,6 +45,8 @@ from gmp.scoring.plugins.snow_tree import SnowTreePlugin
 from gmp.scoring.plugins.stargazing import StargazingPlugin
 
 if TYPE_CHECKING:
+    import httpx
+
     from gmp.backtest.backtester import Backtester
     from gmp.core.batch_generator import BatchGenerator
 
@@ -77,6 +82,22 @@ def _register_plugins(engine: ScoreEngine, config: ConfigManager) -> None:
     # engine.register(IceIciclePlugin(config.get_plugin_config("ice_icicle")))  # 暂停
 
 
+def _create_fetcher(
+    cache: WeatherCache,
+    fetcher_config: dict,
+    transport: httpx.MockTransport | None = None,
+) -> MeteoFetcher:
+    """按 fetcher.engine 配置创建同步或 asyncio 数据获取器
+
+    transport 供基准测试接入进程内 API 替身 (同时支持同步与异步客户端)。
+    """
+    if fetcher_config.get("engine", "sync") == "async":
+        from gmp.data.async_meteo_fetcher import AsyncMeteoFetcher
+
+        return AsyncMeteoFetcher(cache, fetcher_config, transport=transport)
+    return MeteoFetcher(cache, fetcher_config, transport=transport)
+
+
 def _create_core_components(
     config_path: str = "config/engine_config.yaml",
 ) -> tuple[
@@ -91,16 +112,27 @@ def _create_core_components(
     """
     viewpoint_config, route_config, config_manager = _load_configs(config_path)
 
-    repo = CacheRepository(config_manager.config.db_path)
+    repo = create_cache_repository(
+        config_manager.config.db_path,
+        backend=config_manager.config.cache_backend,
+        sqlite_config=config_manager.get_cache_sqlite_config(),
+    )
     cache = WeatherCache(
-        repo, config_manager.config.data_freshness
+        repo,
+        config_manager.config.data_freshness,
+        config_manager.get_cache_memory_config(),
     )
-    fetcher = MeteoFetcher(cache)
+    fetcher = _create_fetcher(cache, config_manager.get_fetcher_config())
 
     engine = ScoreEngine()
     _register_plugins(engine, config_manager)
 
-    astro = AstroUtils()
+    astro_config = config_manager.get_astro_config()
+    astro = CachedAstro(
+        precision=astro_config.get("precision", 2),
+        db_path=astro_config.get("db_path"),
+        backend=astro_config.get("backend", "ephem"),
+    )
     geo = GeoUtils()
 
     scheduler = GMPScheduler(
@@ -116,6 +148,39 @@ def _create_core_components(
     return scheduler, viewpoint_config, route_config, config_manager, repo, fetcher, engine
 
 
+def _close_core_components(
+    scheduler: GMPScheduler,
+    repo: CacheRepository,
+    fetcher: MeteoFetcher,
+) -> None:
+    """释放 _create_core_components 创建的资源
+
+    先关闭 fetcher (等待已排队的后台刷新完成，关闭 HTTP 客户端与主机限流连接)，
+    再停止缓存刷新线程，最后关闭天文缓存与天气缓存的 SQLite 连接。
+    """
+    fetcher.close()
+    fetcher.cache.close()
+    if isinstance(scheduler.astro, CachedAstro):
+        scheduler.astro.close()
+    repo.close()
+
+
+@contextmanager
+def _core_components(
+    config_path: str = "config/engine_config.yaml",
+) -> Iterator[tuple[
+    GMPScheduler, ViewpointConfig, RouteConfig, ConfigManager,
+    CacheRepository, MeteoFetcher, ScoreEngine,
+]]:
+    """_create_core_components 的上下文管理器版本，退出时释放全部资源"""
+    components = _create_core_components(config_path)
+    scheduler, _, _, _, repo, fetcher, _ = components
+    try:
+        yield components
+    finally:
+        _close_core_components(scheduler, repo, fetcher)
+
+
 def create_scheduler(
     config_path: str = "config/engine_config.yaml",
 ) -> GMPScheduler:
@@ -132,13 +197,23 @@ def create_batch_generator(
     output_dir: str = "public/data",
     archive_dir: str = "archive",
     display_names: dict[str, str] | None = None,
+    fetcher: MeteoFetcher | None = None,
 ) -> BatchGenerator:
-    """创建 BatchGenerator 及输出层组件"""
+    """创建 BatchGenerator 及输出层组件
+
+    传入 fetcher 时附带 FetchPlanner，评分前对全部坐标统一去重预取。
+    """
     from gmp.core.batch_generator import BatchGenerator
+    from gmp.core.fetch_planner import FetchPlanner
 
     forecast_reporter = ForecastReporter(display_names=display_names)
     timeline_reporter = TimelineReporter()
-    json_writer = JSONFileWriter(output_dir=output_dir, archive_dir=archive_dir)
+    # 增量指纹是内部状态，与缓存数据库放在一起，不写入发布目录
+    json_writer = JSONFileWriter(
+        output_dir=output_dir,
+        archive_dir=archive_dir,
+        state_dir=str(Path(config.config.db_path).parent / "state"),
+    )
 
     return BatchGenerator(
         scheduler=scheduler,
@@ -148,6 +223,7 @@ def create_batch_generator(
         timeline_reporter=timeline_reporter,
         json_writer=json_writer,
         output_dir=output_dir,
+        planner=FetchPlanner(scheduler, fetcher) if fetcher is not None else None,
     )
 
 
@@ -231,25 +307,25 @@ def predict(
 ) -> None:
     """对指定观景台生成预测"""
     try:
-        scheduler, _, _, _, _, _, engine = _create_core_components(config)
-        dn = engine.display_names
-        events_list = _parse_events(events)
-        result = scheduler.run(viewpoint_id, days=days, events=events_list)
-
-        if output_format == "json":
-            forecast = ForecastReporter(display_names=dn).generate(result)
-            json_output = json.dumps(forecast, ensure_ascii=False, indent=2)
-            if output_file:
-                Path(output_file).write_text(json_output, encoding="utf-8")
-                click.echo(f"已输出到: {output_file}")
+        with _core_components(config) as (scheduler, _, _, _, _, _, engine):
+            dn = engine.display_names
+            events_list = _parse_events(events)
+            result = scheduler.run(viewpoint_id, days=days, events=events_list)
+
+            if output_format == "json":
+                forecast = ForecastReporter(display_names=dn).generate(result)
+                json_output = json.dumps(forecast, ensure_ascii=False, indent=2)
+                if output_file:
+                    Path(output_file).write_text(json_output, encoding="utf-8")
+                    click.echo(f"已输出到: {output_file}")
+                else:
+                    click.echo(json_output)
             else:
-                click.echo(json_output)
-        else:
-            formatter = CLIFormatter(display_names=dn)
-            if detail:
-                click.echo(formatter.format_detail(result))
-            else:
-                click.echo(formatter.format_forecast(result))
+                formatter = CLIFormatter(display_names=dn)
+                if detail:
+                    click.echo(formatter.format_detail(result))
+                else:
+                    click.echo(formatter.format_forecast(result))
     except ViewpointNotFoundError as e:
         click.echo(f"错误: {e}", err=True)
         raise SystemExit(1)
@@ -282,27 +358,27 @@ def predict_route(
 ) -> None:
     """对指定线路生成预测"""
     try:
-        scheduler, _, route_config, _, _, _, engine = _create_core_components(config)
-        dn = engine.display_names
-        events_list = _parse_events(events)
-        results = scheduler.run_route(route_id, days=days, events=events_list)
-
-        if output_format == "json":
-            route = route_config.get(route_id)
-            forecast = ForecastReporter(display_names=dn).generate_route(results, route)
-            click.echo(json.dumps(forecast, ensure_ascii=False, indent=2))
-        else:
-            formatter = CLIFormatter(display_names=dn)
-            route = route_config.get(route_id)
-            # 线路头信息
-            lines: list[str] = [
-                f"🗺️  线路: {route.name} ({route.id})  |  共 {len(route.stops)} 站",
-                "=" * 60,
-            ]
-            # 按站序展示每站预测（results 已按 route.stops 顺序排列）
-            for pr in results:
-                lines.append(formatter.format_forecast(pr))
-            click.echo("\n".join(lines))
+        with _core_components(config) as (scheduler, _, route_config, _, _, _, engine):
+            dn = engine.display_names
+            events_list = _parse_events(events)
+            results = scheduler.run_route(route_id, days=days, events=events_list)
+
+            if output_format == "json":
+                route = route_config.get(route_id)
+                forecast = ForecastReporter(display_names=dn).generate_route(results, route)
+                click.echo(json.dumps(forecast, ensure_ascii=False, indent=2))
+            else:
+                formatter = CLIFormatter(display_names=dn)
+                route = route_config.get(route_id)
+                # 线路头信息
+                lines: list[str] = [
+                    f"🗺️  线路: {route.name} ({route.id})  |  共 {len(route.stops)} 站",
+                    "=" * 60,
+                ]
+                # 按站序展示每站预测（results 已按 route.stops 顺序排列）
+                for pr in results:
+                    lines.append(formatter.format_forecast(pr))
+                click.echo("\n".join(lines))
     except ViewpointNotFoundError as e:
         click.echo(f"错误: {e}", err=True)
         raise SystemExit(1)
@@ -333,6 +409,27 @@ def predict_route(
     type=click.Path(),
     help="历史归档目录",
 )
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(1, 64),
+    help="并发处理的观景台/线路数 (线程池, 共用限流 fetcher)",
+)
+@click.option(
+    "--profile-report",
+    is_flag=True,
+    help="结束时输出各阶段耗时与计数明细",
+)
+@click.option(
+    "--full-refresh",
+    is_flag=True,
+    help="忽略上次输出的输入指纹，全部重新评分并重写",
+)
+@click.option(
+    "--no-prefetch",
+    is_flag=True,
+    help="跳过评分前的全局坐标去重预取，由各观景台自行获取天气",
+)
 @click.option("--config", default="config/engine_config.yaml", help="配置文件路径")
 def generate_all(
     days: int,
@@ -341,40 +438,55 @@ def generate_all(
     no_archive: bool,
     output_dir: str,
     archive_dir: str,
+    workers: int,
+    profile_report: bool,
+    full_refresh: bool,
+    no_prefetch: bool,
     config: str,
 ) -> None:
     """批量生成所有观景台和线路的预测 JSON 文件"""
     try:
-        scheduler, viewpoint_config, route_config, config_manager, _, _, engine = (
-            _create_core_components(config)
-        )
-        batch_gen = create_batch_generator(
-            scheduler, viewpoint_config, route_config, config_manager,
-            output_dir=output_dir, archive_dir=archive_dir,
-            display_names=engine.display_names,
-        )
+        with _core_components(config) as (
+            scheduler, viewpoint_config, route_config, config_manager, _, fetcher, engine
+        ):
+            batch_gen = create_batch_generator(
+                scheduler, viewpoint_config, route_config, config_manager,
+                output_dir=output_dir, archive_dir=archive_dir,
+                display_names=engine.display_names,
+                fetcher=fetcher,
+            )
 
-        events_list = _parse_events(events)
-        result = batch_gen.generate_all(
-            days=days,
-            events=events_list,
-            fail_fast=fail_fast,
-            no_archive=no_archive,
-            progress_callback=click.echo,
-        )
+            events_list = _parse_events(events)
+            result = batch_gen.generate_all(
+                days=days,
+                events=events_list,
+                fail_fast=fail_fast,
+                no_archive=no_archive,
+                progress_callback=click.echo,
+                workers=workers,
+                incremental=not full_refresh,
+                prefetch=not no_prefetch,
+            )
 
-        click.echo(f"✅ 生成完成")
-        click.echo(
-            f"   观景台: {result['viewpoints_processed']} 成功"
-            f", {len(result['failed_viewpoints'])} 失败"
-        )
-        click.echo(
-            f"   线路: {result['routes_processed']} 成功"
-            f", {len(result['failed_routes'])} 失败"
-        )
-        click.echo(f"   输出目录: {result['output_dir']}")
-        if result.get("archive_dir"):
-            click.echo(f"   归档目录: {result['archive_dir']}")
+            click.echo(f"✅ 生成完成")
+            click.echo(
+                f"   观景台: {result['viewpoints_processed']} 成功"
+                f", {len(result['failed_viewpoints'])} 失败"
+            )
+            click.echo(
+                f"   线路: {result['routes_processed']} 成功"
+                f", {len(result['failed_routes'])} 失败"
+            )
+            click.echo(f"   输出目录: {result['output_dir']}")
+            if result.get("archive_dir"):
+                click.echo(f"   归档目录: {result['archive_dir']}")
+            if profile_report:
+                profile = result.get("profile", {})
+                click.echo("")
+                click.echo("⏱️  阶段耗时")
+                click.echo(
+                    metrics.format_report(profile, wall_seconds=profile.get("wall_seconds"))
+                )
     except GMPError as e:
         click.echo(f"GMP 错误: {e}", err=True)
         raise SystemExit(3)
@@ -402,14 +514,15 @@ def backtest(
     """对历史日期进行回测"""
     try:
         backtester = create_backtester(config)
-        events_list = _parse_events(events)
-
-        report = backtester.run(
-            viewpoint_id=viewpoint_id,
-            target_date=target_date.date(),
-            events=events_list,
-            save=save,
-        )
+        try:
+            report = backtester.run(
+                viewpoint_id=viewpoint_id,
+                target_date=target_date.date(),
+                events=_parse_events(events),
+                save=save,
+            )
+        finally:
+            backtester.close()
 
         click.echo(json.dumps(report, ensure_ascii=False, indent=2))
     except ViewpointNotFoundError as e:
@@ -423,6 +536,144 @@ def backtest(
         raise SystemExit(3)
 
 
+@cli.command()
+@click.option(
+    "--scale",
+    "scales",
+    multiple=True,
+    type=click.IntRange(1),
+    default=(50,),
+    show_default=True,
+    help="合成观景台数量，可重复 (如 --scale 50 --scale 500 --scale 5000)",
+)
+@click.option("--days", default=7, type=click.IntRange(1, 16), help="预测天数 (1-16)")
+@click.option("--seed", default=0, type=int, help="合成数据种子")
+@click.option(
+    "--latency-ms",
+    default=0.0,
+    type=click.FloatRange(0),
+    help="替身上游的单请求延迟 (毫秒)",
+)
+@click.option(
+    "--http",
+    is_flag=True,
+    help="启动本地替身 HTTP 服务，请求经真实 socket 发出 (默认进程内调用)",
+)
+@click.option(
+    "--output",
+    "output_file",
+    default="bench_results.json",
+    type=click.Path(),
+    help="结果 JSON 文件路径",
+)
+@click.option(
+    "--compare",
+    "baseline_file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="与之前保存的结果 JSON 对比各阶段耗时",
+)
+@click.option("--config", default="config/engine_config.yaml", help="配置文件路径")
+def bench(
+    scales: tuple[int, ...],
+    days: int,
+    seed: int,
+    latency_ms: float,
+    http: bool,
+    output_file: str,
+    baseline_file: str | None,
+    config: str,
+) -> None:
+    """离线基准测试 — 合成观景台 + 本地 API 替身，分阶段计时"""
+    from gmp.bench import runner
+
+    try:
+        data = runner.run_suite(
+            scales, days=days, seed=seed, config_path=config,
+            progress_callback=click.echo, latency_ms=latency_ms, http=http,
+        )
+        runner.write_results(output_file, data)
+
+        click.echo("")
+        click.echo(runner.format_summary(data))
+        click.echo(f"\n结果已写入: {output_file}")
+        if baseline_file:
+            baseline = json.loads(Path(baseline_file).read_text(encoding="utf-8"))
+            click.echo("")
+            click.echo(runner.format_compare(runner.compare(baseline, data)))
+    except ValueError as e:
+        click.echo(f"错误: {e}", err=True)
+        raise SystemExit(1)
+    except GMPError as e:
+        click.echo(f"GMP 错误: {e}", err=True)
+        raise SystemExit(3)
+
+
+@cli.command("bench-server")
+@click.option("--host", default="127.0.0.1", help="监听地址")
+@click.option("--port", default=8765, type=click.IntRange(0, 65535), help="监听端口")
+@click.option("--latency-ms", default=0.0, type=click.FloatRange(0), help="单请求固定延迟 (毫秒)")
+@click.option("--jitter-ms", default=0.0, type=click.FloatRange(0), help="叠加的随机延迟上限 (毫秒)")
+@click.option(
+    "--error-rate", default=0.0, type=click.FloatRange(0, 1), help="返回 500 的概率 (0-1)"
+)
+@click.option(
+    "--quota",
+    default=0,
+    type=click.IntRange(0),
+    help="每分钟请求配额，超出返回 429 (0 = 不限)",
+)
+@click.option(
+    "--retry-after",
+    default=None,
+    type=click.IntRange(0),
+    help="429 响应的 Retry-After 秒数 (默认按配额窗口计算)",
+)
+@click.option(
+    "--recorded",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="录制的 Open-Meteo 响应 JSON，覆盖对应坐标/日期的合成数据 (可重复)",
+)
+@click.option("--seed", default=0, type=int, help="延迟抖动与错误注入的随机种子")
+def bench_server(
+    host: str,
+    port: int,
+    latency_ms: float,
+    jitter_ms: float,
+    error_rate: float,
+    quota: int,
+    retry_after: int | None,
+    recorded: tuple[str, ...],
+    seed: int,
+) -> None:
+    """启动本地 Open-Meteo 替身服务 (压测/延迟测试用，Ctrl-C 退出)"""
+    from gmp.bench.server import OpenMeteoServer
+    from gmp.bench.synthetic import OpenMeteoStandIn, StandInConfig, load_recordings
+
+    standin = OpenMeteoStandIn(
+        config=StandInConfig(
+            latency_ms=latency_ms,
+            jitter_ms=jitter_ms,
+            error_rate=error_rate,
+            quota_per_minute=quota,
+            retry_after=retry_after,
+            seed=seed,
+        ),
+        recordings=load_recordings(list(recorded)) if recorded else None,
+    )
+    server = OpenMeteoServer(host, port, standin)
+    click.echo(f"🌐 Open-Meteo 替身: {server.url}")
+    click.echo("   engine_config.yaml 中 fetcher 配置:")
+    for key, value in server.fetcher_config().items():
+        click.echo(f"     {key}: {value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"统计: {json.dumps(standin.stats(), ensure_ascii=False)}")
+
+
 @cli.command("list-viewpoints")
 @click.option(
     "--output",
@@ -538,122 +789,121 @@ def debug(
     """诊断日照金山评分 — 逐天输出每个决策点的判断依据"""
     from datetime import timedelta
 
-    from gmp.data.astro_utils import AstroUtils
     from gmp.scoring.plugins.golden_mountain import GoldenMountainPlugin
 
     try:
-        scheduler, viewpoint_config, _, config_manager, _, _ = (
-            _create_core_components(config)
-        )
-        viewpoint = viewpoint_config.get(viewpoint_id)
+        with _core_components(config) as (
+            scheduler, viewpoint_config, _, config_manager, _, _, _
+        ):
+            viewpoint = viewpoint_config.get(viewpoint_id)
+
+            # 创建 sunrise/sunset 两个 GoldenMountain Plugin 实例
+            gm_cfg = config_manager.get_plugin_config("golden_mountain")
+            plugins = [
+                GoldenMountainPlugin("sunrise_golden_mountain", gm_cfg),
+                GoldenMountainPlugin("sunset_golden_mountain", gm_cfg),
+            ]
 
-        # 创建 sunrise/sunset 两个 GoldenMountain Plugin 实例
-        gm_cfg = config_manager.get_plugin_config("golden_mountain")
-        plugins = [
-            GoldenMountainPlugin("sunrise_golden_mountain", gm_cfg),
-            GoldenMountainPlugin("sunset_golden_mountain", gm_cfg),
-        ]
+            # 仅保留 viewpoint 实际配置了的 capability
+            from gmp.scoring.engine import _CAPABILITY_EVENT_MAP
+            allowed_events: set[str] = set()
+            for cap in viewpoint.capabilities:
+                mapped = _CAPABILITY_EVENT_MAP.get(cap, [cap])
+                allowed_events.update(mapped)
+            plugins = [p for p in plugins if p.event_type in allowed_events]
+
+            if not plugins:
+                click.echo(f"⚠️  观景台 {viewpoint_id} 没有配置 sunrise/sunset capability")
+                return
+
+            # 获取天气数据（复用 scheduler 内部逻辑）
+            result = scheduler.run(viewpoint_id, days=days)
+
+            # 然后对每天用 debug_score 重新诊断 (复用 scheduler 的天文缓存)
+            astro = scheduler.astro
+            today = _DateTime.now(
+                tz=__import__("datetime").timezone(timedelta(hours=8))
+            ).date()
+
+            all_debug: list[dict] = []
+            for day_offset in range(days):
+                target_date = today + timedelta(days=day_offset)
+                target_date_str = target_date.isoformat()
+
+                # 取当天本地天气
+                local_weather = scheduler._fetcher.fetch_hourly(
+                    lat=viewpoint.location.lat,
+                    lon=viewpoint.location.lon,
+                    days=days,
+                )
+                day_weather = local_weather[
+                    local_weather["forecast_date"] == target_date_str
+                ].copy()
+
+                if day_weather.empty:
+                    all_debug.append({
+                        "date": target_date_str,
+                        "events": [{"event_type": p.event_type, "decision": "rejected",
+                                    "reason": "无天气数据"} for p in plugins],
+                    })
+                    continue
+
+                # 天文数据
+                sun_events = astro.get_sun_events(
+                    viewpoint.location.lat,
+                    viewpoint.location.lon,
+                    target_date,
+                )
+
+                # 目标天气
+                target_weather: dict[str, __import__("pandas").DataFrame] = {}
+                if viewpoint.targets:
+                    import pandas as pd
+                    fetcher = scheduler._fetcher
+                    for target in viewpoint.targets:
+                        try:
+                            tw = fetcher.fetch_hourly(
+                                lat=target.lat, lon=target.lon, days=days,
+                            )
+                            day_tw = tw[tw["forecast_date"] == target_date_str].copy()
+                            if not day_tw.empty:
+                                target_weather[target.name] = day_tw
+                        except Exception:
+                            pass
+
+                # 光路天气 (简化: 使用 None，debug_score 会跳过)
+                from gmp.scoring.models import DataContext
+                ctx = DataContext(
+                    date=target_date,
+                    viewpoint=viewpoint,
+                    local_weather=day_weather,
+                    sun_events=sun_events,
+                    target_weather=target_weather if target_weather else None,
+                    light_path_weather=None,
+                )
+
+                day_results = []
+                for plugin in plugins:
+                    diag = plugin.debug_score(ctx)
+                    diag["date"] = target_date_str
+                    day_results.append(diag)
 
-        # 仅保留 viewpoint 实际配置了的 capability
-        from gmp.scoring.engine import _CAPABILITY_EVENT_MAP
-        allowed_events: set[str] = set()
-        for cap in viewpoint.capabilities:
-            mapped = _CAPABILITY_EVENT_MAP.get(cap, [cap])
-            allowed_events.update(mapped)
-        plugins = [p for p in plugins if p.event_type in allowed_events]
-
-        if not plugins:
-            click.echo(f"⚠️  观景台 {viewpoint_id} 没有配置 sunrise/sunset capability")
-            return
-
-        # 获取天气数据（复用 scheduler 内部逻辑）
-        result = scheduler.run(viewpoint_id, days=days)
-
-        # 然后对每天用 debug_score 重新诊断
-        astro = AstroUtils()
-        today = _DateTime.now(
-            tz=__import__("datetime").timezone(timedelta(hours=8))
-        ).date()
-
-        all_debug: list[dict] = []
-        for day_offset in range(days):
-            target_date = today + timedelta(days=day_offset)
-            target_date_str = target_date.isoformat()
-
-            # 取当天本地天气
-            local_weather = scheduler._fetcher.fetch_hourly(
-                lat=viewpoint.location.lat,
-                lon=viewpoint.location.lon,
-                days=days,
-            )
-            day_weather = local_weather[
-                local_weather["forecast_date"] == target_date_str
-            ].copy()
-
-            if day_weather.empty:
                 all_debug.append({
                     "date": target_date_str,
-                    "events": [{"event_type": p.event_type, "decision": "rejected",
-                                "reason": "无天气数据"} for p in plugins],
+                    "days_ahead": day_offset + 1,
+                    "events": day_results,
                 })
-                continue
 
-            # 天文数据
-            sun_events = astro.get_sun_events(
-                viewpoint.location.lat,
-                viewpoint.location.lon,
-                target_date,
-            )
-
-            # 目标天气
-            target_weather: dict[str, __import__("pandas").DataFrame] = {}
-            if viewpoint.targets:
-                import pandas as pd
-                fetcher = scheduler._fetcher
-                for target in viewpoint.targets:
-                    try:
-                        tw = fetcher.fetch_hourly(
-                            lat=target.lat, lon=target.lon, days=days,
-                        )
-                        day_tw = tw[tw["forecast_date"] == target_date_str].copy()
-                        if not day_tw.empty:
-                            target_weather[target.name] = day_tw
-                    except Exception:
-                        pass
-
-            # 光路天气 (简化: 使用 None，debug_score 会跳过)
-            from gmp.scoring.models import DataContext
-            ctx = DataContext(
-                date=target_date,
-                viewpoint=viewpoint,
-                local_weather=day_weather,
-                sun_events=sun_events,
-                target_weather=target_weather if target_weather else None,
-                light_path_weather=None,
-            )
-
-            day_results = []
-            for plugin in plugins:
-                diag = plugin.debug_score(ctx)
-                diag["date"] = target_date_str
-                day_results.append(diag)
-
-            all_debug.append({
-                "date": target_date_str,
-                "days_ahead": day_offset + 1,
-                "events": day_results,
-            })
-
-        if output_format == "json":
-            import json as _json
-            output = {
-                "viewpoint_id": viewpoint_id,
-                "viewpoint_name": viewpoint.name,
-                "diagnostics": all_debug,
-            }
-            click.echo(_json.dumps(output, ensure_ascii=False, indent=2))
-        else:
-            _format_debug_table(viewpoint, all_debug)
+            if output_format == "json":
+                import json as _json
+                output = {
+                    "viewpoint_id": viewpoint_id,
+                    "viewpoint_name": viewpoint.name,
+                    "diagnostics": all_debug,
+                }
+                click.echo(_json.dumps(output, ensure_ascii=False, indent=2))
+            else:
+                _format_debug_table(viewpoint, all_debug)
 
     except ViewpointNotFoundError as e:
         click.echo(f"错误: {e}", err=True)
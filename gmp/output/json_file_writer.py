@@ -1,6 +1,7 @@
 """gmp/output/json_file_writer.py — JSON 文件写入器
 
-管理输出目录结构、文件写入和历史归档。
+管理输出目录结构、文件写入和历史归档。增量生成的指纹属于内部状态，
+写入 state_dir (默认与缓存数据库同在 data/ 下)，不进入发布目录与归档。
 """
 
 from __future__ import annotations
@@ -9,6 +10,8 @@ import json
 import shutil
 from pathlib import Path
 
+from gmp.core import metrics
+
 
 class JSONFileWriter:
     """JSON 文件写入与归档管理器"""
@@ -17,9 +20,11 @@ class JSONFileWriter:
         self,
         output_dir: str = "public/data",
         archive_dir: str = "archive",
+        state_dir: str = "data/state",
     ) -> None:
         self._output_dir = output_dir
         self._archive_dir = archive_dir
+        self._state_dir = state_dir
 
     def write_viewpoint(
         self,
@@ -45,6 +50,34 @@ class JSONFileWriter:
         vp_dir.mkdir(parents=True, exist_ok=True)
         self._write_json(vp_dir / f"timeline_{date_str}.json", timeline)
 
+    def read_viewpoint_fingerprints(self, viewpoint_id: str) -> dict:
+        """读取 {state_dir}/fingerprints/{id}.json，不存在或损坏时返回 {}
+
+        输出目录中没有该观景台的 forecast.json (新的输出目录 / 输出被清理)
+        时同样返回 {}，保证增量跳过的文件确实存在。
+        """
+        forecast = Path(self._output_dir) / "viewpoints" / viewpoint_id / "forecast.json"
+        if not forecast.exists():
+            return {}
+        path = self._fingerprint_path(viewpoint_id)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def write_viewpoint_fingerprints(self, viewpoint_id: str, entries: dict) -> None:
+        """写入 {state_dir}/fingerprints/{id}.json (各日输入指纹 + ForecastDay)"""
+        path = self._fingerprint_path(viewpoint_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_json(path, entries)
+        # 旧版本写在发布目录中的指纹文件不再使用，避免继续被发布/归档
+        legacy = Path(self._output_dir) / "viewpoints" / viewpoint_id / "fingerprints.json"
+        legacy.unlink(missing_ok=True)
+
+    def _fingerprint_path(self, viewpoint_id: str) -> Path:
+        return Path(self._state_dir) / "fingerprints" / f"{viewpoint_id}.json"
+
     def write_route(self, route_id: str, forecast: dict) -> None:
         """写入 routes/{id}/forecast.json"""
         route_dir = Path(self._output_dir) / "routes" / route_id
@@ -84,7 +117,8 @@ class JSONFileWriter:
     @staticmethod
     def _write_json(path: Path, data: dict) -> None:
         """写入 JSON 文件（UTF-8, 缩进 2 空格, 中文不转义）"""
-        path.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False) + "\n",
-            encoding="utf-8",
-        )
+        with metrics.timer("writer.write"):
+            payload = (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+            path.write_bytes(payload)
+        metrics.incr("writer.files")
+        metrics.incr("writer.bytes", len(payload))
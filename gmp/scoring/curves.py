@@ -0,0 +1,178 @@
+"""gmp/scoring/curves.py — 阶梯评分曲线
+
+由 YAML 阈值 + 分值一次构建的查表曲线，Plugin 在 __init__ 中编译，
+评分时用 searchsorted 查表，标量与 NumPy 数组共用同一条曲线
+(逐日评分与 score_batch 结果严格一致)。
+
+语义与原先的"按顺序首个命中"列表遍历相同:
+- StepCurve: value <op> thresholds[i] 的首个 i → scores[i]，均未命中 → scores[-1]
+- RangeCurve: 首个满足 lo <= value < hi (closed=True 时 <= hi) 的区间分值，否则 default
+NaN 与任何阈值比较均不命中，默认返回兜底分值；原实现的分支写法使 NaN
+落到其他档位时 (如 "if v > hi … elif v > lo … else" 的最后一个 else)，
+构建曲线时用 nan= 显式指定缺失数据的分值。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+# op → (是否取负后查表, searchsorted side)
+# 降序阈值取负后转为升序: value >= t ⇔ -value <= -t
+_OPS: dict[str, tuple[bool, str]] = {
+    "le": (False, "left"),
+    "lt": (False, "right"),
+    "ge": (True, "left"),
+    "gt": (True, "right"),
+}
+
+
+class StepCurve:
+    """阈值阶梯曲线
+
+    Args:
+        thresholds: 阈值列表 (le/lt 要求升序，ge/gt 要求降序)
+        scores: 分值列表，长度 = len(thresholds) + 1 (最后一个为兜底)
+        op: 命中条件 value <= / < / >= / > threshold
+        nan: 输入为 NaN 时的分值，None 表示使用兜底分值 scores[-1]
+    """
+
+    def __init__(
+        self,
+        thresholds: Sequence[float],
+        scores: Sequence[int | float],
+        op: str = "le",
+        nan: int | float | None = None,
+    ) -> None:
+        if op not in _OPS:
+            raise ValueError(f"未知比较方式: {op}, 可选: {', '.join(_OPS)}")
+        if len(scores) != len(thresholds) + 1:
+            raise ValueError(
+                f"分值数量应为阈值数量 + 1: thresholds={len(thresholds)}, "
+                f"scores={len(scores)}"
+            )
+        negate, side = _OPS[op]
+        edges = np.asarray(thresholds, dtype=float)
+        if negate:
+            edges = -edges
+        if np.any(np.diff(edges) < 0):
+            raise ValueError(
+                f"op={op} 要求阈值{'降序' if negate else '升序'}: {list(thresholds)}"
+            )
+
+        self.op = op
+        self._edges = edges
+        self._negate = negate
+        self._side = side
+        self._scores, self._score_array = _score_table(scores, nan)
+
+    def index(self, value: Any) -> Any:
+        """命中档位下标 (len(thresholds) 表示兜底)"""
+        x = np.asarray(value, dtype=float)
+        if self._negate:
+            x = -x
+        return np.searchsorted(self._edges, x, side=self._side)
+
+    def __call__(self, value: Any) -> Any:
+        """标量 → 原分值 (保持 int/float 类型)；数组 → ndarray"""
+        return _lookup(self.index(value), value, self._scores, self._score_array)
+
+
+class RangeCurve:
+    """区间查表曲线 (区间互不重叠)
+
+    Args:
+        ranges: [(lo, hi, score), ...]，按命中优先级排列
+        default: 未落入任何区间时的分值
+        closed: False → [lo, hi)；True → [lo, hi]
+            闭区间端点相接 (如 [30,60] 与 [0,30]) 时，排在前面的区间优先命中
+        nan: 输入为 NaN 时的分值，None 表示使用 default
+    """
+
+    def __init__(
+        self,
+        ranges: Iterable[tuple[float, float, int | float]],
+        default: int | float = 0,
+        closed: bool = False,
+        nan: int | float | None = None,
+    ) -> None:
+        ranges = list(ranges)
+        order = sorted(range(len(ranges)), key=lambda i: ranges[i][0])
+        entries = [ranges[i] for i in order]
+        for (_, hi, _), (lo, _, _) in zip(entries, entries[1:]):
+            if lo < hi:
+                raise ValueError(f"评分区间重叠: {ranges}")
+
+        self._lo = np.asarray([r[0] for r in entries], dtype=float)
+        self._hi = np.asarray([r[1] for r in entries], dtype=float)
+        self._scores, self._score_array = _score_table(
+            [r[2] for r in entries] + [default], nan
+        )
+        self._closed = closed
+        # 端点相接处 x == lo[i] == hi[i-1]: 前一区间优先级更高时改判前一区间
+        self._prefer_prev = np.asarray(
+            [False] + [order[i - 1] < order[i] for i in range(1, len(order))],
+            dtype=bool,
+        )
+        self.default = default
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Mapping[str, Mapping[str, Any]],
+        default: int | float = 0,
+        closed: bool = False,
+        nan: int | float | None = None,
+    ) -> RangeCurve:
+        """由 YAML 形如 {name: {range: [lo, hi], score: s}} 的配置构建"""
+        return cls(
+            [(e["range"][0], e["range"][1], e["score"]) for e in config.values()],
+            default=default,
+            closed=closed,
+            nan=nan,
+        )
+
+    def index(self, value: Any) -> Any:
+        """命中区间下标 (len(ranges) 表示 default)"""
+        x = np.asarray(value, dtype=float)
+        n = len(self._lo)
+        if n == 0:
+            return np.zeros(x.shape, dtype=np.intp)
+        # 最后一个 lo <= x 的区间
+        pos = np.searchsorted(self._lo, x, side="right") - 1
+        cur = np.clip(pos, 0, n - 1)
+        hit = (pos >= 0) & (x <= self._hi[cur] if self._closed else x < self._hi[cur])
+        idx = np.where(hit, cur, n)
+        if self._closed and n > 1:
+            prev = np.clip(pos - 1, 0, n - 1)
+            at_joint = (
+                (pos >= 1) & (x == self._lo[cur]) & (x == self._hi[prev])
+                & self._prefer_prev[cur]
+            )
+            idx = np.where(at_joint, prev, idx)
+        return idx
+
+    def __call__(self, value: Any) -> Any:
+        """标量 → 原分值；数组 → ndarray"""
+        return _lookup(self.index(value), value, self._scores, self._score_array)
+
+
+def _score_table(
+    scores: Sequence[int | float], nan: int | float | None
+) -> tuple[list[int | float], np.ndarray]:
+    """分值表: [各档分值..., 兜底, NaN 分值] (nan=None 时 NaN 分值即兜底)"""
+    table = list(scores) + [scores[-1] if nan is None else nan]
+    return table, np.asarray(table)
+
+
+def _lookup(
+    idx: Any, value: Any, scores: list[int | float], score_array: np.ndarray
+) -> Any:
+    """按档位下标查分值，NaN 输入改查分值表末位"""
+    x = np.asarray(value, dtype=float)
+    idx = np.where(np.isnan(x), len(scores) - 1, idx)
+    if np.ndim(idx) == 0:
+        return scores[int(idx)]
+    return score_array[idx]
@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from datetime import date
 from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
@@ -12,7 +13,7 @@ from gmp.scoring.models import DataRequirement
 
 if TYPE_CHECKING:
     from gmp.core.models import ScoreResult
-    from gmp.scoring.models import DataContext
+    from gmp.scoring.models import DataContext, WeatherBlock
 
 
 # capability → event_type 映射表
@@ -55,6 +56,37 @@ class ScorerPlugin(Protocol):
     def dimensions(self) -> list[str]: ...
 
 
+@runtime_checkable
+class BatchScorerPlugin(ScorerPlugin, Protocol):
+    """可选的批量评分扩展 — 一次评分多个 DataContext
+
+    score_batch(block) 返回与 block.contexts 一一对应的结果，
+    语义须与逐个调用 score(ctx) 完全一致。Scheduler 优先调用它。
+    """
+
+    def score_batch(self, block: WeatherBlock) -> list[ScoreResult | None]: ...
+
+
+def supports_batch(plugin: ScorerPlugin) -> bool:
+    """Plugin 类是否实现了 score_batch
+
+    检查类型而非实例，避免 MagicMock 等动态属性对象被误判为支持批量。
+    """
+    return callable(getattr(type(plugin), "score_batch", None))
+
+
+def _union_columns(declared: Iterable[list[str] | None]) -> list[str] | None:
+    """合并多个列投影: 任一为 None (需要全部字段) 或无声明 → None"""
+    union: dict[str, None] = {}
+    found = False
+    for columns in declared:
+        if columns is None:
+            return None
+        found = True
+        union.update(dict.fromkeys(columns))
+    return list(union) if found else None
+
+
 class ScoreEngine:
     """Plugin 注册中心"""
 
@@ -97,6 +129,14 @@ class ScoreEngine:
             past_hours=max(
                 (p.data_requirement.past_hours for p in plugins), default=0
             ),
+            target_columns=_union_columns(
+                p.data_requirement.target_columns
+                for p in plugins if p.data_requirement.needs_l2_target
+            ),
+            light_path_columns=_union_columns(
+                p.data_requirement.light_path_columns
+                for p in plugins if p.data_requirement.needs_l2_light_path
+            ),
         )
 
     def filter_active_plugins(
@@ -0,0 +1,111 @@
+"""gmp/scoring/features.py — 单日天气特征存储
+
+挂在 DataContext 上按需计算并缓存的统计量 (均值、安全掩码、安全时段均值、
+时间窗口聚合)。多个 Plugin 需要同一统计量时只计算一次。
+安全相关的键包含阈值，不同 Plugin 使用不同阈值时互不干扰。
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+class WeatherFeatures:
+    """单日 local_weather 的惰性特征缓存
+
+    所有统计量与直接在 DataFrame 上调用 pandas 的结果一致 (跳过 NaN)。
+    缓存的数组/子表为共享对象，调用方不得原地修改。
+    """
+
+    def __init__(self, weather: pd.DataFrame) -> None:
+        self._weather = weather
+        self._cache: dict[tuple, Any] = {}
+
+    def _memo(self, key: tuple, compute) -> Any:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def empty(self) -> bool:
+        return self._weather.empty
+
+    def mean(self, column: str) -> float:
+        """全天均值"""
+        return self._memo(("mean", column), lambda: self._weather[column].mean())
+
+    def safety_mask(
+        self,
+        precip_threshold: float,
+        visibility_threshold: float,
+        missing_ok: bool = False,
+    ) -> np.ndarray:
+        """安全时段掩码: 降水概率 <= precip_threshold 且 能见度(m) >= visibility_threshold
+
+        缺少对应列时抛 KeyError；missing_ok=True 时该条件视为满足 (FrostPlugin)。
+        """
+        def _compute() -> np.ndarray:
+            mask = np.ones(len(self._weather), dtype=bool)
+            if not missing_ok or "precipitation_probability" in self._weather.columns:
+                mask &= (
+                    self._weather["precipitation_probability"] <= precip_threshold
+                ).to_numpy()
+            if not missing_ok or "visibility" in self._weather.columns:
+                mask &= (self._weather["visibility"] >= visibility_threshold).to_numpy()
+            return mask
+
+        return self._memo(
+            ("safety_mask", precip_threshold, visibility_threshold, missing_ok), _compute
+        )
+
+    def safe_frame(
+        self,
+        precip_threshold: float,
+        visibility_threshold: float,
+        missing_ok: bool = False,
+    ) -> pd.DataFrame:
+        """仅含安全时段的子表 (行索引重置)"""
+        return self._memo(
+            ("safe_frame", precip_threshold, visibility_threshold, missing_ok),
+            lambda: self._weather[
+                self.safety_mask(precip_threshold, visibility_threshold, missing_ok)
+            ].reset_index(drop=True),
+        )
+
+    def safe_count(
+        self,
+        precip_threshold: float,
+        visibility_threshold: float,
+        missing_ok: bool = False,
+    ) -> int:
+        """安全时段行数"""
+        return int(
+            self.safety_mask(precip_threshold, visibility_threshold, missing_ok).sum()
+        )
+
+    def safe_mean(
+        self,
+        column: str,
+        precip_threshold: float,
+        visibility_threshold: float,
+        missing_ok: bool = False,
+    ) -> float:
+        """安全时段均值"""
+        return self._memo(
+            ("safe_mean", column, precip_threshold, visibility_threshold, missing_ok),
+            lambda: self.safe_frame(
+                precip_threshold, visibility_threshold, missing_ok
+            )[column].mean(),
+        )
+
+    def window_mean(self, column: str, start_hour: int, end_hour: int) -> float:
+        """forecast_hour ∈ [start_hour, end_hour) 时段的均值，无数据为 NaN"""
+        def _compute() -> float:
+            hours = self._weather["forecast_hour"]
+            in_window = (hours >= start_hour) & (hours < end_hour)
+            return self._weather.loc[in_window, column].mean()
+
+        return self._memo(("window_mean", column, start_hour, end_hour), _compute)
@@ -1,7 +1,8 @@
 """gmp/scoring/models.py — 评分系统数据模型
 
 DataRequirement: Plugin 的数据需求声明
-DataContext: 一天的共享数据上下文
+DataContext: 一天的共享数据上下文 (features 为惰性特征缓存)
+WeatherBlock: 多个 DataContext 的列式天气块 (供 score_batch 使用)
 """
 
 from __future__ import annotations
@@ -10,6 +11,7 @@ from dataclasses import dataclass, field
 from datetime import date
 from typing import TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
 
 from gmp.core.models import (
@@ -18,6 +20,7 @@ from gmp.core.models import (
     SunEvents,
     Viewpoint,
 )
+from gmp.scoring.features import WeatherFeatures
 
 if TYPE_CHECKING:
     pass
@@ -32,6 +35,10 @@ class DataRequirement:
     needs_astro: bool = False
     past_hours: int = 0
     season_months: list[int] | None = None
+    # L2 数据的列投影 (内部列名，如 cloud_cover_medium)，None = 全部字段。
+    # MeteoFetcher 对目标/光路坐标只请求这些列；本地天气还用于逐时展示，始终完整获取
+    target_columns: list[str] | None = None
+    light_path_columns: list[str] | None = None
 
 
 @dataclass
@@ -53,3 +60,80 @@ class DataContext:
 
     # 数据质量标记
     data_freshness: str = "fresh"
+
+    _features: WeatherFeatures | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def features(self) -> WeatherFeatures:
+        """local_weather 的惰性特征缓存，各 Plugin 共享同一份统计量"""
+        if self._features is None:
+            self._features = WeatherFeatures(self.local_weather)
+        return self._features
+
+
+class WeatherBlock:
+    """多日 (或多观景台) 的列式天气块
+
+    将若干 DataContext 的 local_weather 按列拼接为连续 NumPy 数组，
+    以 offsets 标记每段 (每个 context) 的行区间，Plugin 可对所有段一次
+    完成分段归约，而不必逐日构造 pandas 子表。列按需拼接并缓存。
+    """
+
+    def __init__(self, contexts: list[DataContext]) -> None:
+        self.contexts = contexts
+        lengths = np.fromiter(
+            (len(ctx.local_weather) for ctx in contexts),
+            dtype=np.int64,
+            count=len(contexts),
+        )
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self._segment_ids = np.repeat(np.arange(len(contexts)), lengths)
+        self._columns: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.contexts)
+
+    def column(self, name: str, required: bool = False) -> np.ndarray:
+        """返回拼接后的 float 列 (缺列的段以 NaN 填充)
+
+        required=True 时任一段缺列抛 KeyError，与逐日 score 直接取列的行为一致。
+        """
+        if required and any(name not in ctx.local_weather.columns for ctx in self.contexts):
+            raise KeyError(name)
+        cached = self._columns.get(name)
+        if cached is None:
+            parts = [
+                ctx.local_weather[name].to_numpy(dtype=float, na_value=np.nan)
+                if name in ctx.local_weather.columns
+                else np.full(len(ctx.local_weather), np.nan)
+                for ctx in self.contexts
+            ]
+            cached = np.concatenate(parts) if parts else np.empty(0)
+            self._columns[name] = cached
+        return cached
+
+    def segment_count(self, mask: np.ndarray) -> np.ndarray:
+        """每段中 mask 为 True 的行数"""
+        return np.bincount(
+            self._segment_ids, weights=mask.astype(float), minlength=len(self)
+        )
+
+    def segment_mean(
+        self, values: np.ndarray, mask: np.ndarray | None = None
+    ) -> np.ndarray:
+        """每段均值 (可选行掩码，跳过 NaN；无有效行的段为 NaN，同 pandas mean)"""
+        valid = ~np.isnan(values)
+        if mask is not None:
+            valid &= mask
+        sums = np.bincount(
+            self._segment_ids,
+            weights=np.where(valid, values, 0.0),
+            minlength=len(self),
+        )
+        counts = np.bincount(
+            self._segment_ids, weights=valid.astype(float), minlength=len(self)
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
@@ -9,10 +9,11 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from gmp.core.models import ScoreResult, score_to_status
+from gmp.scoring.curves import StepCurve
 from gmp.scoring.models import DataRequirement
 
 if TYPE_CHECKING:
-    from gmp.scoring.models import DataContext
+    from gmp.scoring.models import DataContext, WeatherBlock
 
 
 class ClearSkyPlugin:
@@ -24,6 +25,20 @@ class ClearSkyPlugin:
             "cloud_cover": 50, "precipitation": 25, "visibility": 25,
         })
         self._thresholds = config.get("thresholds", {})
+        # 云量/降水越低越好 (值 <= 阈值命中)；能见度越高越好 (降序阈值，值 >= 阈值命中)
+        self._cloud_curve = StepCurve(
+            self._thresholds.get("cloud_pct", [10, 30, 50, 70]),
+            self._thresholds.get("cloud_scores", [50, 40, 25, 10, 0]),
+        )
+        self._precip_curve = StepCurve(
+            self._thresholds.get("precip_pct", [10, 30, 50]),
+            self._thresholds.get("precip_scores", [25, 20, 10, 0]),
+        )
+        self._visibility_curve = StepCurve(
+            self._thresholds.get("visibility_km", [30, 15, 5]),
+            self._thresholds.get("visibility_scores", [25, 20, 10, 5]),
+            op="ge",
+        )
 
     @property
     def event_type(self) -> str:
@@ -50,23 +65,47 @@ class ClearSkyPlugin:
         2. 按 cloud_cover / precipitation / visibility 三维度打分
         3. 加权求和
         """
-        weather = context.local_weather.copy()
+        features = context.features
 
-        if weather.empty:
+        if features.empty:
             return None
 
+        return self._build_result(
+            features.mean("cloud_cover_total"),
+            features.mean("precipitation_probability"),
+            features.mean("visibility") / 1000.0,
+        )
+
+    def score_batch(self, block: WeatherBlock) -> list[ScoreResult | None]:
+        """批量评分 — 三个维度的日均值按段一次性归约"""
+        avg_cloud = block.segment_mean(block.column("cloud_cover_total"))
+        avg_precip = block.segment_mean(block.column("precipitation_probability"))
+        avg_vis_km = block.segment_mean(block.column("visibility")) / 1000.0
+        lengths = block.offsets[1:] - block.offsets[:-1]
+
+        return [
+            self._build_result(
+                float(avg_cloud[i]), float(avg_precip[i]), float(avg_vis_km[i])
+            )
+            if lengths[i] > 0 else None
+            for i in range(len(block))
+        ]
+
+    def _build_result(
+        self, avg_cloud: float, avg_precip: float, avg_vis_km: float
+    ) -> ScoreResult | None:
+        """由日均值计算评分 (score / score_batch 共用)"""
         # ── 触发判定 ──
         trigger = self._config.get("trigger", {})
         max_cloud = trigger.get("max_cloud_cover", 80)
-        avg_cloud = weather["cloud_cover_total"].mean()
 
         if avg_cloud >= max_cloud:
             return None
 
         # ── 各维度评分 ──
         cloud_score = self._score_cloud(avg_cloud)
-        precip_score = self._score_precipitation(weather)
-        vis_score = self._score_visibility(weather)
+        precip_score = self._score_precipitation(avg_precip)
+        vis_score = self._score_visibility(avg_vis_km)
 
         total = cloud_score + precip_score + vis_score
 
@@ -100,32 +139,12 @@ class ClearSkyPlugin:
 
     def _score_cloud(self, avg_cloud: float) -> int:
         """云量阶梯评分: 云量越低越好"""
-        breakpoints = self._thresholds.get("cloud_pct", [10, 30, 50, 70])
-        scores = self._thresholds.get("cloud_scores", [50, 40, 25, 10, 0])
-
-        for i, bp in enumerate(breakpoints):
-            if avg_cloud <= bp:
-                return scores[i]
-        return scores[-1]
+        return self._cloud_curve(avg_cloud)
 
-    def _score_precipitation(self, weather) -> int:
+    def _score_precipitation(self, avg_precip: float) -> int:
         """降水概率阶梯评分: 降水越低越好"""
-        avg_precip = weather["precipitation_probability"].mean()
-        breakpoints = self._thresholds.get("precip_pct", [10, 30, 50])
-        scores = self._thresholds.get("precip_scores", [25, 20, 10, 0])
-
-        for i, bp in enumerate(breakpoints):
-            if avg_precip <= bp:
-                return scores[i]
-        return scores[-1]
+        return self._precip_curve(avg_precip)
 
-    def _score_visibility(self, weather) -> int:
+    def _score_visibility(self, avg_vis_km: float) -> int:
         """能见度阶梯评分: 能见度越高越好 (降序阈值)"""
-        avg_vis_km = weather["visibility"].mean() / 1000.0
-        breakpoints = self._thresholds.get("visibility_km", [30, 15, 5])
-        scores = self._thresholds.get("visibility_scores", [25, 20, 10, 5])
-
-        for i, bp in enumerate(breakpoints):
-            if avg_vis_km >= bp:
-                return scores[i]
-        return scores[-1]
+        return self._visibility_curve(avg_vis_km)
@@ -8,13 +8,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import pandas as pd
-
 from gmp.core.models import ScoreResult, score_to_status
+from gmp.scoring.curves import StepCurve
 from gmp.scoring.models import DataRequirement
 
 if TYPE_CHECKING:
-    from gmp.scoring.models import DataContext
+    from gmp.scoring.models import DataContext, WeatherBlock
 
 
 class CloudSeaPlugin:
@@ -30,6 +29,22 @@ class CloudSeaPlugin:
         self._safety = safety_config
         self._weights = config["weights"]
         self._thresholds = config["thresholds"]
+        # gap/density 阈值降序，值 > 阈值命中；wind 阈值升序，值 < 阈值命中
+        self._gap_curve = StepCurve(
+            self._thresholds["gap_meters"], self._thresholds["gap_scores"], op="gt"
+        )
+        self._density_curve = StepCurve(
+            self._thresholds["density_pct"], self._thresholds["density_scores"], op="gt"
+        )
+        # factors[0]=≤30%→1.0, factors[1]=>30%→0.7, factors[2]=>60%→0.3；缺失不惩罚
+        self._mid_cloud_curve = StepCurve(
+            self._thresholds["mid_cloud_penalty"],
+            self._thresholds["mid_cloud_factors"],
+            nan=self._thresholds["mid_cloud_factors"][0],
+        )
+        self._wind_curve = StepCurve(
+            self._thresholds["wind_speed"], self._thresholds["wind_scores"], op="lt"
+        )
 
     @property
     def event_type(self) -> str:
@@ -54,23 +69,67 @@ class CloudSeaPlugin:
         3. 计算评分
         4. 返回 ScoreResult
         """
-        weather = self._apply_safety_filter(context.local_weather)
-        if weather.empty:
+        features = context.features
+        precip = self._safety["precip_threshold"]
+        vis = self._safety["visibility_threshold"]
+        if features.safe_count(precip, vis) == 0:
             return None
 
-        viewpoint_alt = context.viewpoint.location.altitude
         # 使用安全行的平均云底高度做触发判定
-        avg_cloud_base = weather["cloud_base_altitude"].mean()
+        return self._build_result(
+            context.viewpoint.location.altitude,
+            features.safe_mean("cloud_base_altitude", precip, vis),
+            features.safe_mean("cloud_cover_low", precip, vis),
+            features.safe_mean("cloud_cover_medium", precip, vis),
+            features.safe_mean("wind_speed_10m", precip, vis),
+        )
+
+    def score_batch(self, block: WeatherBlock) -> list[ScoreResult | None]:
+        """批量评分 — 安全掩码与各维度均值按段一次性归约
 
+        缺少降水概率/能见度列时抛 KeyError (同 score)。
+        """
+        precip = block.column("precipitation_probability", required=True)
+        vis = block.column("visibility", required=True)
+        safe = (
+            (precip <= self._safety["precip_threshold"])
+            & (vis >= self._safety["visibility_threshold"])
+        )
+        safe_rows = block.segment_count(safe)
+        cloud_base = block.segment_mean(block.column("cloud_base_altitude"), safe)
+        low_cloud = block.segment_mean(block.column("cloud_cover_low"), safe)
+        mid_cloud = block.segment_mean(block.column("cloud_cover_medium"), safe)
+        wind = block.segment_mean(block.column("wind_speed_10m"), safe)
+
+        results: list[ScoreResult | None] = []
+        for i, ctx in enumerate(block.contexts):
+            if safe_rows[i] == 0:
+                results.append(None)
+                continue
+            results.append(self._build_result(
+                ctx.viewpoint.location.altitude,
+                float(cloud_base[i]),
+                float(low_cloud[i]),
+                float(mid_cloud[i]),
+                float(wind[i]),
+            ))
+        return results
+
+    def _build_result(
+        self,
+        viewpoint_alt: float,
+        avg_cloud_base: float,
+        low_cloud: float,
+        mid_cloud: float,
+        wind: float,
+    ) -> ScoreResult | None:
+        """由安全行均值计算评分 (score / score_batch 共用)"""
         # 触发判定: 云底必须低于站点
         if avg_cloud_base >= viewpoint_alt:
             return None
 
         # 计算各子维度（基于安全行均值）
         gap = viewpoint_alt - avg_cloud_base
-        low_cloud = weather["cloud_cover_low"].mean()
-        mid_cloud = weather["cloud_cover_medium"].mean()
-        wind = weather["wind_speed_10m"].mean()
 
         score_gap = self._score_gap(gap)
         score_density = self._score_density(low_cloud)
@@ -111,73 +170,18 @@ class CloudSeaPlugin:
 
     # ==================== 子维度评分 ====================
 
-    @staticmethod
-    def _rated_score(
-        value: float,
-        thresholds: list[float],
-        scores: list[int | float],
-        *,
-        ascending: bool = False,
-    ) -> int | float:
-        """通用阶梯评分：按阈值列表 + 分值列表返回得分。
-
-        Args:
-            value: 待评分的数值
-            thresholds: 阈值列表（降序排列）
-            scores: 分值列表，长度 = len(thresholds) + 1（最后一个为兜底）
-            ascending: False → value > threshold 命中 (gap/density);
-                       True  → value < threshold 命中 (wind)
-        """
-        for t, s in zip(thresholds, scores):
-            if (not ascending and value > t) or (ascending and value < t):
-                return s
-        return scores[-1]
-
     def _score_gap(self, gap: float) -> int:
         """高差 → gap 维度得分"""
-        return self._rated_score(
-            gap,
-            self._thresholds["gap_meters"],
-            self._thresholds["gap_scores"],
-        )
+        return self._gap_curve(gap)
 
     def _score_density(self, low_cloud_pct: float) -> int:
         """低云密度 → density 维度得分"""
-        return self._rated_score(
-            low_cloud_pct,
-            self._thresholds["density_pct"],
-            self._thresholds["density_scores"],
-        )
+        return self._density_curve(low_cloud_pct)
 
     def _mid_cloud_factor(self, mid_cloud_pct: float) -> float:
         """中云覆盖 → 惩罚系数"""
-        factors = self._thresholds["mid_cloud_factors"]  # [1.0, 0.7, 0.3]
-        thresholds = self._thresholds["mid_cloud_penalty"]  # [30, 60]
-        # factors[0]=≤30%→1.0, factors[1]=>30%→0.7, factors[2]=>60%→0.3
-        if mid_cloud_pct > thresholds[1]:
-            return factors[2]
-        if mid_cloud_pct > thresholds[0]:
-            return factors[1]
-        return factors[0]
+        return self._mid_cloud_curve(mid_cloud_pct)
 
     def _score_wind(self, wind_speed: float) -> int:
         """风速 → wind 维度得分"""
-        return self._rated_score(
-            wind_speed,
-            self._thresholds["wind_speed"],
-            self._thresholds["wind_scores"],
-            ascending=True,
-        )
-
-    # ==================== 安全过滤 ====================
-
-    def _apply_safety_filter(self, weather: pd.DataFrame) -> pd.DataFrame:
-        """剔除不安全时段（降水概率过高或能见度过低）"""
-        precip_threshold = self._safety["precip_threshold"]
-        vis_threshold = self._safety["visibility_threshold"]
-
-        safe_mask = (
-            (weather["precipitation_probability"] <= precip_threshold)
-            & (weather["visibility"] >= vis_threshold)
-        )
-        return weather[safe_mask].reset_index(drop=True)
+        return self._wind_curve(wind_speed)
@@ -9,6 +9,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from gmp.core.models import ScoreResult, score_to_status
+from gmp.scoring.curves import RangeCurve, StepCurve
 from gmp.scoring.models import DataRequirement
 
 if TYPE_CHECKING:
@@ -24,6 +25,24 @@ class FrostPlugin:
             "temperature": 40, "moisture": 30, "wind": 20, "cloud": 10,
         })
         self._thresholds = config.get("thresholds", {})
+        # 温度: 半开区间 lo <= temp < hi；云量: 闭区间，端点相接时配置靠前者优先
+        self._temperature_curve = RangeCurve.from_config(
+            self._thresholds.get("temp_ranges", {})
+        )
+        self._cloud_curve = RangeCurve.from_config(
+            self._thresholds.get("cloud_pct", {}), closed=True
+        )
+        # 能见度/风速: 值 < 阈值命中
+        self._moisture_curve = StepCurve(
+            self._thresholds.get("visibility_km", [5, 10, 20]),
+            self._thresholds.get("visibility_scores", [30, 20, 10, 5]),
+            op="lt",
+        )
+        self._wind_curve = StepCurve(
+            self._thresholds.get("wind_speed", [3, 5, 10]),
+            self._thresholds.get("wind_scores", [20, 15, 10, 0]),
+            op="lt",
+        )
 
     @property
     def event_type(self) -> str:
@@ -53,48 +72,40 @@ class FrostPlugin:
         3. 各维度评分
         4. 返回 ScoreResult
         """
-        weather = context.local_weather.copy()
-
         # ── 安全检查 ──
         safety = self._config.get("safety", {})
         precip_thresh = safety.get("precip_threshold", 30)
-        vis_thresh = safety.get("visibility_threshold", 1)
-
-        # 降水概率筛选
-        if "precipitation_probability" in weather.columns:
-            weather = weather[
-                weather["precipitation_probability"] <= precip_thresh
-            ]
+        # 能见度阈值单位 km, 数据单位 m
+        vis_thresh = safety.get("visibility_threshold", 1) * 1000
 
-        # 能见度筛选 (阈值单位 km, 数据单位 m)
-        if "visibility" in weather.columns:
-            weather = weather[
-                weather["visibility"] >= vis_thresh * 1000
-            ]
-
-        if weather.empty:
+        # 缺少降水概率/能见度列时不做对应筛选
+        features = context.features
+        if features.safe_count(precip_thresh, vis_thresh, missing_ok=True) == 0:
             return None
 
+        def safe_mean(column: str) -> float:
+            return features.safe_mean(column, precip_thresh, vis_thresh, missing_ok=True)
+
         # ── 触发判定 ──
         trigger = self._config.get("trigger", {})
         max_temp = trigger.get("max_temperature", -2.0)
-        avg_temp = weather["temperature_2m"].mean()
+        avg_temp = safe_mean("temperature_2m")
 
         if avg_temp >= max_temp:
             return None
 
         # 湿度触发检查
         min_humidity = trigger.get("min_humidity", 90)
-        if "relative_humidity_2m" in weather.columns:
-            avg_humidity = weather["relative_humidity_2m"].mean()
+        if "relative_humidity_2m" in context.local_weather.columns:
+            avg_humidity = safe_mean("relative_humidity_2m")
             if avg_humidity < min_humidity:
                 return None
 
         # ── 各维度评分 ──
         temp_score = self._score_temperature(avg_temp)
-        moisture_score = self._score_moisture(weather)
-        wind_score = self._score_wind(weather)
-        cloud_score = self._score_cloud(weather)
+        moisture_score = self._score_moisture(safe_mean("visibility") / 1000.0)
+        wind_score = self._score_wind(safe_mean("wind_speed_10m"))
+        cloud_score = self._score_cloud(safe_mean("cloud_cover_low"))
 
         total = temp_score + moisture_score + wind_score + cloud_score
 
@@ -133,42 +144,16 @@ class FrostPlugin:
 
     def _score_temperature(self, temp: float) -> int:
         """温度区间评分 (半开区间: lo <= temp < hi)"""
-        temp_ranges = self._thresholds.get("temp_ranges", {})
-        for _name, cfg in temp_ranges.items():
-            lo, hi = cfg["range"]
-            if lo <= temp < hi:
-                return cfg["score"]
-        return 0
-
-    def _score_moisture(self, weather) -> int:
-        """能见度/湿度评分: 低能见度 = 高湿度 = 利于雾凇"""
-        avg_vis_km = weather["visibility"].mean() / 1000.0
-        breakpoints = self._thresholds.get("visibility_km", [5, 10, 20])
-        scores = self._thresholds.get("visibility_scores", [30, 20, 10, 5])
+        return self._temperature_curve(temp)
 
-        for i, bp in enumerate(breakpoints):
-            if avg_vis_km < bp:
-                return scores[i]
-        return scores[-1]
+    def _score_moisture(self, avg_vis_km: float) -> int:
+        """能见度/湿度评分: 低能见度 = 高湿度 = 利于雾凇"""
+        return self._moisture_curve(avg_vis_km)
 
-    def _score_wind(self, weather) -> int:
+    def _score_wind(self, avg_wind: float) -> int:
         """风速评分: 低风速利于雾凇"""
-        avg_wind = weather["wind_speed_10m"].mean()
-        breakpoints = self._thresholds.get("wind_speed", [3, 5, 10])
-        scores = self._thresholds.get("wind_scores", [20, 15, 10, 0])
-
-        for i, bp in enumerate(breakpoints):
-            if avg_wind < bp:
-                return scores[i]
-        return scores[-1]
+        return self._wind_curve(avg_wind)
 
-    def _score_cloud(self, weather) -> int:
+    def _score_cloud(self, avg_cloud: float) -> int:
         """云量评分"""
-        avg_cloud = weather["cloud_cover_low"].mean()
-        cloud_pct = self._thresholds.get("cloud_pct", {})
-
-        for _name, cfg in cloud_pct.items():
-            lo, hi = cfg["range"]
-            if lo <= avg_cloud <= hi:
-                return cfg["score"]
-        return 0
+        return self._cloud_curve(avg_cloud)
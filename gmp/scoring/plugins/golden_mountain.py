@@ -11,6 +11,7 @@ from typing import TYPE_CHECKING
 
 from gmp.core.models import ScoreResult, Target, score_to_status
 from gmp.data.geo_utils import GeoUtils
+from gmp.scoring.curves import StepCurve
 from gmp.scoring.models import DataRequirement
 
 if TYPE_CHECKING:
@@ -32,6 +33,16 @@ class GoldenMountainPlugin:
         self._thresholds = config["thresholds"]
         self._trigger = config["trigger"]
         self._veto_threshold = config["veto_threshold"]
+        # 阶梯规则: 值 <= 第 i 个阈值 → scores[i]，超过所有阈值 → scores[-1]
+        self._light_path_curve = StepCurve(
+            self._thresholds["light_path_cloud"], self._thresholds["light_path_scores"]
+        )
+        self._target_curve = StepCurve(
+            self._thresholds["target_cloud"], self._thresholds["target_scores"]
+        )
+        self._local_curve = StepCurve(
+            self._thresholds["local_cloud"], self._thresholds["local_scores"]
+        )
 
     @property
     def event_type(self) -> str:
@@ -47,6 +58,9 @@ class GoldenMountainPlugin:
             needs_l2_target=True,
             needs_l2_light_path=True,
             needs_astro=True,
+            # 与 _calc_target_cloud / _calc_light_path_cloud 读取的列保持一致
+            target_columns=["cloud_cover_high", "cloud_cover_medium"],
+            light_path_columns=["cloud_cover_low", "cloud_cover_medium"],
         )
 
     def dimensions(self) -> list[str]:
@@ -69,7 +83,7 @@ class GoldenMountainPlugin:
             return None
 
         # 2. 触发判定: 总云量检查
-        avg_cloud = context.local_weather["cloud_cover_total"].mean()
+        avg_cloud = context.features.mean("cloud_cover_total")
         max_cloud = self._trigger["max_cloud_cover"]
         if avg_cloud >= max_cloud:
             return None
@@ -218,35 +232,15 @@ class GoldenMountainPlugin:
 
     def _score_light_path(self, cloud_pct: float) -> int:
         """光路云量 → 阶梯评分"""
-        thresholds = self._thresholds["light_path_cloud"]
-        scores = self._thresholds["light_path_scores"]
-        return self._stepped_score(cloud_pct, thresholds, scores)
+        return self._light_path_curve(cloud_pct)
 
     def _score_target(self, cloud_pct: float) -> int:
         """目标可见性 → 阶梯评分"""
-        thresholds = self._thresholds["target_cloud"]
-        scores = self._thresholds["target_scores"]
-        return self._stepped_score(cloud_pct, thresholds, scores)
+        return self._target_curve(cloud_pct)
 
     def _score_local(self, cloud_pct: float) -> int:
         """本地通透 → 阶梯评分"""
-        thresholds = self._thresholds["local_cloud"]
-        scores = self._thresholds["local_scores"]
-        return self._stepped_score(cloud_pct, thresholds, scores)
-
-    @staticmethod
-    def _stepped_score(value: float, thresholds: list[float], scores: list[int]) -> int:
-        """通用阶梯评分
-
-        阶梯规则: 值 <= 第一个阈值 → scores[0],
-        值 <= 第二个阈值 → scores[1], ..., 超过所有阈值 → scores[-1]。
-
-        thresholds 和 scores 均来自配置文件，scores 比 thresholds 多一个元素（兜底值）。
-        """
-        for t, s in zip(thresholds, scores):
-            if value <= t:
-                return s
-        return scores[-1]
+        return self._local_curve(cloud_pct)
 
     # ==================== 调试方法 ====================
 
@@ -282,7 +276,7 @@ class GoldenMountainPlugin:
         })
 
         # 2. 云量触发判定
-        avg_cloud = float(context.local_weather["cloud_cover_total"].mean())
+        avg_cloud = float(context.features.mean("cloud_cover_total"))
         max_cloud = self._trigger["max_cloud_cover"]
         passed = avg_cloud < max_cloud
         debug["steps"].append({
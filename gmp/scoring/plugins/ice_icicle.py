@@ -9,6 +9,7 @@ IceIciclePlugin 是 L1 Plugin，使用 DataContext.local_weather（含过去24h
 from __future__ import annotations
 
 from gmp.core.models import ScoreResult, score_to_status
+from gmp.scoring.curves import StepCurve
 from gmp.scoring.models import DataContext, DataRequirement
 
 
@@ -17,6 +18,23 @@ class IceIciclePlugin:
 
     def __init__(self, config: dict) -> None:
         self._config = config
+        water_input = config["thresholds"]["water_input"]
+        self._water_curve = StepCurve(
+            [t["water"] for t in water_input],
+            [t["score"] for t in water_input] + [0],
+            op="ge",
+        )
+        # age/temp: 值 <= 阈值命中，超出全部阈值取最后一档
+        age = config["deductions"]["age"]
+        self._age_curve = StepCurve(
+            [e["hours"] for e in age],
+            [e["deduction"] for e in age] + [age[-1]["deduction"]],
+        )
+        temp = config["deductions"]["temp"]
+        self._temp_curve = StepCurve(
+            [e["temp"] for e in temp],
+            [e["deduction"] for e in temp] + [temp[-1]["deduction"]],
+        )
 
     @property
     def event_type(self) -> str:
@@ -42,17 +60,14 @@ class IceIciclePlugin:
         4. 各维度评分 + 扣分
         5. 返回 ScoreResult
         """
-        df = context.local_weather.copy()
+        df = context.local_weather
 
         # ── 安全检查 ──
         safety = self._config.get("safety", {})
         precip_thresh = safety.get("precip_threshold", 50)
         vis_thresh = safety.get("visibility_threshold", 1000)
 
-        safe_mask = (df["precipitation_probability"] <= precip_thresh) & (
-            df["visibility"] >= vis_thresh
-        )
-        df_safe = df[safe_mask]
+        df_safe = context.features.safe_frame(precip_thresh, vis_thresh)
         if df_safe.empty:
             return None
 
@@ -183,12 +198,7 @@ class IceIciclePlugin:
 
     def _score_water_input(self, metrics: dict) -> int:
         """水源输入量得分"""
-        thresholds = self._config["thresholds"]["water_input"]
-        water_24h = metrics["effective_water_input_24h_mm"]
-        for t in thresholds:
-            if water_24h >= t["water"]:
-                return t["score"]
-        return 0
+        return self._water_curve(metrics["effective_water_input_24h_mm"])
 
     def _score_freeze_strength(self, metrics: dict, temp_now: float) -> int:
         """冻结强度得分"""
@@ -224,16 +234,8 @@ class IceIciclePlugin:
 
     def _deduction_age(self, hours_since: float) -> int:
         """距水源输入停止扣分"""
-        age_entries = self._config["deductions"]["age"]
-        for entry in age_entries:
-            if hours_since <= entry["hours"]:
-                return entry["deduction"]
-        return age_entries[-1]["deduction"]
+        return self._age_curve(hours_since)
 
     def _deduction_temp(self, max_temp: float) -> int:
         """升温融化扣分"""
-        temp_entries = self._config["deductions"]["temp"]
-        for entry in temp_entries:
-            if max_temp <= entry["temp"]:
-                return entry["deduction"]
-        return temp_entries[-1]["deduction"]
+        return self._temp_curve(max_temp)
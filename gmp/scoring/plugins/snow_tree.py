@@ -9,6 +9,7 @@
 from __future__ import annotations
 
 from gmp.core.models import ScoreResult, score_to_status
+from gmp.scoring.curves import StepCurve
 from gmp.scoring.models import DataContext, DataRequirement
 
 
@@ -17,6 +18,49 @@ class SnowTreePlugin:
 
     def __init__(self, config: dict) -> None:
         self._config = config
+        thresholds = config["thresholds"]
+        deductions = config["deductions"]
+
+        snow_signal = thresholds["snow_signal"]
+        self._snow_signal_curve = StepCurve(
+            [t.get("snowfall", 0) for t in snow_signal],
+            [t["score"] for t in snow_signal] + [0],
+            op="ge",
+        )
+        self._stability_curve = StepCurve(
+            thresholds["stability_wind"], thresholds["stability_scores"], op="lt"
+        )
+        # 逐小时日照权重: 云量 < thresholds[0] → weights[0], < thresholds[1] → weights[1]
+        sunshine_cfg = config.get("sunshine", {})
+        self._sunshine_curve = StepCurve(
+            sunshine_cfg.get("cloud_thresholds", [10, 30]),
+            list(sunshine_cfg.get("weights", [2.0, 1.0])) + [0.0],
+            op="lt",
+        )
+
+        # age/temp: 值 <= 阈值命中，超出全部阈值取最后一档
+        age = deductions["age"]
+        self._age_curve = StepCurve(
+            [e["hours"] for e in age],
+            [e["deduction"] for e in age] + [age[-1]["deduction"]],
+        )
+        temp = deductions["temp"]
+        self._temp_curve = StepCurve(
+            [e["temp"] for e in temp],
+            [e["deduction"] for e in temp] + [temp[-1]["deduction"]],
+        )
+        # sun / wind: 超过阈值才扣分，缺失 (NaN) 不扣分
+        sun = deductions["sun"]
+        self._sun_curve = StepCurve(
+            [e["sun_score"] for e in sun],
+            [0] + [e["deduction"] for e in sun],
+            nan=0,
+        )
+        self._wind_curve = StepCurve(
+            [deductions["wind_moderate_threshold"], deductions["wind_severe_threshold"]],
+            [0, deductions["wind_moderate_deduction"], deductions["wind_severe_deduction"]],
+            nan=0,
+        )
 
     @property
     def event_type(self) -> str:
@@ -34,17 +78,14 @@ class SnowTreePlugin:
         return ["snow_signal", "clear_weather", "stability"]
 
     def score(self, context: DataContext) -> ScoreResult | None:
-        df = context.local_weather.copy()
+        df = context.local_weather
 
         # ---- 安全检查：剔除不安全时段 ----
         safety = self._config.get("safety", {})
         precip_thresh = safety.get("precip_threshold", 50)
         vis_thresh = safety.get("visibility_threshold", 1000)
 
-        safe_mask = (df["precipitation_probability"] <= precip_thresh) & (
-            df["visibility"] >= vis_thresh
-        )
-        df_safe = df[safe_mask]
+        df_safe = context.features.safe_frame(precip_thresh, vis_thresh)
         if df_safe.empty:
             return None
 
@@ -194,15 +235,7 @@ class SnowTreePlugin:
         max_wind_since = float(post_wind.max()) if len(post_wind) > 0 else 0.0
 
         # 日照积分：按云量阈值加权
-        sunshine_cfg = self._config.get("sunshine", {})
-        sun_cloud_thresholds = sunshine_cfg.get("cloud_thresholds", [10, 30])
-        sun_weights = sunshine_cfg.get("weights", [2.0, 1.0])
-        sunshine_score = 0.0
-        for c in post_cloud:
-            if c < sun_cloud_thresholds[0]:
-                sunshine_score += sun_weights[0]
-            elif c < sun_cloud_thresholds[1]:
-                sunshine_score += sun_weights[1]
+        sunshine_score = float(self._sunshine_curve(post_cloud).sum())
 
         return {
             "recent_snowfall_12h_cm": recent_snowfall_12h,
@@ -219,13 +252,7 @@ class SnowTreePlugin:
 
     def _score_snow_signal(self, metrics: dict) -> int:
         """积雪信号得分"""
-        thresholds = self._config["thresholds"]["snow_signal"]
-        snowfall = metrics["recent_snowfall_24h_cm"]
-        for t in thresholds:
-            sf = t.get("snowfall", 0)
-            if snowfall >= sf:
-                return t["score"]
-        return 0
+        return self._snow_signal_curve(metrics["recent_snowfall_24h_cm"])
 
     def _score_clear_weather(self, current_row) -> int:
         """晴朗程度得分"""
@@ -244,53 +271,22 @@ class SnowTreePlugin:
 
     def _score_stability(self, current_row) -> int:
         """稳定保持得分 (当前风速)"""
-        wind_thresholds = self._config["thresholds"]["stability_wind"]
-        stability_scores = self._config["thresholds"]["stability_scores"]
-        wind = float(current_row["wind_speed_10m"])
-        # stability_wind: [12, 20], stability_scores: [20, 14, 8]
-        if wind < wind_thresholds[0]:
-            return stability_scores[0]
-        elif wind < wind_thresholds[1]:
-            return stability_scores[1]
-        else:
-            return stability_scores[2]
+        return self._stability_curve(float(current_row["wind_speed_10m"]))
 
     # ---- 扣分项 ----
 
     def _deduction_age(self, hours_since: float) -> int:
         """降雪距今扣分"""
-        age_entries = self._config["deductions"]["age"]
-        for entry in age_entries:
-            if hours_since <= entry["hours"]:
-                return entry["deduction"]
-        return age_entries[-1]["deduction"]
+        return self._age_curve(hours_since)
 
     def _deduction_temp(self, max_temp: float) -> int:
         """升温融化扣分"""
-        temp_entries = self._config["deductions"]["temp"]
-        for entry in temp_entries:
-            if max_temp <= entry["temp"]:
-                return entry["deduction"]
-        return temp_entries[-1]["deduction"]
+        return self._temp_curve(max_temp)
 
     def _deduction_sun(self, sunshine_score: float) -> int:
         """累积日照扣分"""
-        sun_entries = self._config["deductions"]["sun"]
-        result = 0
-        for entry in sun_entries:
-            if sunshine_score > entry["sun_score"]:
-                result = entry["deduction"]
-        return result
+        return self._sun_curve(sunshine_score)
 
     def _deduction_wind(self, max_wind: float) -> int:
         """历史大风扣分"""
-        wind_cfg = self._config["deductions"]
-        severe = wind_cfg["wind_severe_threshold"]
-        moderate = wind_cfg["wind_moderate_threshold"]
-        severe_ded = wind_cfg["wind_severe_deduction"]
-        moderate_ded = wind_cfg["wind_moderate_deduction"]
-        if max_wind > severe:
-            return severe_ded
-        elif max_wind > moderate:
-            return moderate_ded
-        return 0
+        return self._wind_curve(max_wind)
@@ -9,6 +9,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from gmp.core.models import ScoreResult, score_to_status
+from gmp.scoring.curves import StepCurve
 from gmp.scoring.models import DataRequirement
 
 if TYPE_CHECKING:
@@ -20,6 +21,16 @@ class StargazingPlugin:
 
     def __init__(self, config: dict) -> None:
         self._config = config
+        # 风速 <= moderate → 0, <= severe → moderate 扣分, 否则 severe 扣分；
+        # 缺失 (NaN) 不扣分
+        thresholds = config.get("wind_thresholds", {})
+        severe = thresholds.get("severe", {})
+        moderate = thresholds.get("moderate", {})
+        self._wind_curve = StepCurve(
+            [moderate.get("speed", 20), severe.get("speed", 40)],
+            [0, moderate.get("penalty", 10), severe.get("penalty", 30)],
+            nan=0,
+        )
 
     @property
     def event_type(self) -> str:
@@ -51,12 +62,12 @@ class StargazingPlugin:
         if window is None:
             return None
 
-        weather = context.local_weather
+        features = context.features
 
         # ── 夜间平均云量触发判定 ──
         trigger = self._config.get("trigger", {})
         max_cloud = trigger.get("max_night_cloud_cover", 70)
-        avg_cloud = weather["cloud_cover_total"].mean()
+        avg_cloud = features.mean("cloud_cover_total")
 
         if avg_cloud >= max_cloud:
             return None
@@ -69,7 +80,7 @@ class StargazingPlugin:
         cloud_deduction = avg_cloud * cloud_factor
 
         # ── 风速扣分 ──
-        wind_deduction = self._get_wind_deduction(weather)
+        wind_deduction = self._get_wind_deduction(features.mean("wind_speed_10m"))
 
         # ── 最终分数 ──
         raw_score = base - cloud_deduction - wind_deduction
@@ -120,19 +131,9 @@ class StargazingPlugin:
             factor = self._config.get("cloud_penalty_factor", 0.8)
             return base_poor - phase * factor
 
-    def _get_wind_deduction(self, weather) -> float:
+    def _get_wind_deduction(self, avg_wind: float) -> float:
         """风速阶梯扣分"""
-        avg_wind = weather["wind_speed_10m"].mean()
-        thresholds = self._config.get("wind_thresholds", {})
-
-        severe = thresholds.get("severe", {})
-        moderate = thresholds.get("moderate", {})
-
-        if avg_wind > severe.get("speed", 40):
-            return severe.get("penalty", 30)
-        elif avg_wind > moderate.get("speed", 20):
-            return moderate.get("penalty", 10)
-        return 0
+        return self._wind_curve(avg_wind)
 
     def _format_time_window(self, window) -> str:
         """格式化时间窗口"""
@@ -0,0 +1,73 @@
+"""tests/bench/test_stages.py — 分阶段 pytest-benchmark 套件
+
+需安装 pytest-benchmark，未安装时整个模块跳过:
+
+    pytest tests/bench --benchmark-only --benchmark-autosave
+    pytest tests/bench --benchmark-compare          # 与上次保存结果对比
+
+规模由环境变量 GMP_BENCH_VIEWPOINTS (默认 50) / GMP_BENCH_DAYS (默认 7) 控制。
+数据全部来自 gmp.bench 的合成观景台与 Open-Meteo 替身，不访问网络。
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from gmp.bench.runner import BenchEnvironment  # noqa: E402
+
+pytestmark = pytest.mark.bench
+
+_VIEWPOINTS = int(os.environ.get("GMP_BENCH_VIEWPOINTS", "50"))
+_DAYS = int(os.environ.get("GMP_BENCH_DAYS", "7"))
+
+
+def _new_env(tmp_path_factory) -> BenchEnvironment:
+    return BenchEnvironment(
+        _VIEWPOINTS, tmp_path_factory.mktemp("bench"), days=_DAYS
+    )
+
+
+@pytest.fixture(scope="module")
+def warm_env(tmp_path_factory):
+    """已完成 fetch + 首轮评分的环境 (缓存全部就绪)"""
+    env = _new_env(tmp_path_factory)
+    env.fetch()
+    env.score()
+    yield env
+    env.close()
+
+
+def test_fetch_cold(benchmark, tmp_path_factory):
+    """冷缓存批量获取本地 + 目标坐标"""
+    envs: list[BenchEnvironment] = []
+
+    def _setup():
+        envs.append(_new_env(tmp_path_factory))
+        return (envs[-1],), {}
+
+    benchmark.pedantic(lambda env: env.fetch(), setup=_setup, rounds=3)
+    for env in envs:
+        env.close()
+
+
+def test_cache_read(benchmark, warm_env):
+    """全部命中缓存的批量读取"""
+    benchmark(warm_env.cache_read)
+
+
+def test_scoring(benchmark, warm_env):
+    """所有观景台评分 (数据均已缓存)"""
+    benchmark.pedantic(warm_env.score, rounds=3)
+
+
+def test_routes(benchmark, warm_env):
+    """线路聚合 (站点结果复用备忘录)"""
+    benchmark(warm_env.run_routes)
+
+
+def test_output(benchmark, warm_env):
+    """forecast/timeline 生成与 JSON 写入"""
+    warm_env.run_routes()
+    benchmark.pedantic(warm_env.write_output, rounds=3)
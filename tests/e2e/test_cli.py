@@ -354,6 +354,93 @@ class TestGenerateAllCommand:
         assert "观景台: 2 成功" in result.output
         assert "线路: 1 成功" in result.output
 
+    @pytest.mark.parametrize("fails", [False, True])
+    @patch("gmp.main.create_batch_generator")
+    @patch("gmp.main._create_core_components")
+    def test_generate_all_closes_components(
+        self, mock_components, mock_create_bg, fails, runner
+    ):
+        """成功或出错退出时都关闭 fetcher、缓存刷新线程与缓存数据库"""
+        from gmp.core.exceptions import GMPError
+
+        repo = MagicMock()
+        fetcher = MagicMock()
+        mock_engine = MagicMock()
+        mock_engine.display_names = {}
+        mock_components.return_value = (
+            _mock_scheduler(),
+            _mock_viewpoint_config(),
+            _mock_route_config(),
+            MagicMock(),
+            repo,
+            fetcher,
+            mock_engine,
+        )
+        batch_gen = MagicMock()
+        if fails:
+            batch_gen.generate_all.side_effect = GMPError("写入失败")
+        else:
+            batch_gen.generate_all.return_value = {
+                "viewpoints_processed": 1,
+                "routes_processed": 0,
+                "failed_viewpoints": [],
+                "failed_routes": [],
+                "output_dir": "public/data",
+                "archive_dir": None,
+            }
+        mock_create_bg.return_value = batch_gen
+        from gmp.main import cli
+
+        result = runner.invoke(cli, ["generate-all", "--days", "1"])
+
+        assert result.exit_code == (3 if fails else 0)
+        fetcher.close.assert_called_once()
+        fetcher.cache.close.assert_called_once()
+        repo.close.assert_called_once()
+
+    @patch("gmp.main.create_batch_generator")
+    @patch("gmp.main._create_core_components")
+    def test_generate_all_profile_report(self, mock_components, mock_create_bg, runner):
+        """gmp generate-all --profile-report → 输出阶段耗时表"""
+        mock_engine = MagicMock()
+        mock_engine.display_names = {}
+        mock_components.return_value = (
+            _mock_scheduler(),
+            _mock_viewpoint_config(),
+            _mock_route_config(),
+            MagicMock(),
+            MagicMock(),
+            MagicMock(),
+            mock_engine,
+        )
+        batch_gen = MagicMock()
+        batch_gen.generate_all.return_value = {
+            "viewpoints_processed": 1,
+            "routes_processed": 0,
+            "failed_viewpoints": [],
+            "failed_routes": [],
+            "output_dir": "public/data",
+            "archive_dir": None,
+            "profile": {
+                "timers": {
+                    "fetcher.request": {
+                        "count": 3, "total_s": 0.9, "avg_ms": 300.0, "max_ms": 400.0,
+                    },
+                },
+                "counters": {"fetcher.requests": 3},
+                "wall_seconds": 1.8,
+            },
+        }
+        mock_create_bg.return_value = batch_gen
+        from gmp.main import cli
+
+        result = runner.invoke(cli, ["generate-all", "--profile-report"])
+
+        assert result.exit_code == 0
+        assert "阶段耗时" in result.output
+        assert "fetcher.request" in result.output
+        assert "50.0%" in result.output
+
     @patch("gmp.main.create_batch_generator")
     @patch("gmp.main._create_core_components")
     def test_generate_all_no_archive(self, mock_components, mock_create_bg, runner):
@@ -388,6 +475,38 @@ class TestGenerateAllCommand:
         call_kwargs = batch_gen.generate_all.call_args.kwargs
         assert call_kwargs["no_archive"] is True
 
+    @patch("gmp.main.create_batch_generator")
+    @patch("gmp.main._create_core_components")
+    def test_generate_all_no_prefetch(self, mock_components, mock_create_bg, runner):
+        """gmp generate-all --no-prefetch → prefetch=False 传递到 batch_gen"""
+        mock_engine = MagicMock()
+        mock_engine.display_names = {}
+        mock_components.return_value = (
+            _mock_scheduler(),
+            _mock_viewpoint_config(),
+            _mock_route_config(),
+            MagicMock(),
+            MagicMock(),
+            MagicMock(),
+            mock_engine,
+        )
+        batch_gen = MagicMock()
+        batch_gen.generate_all.return_value = {
+            "viewpoints_processed": 0,
+            "routes_processed": 0,
+            "failed_viewpoints": [],
+            "failed_routes": [],
+            "output_dir": "public/data",
+            "archive_dir": None,
+        }
+        mock_create_bg.return_value = batch_gen
+        from gmp.main import cli
+
+        result = runner.invoke(cli, ["generate-all", "--no-prefetch"])
+        assert result.exit_code == 0
+        assert batch_gen.generate_all.call_args.kwargs["prefetch"] is False
+        assert "fetcher" in mock_create_bg.call_args.kwargs
+
     @patch("gmp.main.create_batch_generator")
     @patch("gmp.main._create_core_components")
     def test_generate_all_custom_paths(self, mock_components, mock_create_bg, runner):
@@ -451,6 +570,79 @@ class TestBacktestCommand:
 
         result = runner.invoke(cli, ["backtest", "niubei", "--date", "2025-12-01"])
         assert result.exit_code == 0
+        backtester.close.assert_called_once()
+
+
+class TestBenchCommand:
+    """测试 bench 命令"""
+
+    def test_bench_writes_results(self, runner, tmp_path):
+        """gmp bench --scale 2 --days 1 → 输出阶段表并写入结果 JSON"""
+        from gmp.main import cli
+
+        output = tmp_path / "bench.json"
+        result = runner.invoke(
+            cli, ["bench", "--scale", "2", "--days", "1", "--output", str(output)]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "scoring" in result.output
+        data = json.loads(output.read_text(encoding="utf-8"))
+        assert [run["scale"]["viewpoints"] for run in data["runs"]] == [2]
+
+    def test_bench_over_http(self, runner, tmp_path):
+        """--http → 经本地替身 HTTP 服务获取"""
+        from gmp.main import cli
+
+        output = tmp_path / "bench.json"
+        result = runner.invoke(cli, [
+            "bench", "--scale", "1", "--days", "1", "--http", "--output", str(output),
+        ])
+
+        assert result.exit_code == 0, result.output
+        scale = json.loads(output.read_text(encoding="utf-8"))["runs"][0]["scale"]
+        assert scale["transport"] == "http"
+        assert scale["api_requests"] >= 1
+
+    def test_bench_server_help(self, runner):
+        """cli group 应包含 bench-server 命令"""
+        from gmp.main import cli
+
+        result = runner.invoke(cli, ["bench-server", "--help"])
+        assert result.exit_code == 0
+        assert "--quota" in result.output
+
+    @patch("gmp.bench.runner.run_suite")
+    def test_bench_compare(self, mock_run_suite, runner, tmp_path):
+        """--compare 基线文件 → 输出各阶段耗时比值"""
+        from gmp.bench.runner import BENCH_VERSION
+        from gmp.main import cli
+
+        def _doc(seconds):
+            stage = {"seconds": seconds, "items": 1, "per_item_ms": seconds * 1000}
+            return {
+                "version": BENCH_VERSION,
+                "runs": [{
+                    "scale": {
+                        "viewpoints": 50, "routes": 5, "days": 7,
+                        "unique_points": 60, "api_requests": 10,
+                    },
+                    "stages": {"scoring": stage},
+                    "wall_seconds": seconds,
+                }],
+            }
+
+        baseline = tmp_path / "base.json"
+        baseline.write_text(json.dumps(_doc(2.0)), encoding="utf-8")
+        mock_run_suite.return_value = _doc(1.0)
+
+        result = runner.invoke(cli, [
+            "bench", "--output", str(tmp_path / "cur.json"),
+            "--compare", str(baseline),
+        ])
+
+        assert result.exit_code == 0, result.output
+        assert "0.50x" in result.output
 
 
 # ==================== Task 6: list 命令 ====================
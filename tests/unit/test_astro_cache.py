@@ -0,0 +1,205 @@
+"""tests/unit/test_astro_cache.py — CachedAstro 天文缓存层 单元测试"""
+
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from gmp.core.models import MoonStatus, SunEvents
+from gmp.data.astro_cache import CachedAstro
+from gmp.data.astro_utils import AstroUtils
+
+_CST = timezone(timedelta(hours=8))
+
+NIUBEI_LAT = 29.6014
+NIUBEI_LON = 102.3689
+
+
+def _sun_events(target_date: date) -> SunEvents:
+    base = datetime(target_date.year, target_date.month, target_date.day, tzinfo=_CST)
+    return SunEvents(
+        sunrise=base + timedelta(hours=7, minutes=50),
+        sunset=base + timedelta(hours=19),
+        sunrise_azimuth=108.5,
+        sunset_azimuth=251.5,
+        astronomical_dawn=base + timedelta(hours=6, minutes=20),
+        astronomical_dusk=base + timedelta(hours=20, minutes=30),
+    )
+
+
+def _mock_astro() -> MagicMock:
+    astro = MagicMock()
+    astro.get_sun_events.side_effect = lambda lat, lon, d: _sun_events(d)
+    return astro
+
+
+class TestSunEventsCache:
+    """get_sun_events 按 (取整坐标, 日期) 缓存"""
+
+    def test_repeat_call_computes_once(self):
+        """同一坐标日期重复调用 → 只计算一次"""
+        astro = _mock_astro()
+        cached = CachedAstro(astro)
+
+        first = cached.get_sun_events(NIUBEI_LAT, NIUBEI_LON, date(2026, 2, 11))
+        second = cached.get_sun_events(NIUBEI_LAT, NIUBEI_LON, date(2026, 2, 11))
+
+        assert first is second
+        assert astro.get_sun_events.call_count == 1
+        assert cached.stats()["hits"] == 1
+
+    def test_nearby_viewpoints_share_entry(self):
+        """ROUND(2) 后相同的邻近坐标 → 共用条目，以取整坐标计算"""
+        astro = _mock_astro()
+        cached = CachedAstro(astro)
+
+        cached.get_sun_events(29.601, 102.368, date(2026, 2, 11))
+        cached.get_sun_events(29.599, 102.371, date(2026, 2, 11))
+
+        astro.get_sun_events.assert_called_once_with(29.6, 102.37, date(2026, 2, 11))
+
+    def test_matches_uncached_within_seconds(self):
+        """真实 ephem: 取整坐标结果与原坐标差异 < 30 秒"""
+        cached = CachedAstro()
+        d = date(2026, 2, 11)
+
+        exact = AstroUtils.get_sun_events(NIUBEI_LAT, NIUBEI_LON, d)
+        rounded = cached.get_sun_events(NIUBEI_LAT, NIUBEI_LON, d)
+
+        assert abs((exact.sunrise - rounded.sunrise).total_seconds()) < 30
+        assert abs((exact.sunset - rounded.sunset).total_seconds()) < 30
+
+
+class TestBulk:
+    """get_sun_events_bulk 坐标 × 日期矩阵"""
+
+    def test_bulk_returns_full_matrix(self):
+        """2 坐标 × 3 日期 → 6 个条目"""
+        astro = _mock_astro()
+        cached = CachedAstro(astro)
+        dates = [date(2026, 2, 11) + timedelta(days=i) for i in range(3)]
+
+        result = cached.get_sun_events_bulk([(29.6, 102.37), (30.1, 101.5)], dates)
+
+        assert len(result) == 6
+        assert (30.1, 101.5, dates[2]) in result
+
+    def test_bulk_only_computes_missing(self):
+        """已缓存的条目不再计算"""
+        astro = _mock_astro()
+        cached = CachedAstro(astro)
+        d0, d1 = date(2026, 2, 11), date(2026, 2, 12)
+        cached.get_sun_events(29.6, 102.37, d0)
+
+        cached.get_sun_events_bulk([(29.6, 102.37)], [d0, d1])
+
+        assert astro.get_sun_events.call_count == 2
+
+
+class TestDiskPersistence:
+    """可选 SQLite 持久化"""
+
+    def test_reload_from_disk(self, tmp_path):
+        """新实例从磁盘表读取，不重新计算"""
+        db_path = str(tmp_path / "astro.db")
+        d = date(2026, 2, 11)
+        writer = CachedAstro(_mock_astro(), db_path=db_path)
+        expected = writer.get_sun_events(29.6, 102.37, d)
+        writer.close()
+
+        astro = _mock_astro()
+        reader = CachedAstro(astro, db_path=db_path)
+        loaded = reader.get_sun_events(29.6, 102.37, d)
+
+        assert loaded == expected
+        astro.get_sun_events.assert_not_called()
+        assert reader.stats()["disk_hits"] == 1
+        reader.close()
+
+
+    def test_backends_do_not_share_disk_entries(self, tmp_path):
+        """ephem 写入的条目不会被 noaa 后端读取 (反之亦然)"""
+        db_path = str(tmp_path / "astro.db")
+        d = date(2026, 2, 11)
+        writer = CachedAstro(_mock_astro(), db_path=db_path, backend="ephem")
+        writer.get_sun_events(NIUBEI_LAT, NIUBEI_LON, d)
+        writer.close()
+
+        reader = CachedAstro(_mock_astro(), db_path=db_path, backend="noaa")
+        reader.get_sun_events(NIUBEI_LAT, NIUBEI_LON, d)
+
+        assert reader.stats()["disk_hits"] == 0
+        assert reader.stats()["misses"] == 1
+        reader.close()
+
+    def test_legacy_table_without_backend_is_rebuilt(self, tmp_path):
+        """旧版表 (主键不含 backend) 被丢弃重建，不返回来源不明的结果"""
+        import sqlite3
+
+        db_path = str(tmp_path / "astro.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE sun_events (lat REAL, lon REAL, date TEXT, sunrise TEXT, "
+            "sunset TEXT, sunrise_azimuth REAL, sunset_azimuth REAL, "
+            "astronomical_dawn TEXT, astronomical_dusk TEXT, "
+            "PRIMARY KEY (lat, lon, date))"
+        )
+        conn.commit()
+        conn.close()
+
+        astro = _mock_astro()
+        cached = CachedAstro(astro, db_path=db_path)
+        cached.get_sun_events(29.6, 102.37, date(2026, 2, 11))
+        cached.close()
+
+        reader = CachedAstro(_mock_astro(), db_path=db_path)
+        reader.get_sun_events(29.6, 102.37, date(2026, 2, 11))
+        assert reader.stats()["disk_hits"] == 1
+        reader.close()
+
+
+class TestMoonStatusCache:
+    """get_moon_status 进程内缓存"""
+
+    def test_same_instant_cached(self):
+        """同一坐标同一时刻 → 只计算一次"""
+        astro = MagicMock()
+        astro.get_moon_status.return_value = MoonStatus(
+            phase=35, elevation=-22.5, moonrise=None, moonset=None
+        )
+        cached = CachedAstro(astro)
+        dt = datetime(2026, 2, 11, 19, 0, tzinfo=_CST)
+
+        cached.get_moon_status(29.6, 102.37, dt)
+        cached.get_moon_status(29.6, 102.37, dt)
+
+        assert astro.get_moon_status.call_count == 1
+
+
+class TestNoaaBackend:
+    """backend="noaa" 向量化计算"""
+
+    def test_noaa_backend_skips_ephem(self):
+        """可达条目由 NOAA 算法批量计算，不调用 ephem"""
+        astro = _mock_astro()
+        cached = CachedAstro(astro, backend="noaa")
+        dates = [date(2026, 2, 11) + timedelta(days=i) for i in range(7)]
+
+        result = cached.get_sun_events_bulk([(NIUBEI_LAT, NIUBEI_LON)], dates)
+
+        assert len(result) == 7
+        astro.get_sun_events.assert_not_called()
+
+    def test_unreachable_falls_back_to_ephem(self):
+        """NOAA 不可达 (高纬无天文黑夜) → 回退到 ephem 实现"""
+        astro = _mock_astro()
+        cached = CachedAstro(astro, backend="noaa")
+
+        cached.get_sun_events(60.0, 120.0, date(2026, 6, 21))
+
+        astro.get_sun_events.assert_called_once_with(60.0, 120.0, date(2026, 6, 21))
+
+    def test_unknown_backend_raises(self):
+        """未知后端 → ValueError"""
+        with pytest.raises(ValueError):
+            CachedAstro(backend="skyfield")
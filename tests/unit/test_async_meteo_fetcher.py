@@ -0,0 +1,177 @@
+"""tests/unit/test_async_meteo_fetcher.py — AsyncMeteoFetcher 单元测试
+
+覆盖：并发上限、令牌桶限流、429 重试、与 MeteoFetcher 一致的同步接口。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from gmp.core.exceptions import APITimeoutError
+from gmp.data.async_meteo_fetcher import AsyncMeteoFetcher
+from tests.unit.test_meteo_fetcher import SAMPLE_API_RESPONSE
+
+
+def _make_fetcher(handler, config: dict | None = None) -> AsyncMeteoFetcher:
+    """创建使用 MockTransport 的 AsyncMeteoFetcher，缓存默认未命中"""
+    cache = MagicMock()
+    cache.get_range.return_value = None
+    cache.get_bulk.return_value = {}
+    cfg = {"min_request_interval": 0, "retry_delay": 0, **(config or {})}
+    return AsyncMeteoFetcher(
+        cache=cache, config=cfg, transport=httpx.MockTransport(handler)
+    )
+
+
+def _location_payload(request: httpx.Request) -> dict | list:
+    """按请求坐标数量返回单对象或数组"""
+    n = len(request.url.params["latitude"].split(","))
+    return SAMPLE_API_RESPONSE if n == 1 else [SAMPLE_API_RESPONSE] * n
+
+
+@pytest.fixture
+def fetchers():
+    created: list[AsyncMeteoFetcher] = []
+    yield created
+    for f in created:
+        f.close()
+
+
+class TestConcurrency:
+    """并发执行与并发上限"""
+
+    def test_in_flight_requests_bounded_by_max_concurrency(self, fetchers) -> None:
+        """6 组请求, max_concurrency=2 → 同时在途请求数不超过 2"""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return httpx.Response(200, json=_location_payload(request))
+
+        fetcher = _make_fetcher(handler, {"max_concurrency": 2, "batch_size": 1})
+        fetchers.append(fetcher)
+
+        coords = [(29.0 + i, 102.0) for i in range(6)]
+        result = fetcher.fetch_multi_points(coords, days=1)
+
+        assert len(result) == 6
+        assert peak == 2
+
+    def test_batches_run_concurrently(self, fetchers) -> None:
+        """4 组各 50ms 的请求并发执行 → 总耗时远小于串行的 200ms"""
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=_location_payload(request))
+
+        fetcher = _make_fetcher(handler, {"max_concurrency": 4, "batch_size": 2})
+        fetchers.append(fetcher)
+
+        start = time.monotonic()
+        result = fetcher.fetch_multi_points([(29.0 + i, 102.0) for i in range(8)], days=1)
+        elapsed = time.monotonic() - start
+
+        assert len(result) == 8
+        assert elapsed < 0.15
+
+    def test_rate_limit_spaces_requests(self, fetchers) -> None:
+        """min_request_interval=0.05 → 3 个请求跨度 ≥ 0.1s"""
+        times: list[float] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            times.append(time.monotonic())
+            return httpx.Response(200, json=_location_payload(request))
+
+        fetcher = _make_fetcher(
+            handler, {"min_request_interval": 0.05, "max_concurrency": 8}
+        )
+        fetchers.append(fetcher)
+
+        fetcher.fetch_multi_points([(29.0 + i, 102.0) for i in range(3)], days=1)
+
+        assert times[-1] - times[0] >= 0.09
+
+
+class TestSyncInterface:
+    """对外同步接口与 MeteoFetcher 一致"""
+
+    def test_fetch_hourly_returns_dataframe(self, fetchers) -> None:
+        """fetch_hourly 返回解析后的 DataFrame"""
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=SAMPLE_API_RESPONSE)
+
+        fetcher = _make_fetcher(handler)
+        fetchers.append(fetcher)
+
+        df = fetcher.fetch_hourly(29.75, 102.35, days=1)
+        assert len(df) == 3
+        assert "cloud_cover_total" in df.columns
+
+    def test_transport_routes_to_standin(self, fetchers) -> None:
+        """transport 参数接入进程内 Open-Meteo 替身，请求不走真实网络"""
+        from gmp.bench.synthetic import OpenMeteoStandIn
+
+        standin = OpenMeteoStandIn()
+        cache = MagicMock()
+        cache.get_range.return_value = None
+        cache.get_bulk.return_value = {}
+        fetcher = AsyncMeteoFetcher(
+            cache=cache,
+            config={"min_request_interval": 0},
+            transport=standin.transport(),
+        )
+        fetchers.append(fetcher)
+
+        fetcher.fetch_multi_points([(29.75, 102.35), (30.0, 102.0)], days=1)
+        assert standin.stats()["requests"] >= 1
+
+    def test_no_sync_client_created(self, fetchers) -> None:
+        """请求全部经异步客户端发出，不创建同步连接池"""
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=SAMPLE_API_RESPONSE)
+
+        fetcher = _make_fetcher(handler)
+        fetchers.append(fetcher)
+
+        assert fetcher._client is None
+
+    def test_http_429_retried(self, fetchers) -> None:
+        """首次 429 → 按 Retry-After 退避后重试成功"""
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json=SAMPLE_API_RESPONSE)
+
+        fetcher = _make_fetcher(handler, {"retries": 2})
+        fetchers.append(fetcher)
+
+        assert fetcher._call_api("http://test", {"latitude": "1"}) == SAMPLE_API_RESPONSE
+        assert calls == 2
+
+    def test_timeout_exhausted_raises(self, fetchers) -> None:
+        """重试耗尽 → APITimeoutError"""
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ReadTimeout("timeout", request=request)
+
+        fetcher = _make_fetcher(handler, {"retries": 1})
+        fetchers.append(fetcher)
+
+        with pytest.raises(APITimeoutError):
+            fetcher._call_api("http://test", {"latitude": "1"})
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timedelta, timezone
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import ANY, MagicMock, call, patch
 
 import pytest
 
@@ -85,6 +85,7 @@ def _build_batch_generator(
     routes: list[Route] | None = None,
     scheduler_run_side_effect=None,
     scheduler_run_route_side_effect=None,
+    planner=None,
 ):
     """构建 BatchGenerator 及其 mock 依赖"""
     from gmp.core.batch_generator import BatchGenerator
@@ -147,6 +148,7 @@ def _build_batch_generator(
         forecast_reporter=forecast_reporter,
         timeline_reporter=timeline_reporter,
         json_writer=json_writer,
+        planner=planner,
     )
 
     return bg, scheduler, forecast_reporter, timeline_reporter, json_writer
@@ -177,7 +179,19 @@ class TestHappyPath:
 
         result = bg.generate_all(days=7)
 
-        scheduler.run_route.assert_called_once_with("route_a", days=7, events=None)
+        scheduler.run_route.assert_called_once_with(
+            "route_a", days=7, events=None, memo=ANY
+        )
+
+    def test_route_reuses_viewpoint_results(self):
+        """线路阶段拿到的备忘录已包含观景台阶段的结果 → 不再调用 run()"""
+        bg, scheduler, *_ = _build_batch_generator()
+
+        bg.generate_all(days=7)
+
+        memo = scheduler.run_route.call_args.kwargs["memo"]
+        assert memo.stats()["entries"] == 2
+        assert scheduler.run.call_count == 2
 
     def test_writes_viewpoint_files(self):
         """每个 viewpoint → JSONFileWriter.write_viewpoint() 被调用"""
@@ -277,6 +291,17 @@ class TestHappyPath:
         assert meta["viewpoints_count"] == 2
         assert meta["routes_count"] == 1
 
+    def test_meta_json_contains_profile(self):
+        """meta.json 与返回值包含本次运行的阶段指标"""
+        bg, _, _, _, json_writer = _build_batch_generator()
+
+        result = bg.generate_all(days=1)
+
+        meta = json_writer.write_meta.call_args.args[0]
+        assert meta["profile"] is result["profile"]
+        assert "batch.viewpoints" in meta["profile"]["timers"]
+        assert meta["profile"]["wall_seconds"] >= 0
+
     def test_writes_poster_json(self):
         """生成 poster.json — write_poster 被调用"""
         bg, _, _, _, json_writer = _build_batch_generator()
@@ -329,6 +354,118 @@ class TestHappyPath:
         assert timeline_reporter.generate.call_count >= 2 * 7
 
 
+class TestIncrementalGeneration:
+    """增量生成: 输入指纹未变的日期跳过写入"""
+
+    @staticmethod
+    def _run_with_reuse(reused_count: int):
+        def run_side_effect(vp_id, **kwargs):
+            result = _make_pipeline_result(vp_id, days=3)
+            dates = [fd.date for fd in result.forecast_days]
+            result.meta["fingerprints"] = {d: f"fp-{d}" for d in dates}
+            result.meta["reused_days"] = dates[:reused_count]
+            return result
+        return run_side_effect
+
+    def test_previous_fingerprints_passed_to_scheduler(self):
+        """读取上次的 fingerprints.json 并传给 scheduler.run"""
+        bg, scheduler, _, _, json_writer = _build_batch_generator()
+        json_writer.read_viewpoint_fingerprints.return_value = {"2026-02-12": {}}
+
+        bg.generate_all(days=3)
+
+        for c in scheduler.run.call_args_list:
+            assert c.kwargs["previous"] == {"2026-02-12": {}}
+
+    def test_full_refresh_ignores_previous(self):
+        """incremental=False → 不读取指纹，previous=None"""
+        bg, scheduler, _, _, json_writer = _build_batch_generator()
+
+        bg.generate_all(days=3, incremental=False)
+
+        json_writer.read_viewpoint_fingerprints.assert_not_called()
+        for c in scheduler.run.call_args_list:
+            assert c.kwargs["previous"] is None
+
+    def test_all_days_reused_skips_writes(self):
+        """所有日期复用 → 不重写该观景台任何文件"""
+        bg, _, forecast_reporter, _, json_writer = _build_batch_generator(
+            scheduler_run_side_effect=self._run_with_reuse(3),
+        )
+
+        result = bg.generate_all(days=3)
+
+        assert result["viewpoints_processed"] == 2
+        forecast_reporter.generate.assert_not_called()
+        json_writer.write_viewpoint.assert_not_called()
+        json_writer.write_viewpoint_timeline.assert_not_called()
+        json_writer.write_viewpoint_fingerprints.assert_not_called()
+
+    def test_partial_reuse_writes_changed_days_only(self):
+        """部分复用 → 仅重写变化日期的 timeline，并更新指纹文件"""
+        bg, _, _, _, json_writer = _build_batch_generator(
+            scheduler_run_side_effect=self._run_with_reuse(1),
+        )
+
+        bg.generate_all(days=3)
+
+        # 2 个观景台 × 2 个变化日期
+        assert json_writer.write_viewpoint_timeline.call_count == 2 * 2
+        assert json_writer.write_viewpoint.call_count == 2
+        vp_id, entries = json_writer.write_viewpoint_fingerprints.call_args.args
+        assert len(entries) == 3
+        for date_str, entry in entries.items():
+            assert entry["fingerprint"] == f"fp-{date_str}"
+            assert entry["day"]["date"] == date_str
+
+
+class TestPrefetch:
+    """全局预取: 评分前由 FetchPlanner 统一获取坐标"""
+
+    _STATS = {
+        "viewpoints": 2, "references": 4, "unique_points": 2,
+        "cache_hits": 0, "requests": 1, "failed_groups": 0,
+    }
+
+    def test_planner_runs_before_scoring(self):
+        """planner.run 在 scheduler.run 之前调用，传入观景台与线路站点"""
+        planner = MagicMock()
+        bg, scheduler, *_ = _build_batch_generator(planner=planner)
+        order: list[str] = []
+        planner.run.side_effect = lambda *a, **kw: order.append("plan") or dict(self._STATS)
+        run_default = scheduler.run.side_effect
+        scheduler.run.side_effect = lambda *a, **kw: order.append("run") or run_default(*a, **kw)
+
+        bg.generate_all(days=1, events=["cloud_sea"])
+
+        ids, days, events = planner.run.call_args.args
+        assert ids == ["vp_a", "vp_b", "vp_a", "vp_b"]
+        assert (days, events) == (1, ["cloud_sea"])
+        assert order[0] == "plan"
+
+    def test_meta_contains_fetch_plan(self):
+        """预取统计写入 meta.json 与返回值"""
+        planner = MagicMock()
+        planner.run.return_value = dict(self._STATS)
+        bg, _, _, _, json_writer = _build_batch_generator(planner=planner)
+
+        result = bg.generate_all(days=1)
+
+        meta = json_writer.write_meta.call_args.args[0]
+        assert meta["fetch_plan"] == self._STATS
+        assert result["fetch_plan"] == self._STATS
+
+    def test_prefetch_false_skips_planner(self):
+        """prefetch=False → 不调用 planner, fetch_plan 为 None"""
+        planner = MagicMock()
+        bg, _, _, _, json_writer = _build_batch_generator(planner=planner)
+
+        result = bg.generate_all(days=1, prefetch=False)
+
+        planner.run.assert_not_called()
+        assert result["fetch_plan"] is None
+
+
 # ══════════════════════════════════════════════════════
 # 容错 Tests
 # ══════════════════════════════════════════════════════
@@ -567,3 +704,110 @@ class TestProgressCallback:
         result = bg.generate_all(days=7)
 
         assert result["viewpoints_processed"] == 2
+
+
+# ══════════════════════════════════════════════════════
+# Parallel Workers Tests
+# ══════════════════════════════════════════════════════
+
+
+class TestParallelWorkers:
+    """workers > 1 并发处理"""
+
+    @staticmethod
+    def _reverse_finishing_run(vp_ids: list[str]):
+        """越靠前的观景台完成越晚, 使完成顺序与配置顺序相反"""
+        import time
+
+        def run_side_effect(vp_id, **kwargs):
+            time.sleep(0.02 * (len(vp_ids) - vp_ids.index(vp_id)))
+            return _make_pipeline_result(vp_id, days=kwargs.get("days", 7))
+
+        return run_side_effect
+
+    def test_index_order_matches_config_order(self):
+        """完成顺序打乱时 index.json 仍按配置顺序"""
+        vp_ids = ["vp_a", "vp_b", "vp_c", "vp_d"]
+        bg, _, _, _, json_writer = _build_batch_generator(
+            viewpoints=[_make_viewpoint(v) for v in vp_ids],
+            scheduler_run_side_effect=self._reverse_finishing_run(vp_ids),
+        )
+
+        bg.generate_all(days=1, workers=4)
+
+        vp_index = json_writer.write_index.call_args.kwargs["viewpoints"]
+        assert [v["id"] for v in vp_index] == vp_ids
+
+    def test_progress_counter_unique_and_complete(self):
+        """并发时进度计数器不重复、不遗漏"""
+        vp_ids = ["vp_a", "vp_b", "vp_c", "vp_d"]
+        bg, *_ = _build_batch_generator(
+            viewpoints=[_make_viewpoint(v) for v in vp_ids],
+            scheduler_run_side_effect=self._reverse_finishing_run(vp_ids),
+        )
+        messages: list[str] = []
+
+        bg.generate_all(days=1, workers=4, progress_callback=messages.append)
+
+        counters = [m.split("]")[0].split("[")[1] for m in messages[1:]]
+        assert counters == [f"{i}/5" for i in range(1, 6)]
+
+    def test_runs_concurrently(self):
+        """workers=4 时观景台处理并发执行"""
+        import threading
+
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def run_side_effect(vp_id, **kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            barrier.wait()
+            with lock:
+                active -= 1
+            return _make_pipeline_result(vp_id, days=1)
+
+        bg, *_ = _build_batch_generator(
+            viewpoints=[_make_viewpoint(v) for v in ["vp_a", "vp_b", "vp_c"]],
+            scheduler_run_side_effect=run_side_effect,
+        )
+
+        result = bg.generate_all(days=1, workers=4)
+
+        assert peak == 3
+        assert result["viewpoints_processed"] == 3
+
+    def test_failed_lists_in_config_order(self):
+        """失败列表同样按配置顺序"""
+        vp_ids = ["vp_a", "vp_b", "vp_c"]
+        inner = self._reverse_finishing_run(vp_ids)
+
+        def run_side_effect(vp_id, **kwargs):
+            inner(vp_id, **kwargs)
+            raise RuntimeError("fail")
+
+        bg, *_ = _build_batch_generator(
+            viewpoints=[_make_viewpoint(v) for v in vp_ids],
+            scheduler_run_side_effect=run_side_effect,
+        )
+
+        result = bg.generate_all(days=1, workers=3)
+
+        assert result["failed_viewpoints"] == vp_ids
+
+    def test_fail_fast_propagates_from_worker(self):
+        """fail_fast=True: 工作线程中的异常向上传播"""
+
+        def run_side_effect(vp_id, **kwargs):
+            if vp_id == "vp_b":
+                raise RuntimeError("vp_b error")
+            return _make_pipeline_result(vp_id, days=1)
+
+        bg, *_ = _build_batch_generator(scheduler_run_side_effect=run_side_effect)
+
+        with pytest.raises(RuntimeError, match="vp_b error"):
+            bg.generate_all(days=1, fail_fast=True, workers=2)
@@ -0,0 +1,184 @@
+"""tests/unit/test_bench.py — 离线基准 (合成数据 / API 替身 / 分阶段运行) 单元测试"""
+
+import json
+from datetime import date
+
+import httpx
+import pytest
+
+from gmp.bench.runner import BENCH_VERSION, STAGES, compare, run_bench, write_results
+from gmp.bench.synthetic import (
+    OpenMeteoStandIn,
+    forecast_response,
+    hourly_payload,
+    synthetic_routes,
+    synthetic_viewpoints,
+)
+from gmp.cache.repository import CacheRepository
+from gmp.cache.weather_cache import WeatherCache
+from gmp.data.meteo_fetcher import MeteoFetcher
+
+_FIELDS = ["temperature_2m", "cloud_cover", "cloud_base", "weather_code"]
+
+
+class TestSyntheticConfig:
+    """合成观景台 / 线路"""
+
+    def test_deterministic_by_seed(self):
+        assert synthetic_viewpoints(20, seed=3) == synthetic_viewpoints(20, seed=3)
+        assert synthetic_viewpoints(20, seed=3) != synthetic_viewpoints(20, seed=4)
+
+    def test_targets_shared_across_viewpoints(self):
+        """目标山峰来自共享池，大量观景台共用同一目标坐标"""
+        vps = synthetic_viewpoints(200)
+        targets = {(t["lat"], t["lon"]) for vp in vps for t in vp["targets"]}
+
+        assert len(targets) <= 16
+        assert all("sunrise" in vp["capabilities"] for vp in vps)
+
+    def test_routes_reference_existing_viewpoints(self):
+        ids = [vp["id"] for vp in synthetic_viewpoints(10)]
+        routes = synthetic_routes(ids, 3)
+
+        assert len(routes) == 3
+        for route in routes:
+            assert [s["order"] for s in route["stops"]] == [1, 2, 3, 4]
+            assert {s["viewpoint_id"] for s in route["stops"]} <= set(ids)
+
+
+class TestSyntheticWeather:
+    """确定性逐小时天气"""
+
+    def test_day_independent_of_span(self):
+        """同一天的数据与请求跨度无关"""
+        wide = hourly_payload(29.6, 101.9, date(2026, 2, 10), date(2026, 2, 12), _FIELDS)
+        single = hourly_payload(29.6, 101.9, date(2026, 2, 11), date(2026, 2, 11), _FIELDS)
+
+        for field in _FIELDS:
+            assert wide["hourly"][field][24:48] == single["hourly"][field]
+
+    def test_shape_and_nulls(self):
+        payload = hourly_payload(29.6, 101.9, date(2026, 2, 10), date(2026, 2, 16), _FIELDS)
+        hourly = payload["hourly"]
+
+        assert len(hourly["time"]) == 7 * 24
+        assert hourly["time"][0] == "2026-02-10T00:00"
+        assert set(hourly) == {"time", *_FIELDS}
+        assert any(v is None for v in hourly["cloud_base"])
+        assert all(isinstance(v, int) for v in hourly["weather_code"])
+
+    def test_multi_coordinate_list(self):
+        """多坐标请求返回与坐标顺序一致的数组"""
+        body = forecast_response(
+            {"latitude": "29.6,31.1", "longitude": "101.9,102.9",
+             "hourly": "cloud_cover", "forecast_days": "2"},
+            today=date(2026, 2, 11),
+        )
+
+        assert [b["latitude"] for b in body] == [29.6, 31.1]
+        assert body[0]["hourly"]["time"][-1] == "2026-02-12T23:00"
+
+    def test_past_days_and_explicit_span(self):
+        today = date(2026, 2, 11)
+        past = forecast_response(
+            {"latitude": "29.6", "longitude": "101.9", "hourly": "cloud_cover",
+             "forecast_days": "1", "past_days": "1"},
+            today=today,
+        )
+        span = forecast_response(
+            {"latitude": "29.6", "longitude": "101.9", "hourly": "cloud_cover",
+             "start_date": "2026-02-13", "end_date": "2026-02-14"},
+            today=today,
+        )
+
+        assert past["hourly"]["time"][0] == "2026-02-10T00:00"
+        assert len(past["hourly"]["time"]) == 48
+        assert span["hourly"]["time"][0] == "2026-02-13T00:00"
+
+    def test_mismatched_coordinates_raise(self):
+        with pytest.raises(ValueError):
+            forecast_response({"latitude": "29.6,31.1", "longitude": "101.9"})
+
+
+class TestOpenMeteoStandIn:
+    """httpx.MockTransport 替身接入 MeteoFetcher"""
+
+    def test_fetcher_roundtrip(self):
+        standin = OpenMeteoStandIn()
+        fetcher = MeteoFetcher(
+            WeatherCache(CacheRepository(":memory:")),
+            {"min_request_interval": 0, "batch_size": 10},
+            transport=standin.transport(),
+        )
+
+        result = fetcher.fetch_multi_points([(29.6, 101.9), (31.1, 102.9)], days=3)
+
+        assert standin.request_count == 1
+        assert [len(df) for df in result.values()] == [72, 72]
+        assert result[(29.6, 101.9)]["cloud_base_altitude"].notna().all()
+
+        fetcher.fetch_multi_points([(29.6, 101.9), (31.1, 102.9)], days=3)
+        assert standin.request_count == 1
+
+    def test_bad_request_returns_400(self):
+        standin = OpenMeteoStandIn()
+        client = httpx.Client(transport=standin.transport())
+
+        response = client.get("http://standin/v1/forecast", params={"latitude": "1"})
+
+        assert response.status_code == 400
+
+
+@pytest.fixture(scope="module")
+def run(tmp_path_factory):
+    """3 个观景台 × 1 天的一轮完整基准"""
+    return run_bench(3, days=1, workdir=tmp_path_factory.mktemp("bench"))
+
+
+class TestRunBench:
+    """分阶段运行与结果对比"""
+
+    def test_all_stages_recorded(self, run):
+        assert tuple(run["stages"]) == STAGES
+        assert run["scale"]["viewpoints"] == 3
+        assert run["scale"]["routes"] == 1
+        for stage in run["stages"].values():
+            assert stage["seconds"] >= 0
+            assert set(stage) >= {"items", "per_item_ms", "timers", "counters"}
+
+    def test_stage_metrics_isolated(self, run):
+        """fetch 阶段走 API，cache/scoring 阶段全部命中缓存"""
+        stages = run["stages"]
+
+        assert stages["fetch"]["counters"]["fetcher.requests"] >= 1
+        assert stages["cache"]["counters"]["cache.misses"] == 0
+        assert "fetcher.requests" not in stages["scoring"]["counters"]
+        assert stages["output"]["counters"]["writer.files"] > 0
+
+    def test_uses_production_fetcher_factory(self, tmp_path):
+        """fetcher 经 gmp.main._create_fetcher 按配置创建，主机级令牌桶改用 workdir 内文件"""
+        from gmp.bench.runner import BenchEnvironment
+        from gmp.data.async_meteo_fetcher import AsyncMeteoFetcher
+
+        env = BenchEnvironment(2, tmp_path, days=1)
+        try:
+            assert env.engine == "async"
+            assert isinstance(env.fetcher, AsyncMeteoFetcher)
+            env.fetch()
+        finally:
+            env.close()
+        assert (tmp_path / "rate_limit.db").exists()
+
+    def test_write_and_compare(self, run, tmp_path):
+        data = {"version": BENCH_VERSION, "runs": [run]}
+        path = tmp_path / "bench.json"
+        write_results(path, data)
+
+        rows = compare(json.loads(path.read_text(encoding="utf-8")), data)
+
+        assert [r["stage"] for r in rows] == list(STAGES)
+        assert all(r["ratio"] in (1.0, None) for r in rows)
+
+    def test_compare_version_mismatch(self):
+        with pytest.raises(ValueError):
+            compare({"version": 0, "runs": []}, {"version": BENCH_VERSION, "runs": []})
@@ -0,0 +1,137 @@
+"""tests/unit/test_bench_server.py — 本地 Open-Meteo 替身服务 单元测试"""
+
+import time
+from datetime import date
+from pathlib import Path
+
+import httpx
+import pytest
+
+from gmp.bench.server import OpenMeteoServer
+from gmp.bench.synthetic import OpenMeteoStandIn, StandInConfig, load_recordings
+from gmp.cache.repository import CacheRepository
+from gmp.cache.weather_cache import WeatherCache
+from gmp.core.exceptions import APITimeoutError
+from gmp.data.meteo_fetcher import MeteoFetcher
+
+_FIXTURE = Path(__file__).parent.parent / "fixtures" / "weather_data_clear.json"
+_PARAMS = {"latitude": "29.6", "longitude": "101.9", "hourly": "cloud_cover"}
+
+
+def _fetcher(server: OpenMeteoServer, **cfg) -> MeteoFetcher:
+    return MeteoFetcher(
+        WeatherCache(CacheRepository(":memory:")),
+        {**server.fetcher_config(), "min_request_interval": 0, **cfg},
+    )
+
+
+class TestOpenMeteoServer:
+    """经真实 socket 的请求"""
+
+    def test_forecast_multi_points(self):
+        with OpenMeteoServer() as server:
+            fetcher = _fetcher(server, batch_size=5)
+            result = fetcher.fetch_multi_points(
+                [(29.6, 101.9), (31.1, 102.9), (30.4, 101.6)], days=2
+            )
+            fetcher.close()
+            stats = httpx.get(f"{server.url}/stats").json()
+
+        assert [len(df) for df in result.values()] == [48, 48, 48]
+        assert stats["requests"] == 1
+        assert stats["coordinates"] == 3
+
+    def test_archive_endpoint(self):
+        with OpenMeteoServer() as server:
+            fetcher = _fetcher(server)
+            df = fetcher.fetch_historical(29.6, 101.9, date(2025, 12, 1))
+            fetcher.close()
+
+        assert len(df) == 24
+        assert set(df["forecast_date"]) == {"2025-12-01"}
+
+    def test_unknown_path_returns_404(self):
+        with OpenMeteoServer() as server:
+            response = httpx.get(f"{server.url}/v1/elevation", params=_PARAMS)
+
+        assert response.status_code == 404
+
+
+class TestUpstreamBehaviour:
+    """延迟 / 错误 / 配额注入"""
+
+    def test_quota_returns_429_with_retry_after(self):
+        standin = OpenMeteoStandIn(config=StandInConfig(quota_per_minute=2))
+
+        statuses = [standin.respond("/v1/forecast", _PARAMS)[0] for _ in range(3)]
+        _, headers, _ = standin.respond("/v1/forecast", _PARAMS)
+
+        assert statuses == [200, 200, 429]
+        assert 1 <= int(headers["Retry-After"]) <= 60
+        assert standin.stats()["rate_limited"] == 2
+
+    def test_fetcher_retries_on_429(self):
+        """超出配额 → fetcher 按 Retry-After 重试，重试耗尽后抛出 APITimeoutError"""
+        standin = OpenMeteoStandIn(
+            config=StandInConfig(quota_per_minute=1, retry_after=0)
+        )
+        with OpenMeteoServer(standin=standin) as server:
+            fetcher = _fetcher(server, retries=1)
+            fetcher.fetch_hourly(29.6, 101.9, days=1)
+            with pytest.raises(APITimeoutError):
+                fetcher.fetch_hourly(31.1, 102.9, days=1)
+            fetcher.close()
+
+        assert standin.stats() == {
+            "requests": 3,
+            "coordinates": 1,
+            "rate_limited": 2,
+            "errors": 0,
+            "bad_requests": 0,
+        }
+
+    def test_error_rate_surfaces_http_error(self):
+        standin = OpenMeteoStandIn(config=StandInConfig(error_rate=1.0))
+        with OpenMeteoServer(standin=standin) as server:
+            fetcher = _fetcher(server)
+            with pytest.raises(httpx.HTTPStatusError):
+                fetcher.fetch_hourly(29.6, 101.9, days=1)
+            fetcher.close()
+
+        assert standin.stats()["errors"] == 1
+
+    def test_latency(self):
+        standin = OpenMeteoStandIn(config=StandInConfig(latency_ms=30))
+
+        start = time.perf_counter()
+        standin.respond("/v1/forecast", _PARAMS)
+
+        assert time.perf_counter() - start >= 0.03
+
+    def test_unknown_field_is_bad_request(self):
+        standin = OpenMeteoStandIn()
+
+        status, _, body = standin.respond(
+            "/v1/forecast", {**_PARAMS, "hourly": "soil_moisture"}
+        )
+
+        assert status == 400
+        assert "soil_moisture" in body["reason"]
+
+
+class TestRecordings:
+    """录制数据覆盖合成值"""
+
+    def test_recorded_day_served(self):
+        recordings = load_recordings([_FIXTURE])
+        standin = OpenMeteoStandIn(recordings=recordings)
+
+        _, _, body = standin.respond("/v1/archive", {
+            "latitude": "29.75", "longitude": "102.35",
+            "hourly": "cloud_cover,weather_code",
+            "start_date": "2025-11-30", "end_date": "2025-12-01",
+        })
+
+        recorded = recordings[(29.75, 102.35)][date(2025, 12, 1)]
+        assert body["hourly"]["cloud_cover"][24:] == recorded["cloud_cover"]
+        assert len(body["hourly"]["cloud_cover"]) == 48
@@ -0,0 +1,252 @@
+"""tests/unit/test_blob_repository.py — BlobCacheRepository 单元测试
+
+列式压缩存储后端须与 CacheRepository 的读写接口行为一致。
+"""
+
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gmp.cache.blob_repository import (
+    BlobCacheRepository,
+    decode_payload,
+    encode_payload,
+)
+from gmp.cache.repository import (
+    FIELD_BITS,
+    CacheRepository,
+    create_cache_repository,
+    fields_mask,
+)
+from gmp.cache.weather_cache import WeatherCache
+
+# ==================== Fixtures ====================
+
+
+@pytest.fixture
+def blob_repo():
+    r = BlobCacheRepository(":memory:")
+    yield r
+    r.close()
+
+
+@pytest.fixture
+def row_repo():
+    r = CacheRepository(":memory:")
+    yield r
+    r.close()
+
+
+def _frame(coords, dates, hours, fetched_at="2026-02-10 08:00:00", temperature=0.0):
+    """辅助函数: 多坐标 × 多天 × 多小时的写入 DataFrame"""
+    rows = [
+        {
+            "lat_rounded": lat,
+            "lon_rounded": lon,
+            "forecast_date": d,
+            "forecast_hour": h,
+            "fetched_at": fetched_at,
+            "temperature_2m": temperature + h * 0.1,
+            "cloud_cover_total": 10 + h,
+            "cloud_cover_low": 5,
+            "cloud_cover_medium": 3,
+            "cloud_cover_high": 2,
+            "cloud_base_altitude": 5200.0,
+            "precipitation_probability": 0,
+            "visibility": 45000.0,
+            "wind_speed_10m": 8.5,
+            "snowfall": 0.0,
+            "rain": 0.0,
+            "showers": 0.0,
+            "weather_code": 1,
+        }
+        for lat, lon in coords
+        for d in dates
+        for h in hours
+    ]
+    return pd.DataFrame(rows)
+
+
+# ==================== payload 编解码 ====================
+
+
+class TestPayload:
+    def test_roundtrip_preserves_values_and_nan(self):
+        """编码 → 解码数值不变, NaN 保留"""
+        hours = np.arange(24)
+        values = np.random.default_rng(0).normal(size=(13, 24))
+        values[2, 5] = np.nan
+
+        matrix = decode_payload(encode_payload(hours, values))
+        assert np.array_equal(matrix[0], hours)
+        np.testing.assert_array_equal(matrix[1:], values)
+
+    def test_unknown_version_raises(self):
+        """未知版本号 → ValueError"""
+        payload = encode_payload(np.arange(2), np.zeros((13, 2)))
+        with pytest.raises(ValueError):
+            decode_payload(b"\xff" + payload[1:])
+
+
+# ==================== 与行存储一致 ====================
+
+
+class TestMatchesRowBackend:
+    def test_range_frame_matches_row_backend(self, blob_repo, row_repo):
+        """相同写入 → query_weather_range 结果与行存储一致"""
+        df = _frame([(29.58, 101.88)], ["2026-02-11", "2026-02-12"], range(24))
+        blob_repo.upsert_weather_frame(df)
+        row_repo.upsert_weather_frame(df)
+
+        args = (29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12))
+        pd.testing.assert_frame_equal(
+            blob_repo.query_weather_range(*args),
+            row_repo.query_weather_range(*args),
+            check_dtype=False,
+        )
+
+    def test_query_weather_records_match(self, blob_repo, row_repo):
+        """query_weather 返回的 dict 列表与行存储一致 (含 NULL → None)"""
+        df = _frame([(29.58, 101.88)], ["2026-02-11"], [6, 7, 8]).assign(
+            cloud_base_altitude=[np.nan, 5200.0, 5100.0]
+        )
+        blob_repo.upsert_weather_frame(df)
+        row_repo.upsert_weather_frame(df)
+
+        args = (29.58, 101.88, date(2026, 2, 11), [7, 6])
+        assert blob_repo.query_weather(*args) == row_repo.query_weather(*args)
+
+    def test_bulk_matches_row_backend(self, blob_repo, row_repo):
+        """多坐标批量读取与行存储一致"""
+        df = _frame([(29.58, 101.88), (30.0, 102.0)], ["2026-02-11"], range(3))
+        blob_repo.upsert_weather_frame(df)
+        row_repo.upsert_weather_frame(df)
+
+        args = ([(30.0, 102.0), (29.58, 101.88)], date(2026, 2, 11), date(2026, 2, 11))
+        pd.testing.assert_frame_equal(
+            blob_repo.query_weather_bulk(*args),
+            row_repo.query_weather_bulk(*args),
+            check_dtype=False,
+        )
+
+    def test_no_data(self, blob_repo):
+        """无数据 → query_weather 返回 None, 区间读取返回空 DataFrame"""
+        assert blob_repo.query_weather(29.58, 101.88, date(2026, 2, 11)) is None
+        df = blob_repo.query_weather_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11))
+        assert df.empty
+
+
+# ==================== 版本与覆盖写入 ====================
+
+
+class TestVersions:
+    def _count(self, repo):
+        return repo._conn.execute("SELECT count(*) FROM weather_blob").fetchone()[0]
+
+    def test_one_row_per_coordinate_day(self, blob_repo):
+        """每个 (坐标, 日期, fetched_at) 一行"""
+        blob_repo.upsert_weather_frame(
+            _frame([(29.58, 101.88), (30.0, 102.0)], ["2026-02-11", "2026-02-12"], range(24))
+        )
+        assert self._count(blob_repo) == 4
+
+    def test_full_overwrite_replaces_old_version(self, blob_repo):
+        """新版本覆盖全部小时 → 旧版本删除"""
+        blob_repo.upsert_weather_frame(_frame([(29.58, 101.88)], ["2026-02-11"], range(24)))
+        blob_repo.upsert_weather_frame(
+            _frame([(29.58, 101.88)], ["2026-02-11"], range(24),
+                   fetched_at="2026-02-11 08:00:00", temperature=5.0)
+        )
+        assert self._count(blob_repo) == 1
+        df = blob_repo.query_weather_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11))
+        assert df["temperature_2m"].iloc[0] == 5.0
+
+    def test_partial_overwrite_merges_by_hour(self, blob_repo):
+        """部分小时覆盖 → 读取时每小时取最新版本, 保留逐小时 fetched_at"""
+        blob_repo.upsert_weather_frame(_frame([(29.58, 101.88)], ["2026-02-11"], [0, 1, 2]))
+        blob_repo.upsert_weather_frame(
+            _frame([(29.58, 101.88)], ["2026-02-11"], [1],
+                   fetched_at="2026-02-11 08:00:00", temperature=5.0)
+        )
+        df = blob_repo.query_weather_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11))
+        assert df["forecast_hour"].tolist() == [0, 1, 2]
+        assert df["temperature_2m"].tolist() == [0.0, 5.1, 0.2]
+        assert df["fetched_at"].tolist()[1] == "2026-02-11 08:00:00"
+
+    def test_same_fetched_at_writes_merge(self, blob_repo):
+        """相同 fetched_at 的逐小时写入合并为一行"""
+        blob_repo.upsert_weather(29.58, 101.88, date(2026, 2, 11), 6,
+                                 {"fetched_at": "2026-02-10 08:00:00", "temperature_2m": 1.0})
+        blob_repo.upsert_weather(29.58, 101.88, date(2026, 2, 11), 7,
+                                 {"fetched_at": "2026-02-10 08:00:00", "temperature_2m": 2.0})
+        assert self._count(blob_repo) == 1
+        rows = blob_repo.query_weather(29.58, 101.88, date(2026, 2, 11))
+        assert [r["temperature_2m"] for r in rows] == [1.0, 2.0]
+
+    def test_fields_mask_follows_hour_version(self, blob_repo):
+        """逐小时 fields_mask 取自该小时所在的版本"""
+        blob_repo.upsert_weather_frame(_frame([(29.58, 101.88)], ["2026-02-11"], [0, 1]))
+        blob_repo.upsert_weather_frame(
+            _frame([(29.58, 101.88)], ["2026-02-11"], [1], fetched_at="2026-02-11 08:00:00")
+            [["lat_rounded", "lon_rounded", "forecast_date", "forecast_hour",
+              "fetched_at", "temperature_2m"]]
+        )
+        df = blob_repo.query_weather_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11))
+        assert df["fields_mask"].tolist() == [
+            fields_mask(FIELD_BITS), FIELD_BITS["temperature_2m"],
+        ]
+
+    def test_legacy_table_gains_nullable_column(self, tmp_path):
+        """旧版 weather_blob 无 fields_mask 列 → 补列, 旧版本读出为 NaN"""
+        path = str(tmp_path / "legacy.db")
+        repo = BlobCacheRepository(path)
+        repo.upsert_weather_frame(_frame([(29.58, 101.88)], ["2026-02-11"], [0]))
+        repo._conn.execute("ALTER TABLE weather_blob DROP COLUMN fields_mask")
+        repo._conn.commit()
+        repo.close()
+
+        repo = BlobCacheRepository(path)
+        df = repo.query_weather_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11))
+        repo.close()
+        assert df["fields_mask"].isna().all()
+        assert df["temperature_2m"].tolist() == [0.0]
+
+
+# ==================== 集成 ====================
+
+
+class TestIntegration:
+    def test_factory_selects_backend(self):
+        """create_cache_repository 按 backend 选择实现"""
+        assert type(create_cache_repository(":memory:")) is CacheRepository
+        assert isinstance(create_cache_repository(":memory:", "blob"), BlobCacheRepository)
+        with pytest.raises(ValueError):
+            create_cache_repository(":memory:", "parquet")
+
+    def test_weather_cache_on_blob_backend(self, blob_repo):
+        """WeatherCache 在 blob 后端上读写正常"""
+        cache = WeatherCache(blob_repo)
+        cache.set_many({
+            (29.58, 101.88): _frame([(0, 0)], ["2026-02-11"], range(24)).drop(
+                columns=["lat_rounded", "lon_rounded", "fetched_at"]
+            )
+        })
+        result = cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11))
+        assert len(result) == 24
+
+    def test_smaller_on_disk(self, tmp_path):
+        """相同数据下 blob 后端文件更小"""
+        df = _frame([(29.0 + i * 0.01, 101.88) for i in range(20)],
+                    [f"2026-02-{d:02d}" for d in range(1, 8)], range(24))
+        sizes = {}
+        for backend in ("rows", "blob"):
+            path = str(tmp_path / f"{backend}.db")
+            repo = create_cache_repository(path, backend)
+            repo.upsert_weather_frame(df)
+            repo._conn.execute("VACUUM")
+            repo.close()
+            sizes[backend] = os.path.getsize(path)
+        assert sizes["blob"] < sizes["rows"] / 2
@@ -5,9 +5,12 @@
 
 from datetime import date, datetime
 
+import sqlite3
+
+import pandas as pd
 import pytest
 
-from gmp.cache.repository import CacheRepository
+from gmp.cache.repository import FIELD_BITS, CacheRepository, fields_mask
 
 
 # ==================== Fixtures ====================
@@ -205,6 +208,244 @@ class TestBatchUpsert:
         assert len(result) == 24
 
 
+# ==================== upsert_weather_frame ====================
+
+
+def _frame(coords, dates, hours, temperature=0.0):
+    """辅助函数: 多坐标 × 多天 × 多小时的写入 DataFrame"""
+    rows = [
+        {
+            "lat_rounded": lat,
+            "lon_rounded": lon,
+            "forecast_date": d,
+            "forecast_hour": h,
+            "fetched_at": "2026-02-10 08:00:00",
+            "temperature_2m": temperature + h,
+            "visibility": 50000.0,
+        }
+        for lat, lon in coords
+        for d in dates
+        for h in hours
+    ]
+    return pd.DataFrame(rows)
+
+
+class TestFrameUpsert:
+    def test_writes_many_coords_and_days(self, memory_repo):
+        """一次写入多个坐标、多天"""
+        coords = [(29.58, 101.88), (30.0, 102.0)]
+        df = _frame(coords, ["2026-02-11", "2026-02-12"], range(24))
+        assert memory_repo.upsert_weather_frame(df) == 96
+
+        for lat, lon in coords:
+            result = memory_repo.query_weather(lat, lon, date(2026, 2, 12))
+            assert len(result) == 24
+
+    def test_replaces_existing_rows(self, memory_repo):
+        """相同 (坐标, 日期, 小时) 覆盖旧数据"""
+        memory_repo.upsert_weather_frame(_frame([(29.58, 101.88)], ["2026-02-11"], [6]))
+        memory_repo.upsert_weather_frame(
+            _frame([(29.58, 101.88)], ["2026-02-11"], [6], temperature=-5.0)
+        )
+        result = memory_repo.query_weather(29.58, 101.88, date(2026, 2, 11))
+        assert len(result) == 1
+        assert result[0]["temperature_2m"] == 1.0
+
+    def test_ignores_extra_columns_and_stores_nan_as_null(self, memory_repo):
+        """多余列忽略, NaN/缺失字段写入 NULL, date 对象转 ISO 字符串"""
+        df = _frame([(29.5812, 101.8799)], [date(2026, 2, 11)], [0]).assign(
+            relative_humidity_2m=80, cloud_cover_total=float("nan")
+        )
+        memory_repo.upsert_weather_frame(df)
+
+        result = memory_repo.query_weather(29.58, 101.88, date(2026, 2, 11))
+        assert result[0]["cloud_cover_total"] is None
+        assert result[0]["snowfall"] is None
+        assert "relative_humidity_2m" not in result[0]
+
+    def test_empty_frame_writes_nothing(self, memory_repo):
+        """空 DataFrame → 返回 0"""
+        assert memory_repo.upsert_weather_frame(pd.DataFrame()) == 0
+
+
+class TestFieldsMask:
+    def test_records_written_weather_columns(self, memory_repo):
+        """fields_mask 记录写入时给出的天气字段，值为空的字段同样计入"""
+        df = _frame([(29.58, 101.88)], ["2026-02-11"], [0]).assign(
+            cloud_base_altitude=None
+        ).drop(columns=["visibility"])
+        memory_repo.upsert_weather_frame(df)
+
+        result = memory_repo.query_weather(29.58, 101.88, date(2026, 2, 11))
+        mask = result[0]["fields_mask"]
+        assert mask & FIELD_BITS["cloud_base_altitude"]
+        assert not mask & FIELD_BITS["visibility"]
+
+    def test_explicit_fields_mask_column_kept(self, memory_repo):
+        """df 自带 fields_mask 列时沿用 (缓存读出的数据写回不扩大字段集)"""
+        df = _frame([(29.58, 101.88)], ["2026-02-11"], [0]).assign(
+            fields_mask=fields_mask(["temperature_2m"])
+        )
+        memory_repo.upsert_weather_frame(df)
+
+        frame = memory_repo.query_weather_range(
+            29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11)
+        )
+        assert frame["fields_mask"].tolist() == [FIELD_BITS["temperature_2m"]]
+
+    def test_legacy_table_gains_nullable_column(self, tmp_path):
+        """旧版 weather_cache 无 fields_mask 列 → 补列, 旧行为 NULL"""
+        path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE weather_cache (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "lat_rounded REAL NOT NULL, lon_rounded REAL NOT NULL, "
+            "forecast_date DATE NOT NULL, forecast_hour INTEGER NOT NULL, "
+            "fetched_at DATETIME NOT NULL, api_source TEXT DEFAULT 'open-meteo', "
+            "raw_response_json TEXT, temperature_2m REAL, cloud_cover_total INTEGER, "
+            "cloud_cover_low INTEGER, cloud_cover_medium INTEGER, "
+            "cloud_cover_high INTEGER, cloud_base_altitude REAL, "
+            "precipitation_probability INTEGER, visibility REAL, wind_speed_10m REAL, "
+            "snowfall REAL, rain REAL, showers REAL, weather_code INTEGER, "
+            "UNIQUE(lat_rounded, lon_rounded, forecast_date, forecast_hour))"
+        )
+        conn.execute(
+            "INSERT INTO weather_cache (lat_rounded, lon_rounded, forecast_date, "
+            "forecast_hour, fetched_at, temperature_2m) "
+            "VALUES (29.58, 101.88, '2026-02-11', 0, '2026-02-10 08:00:00', 1.0)"
+        )
+        conn.commit()
+        conn.close()
+
+        repo = CacheRepository(path)
+        result = repo.query_weather(29.58, 101.88, date(2026, 2, 11))
+        repo.close()
+        assert result[0]["temperature_2m"] == 1.0
+        assert result[0]["fields_mask"] is None
+
+
+# ==================== SQLite 调优 ====================
+
+
+class TestSqlitePragmas:
+    def test_default_keeps_rollback_journal(self, repo):
+        """未配置时保持默认 journal_mode"""
+        mode = repo._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode.lower() == "delete"
+
+    def test_wal_and_tuning_applied(self, tmp_path):
+        """配置 WAL + synchronous + cache_size + mmap_size"""
+        r = CacheRepository(
+            str(tmp_path / "wal.db"),
+            {"wal": True, "synchronous": "normal", "cache_size_mb": 8, "mmap_size_mb": 16},
+        )
+        try:
+            conn = r._conn
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -8 * 1024
+        finally:
+            r.close()
+
+    def test_invalid_synchronous_raises(self, tmp_path):
+        """无效 synchronous 模式 → ValueError"""
+        with pytest.raises(ValueError):
+            CacheRepository(str(tmp_path / "bad.db"), {"synchronous": "fast"})
+
+
+# ==================== 区间 / 批量读取 ====================
+
+
+def _hour_rows(hours, temperature=0.0):
+    """辅助函数: 生成逐小时写入行"""
+    return [
+        {
+            "forecast_hour": h,
+            "fetched_at": "2026-02-10 08:00:00",
+            "temperature_2m": temperature + h,
+            "cloud_cover_total": 10,
+            "visibility": 50000.0,
+            "weather_code": 0,
+        }
+        for h in hours
+    ]
+
+
+class TestRangeAndBulkQuery:
+    def test_range_returns_all_days_sorted(self, memory_repo):
+        """区间查询一次返回多天数据, 按日期/小时排序"""
+        for day in (12, 11, 13):
+            memory_repo.upsert_weather_batch(
+                29.58, 101.88, date(2026, 2, day), _hour_rows([1, 0], temperature=day)
+            )
+
+        df = memory_repo.query_weather_range(
+            29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12)
+        )
+        assert list(zip(df["forecast_date"], df["forecast_hour"])) == [
+            ("2026-02-11", 0), ("2026-02-11", 1),
+            ("2026-02-12", 0), ("2026-02-12", 1),
+        ]
+        assert df["temperature_2m"].tolist() == [11.0, 12.0, 12.0, 13.0]
+
+    def test_range_no_data_returns_empty_frame(self, memory_repo):
+        """区间内无数据 → 空 DataFrame, 列齐全"""
+        df = memory_repo.query_weather_range(
+            29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12)
+        )
+        assert df.empty
+        assert "temperature_2m" in df.columns
+
+    def test_range_rounds_coordinates(self, memory_repo):
+        """区间查询坐标按 ROUND(2) 匹配"""
+        memory_repo.upsert_weather_batch(29.58, 101.88, date(2026, 2, 11), _hour_rows([0]))
+        df = memory_repo.query_weather_range(
+            29.5812, 101.8799, date(2026, 2, 11), date(2026, 2, 11)
+        )
+        assert len(df) == 1
+
+    def test_bulk_returns_only_requested_coords(self, memory_repo):
+        """批量查询返回所请求坐标的区间数据"""
+        for lat in (29.58, 30.0, 31.0):
+            memory_repo.upsert_weather_batch(lat, 101.88, date(2026, 2, 11), _hour_rows([0, 1]))
+
+        df = memory_repo.query_weather_bulk(
+            [(29.58, 101.88), (31.0, 101.88), (29.5801, 101.8801)],
+            date(2026, 2, 11),
+            date(2026, 2, 11),
+        )
+        assert len(df) == 4
+        assert set(df["lat_rounded"]) == {29.58, 31.0}
+
+    def test_bulk_chunks_large_coordinate_sets(self, memory_repo, monkeypatch):
+        """坐标数超过单条 SQL 上限时分段查询并合并"""
+        monkeypatch.setattr("gmp.cache.repository._BULK_COORDS_PER_QUERY", 2)
+        coords = [(29.0 + i, 101.88) for i in range(5)]
+        for lat, lon in coords:
+            memory_repo.upsert_weather_batch(lat, lon, date(2026, 2, 11), _hour_rows([0]))
+
+        df = memory_repo.query_weather_bulk(coords, date(2026, 2, 11), date(2026, 2, 11))
+        assert sorted(df["lat_rounded"]) == [lat for lat, _ in coords]
+
+    def test_bulk_empty_coords_returns_empty_frame(self, memory_repo):
+        """空坐标列表 → 空 DataFrame"""
+        df = memory_repo.query_weather_bulk([], date(2026, 2, 11), date(2026, 2, 11))
+        assert df.empty
+
+    def test_range_query_uses_coordinate_date_index(self, memory_repo):
+        """区间查询走 (lat, lon, date, hour) 索引而非全表扫描"""
+        plan = memory_repo._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM weather_cache "
+            "WHERE lat_rounded = ? AND lon_rounded = ? "
+            "AND forecast_date BETWEEN ? AND ? "
+            "ORDER BY forecast_date, forecast_hour",
+            (29.58, 101.88, "2026-02-11", "2026-02-12"),
+        ).fetchall()
+        detail = " ".join(row[-1] for row in plan)
+        assert "sqlite_autoindex_weather_cache" in detail
+        assert "TEMP B-TREE" not in detail
+
+
 # ==================== prediction_history ====================
 
 
@@ -183,6 +183,26 @@ class TestConfigManagerAccessors:
         assert conf["medium"] == [3, 4]
         assert conf["low"] == [5, 16]
 
+    def test_get_fetcher_config_defaults_to_empty(self, config_file):
+        """未配置 fetcher 段时 get_fetcher_config() 返回空 dict。"""
+        mgr = ConfigManager(config_path=config_file)
+        assert mgr.get_fetcher_config() == {}
+
+    def test_get_cache_sqlite_config_defaults_to_empty(self, config_file):
+        """未配置 cache.sqlite 时 get_cache_sqlite_config() 返回空 dict。"""
+        mgr = ConfigManager(config_path=config_file)
+        assert mgr.get_cache_sqlite_config() == {}
+
+    def test_get_cache_memory_config_defaults_to_empty(self, config_file):
+        """未配置 cache.memory 时 get_cache_memory_config() 返回空 dict。"""
+        mgr = ConfigManager(config_path=config_file)
+        assert mgr.get_cache_memory_config() == {}
+
+    def test_get_astro_config_defaults_to_empty(self, config_file):
+        """未配置 astro 段时 get_astro_config() 返回空 dict。"""
+        mgr = ConfigManager(config_path=config_file)
+        assert mgr.get_astro_config() == {}
+
     def test_get_output_config(self, config_file):
         """get_output_config() 返回输出路径配置。"""
         mgr = ConfigManager(config_path=config_file)
@@ -0,0 +1,139 @@
+"""tests/unit/test_fetch_planner.py — FetchPlanner 单元测试"""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from gmp.core.exceptions import ViewpointNotFoundError
+from gmp.core.fetch_planner import FetchPlan, FetchPlanner
+
+
+_GONGGA = (29.58, 101.88)
+_TARGET = ["cloud_cover_high", "cloud_cover_medium"]
+_PATH = ["cloud_cover_low", "cloud_cover_medium"]
+
+
+def _required(viewpoint_id: str, events=None):
+    """两个观景台共用贡嘎目标，vp_b 需要前一天数据"""
+    if viewpoint_id == "missing":
+        raise ViewpointNotFoundError(viewpoint_id)
+    return {
+        "vp_a": [((29.75, 102.35), 0, None), (_GONGGA, 0, _TARGET)],
+        "vp_b": [
+            ((29.751, 102.351), 1, None),
+            (_GONGGA, 0, _TARGET),
+            ((29.8, 102.4), 0, _PATH),
+        ],
+    }[viewpoint_id]
+
+
+def _build_planner() -> tuple[FetchPlanner, MagicMock, MagicMock]:
+    scheduler = MagicMock()
+    scheduler.required_points.side_effect = _required
+    fetcher = MagicMock()
+    fetcher.prefetch.side_effect = lambda coords, days, past_days, columns=None: {
+        "points": len(coords), "cache_hits": 1, "requests": 1,
+    }
+    return FetchPlanner(scheduler, fetcher), scheduler, fetcher
+
+
+class TestPlan:
+    """plan(): 全局去重，不发起请求"""
+
+    def test_dedupes_rounded_coords_across_viewpoints(self):
+        planner, _, fetcher = _build_planner()
+
+        plan = planner.plan(["vp_a", "vp_b"], days=3)
+
+        assert plan.references == 5
+        assert plan.viewpoints == 2
+        assert set(plan.points) == {(29.75, 102.35), _GONGGA, (29.8, 102.4)}
+        fetcher.prefetch.assert_not_called()
+
+    def test_past_days_takes_max(self):
+        """同一坐标取各观景台所需 past_days 的最大值"""
+        planner, _, _ = _build_planner()
+
+        plan = planner.plan(["vp_a", "vp_b"], days=3)
+
+        assert plan.points[(29.75, 102.35)] == 1
+        assert plan.points[_GONGGA] == 0
+
+    def test_duplicate_viewpoint_ids_planned_once(self):
+        """线路站点重复出现的观景台只规划一次"""
+        planner, scheduler, _ = _build_planner()
+
+        plan = planner.plan(["vp_a", "vp_b", "vp_a"], days=3)
+
+        assert scheduler.required_points.call_count == 2
+        assert plan.references == 5
+
+    def test_failed_viewpoint_recorded(self):
+        planner, _, _ = _build_planner()
+
+        plan = planner.plan(["vp_a", "missing"], days=3)
+
+        assert plan.failed_viewpoints == ["missing"]
+        assert plan.viewpoints == 1
+
+    def test_columns_union_per_coord(self):
+        """同一坐标不同投影取并集，任一需要全部字段 → None"""
+        plan = FetchPlan(days=1)
+        plan.add((1.0, 2.0), 0, _TARGET)
+        plan.add((1.0, 2.0), 0, _PATH)
+        plan.add((3.0, 4.0), 0, _PATH)
+        plan.add((3.0, 4.0), 0, None)
+
+        assert plan.columns[(1.0, 2.0)] == frozenset(_TARGET + _PATH)
+        assert plan.columns[(3.0, 4.0)] is None
+
+    def test_groups_by_past_days_and_columns(self):
+        plan = FetchPlan(days=1)
+        plan.add((1.0, 2.0), 0, None)
+        plan.add((3.0, 4.0), 1, None)
+        plan.add((5.0, 6.0), 0, None)
+        plan.add((7.0, 8.0), 0, _PATH)
+
+        assert plan.groups() == {
+            (0, None): [(1.0, 2.0), (5.0, 6.0)],
+            (1, None): [(3.0, 4.0)],
+            (0, frozenset(_PATH)): [(7.0, 8.0)],
+        }
+
+
+class TestExecute:
+    """execute(): 每个 (past_days, 列投影) 分组一次 prefetch"""
+
+    def test_one_prefetch_per_group(self):
+        planner, _, fetcher = _build_planner()
+        plan = planner.plan(["vp_a", "vp_b"], days=3)
+
+        stats = planner.execute(plan)
+
+        calls = {
+            (c.args[2], c.kwargs["columns"]): c.args[0]
+            for c in fetcher.prefetch.call_args_list
+        }
+        assert calls == {
+            (1, None): [(29.75, 102.35)],
+            (0, frozenset(_TARGET)): [_GONGGA],
+            (0, frozenset(_PATH)): [(29.8, 102.4)],
+        }
+        assert stats == {
+            "viewpoints": 2,
+            "references": 5,
+            "unique_points": 3,
+            "cache_hits": 3,
+            "requests": 3,
+            "failed_groups": 0,
+        }
+
+    def test_failed_group_counted_not_raised(self):
+        """单组预取失败不中断，评分阶段按原逻辑获取"""
+        planner, _, fetcher = _build_planner()
+        fetcher.prefetch.side_effect = RuntimeError("boom")
+
+        stats = planner.run(["vp_a"], days=1)
+
+        assert stats["failed_groups"] == 2
+        assert stats["requests"] == 0
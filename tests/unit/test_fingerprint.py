@@ -0,0 +1,85 @@
+"""tests/unit/test_fingerprint.py — 增量生成输入指纹 单元测试"""
+
+from datetime import date
+
+import pandas as pd
+
+from gmp.core.config_loader import EngineConfig
+from gmp.core.fingerprint import (
+    digest,
+    fetched_at_stamps,
+    forecast_day_from_dict,
+    forecast_day_to_dict,
+)
+from gmp.core.models import ForecastDay, ScoreResult
+
+
+class TestDigest:
+    """稳定摘要"""
+
+    def test_stable_across_calls(self):
+        assert digest(EngineConfig(), date(2026, 2, 11)) == digest(
+            EngineConfig(), date(2026, 2, 11)
+        )
+
+    def test_dict_key_order_irrelevant(self):
+        assert digest({"a": 1, "b": 2}) == digest({"b": 2, "a": 1})
+
+    def test_config_change_changes_digest(self):
+        assert digest(EngineConfig()) != digest(EngineConfig(light_path_count=5))
+
+
+class TestFetchedAtStamps:
+    """fetched_at 集合提取"""
+
+    def test_sorted_unique(self):
+        df = pd.DataFrame({"fetched_at": ["t2", "t1", "t2"]})
+
+        assert fetched_at_stamps([("local", df)]) == [("local", ["t1", "t2"])]
+
+    def test_empty_frame_has_no_stamps(self):
+        assert fetched_at_stamps([("local", pd.DataFrame())]) == [("local", [])]
+
+    def test_missing_column_returns_none(self):
+        """非空切片缺少 fetched_at → 无法判定"""
+        df = pd.DataFrame({"cloud_cover_total": [10]})
+
+        assert fetched_at_stamps([("local", df)]) is None
+
+    def test_missing_value_returns_none(self):
+        """部分行 fetched_at 为空 (刚获取的数据) → 无法判定"""
+        df = pd.DataFrame({"fetched_at": ["t1", None]})
+
+        assert fetched_at_stamps([("local", df)]) is None
+
+
+class TestForecastDayRoundtrip:
+    """ForecastDay 序列化"""
+
+    def test_roundtrip(self):
+        event = ScoreResult(
+            event_type="cloud_sea",
+            total_score=80,
+            status="Recommended",
+            breakdown={"gap": {"score": 50, "max": 50, "detail": "gap=800m"}},
+            time_window="05:00 - 10:00",
+            confidence="High",
+            highlights=["云海"],
+        )
+        day = ForecastDay(
+            date="2026-02-11",
+            summary="云海",
+            best_event=event,
+            events=[event],
+            confidence="High",
+        )
+
+        assert forecast_day_from_dict(forecast_day_to_dict(day)) == day
+
+    def test_roundtrip_without_best_event(self):
+        day = ForecastDay(
+            date="2026-02-11", summary="无", best_event=None, events=[],
+            confidence="Low",
+        )
+
+        assert forecast_day_from_dict(forecast_day_to_dict(day)) == day
@@ -19,6 +19,7 @@ def writer(tmp_path: Path) -> JSONFileWriter:
     return JSONFileWriter(
         output_dir=str(output_dir),
         archive_dir=str(archive_dir),
+        state_dir=str(tmp_path / "data" / "state"),
     )
 
 
@@ -117,6 +118,59 @@ class TestWriteViewpointTimeline:
             assert path.exists()
 
 
+# ── fingerprints ─────────────────────────────────────────
+
+
+class TestViewpointFingerprints:
+    @pytest.fixture(autouse=True)
+    def _published(self, writer: JSONFileWriter):
+        """指纹仅在输出目录已有该观景台 forecast.json 时有效"""
+        writer.write_viewpoint("vp001", {}, {})
+
+    def test_roundtrip(self, writer: JSONFileWriter):
+        """写入后可原样读回"""
+        entries = {"2026-02-12": {"fingerprint": "abc", "day": {"date": "2026-02-12"}}}
+        writer.write_viewpoint_fingerprints("vp001", entries)
+
+        assert writer.read_viewpoint_fingerprints("vp001") == entries
+
+    def test_stored_outside_output_and_archive(self, writer: JSONFileWriter):
+        """指纹写入 state_dir，不出现在发布目录与归档中"""
+        writer.write_viewpoint_fingerprints("vp001", {"2026-02-12": {}})
+        writer.archive("2026-02-14T00-00")
+
+        assert (Path(writer._state_dir) / "fingerprints" / "vp001.json").exists()
+        for root in (writer._output_dir, writer._archive_dir):
+            assert not list(Path(root).rglob("fingerprints*"))
+
+    def test_legacy_file_in_output_removed(self, writer: JSONFileWriter):
+        """旧版本写在发布目录中的 fingerprints.json 在下次写入时删除"""
+        legacy = Path(writer._output_dir) / "viewpoints" / "vp001" / "fingerprints.json"
+        legacy.write_text("{}", encoding="utf-8")
+
+        writer.write_viewpoint_fingerprints("vp001", {})
+
+        assert not legacy.exists()
+
+    def test_missing_output_ignores_fingerprints(self, writer: JSONFileWriter):
+        """输出目录缺少 forecast.json → 指纹无效 (全部重新生成)"""
+        writer.write_viewpoint_fingerprints("vp001", {"2026-02-12": {}})
+        (Path(writer._output_dir) / "viewpoints" / "vp001" / "forecast.json").unlink()
+
+        assert writer.read_viewpoint_fingerprints("vp001") == {}
+
+    def test_missing_file_returns_empty(self, writer: JSONFileWriter):
+        assert writer.read_viewpoint_fingerprints("vp001") == {}
+
+    def test_corrupt_file_returns_empty(self, writer: JSONFileWriter):
+        """损坏的文件视为无指纹 (全部重新评分)"""
+        path = Path(writer._state_dir) / "fingerprints" / "vp001.json"
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json", encoding="utf-8")
+
+        assert writer.read_viewpoint_fingerprints("vp001") == {}
+
+
 # ── write_route ──────────────────────────────────────────
 
 
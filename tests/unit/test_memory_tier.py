@@ -0,0 +1,112 @@
+"""tests/unit/test_memory_tier.py — MemoryTier 单元测试
+
+测试进程内 LRU 缓存层的命中、淘汰、TTL 过期与计数。
+"""
+
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from gmp.cache.memory_tier import MemoryTier
+
+
+def _key(i: int):
+    return MemoryTier.key(29.0 + i, 101.88, date(2026, 2, 11))
+
+
+class TestMemoryTier:
+    def test_get_after_put_hits(self):
+        """写入后读取命中, 返回同一对象"""
+        tier = MemoryTier(max_entries=4)
+        df = pd.DataFrame({"forecast_hour": [0]})
+        tier.put(_key(0), df)
+
+        assert tier.get(_key(0)) is df
+        assert tier.stats()["hits"] == 1
+
+    def test_missing_key_counts_miss(self):
+        """未写入的键 → None, 计入 misses"""
+        tier = MemoryTier(max_entries=4)
+        assert tier.get(_key(0)) is None
+        assert tier.stats()["misses"] == 1
+
+    def test_key_rounds_coordinates(self):
+        """键坐标 ROUND(2)"""
+        assert MemoryTier.key(29.5812, 101.8799, date(2026, 2, 11)) == (
+            29.58, 101.88, date(2026, 2, 11),
+        )
+
+    def test_evicts_least_recently_used(self):
+        """超出容量时淘汰最久未使用的条目"""
+        tier = MemoryTier(max_entries=2)
+        tier.put(_key(0), pd.DataFrame())
+        tier.put(_key(1), pd.DataFrame())
+        tier.get(_key(0))  # key0 变为最近使用
+        tier.put(_key(2), pd.DataFrame())
+
+        assert tier.get(_key(1)) is None
+        assert tier.get(_key(0)) is not None
+        assert tier.stats()["evictions"] == 1
+        assert len(tier) == 2
+
+    def test_expired_entry_is_miss(self):
+        """超过 TTL 的条目视为未命中并移除"""
+        tier = MemoryTier(max_entries=4, ttl_seconds=10)
+        with patch("gmp.cache.memory_tier.time.monotonic", return_value=100.0):
+            tier.put(_key(0), pd.DataFrame())
+        with patch("gmp.cache.memory_tier.time.monotonic", return_value=111.0):
+            assert tier.get(_key(0)) is None
+
+        stats = tier.stats()
+        assert stats["expirations"] == 1
+        assert stats["entries"] == 0
+
+    def test_zero_ttl_never_expires(self):
+        """ttl_seconds <= 0 → 不过期"""
+        tier = MemoryTier(max_entries=4, ttl_seconds=0)
+        with patch("gmp.cache.memory_tier.time.monotonic", return_value=0.0):
+            tier.put(_key(0), pd.DataFrame())
+        with patch("gmp.cache.memory_tier.time.monotonic", return_value=1e9):
+            assert tier.get(_key(0)) is not None
+
+    def test_invalidate_removes_entries(self):
+        """invalidate 移除指定条目, 不存在的键忽略"""
+        tier = MemoryTier(max_entries=4)
+        tier.put(_key(0), pd.DataFrame())
+        tier.invalidate([_key(0), _key(1)])
+        assert tier.get(_key(0)) is None
+
+    def test_put_skipped_when_invalidated_after_generation(self):
+        """读取开始后该键被 invalidate → put 放弃写入, 其他键不受影响"""
+        tier = MemoryTier(max_entries=4)
+        generation = tier.generation
+        tier.invalidate([_key(0)])
+
+        tier.put(_key(0), pd.DataFrame(), generation)
+        tier.put(_key(1), pd.DataFrame(), generation)
+
+        assert tier.get(_key(0)) is None
+        assert tier.get(_key(1)) is not None
+
+    def test_put_after_invalidate_with_fresh_generation(self):
+        """invalidate 之后取得的 generation 正常写入"""
+        tier = MemoryTier(max_entries=4)
+        tier.invalidate([_key(0)])
+        tier.put(_key(0), pd.DataFrame(), tier.generation)
+        assert tier.get(_key(0)) is not None
+
+    def test_pruned_records_reject_older_reads(self):
+        """失效记录过多被清空后，早于清空的读取一律不写回"""
+        tier = MemoryTier(max_entries=1)
+        generation = tier.generation
+        tier.invalidate([_key(i) for i in range(5)])
+
+        tier.put(_key(9), pd.DataFrame(), generation)
+        assert tier.get(_key(9)) is None
+
+    def test_invalid_max_entries_raises(self):
+        """max_entries <= 0 → ValueError"""
+        with pytest.raises(ValueError):
+            MemoryTier(max_entries=0)
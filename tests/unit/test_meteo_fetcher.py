@@ -5,13 +5,17 @@
 
 from __future__ import annotations
 
+import json
 import warnings
-from datetime import date
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
 import pytest
 
+from gmp.cache.blob_repository import BlobCacheRepository
+from gmp.cache.repository import CacheRepository
+from gmp.cache.weather_cache import WeatherCache
 from gmp.core.exceptions import APITimeoutError, DataDegradedWarning
 from gmp.data.meteo_fetcher import MeteoFetcher
 
@@ -44,11 +48,42 @@ SAMPLE_API_RESPONSE: dict = {
 }
 
 
+def _cache_from_days(get_day) -> MagicMock:
+    """由逐日读取函数 get_day(lat, lon, d) 构造 mock cache
+
+    get_range / get_bulk 按日调用 get_day 拼接，模拟单次区间/批量查询。
+    """
+    cache = MagicMock()
+    cache.get.side_effect = get_day
+
+    def _range(lat, lon, start, end):
+        frames = []
+        d = start
+        while d <= end:
+            df = get_day(lat, lon, d)
+            if df is not None:
+                frames.append(df)
+            d += timedelta(days=1)
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+    def _bulk(coords, start, end):
+        frames = {coord: _range(*coord, start, end) for coord in coords}
+        return {coord: df for coord, df in frames.items() if df is not None}
+
+    cache.get_range.side_effect = _range
+    cache.get_bulk.side_effect = _bulk
+    return cache
+
+
+def _miss_cache() -> MagicMock:
+    """所有日期均未命中的 mock cache"""
+    return _cache_from_days(lambda lat, lon, d: None)
+
+
 def _make_fetcher(cache: MagicMock | None = None, config: dict | None = None) -> MeteoFetcher:
     """创建 MeteoFetcher 实例，默认用 mock cache"""
     if cache is None:
-        cache = MagicMock()
-        cache.get.return_value = None  # 默认缓存未命中
+        cache = _miss_cache()  # 默认缓存未命中
     return MeteoFetcher(cache=cache, config=config)
 
 
@@ -113,6 +148,37 @@ class TestParseResponse:
         df = fetcher._parse_response(SAMPLE_API_RESPONSE)
         assert len(df) == 3
 
+    def test_parse_dates_across_midnight(self) -> None:
+        """跨日时间戳拆分为各自的日期与小时"""
+        response = {"hourly": {"time": ["2025-12-01T23:00", "2025-12-02T00:00"]}}
+        df = _make_fetcher()._parse_response(response)
+
+        assert df["forecast_date"].tolist() == ["2025-12-01", "2025-12-02"]
+        assert df["forecast_hour"].tolist() == [23, 0]
+
+    def test_parse_typed_columns(self) -> None:
+        """整数列保持 int64，含 null 的列为 float64 + NaN"""
+        hourly = dict(SAMPLE_API_RESPONSE["hourly"])
+        hourly["cloud_base"] = [3000.0, None, 2500.0]
+        df = _make_fetcher()._parse_response({"hourly": hourly})
+
+        assert df["forecast_hour"].dtype == "int64"
+        assert df["cloud_cover_total"].dtype == "int64"
+        assert df["cloud_base_altitude"].dtype == "float64"
+        assert pd.isna(df["cloud_base_altitude"].iloc[1])
+
+
+class TestDecodeJson:
+    """_decode_json: orjson 可选"""
+
+    def test_decodes_with_orjson_or_stdlib(self) -> None:
+        from gmp.data import meteo_fetcher
+
+        body = json.dumps(SAMPLE_API_RESPONSE).encode()
+        assert meteo_fetcher._decode_json(body) == SAMPLE_API_RESPONSE
+        with patch.object(meteo_fetcher, "orjson", None):
+            assert meteo_fetcher._decode_json(body) == SAMPLE_API_RESPONSE
+
 
 # ========================================================================
 # 2. 校验测试 — _validate_data
@@ -122,6 +188,17 @@ class TestParseResponse:
 class TestValidateData:
     """_validate_data 数据校验"""
 
+    def test_validates_in_place(self) -> None:
+        """原地修改并返回同一个 DataFrame"""
+        fetcher = _make_fetcher()
+        df = fetcher._parse_response(SAMPLE_API_RESPONSE)
+        df.loc[0, "cloud_cover_low"] = 150
+
+        result = fetcher._validate_data(df)
+
+        assert result is df
+        assert df["cloud_cover_low"].iloc[0] == 100
+
     def test_cloud_base_altitude_none_replaced(self) -> None:
         """cloud_base_altitude=None → 替换为 10000"""
         fetcher = _make_fetcher()
@@ -286,7 +363,6 @@ class TestCacheIntegration:
 
     def test_cache_hit_skips_api_call(self) -> None:
         """所有 days 天缓存全部命中时不调用 API"""
-        cache = MagicMock()
         cached_df = pd.DataFrame(
             {
                 "forecast_date": ["2025-12-01"],
@@ -307,7 +383,9 @@ class TestCacheIntegration:
             }
         )
         # 所有天都命中
-        cache.get.return_value = cached_df
+        cache = _cache_from_days(
+            lambda lat, lon, d: cached_df.assign(forecast_date=d.isoformat())
+        )
         fetcher = MeteoFetcher(cache=cache)
 
         with patch.object(fetcher, "_call_api") as mock_api:
@@ -317,8 +395,7 @@ class TestCacheIntegration:
             assert len(result) == 2
 
     def test_partial_cache_hit_calls_api(self) -> None:
-        """部分天缓存命中、部分缺失时，fallback 到 API 获取完整数据"""
-        cache = MagicMock()
+        """部分天缓存命中、部分缺失时，仅请求缺失日期并与缓存合并"""
         cached_df = pd.DataFrame(
             {
                 "forecast_date": ["2025-12-01"],
@@ -339,13 +416,134 @@ class TestCacheIntegration:
             }
         )
         # 第一天命中，第二天缺失
-        cache.get.side_effect = [cached_df, None]
+        first_day = datetime.now(timezone(timedelta(hours=8))).date()
+        cache = _cache_from_days(
+            lambda lat, lon, d: (
+                cached_df.assign(forecast_date=d.isoformat()) if d == first_day else None
+            )
+        )
         fetcher = MeteoFetcher(cache=cache)
 
         with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
             result = fetcher.fetch_hourly(29.75, 102.35, days=2)
             mock_api.assert_called_once()
-            assert len(result) == 3  # API 返回的完整数据
+            assert len(result) == 4  # 1 行缓存 + API 返回的 3 行
+
+
+class TestPartialRangeCache:
+    """缺失日期跨度计算与合并"""
+
+    @staticmethod
+    def _cache_with(hit_offsets: set[int]) -> MagicMock:
+        """仅 today + offset ∈ hit_offsets 的日期命中缓存"""
+        from datetime import datetime, timedelta, timezone
+
+        today = datetime.now(timezone(timedelta(hours=8))).date()
+
+        def _get(lat, lon, d):
+            offset = (d - today).days
+            if offset not in hit_offsets:
+                return None
+            return pd.DataFrame({
+                "forecast_date": [d.isoformat()],
+                "forecast_hour": [0],
+                "temperature_2m": [float(offset)],
+            })
+
+        return _cache_from_days(_get)
+
+    def test_missing_tail_requests_only_that_span(self) -> None:
+        """前 3 天命中、后 2 天缺失 → start_date/end_date 仅覆盖后 2 天"""
+        from datetime import datetime, timedelta, timezone
+
+        today = datetime.now(timezone(timedelta(hours=8))).date()
+        fetcher = MeteoFetcher(cache=self._cache_with({0, 1, 2}))
+
+        with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
+            fetcher.fetch_hourly(29.75, 102.35, days=5)
+
+        params = mock_api.call_args[0][1]
+        assert params["start_date"] == (today + timedelta(days=3)).isoformat()
+        assert params["end_date"] == (today + timedelta(days=4)).isoformat()
+        assert "forecast_days" not in params
+
+    def test_missing_today_uses_forecast_days(self) -> None:
+        """今天缺失 → forecast_days 截至最后缺失日, 保留 past_days"""
+        fetcher = MeteoFetcher(cache=self._cache_with({2, 3}))
+
+        with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
+            fetcher.fetch_hourly(29.75, 102.35, days=4, past_days=1)
+
+        params = mock_api.call_args[0][1]
+        assert params["forecast_days"] == 2
+        assert params["past_days"] == 1
+        assert "start_date" not in params
+
+    def test_cached_days_inside_span_are_replaced(self) -> None:
+        """跨度内的已缓存日期以新数据为准，跨度外的保留"""
+        fetcher = MeteoFetcher(cache=self._cache_with({0, 2}))
+
+        with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
+            result = fetcher.fetch_hourly(29.75, 102.35, days=4)
+
+        params = mock_api.call_args[0][1]
+        assert params["start_date"] < params["end_date"]
+        # day0 缓存 (1 行) + API 返回 (3 行)，day2 缓存位于跨度内被丢弃
+        assert len(result) == 4
+        assert 2.0 not in result["temperature_2m"].tolist()
+
+    def test_merged_result_sorted_by_date_and_hour(self) -> None:
+        """合并结果按 forecast_date / forecast_hour 排序"""
+        fetcher = MeteoFetcher(cache=self._cache_with({1}))
+
+        with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE):
+            result = fetcher.fetch_hourly(29.75, 102.35, days=2)
+
+        keys = list(zip(result["forecast_date"], result["forecast_hour"]))
+        assert keys == sorted(keys)
+
+    def test_batched_coords_grouped_by_span(self) -> None:
+        """批量模式: 缺失跨度相同的坐标合并为一次请求"""
+        fetcher = MeteoFetcher(cache=self._cache_with({0}), config={"batch_size": 10})
+        response = [SAMPLE_API_RESPONSE, SAMPLE_API_RESPONSE]
+
+        with patch.object(fetcher, "_call_api", return_value=response) as mock_api:
+            result = fetcher.fetch_multi_points([(29.75, 102.35), (30.0, 103.0)], days=3)
+
+        mock_api.assert_called_once()
+        params = mock_api.call_args[0][1]
+        assert params["latitude"] == "29.75,30.0"
+        assert "start_date" in params
+        assert len(result[(30.0, 103.0)]) == 4
+
+
+class TestRevalidate:
+    """stale-while-revalidate 后台刷新回调"""
+
+    def test_registers_revalidator_with_cache(self) -> None:
+        """构造时向缓存注册刷新函数"""
+        fetcher = _make_fetcher()
+        fetcher._cache.set_revalidator.assert_called_once_with(fetcher._revalidate)
+
+    def test_revalidate_fetches_span_and_stores(self) -> None:
+        """刷新过期日期: 仅请求该跨度并写回缓存"""
+        fetcher = _make_fetcher()
+        today = datetime.now(timezone(timedelta(hours=8))).date()
+        dates = [today + timedelta(days=2), today + timedelta(days=3)]
+
+        with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
+            fetcher._revalidate(29.75, 102.35, dates)
+
+        params = mock_api.call_args[0][1]
+        assert params["start_date"] == dates[0].isoformat()
+        assert params["end_date"] == dates[1].isoformat()
+        fetcher._cache.set_many.assert_called_once()
+
+    def test_close_waits_for_revalidation(self) -> None:
+        """close() 先等待后台刷新完成"""
+        fetcher = _make_fetcher()
+        fetcher.close()
+        fetcher._cache.wait_revalidation.assert_called_once()
 
 
 # ========================================================================
@@ -360,8 +558,7 @@ class TestErrorHandling:
         """API 超时 → 抛出 APITimeoutError"""
         import httpx
 
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache, config={"retries": 0})
 
         with patch.object(
@@ -374,8 +571,7 @@ class TestErrorHandling:
 
     def test_api_invalid_format_raises_error(self) -> None:
         """API 返回格式无效 → 合理错误"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         with patch.object(fetcher, "_call_api", return_value={"bad": "data"}):
@@ -386,8 +582,7 @@ class TestErrorHandling:
         """第 1 次超时, 第 2 次成功 → 返回正常数据"""
         import httpx
 
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(
             cache=cache,
             config={"retries": 2, "retry_delay": 0, "connect_timeout": 5, "read_timeout": 15},
@@ -402,7 +597,7 @@ class TestErrorHandling:
                 raise httpx.TimeoutException("timeout")
             response = MagicMock()
             response.status_code = 200
-            response.json.return_value = SAMPLE_API_RESPONSE
+            response.content = json.dumps(SAMPLE_API_RESPONSE).encode()
             response.raise_for_status = MagicMock()
             return response
 
@@ -415,8 +610,7 @@ class TestErrorHandling:
         """重试次数耗尽 → 抛出 APITimeoutError"""
         import httpx
 
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(
             cache=cache,
             config={"retries": 2, "retry_delay": 0, "connect_timeout": 5, "read_timeout": 15},
@@ -437,8 +631,7 @@ class TestPastDays:
 
     def test_past_days_included_in_api_request(self) -> None:
         """past_days=1 → API 请求包含 past_days=1"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
@@ -449,8 +642,7 @@ class TestPastDays:
 
     def test_past_days_zero_not_included(self) -> None:
         """past_days=0 → API 请求不含 past_days 或为 0"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
@@ -470,8 +662,7 @@ class TestFetchHistorical:
 
     def test_uses_archive_api_url(self) -> None:
         """使用 Archive API URL"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
@@ -482,8 +673,7 @@ class TestFetchHistorical:
 
     def test_passes_start_and_end_date(self) -> None:
         """正确传入 start_date 和 end_date"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE) as mock_api:
@@ -495,8 +685,7 @@ class TestFetchHistorical:
 
     def test_returns_dataframe_with_same_format(self) -> None:
         """返回 DataFrame 格式与 fetch_hourly 一致"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         with patch.object(fetcher, "_call_api", return_value=SAMPLE_API_RESPONSE):
@@ -516,8 +705,7 @@ class TestFetchMultiPoints:
 
     def test_deduplicates_by_rounded_coords(self) -> None:
         """坐标去重: 3 个坐标, 2 个 ROUND(2) 后相同 → 实际请求 2 个"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         coords = [
@@ -532,8 +720,7 @@ class TestFetchMultiPoints:
 
     def test_returns_dict_keyed_by_rounded_coords(self) -> None:
         """返回字典 key 为 rounded 坐标"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         coords = [(29.7511, 102.3522)]
@@ -544,8 +731,7 @@ class TestFetchMultiPoints:
 
     def test_empty_coords_returns_empty_dict(self) -> None:
         """空坐标列表 → 返回空字典"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(cache=cache)
 
         result = fetcher.fetch_multi_points([], days=1)
@@ -564,8 +750,7 @@ class TestRateLimiting:
         """两次 _call_api 之间间隔 ≥ min_request_interval"""
         import httpx as _httpx
 
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(
             cache=cache,
             config={"min_request_interval": 0.1, "retries": 0},
@@ -578,7 +763,7 @@ class TestRateLimiting:
             call_times.append(time.monotonic())
             response = MagicMock()
             response.status_code = 200
-            response.json.return_value = SAMPLE_API_RESPONSE
+            response.content = json.dumps(SAMPLE_API_RESPONSE).encode()
             response.raise_for_status = MagicMock()
             return response
 
@@ -590,10 +775,41 @@ class TestRateLimiting:
         interval = call_times[1] - call_times[0]
         assert interval >= 0.09  # 允许微小误差
 
+    def test_throttle_spaces_concurrent_threads(self) -> None:
+        """多线程共用实例时，请求发起时刻仍间隔 ≥ min_request_interval"""
+        import threading
+        import time
+
+        fetcher = MeteoFetcher(
+            cache=_miss_cache(),
+            config={"min_request_interval": 0.05, "retries": 0},
+        )
+        call_times: list[float] = []
+
+        def _mock_get(*args, **kwargs):
+            call_times.append(time.monotonic())
+            response = MagicMock()
+            response.content = json.dumps(SAMPLE_API_RESPONSE).encode()
+            return response
+
+        with patch.object(fetcher._client, "get", side_effect=_mock_get):
+            threads = [
+                threading.Thread(target=fetcher._call_api, args=("http://test", {}))
+                for _ in range(4)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        call_times.sort()
+        gaps = [b - a for a, b in zip(call_times, call_times[1:])]
+        assert len(call_times) == 4
+        assert min(gaps) >= 0.045
+
     def test_throttle_disabled_when_zero(self) -> None:
         """min_request_interval=0 时不节流"""
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(
             cache=cache,
             config={"min_request_interval": 0, "retries": 0},
@@ -606,7 +822,7 @@ class TestRateLimiting:
             call_times.append(time.monotonic())
             response = MagicMock()
             response.status_code = 200
-            response.json.return_value = SAMPLE_API_RESPONSE
+            response.content = json.dumps(SAMPLE_API_RESPONSE).encode()
             response.raise_for_status = MagicMock()
             return response
 
@@ -622,8 +838,7 @@ class TestRateLimiting:
         """HTTP 429 → 自动退避重试，最终成功"""
         import httpx as _httpx
 
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(
             cache=cache,
             config={
@@ -652,7 +867,7 @@ class TestRateLimiting:
                 )
             response = MagicMock()
             response.status_code = 200
-            response.json.return_value = SAMPLE_API_RESPONSE
+            response.content = json.dumps(SAMPLE_API_RESPONSE).encode()
             response.raise_for_status = MagicMock()
             return response
 
@@ -666,8 +881,7 @@ class TestRateLimiting:
         """多次调用使用同一个 httpx.Client 实例"""
         import httpx as _httpx
 
-        cache = MagicMock()
-        cache.get.return_value = None
+        cache = _miss_cache()
         fetcher = MeteoFetcher(
             cache=cache,
             config={"min_request_interval": 0, "retries": 0},
@@ -681,7 +895,7 @@ class TestRateLimiting:
         def _mock_get(*args, **kwargs):
             response = MagicMock()
             response.status_code = 200
-            response.json.return_value = SAMPLE_API_RESPONSE
+            response.content = json.dumps(SAMPLE_API_RESPONSE).encode()
             response.raise_for_status = MagicMock()
             return response
 
@@ -690,3 +904,489 @@ class TestRateLimiting:
             fetcher._call_api("http://test", {"a": 2})
 
         assert fetcher._client is client_ref
+
+    def test_host_limiter_shared_across_instances(self, tmp_path) -> None:
+        """两个实例指向同一 host_rate_limit 文件 → 共用日配额, 用尽后抛出"""
+        from gmp.core import metrics
+        from gmp.core.exceptions import RateBudgetExceededError
+
+        config = {
+            "min_request_interval": 0,
+            "retries": 0,
+            "host_rate_limit": {
+                "db_path": str(tmp_path / "rate.db"),
+                "per_minute": 6000,
+                "per_day": 2,
+                "burst": 5,
+            },
+        }
+        first = _make_fetcher(config=config)
+        second = _make_fetcher(config=config)
+
+        def _mock_get(*args, **kwargs):
+            response = MagicMock()
+            response.content = json.dumps(SAMPLE_API_RESPONSE).encode()
+            return response
+
+        with metrics.scope() as m:
+            with patch.object(first._client, "get", side_effect=_mock_get), \
+                 patch.object(second._client, "get", side_effect=_mock_get) as get:
+                first._call_api("http://test", {})
+                second._call_api("http://test", {})
+                with pytest.raises(RateBudgetExceededError):
+                    second._call_api("http://test", {})
+
+        assert get.call_count == 1
+        assert m.snapshot()["timers"]["fetcher.host_wait"]["count"] == 2
+        first.close()
+        second.close()
+
+
+# ========================================================================
+# 9. 多坐标合并请求测试
+# ========================================================================
+
+
+def _location_response(temperature: float) -> dict:
+    """单个坐标的响应 (多坐标响应数组中的一个元素)"""
+    hourly = dict(SAMPLE_API_RESPONSE["hourly"])
+    hourly["temperature_2m"] = [temperature] * len(hourly["time"])
+    return {"hourly": hourly}
+
+
+class TestBatchedMultiPoints:
+    """batch_size > 1 时 fetch_multi_points 合并请求"""
+
+    def test_missing_coords_packed_into_one_request(self) -> None:
+        """2 个未命中坐标 + batch_size=10 → 1 次请求, 逗号分隔坐标"""
+        fetcher = _make_fetcher(config={"batch_size": 10})
+        response = [_location_response(1.0), _location_response(2.0)]
+
+        with patch.object(fetcher, "_call_api", return_value=response) as mock_api:
+            result = fetcher.fetch_multi_points(
+                [(29.75, 102.35), (30.0, 103.0)], days=1
+            )
+
+        mock_api.assert_called_once()
+        params = mock_api.call_args[0][1]
+        assert params["latitude"] == "29.75,30.0"
+        assert params["longitude"] == "102.35,103.0"
+        assert result[(29.75, 102.35)]["temperature_2m"].iloc[0] == 1.0
+        assert result[(30.0, 103.0)]["temperature_2m"].iloc[0] == 2.0
+
+    def test_chunks_by_batch_size(self) -> None:
+        """5 个未命中坐标 + batch_size=2 → 3 次请求"""
+        fetcher = _make_fetcher(config={"batch_size": 2})
+        coords = [(29.0 + i, 102.0) for i in range(5)]
+
+        def _fake_call(url, params):
+            n = len(params["latitude"].split(","))
+            return [_location_response(0.0) for _ in range(n)]
+
+        with patch.object(fetcher, "_call_api", side_effect=_fake_call) as mock_api:
+            result = fetcher.fetch_multi_points(coords, days=1)
+
+        assert mock_api.call_count == 3
+        assert list(result) == coords
+
+    def test_cached_coords_excluded_from_request(self) -> None:
+        """已缓存坐标不进入合并请求"""
+        cached_df = pd.DataFrame({"forecast_date": ["2025-12-01"], "forecast_hour": [0]})
+
+        def _get(lat, lon, d):
+            if (lat, lon) != (29.75, 102.35):
+                return None
+            return cached_df.assign(forecast_date=d.isoformat())
+
+        cache = _cache_from_days(_get)
+        fetcher = MeteoFetcher(cache=cache, config={"batch_size": 10})
+
+        with patch.object(
+            fetcher, "_call_api", return_value=_location_response(3.0)
+        ) as mock_api:
+            result = fetcher.fetch_multi_points(
+                [(29.75, 102.35), (30.0, 103.0)], days=1
+            )
+
+        params = mock_api.call_args[0][1]
+        assert params["latitude"] == "30.0"
+        assert result[(29.75, 102.35)] is not None
+        assert result[(30.0, 103.0)]["temperature_2m"].iloc[0] == 3.0
+
+    def test_each_location_written_to_cache(self) -> None:
+        """合并请求的全部坐标一次写入缓存"""
+        fetcher = _make_fetcher(config={"batch_size": 10})
+        response = [_location_response(1.0), _location_response(2.0)]
+
+        with patch.object(fetcher, "_call_api", return_value=response):
+            fetcher.fetch_multi_points([(29.75, 102.35), (30.0, 103.0)], days=1)
+
+        fetcher._cache.set_many.assert_called_once()
+        written = fetcher._cache.set_many.call_args.args[0]
+        assert set(written) == {(29.75, 102.35), (30.0, 103.0)}
+
+    def test_response_count_mismatch_raises(self) -> None:
+        """返回的坐标数量与请求不一致 → ValueError"""
+        fetcher = _make_fetcher(config={"batch_size": 10})
+
+        with patch.object(fetcher, "_call_api", return_value=[_location_response(1.0)]):
+            with pytest.raises(ValueError):
+                fetcher.fetch_multi_points([(29.75, 102.35), (30.0, 103.0)], days=1)
+
+    def test_batches_balanced(self) -> None:
+        """5 个未命中坐标 + batch_size=4 → 2 次请求, 3/2 均分而非 4/1"""
+        fetcher = _make_fetcher(config={"batch_size": 4})
+        coords = [(29.0 + i, 102.0) for i in range(5)]
+        sizes: list[int] = []
+
+        def _fake_call(url, params):
+            n = len(params["latitude"].split(","))
+            sizes.append(n)
+            return [_location_response(0.0) for _ in range(n)]
+
+        with patch.object(fetcher, "_call_api", side_effect=_fake_call):
+            fetcher.fetch_multi_points(coords, days=1)
+
+        assert sorted(sizes) == [2, 3]
+
+    def test_past_days_passed_to_request(self) -> None:
+        """fetch_multi_points 透传 past_days"""
+        fetcher = _make_fetcher(config={"batch_size": 10})
+
+        with patch.object(
+            fetcher, "_call_api", return_value=_location_response(1.0)
+        ) as mock_api:
+            fetcher.fetch_multi_points([(29.75, 102.35)], days=1, past_days=1)
+
+        assert mock_api.call_args[0][1]["past_days"] == 1
+
+
+class TestBalancedChunks:
+    """_balanced_chunks 均分批次"""
+
+    def test_min_batches_equal_sizes(self) -> None:
+        chunks = MeteoFetcher._balanced_chunks(list(range(101)), 50)
+        assert [len(c) for c in chunks] == [34, 34, 33]
+        assert [x for c in chunks for x in c] == list(range(101))
+
+    def test_single_batch(self) -> None:
+        assert MeteoFetcher._balanced_chunks([1, 2], 50) == [[1, 2]]
+
+
+class TestPrefetch:
+    """prefetch 只预热缓存并返回统计"""
+
+    def test_returns_stats_and_writes_cache(self) -> None:
+        fetcher = _make_fetcher(config={"batch_size": 10})
+        response = [_location_response(1.0), _location_response(2.0)]
+
+        with patch.object(fetcher, "_call_api", return_value=response):
+            stats = fetcher.prefetch(
+                [(29.751, 102.351), (29.75, 102.35), (30.0, 103.0)], days=1
+            )
+
+        assert stats == {"points": 2, "cache_hits": 0, "requests": 1}
+        fetcher._cache.set_many.assert_called_once()
+
+    def test_all_cached_no_request(self) -> None:
+        cached_df = pd.DataFrame({"forecast_date": ["2025-12-01"], "forecast_hour": [0]})
+        cache = _cache_from_days(
+            lambda lat, lon, d: cached_df.assign(forecast_date=d.isoformat())
+        )
+        fetcher = MeteoFetcher(cache=cache, config={"batch_size": 10})
+
+        with patch.object(fetcher, "_call_api") as mock_api:
+            stats = fetcher.prefetch([(29.75, 102.35)], days=1)
+
+        mock_api.assert_not_called()
+        assert stats == {"points": 1, "cache_hits": 1, "requests": 0}
+
+    def test_empty_coords(self) -> None:
+        assert _make_fetcher().prefetch([]) == {
+            "points": 0, "cache_hits": 0, "requests": 0,
+        }
+
+
+# ========================================================================
+# 10. 列投影测试
+# ========================================================================
+
+
+def _projected_response(**fields: list) -> dict:
+    """只含部分 hourly 字段的响应"""
+    return {"hourly": {"time": SAMPLE_API_RESPONSE["hourly"]["time"], **fields}}
+
+
+def _full_day(d: date, **overrides) -> pd.DataFrame:
+    """完整 24 小时缓存行 (全部列有值)"""
+    df = MeteoFetcher(cache=_miss_cache())._parse_response(SAMPLE_API_RESPONSE)
+    df = df.assign(forecast_date=d.isoformat())
+    for col, value in overrides.items():
+        df[col] = value
+    return df
+
+
+class TestColumnProjection:
+    """columns 投影: 只请求声明的字段，缓存按列判断命中"""
+
+    def test_requests_only_projected_fields(self) -> None:
+        """columns → hourly 只含对应 Open-Meteo 字段名"""
+        fetcher = _make_fetcher(config={"batch_size": 10})
+        response = _projected_response(cloud_cover_low=[10, 20, 30], cloud_cover_mid=[1, 2, 3])
+
+        with patch.object(fetcher, "_call_api", return_value=response) as mock_api:
+            result = fetcher.fetch_multi_points(
+                [(29.75, 102.35)],
+                days=1,
+                columns=["cloud_cover_low", "cloud_cover_medium"],
+            )
+
+        assert mock_api.call_args[0][1]["hourly"] == "cloud_cover_low,cloud_cover_mid"
+        df = result[(29.75, 102.35)]
+        assert list(df.columns) == [
+            "forecast_date", "forecast_hour", "cloud_cover_low", "cloud_cover_medium",
+        ]
+
+    def test_projected_columns_not_filled_with_defaults(self) -> None:
+        """未请求的列不被校验默认值填充 (否则缓存误判为已获取)"""
+        fetcher = _make_fetcher(config={"batch_size": 10})
+
+        with patch.object(
+            fetcher, "_call_api", return_value=_projected_response(cloud_cover_low=[1, 2, 3])
+        ):
+            fetcher.fetch_multi_points([(29.75, 102.35)], days=1, columns=["cloud_cover_low"])
+
+        written = fetcher._cache.set_many.call_args.args[0][(29.75, 102.35)]
+        assert "visibility" not in written.columns
+        assert "cloud_base_altitude" not in written.columns
+
+    def test_cached_projection_satisfies_subset(self) -> None:
+        """缓存中投影列有值 → 命中，其余列为空也不影响"""
+        today = datetime.now(timezone(timedelta(hours=8))).date()
+        cache = _cache_from_days(
+            lambda lat, lon, d: _full_day(d, visibility=None, temperature_2m=None)
+        )
+        fetcher = MeteoFetcher(cache=cache, config={"batch_size": 10})
+
+        with patch.object(fetcher, "_call_api") as mock_api:
+            result = fetcher.fetch_multi_points(
+                [(29.75, 102.35)], days=1, columns=["cloud_cover_low"]
+            )
+
+        mock_api.assert_not_called()
+        assert result[(29.75, 102.35)]["forecast_date"].iloc[0] == today.isoformat()
+
+    def test_missing_projected_column_is_cache_miss(self) -> None:
+        """缓存中所需列全部为空 (由其他投影写入) → 视为未命中并重新请求"""
+        cache = _cache_from_days(lambda lat, lon, d: _full_day(d, visibility=None))
+        fetcher = MeteoFetcher(cache=cache, config={"batch_size": 10})
+
+        with patch.object(
+            fetcher, "_call_api", return_value=_location_response(1.0)
+        ) as mock_api:
+            fetcher.fetch_multi_points([(29.75, 102.35)], days=1)
+
+        mock_api.assert_called_once()
+
+    def test_refetch_keeps_cached_columns(self) -> None:
+        """重新获取时一并请求缓存中已有值的列，整行覆盖不丢失其他投影"""
+        cache = _cache_from_days(
+            lambda lat, lon, d: _full_day(d, cloud_cover_low=None).drop(
+                columns=["temperature_2m", "visibility"]
+            ).assign(cloud_cover_total=None, relative_humidity_2m=None)
+        )
+        fetcher = MeteoFetcher(cache=cache, config={"batch_size": 10})
+
+        with patch.object(
+            fetcher, "_call_api", return_value=_location_response(1.0)
+        ) as mock_api:
+            fetcher.fetch_multi_points([(29.75, 102.35)], days=1, columns=["cloud_cover_low"])
+
+        fields = mock_api.call_args[0][1]["hourly"].split(",")
+        assert "cloud_cover_low" in fields
+        assert "cloud_cover_high" in fields
+        assert "cloud_cover" not in fields
+
+    def test_unknown_column_raises(self) -> None:
+        with pytest.raises(ValueError):
+            _make_fetcher().fetch_multi_points([(29.75, 102.35)], columns=["cloud_cover_mid"])
+
+
+def _today_response(**overrides: list) -> dict:
+    """今天 (北京时间) 3 个小时的完整响应，overrides 替换对应字段"""
+    today = datetime.now(timezone(timedelta(hours=8))).date().isoformat()
+    hourly = {
+        **SAMPLE_API_RESPONSE["hourly"],
+        "time": [f"{today}T{h:02d}:00" for h in range(3)],
+        **overrides,
+    }
+    return {"hourly": hourly}
+
+
+@pytest.fixture(params=[CacheRepository, BlobCacheRepository], ids=["rows", "blob"])
+def real_cache(request):
+    """真实 SQLite 缓存 (两种存储后端)"""
+    repo = request.param(":memory:")
+    yield WeatherCache(repo)
+    repo.close()
+
+
+class TestFetchedNullColumns:
+    """已请求但上游返回全空的列视为已获取，不反复重新请求"""
+
+    def test_all_null_column_is_cache_hit(self, real_cache) -> None:
+        """columns=None: temperature_2m 全为 null 的日期第二次读取命中缓存"""
+        fetcher = MeteoFetcher(cache=real_cache, config={"batch_size": 10})
+        response = _today_response(temperature_2m=[None, None, None])
+
+        with patch.object(fetcher, "_call_api", return_value=response) as mock_api:
+            fetcher.fetch_multi_points([(29.75, 102.35)], days=1)
+            result = fetcher.fetch_multi_points([(29.75, 102.35)], days=1)
+
+        mock_api.assert_called_once()
+        assert result[(29.75, 102.35)]["temperature_2m"].isna().all()
+
+    def test_projection_marks_only_requested_fields(self, real_cache) -> None:
+        """投影请求的列为空也命中，未请求的列仍视为缺失"""
+        fetcher = MeteoFetcher(cache=real_cache, config={"batch_size": 10})
+        projected = _projected_response(cloud_cover_low=[None, None, None])
+        projected["hourly"]["time"] = _today_response()["hourly"]["time"]
+
+        with patch.object(fetcher, "_call_api", return_value=projected) as mock_api:
+            fetcher.prefetch([(29.75, 102.35)], days=1, columns=["cloud_cover_low"])
+            fetcher.prefetch([(29.75, 102.35)], days=1, columns=["cloud_cover_low"])
+        mock_api.assert_called_once()
+
+        with patch.object(
+            fetcher, "_call_api", return_value=_today_response()
+        ) as mock_api:
+            fetcher.prefetch([(29.75, 102.35)], days=1, columns=["visibility"])
+        fields = mock_api.call_args[0][1]["hourly"].split(",")
+        assert fields == ["cloud_cover_low", "visibility"]
+
+
+# ========================================================================
+# 11. single-flight 请求合并测试
+# ========================================================================
+
+
+class TestSingleFlightCoalescing:
+    """并发线程缺失相同坐标时只请求一次"""
+
+    @staticmethod
+    def _run_concurrently(fetcher: MeteoFetcher, calls) -> tuple[list, MagicMock]:
+        """第一个调用的 API 请求阻塞期间发起其余调用，返回各调用结果"""
+        import threading
+        import time
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def _slow_call(url, params):
+            started.set()
+            release.wait(2)
+            n = len(str(params["latitude"]).split(","))
+            response = [_location_response(1.0) for _ in range(n)]
+            return response[0] if n == 1 else response
+
+        results: list = [None] * len(calls)
+
+        def _worker(i, fn):
+            results[i] = fn()
+
+        with patch.object(fetcher, "_call_api", side_effect=_slow_call) as mock_api:
+            threads = [threading.Thread(target=_worker, args=(0, calls[0]))]
+            threads[0].start()
+            assert started.wait(2)
+            for i, fn in enumerate(calls[1:], start=1):
+                threads.append(threading.Thread(target=_worker, args=(i, fn)))
+                threads[-1].start()
+            time.sleep(0.1)  # 让后来者完成登记并开始等待
+            release.set()
+            for t in threads:
+                t.join(2)
+        return results, mock_api
+
+    def test_concurrent_multi_points_share_one_request(self) -> None:
+        from gmp.core import metrics
+
+        fetcher = _make_fetcher(config={"batch_size": 10, "min_request_interval": 0})
+        coords = [(29.75, 102.35)]
+        before = metrics.snapshot()["counters"].get("fetcher.coalesced", 0)
+
+        results, mock_api = self._run_concurrently(
+            fetcher,
+            [lambda: fetcher.fetch_multi_points(coords, days=1)] * 3,
+        )
+
+        assert mock_api.call_count == 1
+        assert metrics.snapshot()["counters"]["fetcher.coalesced"] - before == 2
+        for result in results:
+            assert result[(29.75, 102.35)]["temperature_2m"].iloc[0] == 1.0
+        # 各调用方拿到独立的 DataFrame
+        assert results[1][(29.75, 102.35)] is not results[2][(29.75, 102.35)]
+        assert fetcher._flights.in_flight() == 0
+
+    def test_fetch_hourly_coalesces_with_multi_points(self) -> None:
+        """fetch_hourly 与全字段 fetch_multi_points 共享同一 key"""
+        fetcher = _make_fetcher(config={"batch_size": 10, "min_request_interval": 0})
+
+        results, mock_api = self._run_concurrently(
+            fetcher,
+            [
+                lambda: fetcher.fetch_hourly(29.75, 102.35, days=1),
+                lambda: fetcher.fetch_multi_points([(29.75, 102.35)], days=1),
+            ],
+        )
+
+        assert mock_api.call_count == 1
+        assert len(results[0]) == len(results[1][(29.75, 102.35)]) == 3
+
+    def test_different_projection_not_coalesced(self) -> None:
+        """请求字段不同 → 不同 key，各自请求"""
+        fetcher = _make_fetcher(config={"batch_size": 10, "min_request_interval": 0})
+
+        _, mock_api = self._run_concurrently(
+            fetcher,
+            [
+                lambda: fetcher.fetch_multi_points([(29.75, 102.35)], days=1),
+                lambda: fetcher.fetch_multi_points(
+                    [(29.75, 102.35)], days=1, columns=["cloud_cover_low"]
+                ),
+            ],
+        )
+
+        assert mock_api.call_count == 2
+
+    def test_leader_failure_shared_with_waiters(self) -> None:
+        """负责请求的线程失败 → 等待者收到同一异常，key 被释放"""
+        import threading
+        import time
+
+        fetcher = _make_fetcher(config={"batch_size": 10, "min_request_interval": 0})
+        errors: list[Exception] = []
+        started = threading.Event()
+
+        def _failing_call(url, params):
+            started.set()
+            time.sleep(0.2)  # 让第二个线程完成登记并开始等待
+            raise APITimeoutError("open-meteo", 15)
+
+        def _worker():
+            try:
+                fetcher.fetch_multi_points([(29.75, 102.35)], days=1)
+            except APITimeoutError as exc:
+                errors.append(exc)
+
+        with patch.object(fetcher, "_call_api", side_effect=_failing_call) as mock_api:
+            first = threading.Thread(target=_worker)
+            first.start()
+            assert started.wait(2)
+            second = threading.Thread(target=_worker)
+            second.start()
+            first.join(2)
+            second.join(2)
+
+        assert mock_api.call_count == 1
+        assert len(errors) == 2
+        assert fetcher._flights.in_flight() == 0
@@ -0,0 +1,164 @@
+"""tests/unit/test_metrics.py — 运行指标 (计时器/计数器) 单元测试"""
+
+import asyncio
+import threading
+
+import pytest
+
+from gmp.core import metrics
+from gmp.core.metrics import Metrics
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestMetrics:
+    """计时器与计数器"""
+
+    def test_observe_aggregates(self):
+        m = Metrics()
+        m.observe("stage", 0.1)
+        m.observe("stage", 0.3)
+
+        timer = m.snapshot()["timers"]["stage"]
+        assert timer["count"] == 2
+        assert timer["total_s"] == pytest.approx(0.4)
+        assert timer["avg_ms"] == pytest.approx(200.0)
+        assert timer["max_ms"] == pytest.approx(300.0)
+
+    def test_incr(self):
+        m = Metrics()
+        m.incr("hits")
+        m.incr("hits", 4)
+
+        assert m.counter("hits") == 5
+        assert m.counter("missing") == 0
+
+    def test_concurrent_incr(self):
+        """多线程累加不丢失"""
+        def _work():
+            for _ in range(1000):
+                metrics.incr("n")
+
+        threads = [threading.Thread(target=_work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert metrics.snapshot()["counters"]["n"] == 8000
+
+
+class TestTimers:
+    """模块级计时接口"""
+
+    def test_timer_records_on_exception(self):
+        """异常退出同样计入耗时"""
+        with pytest.raises(ValueError):
+            with metrics.timer("boom"):
+                raise ValueError
+
+        assert metrics.snapshot()["timers"]["boom"]["count"] == 1
+
+    def test_timed_decorator(self):
+        @metrics.timed("fn")
+        def fn(x):
+            return x * 2
+
+        assert fn(3) == 6
+        assert metrics.snapshot()["timers"]["fn"]["count"] == 1
+
+    def test_reset_clears(self):
+        metrics.incr("a")
+        metrics.reset()
+
+        assert metrics.snapshot() == {"timers": {}, "counters": {}}
+
+
+class TestScope:
+    """线程内局部指标"""
+
+    def test_scope_collects_alongside_global(self):
+        with metrics.scope() as local:
+            metrics.incr("cache.hits", 2)
+
+        metrics.incr("cache.hits")
+        assert local.counter("cache.hits") == 2
+        assert metrics.snapshot()["counters"]["cache.hits"] == 3
+
+    def test_scope_ignores_other_threads(self):
+        """其他线程的记录不进入本线程 scope"""
+        with metrics.scope() as local:
+            t = threading.Thread(target=lambda: metrics.incr("cache.hits"))
+            t.start()
+            t.join()
+
+        assert local.counter("cache.hits") == 0
+        assert metrics.snapshot()["counters"]["cache.hits"] == 1
+
+    def test_adopt_records_into_caller_scope_on_other_thread(self):
+        """current_scopes() + adopt() → 其他线程代为记录的指标计入调用方 scope"""
+        with metrics.scope() as local:
+            scopes = metrics.current_scopes()
+
+            def _work():
+                with metrics.adopt(scopes):
+                    metrics.incr("fetcher.requests")
+
+            t = threading.Thread(target=_work)
+            t.start()
+            t.join()
+
+        assert local.counter("fetcher.requests") == 1
+
+    def test_adopt_does_not_double_count_active_scope(self):
+        """已生效的 scope 再次 adopt 不重复计数"""
+        with metrics.scope() as local:
+            with metrics.adopt(metrics.current_scopes()):
+                metrics.incr("fetcher.requests")
+
+        assert local.counter("fetcher.requests") == 1
+
+    def test_concurrent_tasks_keep_separate_scopes(self):
+        """同一事件循环上的并发任务各自 adopt 的 scope 互不串扰"""
+        a, b = Metrics(), Metrics()
+
+        async def _task(scope: Metrics, n: int) -> None:
+            with metrics.adopt((scope,)):
+                for _ in range(n):
+                    metrics.incr("fetcher.requests")
+                    await asyncio.sleep(0)
+
+        async def _main() -> None:
+            await asyncio.gather(_task(a, 3), _task(b, 5))
+
+        asyncio.run(_main())
+        assert a.counter("fetcher.requests") == 3
+        assert b.counter("fetcher.requests") == 5
+
+
+class TestFormatReport:
+    """文本报告"""
+
+    def test_sorted_by_total(self):
+        metrics.observe("fast", 0.01)
+        metrics.observe("slow", 1.0)
+        metrics.incr("fetcher.requests", 3)
+
+        report = metrics.format_report(metrics.snapshot(), wall_seconds=2.0)
+        lines = report.splitlines()
+
+        assert lines[1].startswith("slow")
+        assert lines[2].startswith("fast")
+        assert "50.0%" in lines[1]
+        assert "fetcher.requests" in report
+        assert "总耗时: 2.000s" in report
+
+    def test_empty_snapshot(self):
+        report = metrics.format_report({"timers": {}, "counters": {}})
+
+        assert report.splitlines()[0].startswith("阶段")
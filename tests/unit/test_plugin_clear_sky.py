@@ -298,3 +298,36 @@ class TestScoreResultStructure:
         result = plugin.score(ctx)
         assert result is not None
         assert result.status in ("Perfect", "Recommended", "Possible", "Not Recommended")
+
+
+class TestScoreBatch:
+    """score_batch 与逐日 score 结果一致"""
+
+    def test_batch_matches_single(self):
+        """晴/阴/低能见度/空数据 → 与 score 逐个结果相同"""
+        from gmp.scoring.models import WeatherBlock
+
+        plugin = ClearSkyPlugin(_default_config())
+        contexts = [
+            _make_context(_make_weather(cloud_cover=5)),
+            _make_context(_make_weather(cloud_cover=90)),
+            _make_context(_make_weather(cloud_cover=25, precip_prob=40, visibility_km=3)),
+            _make_context(_make_weather(cloud_cover=5, hours=0)),
+        ]
+
+        batch = plugin.score_batch(WeatherBlock(contexts))
+
+        assert batch == [plugin.score(ctx) for ctx in contexts]
+        assert batch[0] is not None
+        assert batch[1] is None and batch[3] is None
+
+
+class TestNanInputs:
+    """缺失数据 (NaN) 与改用 StepCurve 之前的分支实现结果一致"""
+
+    def test_nan_falls_back_to_last_step(self):
+        plugin = ClearSkyPlugin(_default_config())
+        nan = float("nan")
+        assert plugin._score_cloud(nan) == 0
+        assert plugin._score_precipitation(nan) == 0
+        assert plugin._score_visibility(nan) == 5
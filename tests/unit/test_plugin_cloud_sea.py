@@ -369,3 +369,76 @@ class TestCloudSeaConfigDriven:
         assert result_default is not None
         assert result_custom is not None
         assert result_custom.total_score > result_default.total_score
+
+
+class TestScoreBatch:
+    """score_batch 与逐日 score 结果一致"""
+
+    def test_batch_matches_single(self):
+        """多种天气组合 (含未触发/全部不安全) → 与 score 逐个结果相同"""
+        from gmp.scoring.models import WeatherBlock
+        from gmp.scoring.plugins.cloud_sea import CloudSeaPlugin
+
+        plugin = CloudSeaPlugin(DEFAULT_CONFIG, SAFETY_CONFIG)
+        contexts = [
+            _context(weather=_weather_df()),
+            _context(weather=_weather_df(cloud_base=2500.0)),   # 云底高于站点
+            _context(weather=_weather_df(precip_prob=80.0)),    # 全部不安全
+            _context(
+                viewpoint=_viewpoint(altitude=3000),
+                weather=_weather_df(low_cloud=40.0, mid_cloud=65.0, wind=9.0),
+            ),
+        ]
+
+        batch = plugin.score_batch(WeatherBlock(contexts))
+
+        assert batch == [plugin.score(ctx) for ctx in contexts]
+        assert batch[1] is None and batch[2] is None
+
+    def test_batch_partial_unsafe_rows(self):
+        """部分时段不安全 → 只用安全行均值"""
+        from gmp.scoring.models import WeatherBlock
+        from gmp.scoring.plugins.cloud_sea import CloudSeaPlugin
+
+        plugin = CloudSeaPlugin(DEFAULT_CONFIG, SAFETY_CONFIG)
+        weather = pd.concat([
+            _weather_df(cloud_base=900.0, hours=2),
+            _weather_df(cloud_base=1900.0, visibility=500.0, hours=2),
+        ], ignore_index=True)
+        ctx = _context(weather=weather)
+
+        assert plugin.score_batch(WeatherBlock([ctx])) == [plugin.score(ctx)]
+
+    @pytest.mark.parametrize("column", ["precipitation_probability", "visibility"])
+    def test_missing_safety_column_raises_in_both_paths(self, column):
+        """缺少安全列 → score 与 score_batch 均抛 KeyError"""
+        from gmp.scoring.models import WeatherBlock
+        from gmp.scoring.plugins.cloud_sea import CloudSeaPlugin
+
+        plugin = CloudSeaPlugin(DEFAULT_CONFIG, SAFETY_CONFIG)
+        ctx = _context(weather=_weather_df().drop(columns=[column]))
+
+        with pytest.raises(KeyError):
+            plugin.score(ctx)
+        with pytest.raises(KeyError):
+            plugin.score_batch(WeatherBlock([ctx]))
+
+
+class TestNanInputs:
+    """缺失数据 (NaN) 与改用 StepCurve 之前的分支实现结果一致"""
+
+    def test_nan_scores(self):
+        from gmp.scoring.plugins.cloud_sea import CloudSeaPlugin
+
+        plugin = CloudSeaPlugin(DEFAULT_CONFIG, SAFETY_CONFIG)
+        nan = float("nan")
+        assert plugin._score_gap(nan) == 10
+        assert plugin._score_density(nan) == 5
+        assert plugin._score_wind(nan) == 5
+
+    def test_nan_mid_cloud_not_penalized(self):
+        """中云缺失 → 系数 1.0 (原实现两个 > 比较均不成立)"""
+        from gmp.scoring.plugins.cloud_sea import CloudSeaPlugin
+
+        plugin = CloudSeaPlugin(DEFAULT_CONFIG, SAFETY_CONFIG)
+        assert plugin._mid_cloud_factor(float("nan")) == 1.0
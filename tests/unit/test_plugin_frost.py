@@ -312,3 +312,24 @@ class TestSafetyCheck:
         ctx = _make_context(weather)
         result = plugin.score(ctx)
         assert result is None
+
+    def test_missing_safety_columns_skip_filter(self):
+        """缺少降水概率/能见度列 → 不做对应筛选，照常评分"""
+        plugin = FrostPlugin(_default_config())
+        weather = _make_weather(
+            temperature=-5.0, visibility=10, wind_speed=2, cloud_cover=50,
+        ).drop(columns=["precipitation_probability"])
+        result = plugin.score(_make_context(weather))
+        assert result is not None
+
+
+class TestNanInputs:
+    """缺失数据 (NaN) 与改用 StepCurve/RangeCurve 之前的分支实现结果一致"""
+
+    def test_nan_scores(self):
+        plugin = FrostPlugin(_default_config())
+        nan = float("nan")
+        assert plugin._score_temperature(nan) == 0
+        assert plugin._score_moisture(nan) == 5
+        assert plugin._score_wind(nan) == 0
+        assert plugin._score_cloud(nan) == 0
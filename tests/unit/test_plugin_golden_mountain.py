@@ -196,6 +196,8 @@ class TestGoldenMountainMetadata:
         assert req.needs_l2_target is True
         assert req.needs_l2_light_path is True
         assert req.needs_astro is True
+        assert set(req.target_columns) == {"cloud_cover_high", "cloud_cover_medium"}
+        assert set(req.light_path_columns) == {"cloud_cover_low", "cloud_cover_medium"}
 
 
 # ==================== Tests: 触发判定 ====================
@@ -423,3 +425,16 @@ class TestGoldenMountainDualInstance:
 
         # 两者可以同时注册
         assert sunrise_plugin.event_type != sunset_plugin.event_type
+
+
+class TestNanInputs:
+    """缺失数据 (NaN) 与改用 StepCurve 之前的分支实现结果一致"""
+
+    def test_nan_falls_back_to_last_step(self):
+        from gmp.scoring.plugins.golden_mountain import GoldenMountainPlugin
+
+        plugin = GoldenMountainPlugin("sunrise_golden_mountain", DEFAULT_CONFIG)
+        nan = float("nan")
+        assert plugin._score_light_path(nan) == 0
+        assert plugin._score_target(nan) == 0
+        assert plugin._score_local(nan) == 0
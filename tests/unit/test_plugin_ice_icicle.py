@@ -372,3 +372,17 @@ class TestIceIcicleSnowWaterEquivalent:
         assert result is not None
         # water_input 应为 0.8mm → score 24 (>= 0.4)
         assert result.breakdown["water_input"]["score"] == 24
+
+
+class TestNanInputs:
+    """缺失数据 (NaN) 与改用 StepCurve 之前的分支实现结果一致"""
+
+    def test_nan_scores(self):
+        from gmp.scoring.plugins.ice_icicle import IceIciclePlugin
+
+        config = _make_config()
+        plugin = IceIciclePlugin(config)
+        nan = float("nan")
+        assert plugin._score_water_input({"effective_water_input_24h_mm": nan}) == 0
+        assert plugin._deduction_age(nan) == config["deductions"]["age"][-1]["deduction"]
+        assert plugin._deduction_temp(nan) == config["deductions"]["temp"][-1]["deduction"]
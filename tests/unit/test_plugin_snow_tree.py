@@ -376,3 +376,34 @@ class TestSnowTreeDeductions:
         assert result_no_sun is not None
         # 暴晒应该比不晒低分
         assert result_with_sun.total_score < result_no_sun.total_score
+
+
+class TestNanInputs:
+    """缺失数据 (NaN) 与改用 StepCurve 之前的分支实现结果一致"""
+
+    def test_nan_scores(self):
+        from gmp.scoring.plugins.snow_tree import SnowTreePlugin
+
+        config = _make_config()
+        plugin = SnowTreePlugin(config)
+        nan = float("nan")
+        assert plugin._score_snow_signal({"recent_snowfall_24h_cm": nan}) == 0
+        assert plugin._score_stability({"wind_speed_10m": nan}) == 8
+        assert plugin._deduction_age(nan) == config["deductions"]["age"][-1]["deduction"]
+        assert plugin._deduction_temp(nan) == config["deductions"]["temp"][-1]["deduction"]
+
+    def test_nan_sun_and_wind_not_deducted(self):
+        """日照积分/历史最大风速缺失 → 不扣分 (原实现 > 比较均不成立)"""
+        from gmp.scoring.plugins.snow_tree import SnowTreePlugin
+
+        plugin = SnowTreePlugin(_make_config())
+        assert plugin._deduction_sun(float("nan")) == 0
+        assert plugin._deduction_wind(float("nan")) == 0
+
+    def test_nan_hourly_cloud_adds_no_sunshine(self):
+        """逐小时云量中的 NaN 不计日照权重"""
+        from gmp.scoring.plugins.snow_tree import SnowTreePlugin
+
+        plugin = SnowTreePlugin(_make_config())
+        weights = plugin._sunshine_curve(np.array([5.0, np.nan, 20.0]))
+        assert weights.tolist() == [2.0, 0.0, 1.0]
@@ -335,3 +335,14 @@ class TestStargazingTimeWindow:
         assert result.time_window != ""
         assert "22:00" in result.time_window
         assert "04:00" in result.time_window
+
+
+class TestNanInputs:
+    """缺失数据 (NaN) 与改用 StepCurve 之前的分支实现结果一致"""
+
+    def test_nan_wind_not_deducted(self):
+        """平均风速缺失 → 不扣分 (原实现两个 > 比较均不成立)"""
+        from gmp.scoring.plugins.stargazing import StargazingPlugin
+
+        plugin = StargazingPlugin(_make_config())
+        assert plugin._get_wind_deduction(float("nan")) == 0
@@ -0,0 +1,124 @@
+"""tests/unit/test_rate_limiter.py — 限流器单元测试"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from gmp.core.exceptions import RateBudgetExceededError
+from gmp.data.rate_limiter import AsyncTokenBucket, HostRateLimiter
+
+
+class TestAsyncTokenBucket:
+    """asyncio 令牌桶"""
+
+    def test_first_acquire_does_not_wait(self) -> None:
+        """桶初始为满 → 首个令牌立即返回"""
+        bucket = AsyncTokenBucket(rate=10)
+        assert asyncio.run(bucket.acquire()) == 0.0
+
+    def test_concurrent_acquires_are_spaced_by_rate(self) -> None:
+        """5 个并发 acquire, rate=50/s → 总耗时 ≈ 4 × 20ms"""
+        bucket = AsyncTokenBucket(rate=50)
+
+        async def _run() -> float:
+            start = time.monotonic()
+            await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(_run())
+        assert elapsed >= 0.075
+
+    def test_capacity_allows_burst(self) -> None:
+        """capacity=3 → 前 3 个令牌无需等待"""
+        bucket = AsyncTokenBucket(rate=1, capacity=3)
+
+        async def _run() -> list[float]:
+            return [await bucket.acquire() for _ in range(3)]
+
+        assert asyncio.run(_run()) == [0.0, 0.0, 0.0]
+
+    def test_invalid_rate_raises(self) -> None:
+        """rate <= 0 → ValueError"""
+        with pytest.raises(ValueError):
+            AsyncTokenBucket(rate=0)
+
+
+class TestHostRateLimiter:
+    """SQLite 共享的主机级令牌桶"""
+
+    def test_instances_share_bucket(self, tmp_path) -> None:
+        """两个实例指向同一文件 → 第二个实例需等待第一个的欠额"""
+        db_path = str(tmp_path / "rate.db")
+        first = HostRateLimiter(db_path, per_minute=60)
+        second = HostRateLimiter(db_path, per_minute=60)
+
+        assert first.reserve() == 0.0
+        assert second.reserve() == pytest.approx(1.0, abs=0.05)
+        assert first.used_today() == 2
+
+    def test_concurrent_threads_are_spaced_by_rate(self, tmp_path) -> None:
+        """4 个线程各自持有实例, 600/min → 总耗时 ≈ 3 × 100ms"""
+        db_path = str(tmp_path / "rate.db")
+        limiters = [HostRateLimiter(db_path, per_minute=600) for _ in range(4)]
+        start = time.monotonic()
+        threads = [threading.Thread(target=lim.acquire) for lim in limiters]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert time.monotonic() - start >= 0.28
+
+    def test_burst_allows_immediate_tokens(self, tmp_path) -> None:
+        """burst=3 → 前 3 个令牌无需等待"""
+        limiter = HostRateLimiter(str(tmp_path / "rate.db"), per_minute=1, burst=3)
+        assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.reserve() > 0
+
+    def test_daily_budget_exhausted_raises(self, tmp_path) -> None:
+        """日配额用尽 → RateBudgetExceededError, 不再计数"""
+        limiter = HostRateLimiter(
+            str(tmp_path / "rate.db"), per_minute=6000, per_day=2, burst=10
+        )
+        limiter.reserve()
+        limiter.reserve()
+        with pytest.raises(RateBudgetExceededError):
+            limiter.reserve()
+        assert limiter.used_today() == 2
+
+    def test_daily_budget_resets_next_day(self, tmp_path) -> None:
+        """跨过北京时间零点 → 日计数清零"""
+        limiter = HostRateLimiter(
+            str(tmp_path / "rate.db"), per_minute=6000, per_day=1, burst=10
+        )
+        now = time.time()
+        with patch("gmp.data.rate_limiter.time.time", return_value=now):
+            limiter.reserve()
+        with patch("gmp.data.rate_limiter.time.time", return_value=now + 86400):
+            assert limiter.reserve() == 0.0
+
+    def test_names_are_independent(self, tmp_path) -> None:
+        """同一文件内不同 name 的令牌桶互不影响"""
+        db_path = str(tmp_path / "rate.db")
+        a = HostRateLimiter(db_path, per_minute=1, name="a")
+        b = HostRateLimiter(db_path, per_minute=1, name="b")
+        assert a.reserve() == 0.0
+        assert b.reserve() == 0.0
+
+    def test_from_config(self, tmp_path) -> None:
+        """未配置或缺少 per_minute → None"""
+        assert HostRateLimiter.from_config(None) is None
+        assert HostRateLimiter.from_config({"per_day": 10}) is None
+        limiter = HostRateLimiter.from_config(
+            {"db_path": str(tmp_path / "sub" / "rate.db"), "per_minute": 60}
+        )
+        assert isinstance(limiter, HostRateLimiter)
+
+    def test_invalid_per_minute_raises(self, tmp_path) -> None:
+        """per_minute <= 0 → ValueError"""
+        with pytest.raises(ValueError):
+            HostRateLimiter(str(tmp_path / "rate.db"), per_minute=0)
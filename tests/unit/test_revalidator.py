@@ -0,0 +1,50 @@
+"""tests/unit/test_revalidator.py — BackgroundRevalidator 单元测试"""
+
+import threading
+from datetime import date
+
+from gmp.cache.revalidator import BackgroundRevalidator
+
+
+class TestBackgroundRevalidator:
+    def test_refresh_runs_in_background(self):
+        """提交后在后台线程执行刷新函数"""
+        calls = []
+        revalidator = BackgroundRevalidator(lambda lat, lon, dates: calls.append(dates))
+        assert revalidator.submit(29.58, 101.88, [date(2026, 2, 12), date(2026, 2, 11)])
+        revalidator.close()
+
+        assert calls == [[date(2026, 2, 11), date(2026, 2, 12)]]
+        assert revalidator.stats()["refreshed"] == 1
+
+    def test_pending_dates_deduplicated(self):
+        """刷新完成前重复提交相同 (坐标, 日期) 被忽略"""
+        release = threading.Event()
+        calls = []
+
+        def _refresh(lat, lon, dates):
+            release.wait(timeout=5)
+            calls.append(dates)
+
+        revalidator = BackgroundRevalidator(_refresh)
+        assert revalidator.submit(29.58, 101.88, [date(2026, 2, 11)]) is True
+        assert revalidator.submit(29.5801, 101.88, [date(2026, 2, 11)]) is False
+        assert revalidator.submit(29.58, 101.88, [date(2026, 2, 11), date(2026, 2, 12)])
+        release.set()
+        revalidator.close()
+
+        assert calls == [[date(2026, 2, 11)], [date(2026, 2, 12)]]
+        assert revalidator.stats()["pending"] == 0
+
+    def test_failure_counted_and_resubmittable(self):
+        """刷新异常计入 failed, 之后可再次提交"""
+        def _refresh(lat, lon, dates):
+            raise RuntimeError("boom")
+
+        revalidator = BackgroundRevalidator(_refresh)
+        revalidator.submit(29.58, 101.88, [date(2026, 2, 11)])
+        revalidator.wait()
+        assert revalidator.submit(29.58, 101.88, [date(2026, 2, 11)]) is True
+        revalidator.close()
+
+        assert revalidator.stats()["failed"] == 2
@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
 from datetime import date, datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -29,6 +32,7 @@ from gmp.core.models import (
     Target,
     Viewpoint,
 )
+from gmp.core.scheduler import ResultMemo
 from gmp.scoring.engine import ScoreEngine
 from gmp.scoring.models import DataContext, DataRequirement
 
@@ -315,6 +319,77 @@ class TestRunHappyPath:
         assert "generated_at" in result.meta
         assert "data_freshness" in result.meta
 
+    def test_astro_accessor_returns_injected_instance(self):
+        """astro 属性暴露注入的天文计算实例 (CLI debug 复用其缓存)"""
+        scheduler, _, _, _, astro, _ = _build_scheduler()
+        assert scheduler.astro is astro
+
+
+class TestRunCacheStats:
+    """meta.cache_stats 填充"""
+
+    def test_cache_stats_from_run_scope(self):
+        """fetcher 在本线程记录的缓存命中计入 meta.cache_stats"""
+        from gmp.core import metrics
+
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, fetcher, *_ = _build_scheduler(plugins=[plugin])
+        weather = _make_clear_weather(days=2)
+
+        def _fetch(**kwargs):
+            metrics.incr("cache.hits", 2)
+            metrics.incr("cache.misses", 1)
+            return weather
+
+        fetcher.fetch_hourly.side_effect = _fetch
+
+        result = scheduler.run("test_vp", days=2)
+
+        assert result.meta["cache_stats"] == {"hits": 2, "misses": 1, "api_requests": 0}
+
+    def test_cache_stats_count_async_fetcher_requests(self):
+        """AsyncMeteoFetcher 在事件循环线程发出的请求同样计入本次 run"""
+        import httpx
+
+        from gmp.data.async_meteo_fetcher import AsyncMeteoFetcher
+        from tests.unit.test_meteo_fetcher import SAMPLE_API_RESPONSE
+
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, *_ = _build_scheduler(plugins=[plugin])
+        cache = MagicMock()
+        cache.get_range.return_value = None
+        cache.get_bulk.return_value = {}
+        fetcher = AsyncMeteoFetcher(
+            cache,
+            {"min_request_interval": 0, "retries": 0},
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json=SAMPLE_API_RESPONSE)
+            ),
+        )
+        scheduler._fetcher = fetcher
+        try:
+            result = scheduler.run("test_vp", days=1)
+        finally:
+            fetcher.close()
+
+        assert result.meta["cache_stats"]["api_requests"] >= 1
+
+    def test_plugin_score_timed(self):
+        """Plugin.score 计入 plugin.<event>.score 计时器"""
+        from gmp.core import metrics
+
+        metrics.reset()
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, *_ = _build_scheduler(
+            plugins=[plugin], fetch_hourly_return=_make_clear_weather(days=2),
+        )
+
+        scheduler.run("test_vp", days=2)
+
+        timers = metrics.snapshot()["timers"]
+        assert timers["plugin.cloud_sea.score"]["count"] == 2
+        assert timers["scheduler.run"]["count"] == 1
+
 
 class TestRunEventsFilter:
     """events 过滤测试"""
@@ -414,6 +489,29 @@ class TestRunOnDemandFetch:
 
         fetcher.fetch_multi_points.assert_called()
 
+    def test_l2_fetch_uses_column_projection(self):
+        """目标/光路坐标按 Plugin 声明的列投影请求"""
+        l2 = _make_l2_plugin("sunrise_golden_mountain")
+        l2.data_requirement = DataRequirement(
+            needs_l2_target=True,
+            needs_l2_light_path=True,
+            needs_astro=True,
+            target_columns=["cloud_cover_high", "cloud_cover_medium"],
+            light_path_columns=["cloud_cover_low", "cloud_cover_medium"],
+        )
+        scheduler, fetcher, *_ = _build_scheduler(
+            viewpoint=_make_viewpoint_with_targets(),
+            plugins=[l2],
+            fetch_hourly_return=_make_clear_weather(days=1),
+        )
+
+        scheduler.run("test_vp", days=1)
+
+        target_call, path_call = fetcher.fetch_multi_points.call_args_list
+        assert target_call.args[0] == [(29.58, 101.88)]
+        assert target_call.kwargs["columns"] == ["cloud_cover_high", "cloud_cover_medium"]
+        assert path_call.kwargs["columns"] == ["cloud_cover_low", "cloud_cover_medium"]
+
     def test_only_sunrise_fetches_sunrise_azimuth(self):
         """仅 sunrise Plugin 活跃 → 只获取 sunrise 方向光路"""
         sunrise_plugin = _make_l2_plugin("sunrise_golden_mountain")
@@ -437,6 +535,308 @@ class TestRunOnDemandFetch:
         assert 251.5 not in azimuths  # sunset_azimuth 不应被使用
 
 
+class _BatchPlugin:
+    """实现 score_batch 的测试 Plugin，记录调用次数"""
+
+    event_type = "clear_sky"
+    display_name = "晴天"
+    data_requirement = DataRequirement()
+
+    def __init__(self, fail_batch: bool = False, drop_results: int = 0) -> None:
+        self.fail_batch = fail_batch
+        self.drop_results = drop_results
+        self.score_calls = 0
+        self.batch_sizes: list[int] = []
+
+    def dimensions(self) -> list[str]:
+        return ["test"]
+
+    def _result(self) -> ScoreResult:
+        return ScoreResult(
+            event_type="clear_sky",
+            total_score=70,
+            status="Recommended",
+            breakdown={"test": {"score": 70, "max": 100}},
+        )
+
+    def score(self, context: DataContext) -> ScoreResult:
+        self.score_calls += 1
+        return self._result()
+
+    def score_batch(self, block) -> list[ScoreResult]:
+        self.batch_sizes.append(len(block))
+        if self.fail_batch:
+            raise RuntimeError("batch failed")
+        return [self._result() for _ in range(len(block) - self.drop_results)]
+
+
+class TestScoreBatchDispatch:
+    """Scheduler 优先使用 score_batch"""
+
+    def test_batch_plugin_scored_once_for_all_days(self):
+        """实现 score_batch → 全部日期一次批量评分，不调用 score"""
+        plugin = _BatchPlugin()
+        scheduler, *_ = _build_scheduler(
+            plugins=[plugin],
+            fetch_hourly_return=_make_clear_weather(days=3),
+        )
+
+        result = scheduler.run("test_vp", days=3)
+
+        assert plugin.batch_sizes == [3]
+        assert plugin.score_calls == 0
+        assert all(fd.events[0].confidence for fd in result.forecast_days)
+
+    def test_batch_failure_falls_back_to_score(self):
+        """score_batch 抛异常 → 回退逐日 score"""
+        plugin = _BatchPlugin(fail_batch=True)
+        scheduler, *_ = _build_scheduler(
+            plugins=[plugin],
+            fetch_hourly_return=_make_clear_weather(days=3),
+        )
+
+        result = scheduler.run("test_vp", days=3)
+
+        assert plugin.score_calls == 3
+        assert all(len(fd.events) == 1 for fd in result.forecast_days)
+
+    def test_batch_result_count_mismatch_falls_back_to_score(self):
+        """score_batch 返回结果数与日期数不符 → 不静默丢弃日期，回退逐日 score"""
+        plugin = _BatchPlugin(drop_results=1)
+        scheduler, *_ = _build_scheduler(
+            plugins=[plugin],
+            fetch_hourly_return=_make_clear_weather(days=3),
+        )
+
+        result = scheduler.run("test_vp", days=3)
+
+        assert plugin.score_calls == 3
+        assert all(len(fd.events) == 1 for fd in result.forecast_days)
+
+    def test_mock_plugin_uses_score(self):
+        """MagicMock Plugin (类型上无 score_batch) → 逐日 score"""
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, *_ = _build_scheduler(
+            plugins=[plugin],
+            fetch_hourly_return=_make_clear_weather(days=2),
+        )
+
+        scheduler.run("test_vp", days=2)
+
+        assert plugin.score.call_count == 2
+
+
+class TestWeatherPartition:
+    """多日天气按日期一次性预切分"""
+
+    def test_partition_by_date_slices_each_day(self):
+        """乱序输入 → 每日一个切片，行数与日期正确"""
+        from gmp.core.scheduler import _partition_by_date
+
+        df = _make_clear_weather(days=3).sample(frac=1, random_state=0)
+
+        parts = _partition_by_date(df)
+
+        assert sorted(parts) == sorted(df["forecast_date"].unique())
+        for date_str, day in parts.items():
+            assert len(day) == 24
+            assert (day["forecast_date"] == date_str).all()
+
+    def test_partition_sorted_input_shares_memory(self):
+        """已按日期排序 → 切片不复制底层数据"""
+        from gmp.core.scheduler import _partition_by_date
+
+        df = _make_clear_weather(days=2)
+
+        parts = _partition_by_date(df)
+
+        first = parts[df["forecast_date"].iloc[0]]
+        assert np.shares_memory(
+            first["cloud_cover_total"].to_numpy(),
+            df["cloud_cover_total"].to_numpy(),
+        )
+
+    def test_partition_without_date_column_is_empty(self):
+        """缺少 forecast_date 列 → 空映射"""
+        from gmp.core.scheduler import _partition_by_date
+
+        assert _partition_by_date(pd.DataFrame({"x": [1]})) == {}
+
+    def test_light_path_weather_sliced_per_day(self):
+        """光路天气按天切片后传给 Plugin"""
+        l2 = _make_l2_plugin("sunrise_golden_mountain")
+        scheduler, *_ = _build_scheduler(
+            viewpoint=_make_viewpoint_with_targets(),
+            plugins=[l2],
+            fetch_hourly_return=_make_clear_weather(days=2),
+            fetch_multi_points_return={
+                (29.8, 102.4): _make_clear_weather(days=2),
+            },
+        )
+
+        scheduler.run("test_vp", days=2)
+
+        contexts = [c.args[0] for c in l2.score.call_args_list]
+        assert len(contexts) == 2
+        for ctx in contexts:
+            for path in ctx.light_path_weather:
+                for df in path["weather"].values():
+                    assert set(df["forecast_date"]) == {ctx.date.isoformat()}
+
+    def test_golden_mountain_light_path_scored_per_day(self):
+        """光路云量逐日评分: 晴天与多云日得分不同 (整窗口均值下两日同分)"""
+        from gmp.scoring.plugins.golden_mountain import GoldenMountainPlugin
+
+        config = {
+            "trigger": {"max_cloud_cover": 65},
+            "weights": {"light_path": 35, "target_visible": 40, "local_clear": 25},
+            "thresholds": {
+                "light_path_cloud": [10, 20, 30, 50],
+                "light_path_scores": [35, 30, 20, 10, 0],
+                "target_cloud": [10, 20, 30, 50],
+                "target_scores": [40, 35, 25, 10, 0],
+                "local_cloud": [15, 30, 50],
+                "local_scores": [25, 20, 10, 0],
+            },
+            "veto_threshold": 0,
+        }
+        plugins = [
+            GoldenMountainPlugin("sunrise_golden_mountain", config),
+            GoldenMountainPlugin("sunset_golden_mountain", config),
+        ]
+        # 第 1 天光路无云 (0%)，第 2 天低云 20% + 中云 5% → 整窗口均值 12.5%
+        remote = _make_clear_weather(days=2)
+        first_day = remote["forecast_date"] == remote["forecast_date"].iloc[0]
+        remote["cloud_cover_low"] = np.where(first_day, 0, 20)
+        remote["cloud_cover_medium"] = np.where(first_day, 0, 5)
+        remote["cloud_cover_high"] = 0
+        scheduler, fetcher, *_ = _build_scheduler(
+            viewpoint=_make_viewpoint_with_targets(),
+            plugins=plugins,
+            fetch_hourly_return=_make_clear_weather(days=2),
+        )
+        fetcher.fetch_multi_points.side_effect = (
+            lambda coords, **kw: {c: remote for c in coords}
+        )
+
+        result = scheduler.run("test_vp", days=2)
+
+        light_scores = [
+            {e.breakdown["light_path"]["score"] for e in day.events}
+            for day in result.forecast_days
+        ]
+        # 逐日: 0% → 35, 25% → 20；整窗口 12.5% 时两日均为 30
+        assert light_scores == [{35}, {20}]
+
+
+class TestIncrementalFingerprint:
+    """输入指纹: 未变的日期复用上次结果"""
+
+    @staticmethod
+    def _stamped_weather(days: int = 3) -> pd.DataFrame:
+        df = _make_clear_weather(days=days)
+        df["fetched_at"] = "2026-02-11T00:00:00+00:00"
+        return df
+
+    @staticmethod
+    def _previous(result) -> dict:
+        from gmp.core.fingerprint import forecast_day_to_dict
+
+        return {
+            fd.date: {
+                "fingerprint": result.meta["fingerprints"][fd.date],
+                "day": forecast_day_to_dict(fd),
+            }
+            for fd in result.forecast_days
+        }
+
+    def test_unchanged_inputs_skip_scoring(self):
+        """fetched_at 未变 → 所有日期复用，Plugin 不再评分"""
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, *_ = _build_scheduler(
+            plugins=[plugin], fetch_hourly_return=self._stamped_weather(),
+        )
+        first = scheduler.run("test_vp", days=3)
+        assert len(first.meta["fingerprints"]) == 3
+        plugin.score.reset_mock()
+
+        second = scheduler.run("test_vp", days=3, previous=self._previous(first))
+
+        plugin.score.assert_not_called()
+        assert second.meta["reused_days"] == [fd.date for fd in first.forecast_days]
+        assert second.forecast_days == first.forecast_days
+
+    def test_changed_day_is_rescored(self):
+        """单日 fetched_at 变化 → 仅该日重新评分"""
+        plugin = _make_l1_plugin("cloud_sea")
+        weather = self._stamped_weather()
+        scheduler, fetcher, *_ = _build_scheduler(
+            plugins=[plugin], fetch_hourly_return=weather,
+        )
+        first = scheduler.run("test_vp", days=3)
+        changed = first.forecast_days[1].date
+        updated = weather.copy()
+        updated.loc[updated["forecast_date"] == changed, "fetched_at"] = (
+            "2026-02-11T06:00:00+00:00"
+        )
+        fetcher.fetch_hourly.return_value = updated
+        plugin.score.reset_mock()
+
+        second = scheduler.run("test_vp", days=3, previous=self._previous(first))
+
+        assert plugin.score.call_count == 1
+        assert plugin.score.call_args.args[0].date.isoformat() == changed
+        assert changed not in second.meta["reused_days"]
+        assert len(second.meta["reused_days"]) == 2
+
+    def test_config_change_invalidates(self):
+        """配置摘要不同 → 指纹不同"""
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, *_ = _build_scheduler(
+            plugins=[plugin], fetch_hourly_return=self._stamped_weather(),
+        )
+        first = scheduler.run("test_vp", days=3)
+        scheduler._config.config = EngineConfig(light_path_count=5)
+        scheduler._config_digest = None
+
+        second = scheduler.run("test_vp", days=3, previous=self._previous(first))
+
+        assert second.meta["reused_days"] == []
+
+    def test_missing_fetched_at_always_rescored(self):
+        """刚获取的数据无 fetched_at → 无指纹，不复用"""
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, *_ = _build_scheduler(
+            plugins=[plugin], fetch_hourly_return=_make_clear_weather(days=3),
+        )
+
+        result = scheduler.run("test_vp", days=3)
+
+        assert result.meta["fingerprints"] == {}
+        assert result.meta["reused_days"] == []
+
+    def test_freshly_fetched_days_in_merged_frame_have_no_fingerprint(self):
+        """缓存日期与刚获取的日期经 _merge_days 合并 → 仅缓存日期有指纹"""
+        from gmp.data.meteo_fetcher import MeteoFetcher
+
+        stamped = self._stamped_weather()
+        dates = sorted(stamped["forecast_date"].unique())
+        cached_day = stamped[stamped["forecast_date"] == dates[0]].reset_index(drop=True)
+        fresh = _make_clear_weather(days=3)
+        fresh = fresh[fresh["forecast_date"] != dates[0]].reset_index(drop=True)
+        merged = MeteoFetcher._merge_days(
+            {date.fromisoformat(dates[0]): cached_day},
+            (date.fromisoformat(dates[1]), date.fromisoformat(dates[-1])),
+            fresh,
+        )
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, *_ = _build_scheduler(plugins=[plugin], fetch_hourly_return=merged)
+
+        result = scheduler.run("test_vp", days=3)
+
+        assert list(result.meta["fingerprints"]) == [dates[0]]
+
+
 class TestRunMultiDayResilience:
     """多天循环容错"""
 
@@ -555,6 +955,98 @@ class TestRunRoute:
         with pytest.raises(RouteNotFoundError):
             scheduler.run_route("nonexistent", days=1)
 
+    def test_memo_hit_skips_run(self):
+        """备忘录已有站点结果 → 直接复用，不再获取天气"""
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, fetcher, _, route_config, *_ = _build_scheduler(
+            plugins=[plugin],
+            fetch_hourly_return=_make_clear_weather(days=1),
+        )
+        route_config.get.return_value = Route(
+            id="test_route",
+            name="测试线路",
+            stops=[RouteStop(viewpoint_id="vp_a", order=1)],
+        )
+
+        memo = ResultMemo()
+        cached = scheduler.run("vp_a", days=1)
+        memo.get_or_run(ResultMemo.key("vp_a", 1, None), lambda: cached)
+        fetcher.fetch_hourly.reset_mock()
+
+        results = scheduler.run_route("test_route", days=1, memo=memo)
+
+        assert results == [cached]
+        fetcher.fetch_hourly.assert_not_called()
+
+    def test_memo_miss_runs_and_remembers(self):
+        """备忘录未命中 → 调用 run() 并记住，供其他线路复用"""
+        plugin = _make_l1_plugin("cloud_sea")
+        scheduler, fetcher, _, route_config, *_ = _build_scheduler(
+            plugins=[plugin],
+            fetch_hourly_return=_make_clear_weather(days=1),
+        )
+        route_config.get.return_value = Route(
+            id="test_route",
+            name="测试线路",
+            stops=[RouteStop(viewpoint_id="vp_a", order=1)],
+        )
+        memo = ResultMemo()
+
+        first = scheduler.run_route("test_route", days=1, memo=memo)
+        second = scheduler.run_route("test_route", days=1, memo=memo)
+
+        assert first[0] is second[0]
+        assert fetcher.fetch_hourly.call_count == 1
+        assert memo.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+class TestResultMemo:
+    """ResultMemo 单次运行备忘录"""
+
+    def test_key_normalizes_event_order(self):
+        """events 顺序不同 → 同一个键"""
+        assert ResultMemo.key("vp_a", 3, ["b", "a"]) == ResultMemo.key(
+            "vp_a", 3, ["a", "b"]
+        )
+        assert ResultMemo.key("vp_a", 3, None) != ResultMemo.key("vp_a", 3, [])
+
+    def test_failure_is_remembered(self):
+        """run_fn 失败 → 异常被记住，再次读取时重新抛出而不重复执行"""
+        memo = ResultMemo()
+        run_fn = MagicMock(side_effect=ValueError("boom"))
+        key = ResultMemo.key("vp_a", 1, None)
+
+        with pytest.raises(ValueError):
+            memo.get_or_run(key, run_fn)
+        with pytest.raises(ValueError):
+            memo.get_or_run(key, run_fn)
+
+        assert run_fn.call_count == 1
+
+    def test_concurrent_same_key_runs_once(self):
+        """并发请求同一键 → 只执行一次"""
+        memo = ResultMemo()
+        calls = []
+
+        def run_fn():
+            calls.append(1)
+            time.sleep(0.05)
+            return "result"
+
+        key = ResultMemo.key("vp_a", 1, None)
+        out = []
+        threads = [
+            threading.Thread(target=lambda: out.append(memo.get_or_run(key, run_fn)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert out == ["result"] * 4
+
 
 # ══════════════════════════════════════════════════════
 # Task 3: run_with_data() 数据注入接口
@@ -798,3 +1290,58 @@ class TestExtractHourlyWeather:
         hw = result.meta.get("hourly_weather", {})
         assert hw == {}
 
+
+
+# ══════════════════════════════════════════════════════
+# required_points(): 预取规划
+# ══════════════════════════════════════════════════════
+
+
+class TestRequiredPoints:
+    """required_points 与 run() 请求的坐标一致，且不发起请求"""
+
+    def test_l1_only_returns_local_point(self):
+        """仅 L1 Plugin → 只有本地坐标"""
+        scheduler, fetcher, *_ = _build_scheduler(plugins=[_make_l1_plugin("cloud_sea")])
+
+        points = scheduler.required_points("test_vp")
+
+        assert points == [((29.75, 102.35), 0, None)]
+        fetcher.fetch_hourly.assert_not_called()
+        fetcher.fetch_multi_points.assert_not_called()
+
+    def test_l2_adds_targets_and_light_path(self):
+        """L2 Plugin → 本地 + 目标 + 光路采样点，L2 坐标带各自的列投影"""
+        plugin = _make_l2_plugin("sunrise_golden_mountain")
+        plugin.data_requirement = DataRequirement(
+            needs_l2_target=True,
+            needs_l2_light_path=True,
+            needs_astro=True,
+            target_columns=["cloud_cover_high"],
+            light_path_columns=["cloud_cover_low"],
+        )
+        scheduler, *_, geo = _build_scheduler(
+            viewpoint=_make_viewpoint_with_targets(),
+            plugins=[plugin],
+        )
+
+        points = {coord: columns for coord, _, columns in scheduler.required_points("test_vp")}
+
+        assert points[(29.75, 102.35)] is None
+        assert points[(29.58, 101.88)] == ["cloud_cover_high"]
+        assert points[(29.8, 102.4)] == ["cloud_cover_low"]
+        assert geo.calculate_light_path_points.call_args.args[2] == 108.5
+
+    def test_past_hours_requests_past_day_for_local(self):
+        """past_hours > 0 → 本地坐标 past_days=1"""
+        plugin = _make_l1_plugin("cloud_sea")
+        plugin.data_requirement = DataRequirement(past_hours=24)
+        scheduler, *_ = _build_scheduler(plugins=[plugin])
+
+        assert scheduler.required_points("test_vp") == [((29.75, 102.35), 1, None)]
+
+    def test_no_active_plugins_returns_empty(self):
+        """events 过滤后无活跃 Plugin → 空列表"""
+        scheduler, *_ = _build_scheduler(plugins=[_make_l1_plugin("cloud_sea")])
+
+        assert scheduler.required_points("test_vp", events=["frost"]) == []
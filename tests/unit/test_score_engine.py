@@ -112,6 +112,47 @@ class TestCollectRequirements:
         req = engine.collect_requirements([st, fr])
         assert req.past_hours == 24
 
+    def test_columns_union_of_l2_plugins(self):
+        """列投影取需要该类数据的 Plugin 声明的并集，未声明的 Plugin 不参与"""
+        from gmp.scoring.engine import ScoreEngine
+
+        engine = ScoreEngine()
+        a = StubPlugin(
+            "sunrise_golden_mountain",
+            requirement=DataRequirement(
+                needs_l2_target=True,
+                needs_l2_light_path=True,
+                target_columns=["cloud_cover_high", "cloud_cover_medium"],
+                light_path_columns=["cloud_cover_low"],
+            ),
+        )
+        b = StubPlugin(
+            "sunset_golden_mountain",
+            requirement=DataRequirement(
+                needs_l2_target=True,
+                target_columns=["cloud_cover_medium", "visibility"],
+            ),
+        )
+        cs = StubPlugin("cloud_sea", requirement=DataRequirement())
+        req = engine.collect_requirements([a, b, cs])
+        assert req.target_columns == ["cloud_cover_high", "cloud_cover_medium", "visibility"]
+        assert req.light_path_columns == ["cloud_cover_low"]
+
+    def test_undeclared_columns_means_all(self):
+        """任一需要 L2 数据的 Plugin 未声明列投影 → None (全部字段)"""
+        from gmp.scoring.engine import ScoreEngine
+
+        engine = ScoreEngine()
+        a = StubPlugin(
+            "sunrise_golden_mountain",
+            requirement=DataRequirement(
+                needs_l2_target=True, target_columns=["cloud_cover_high"]
+            ),
+        )
+        b = StubPlugin("custom_l2", requirement=DataRequirement(needs_l2_target=True))
+        req = engine.collect_requirements([a, b])
+        assert req.target_columns is None
+
 
 # ==================== Plugin 过滤 ====================
 
@@ -258,3 +299,34 @@ class TestUniversalCapabilityInjection:
             "cloud_sea", "clear_sky", "stargazing",
             "frost", "snow_tree",
         }
+
+
+# ==================== 批量评分扩展 ====================
+
+
+class TestSupportsBatch:
+    """supports_batch 按类型判定"""
+
+    def test_plain_plugin_not_batch(self):
+        """未实现 score_batch → False"""
+        from gmp.scoring.engine import supports_batch
+
+        assert supports_batch(StubPlugin("cloud_sea")) is False
+
+    def test_magic_mock_not_batch(self):
+        """MagicMock 实例有任意属性，但类型上没有 score_batch → False"""
+        from unittest.mock import MagicMock
+
+        from gmp.scoring.engine import supports_batch
+
+        assert supports_batch(MagicMock()) is False
+
+    def test_batch_plugin_detected(self):
+        """实现了 score_batch 的 Plugin → True 且满足 BatchScorerPlugin"""
+        from gmp.scoring.engine import BatchScorerPlugin, supports_batch
+        from gmp.scoring.plugins.clear_sky import ClearSkyPlugin
+
+        plugin = ClearSkyPlugin({})
+
+        assert supports_batch(plugin) is True
+        assert isinstance(plugin, BatchScorerPlugin)
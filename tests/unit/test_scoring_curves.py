@@ -0,0 +1,137 @@
+"""tests/unit/test_scoring_curves.py — StepCurve / RangeCurve 单元测试"""
+
+import numpy as np
+import pytest
+
+from gmp.scoring.curves import RangeCurve, StepCurve
+
+
+def _first_match(value, thresholds, scores, hit):
+    """原先的逐项遍历实现，作为对照"""
+    for t, s in zip(thresholds, scores):
+        if hit(value, t):
+            return s
+    return scores[-1]
+
+
+_OP_FUNCS = {
+    "le": lambda v, t: v <= t,
+    "lt": lambda v, t: v < t,
+    "ge": lambda v, t: v >= t,
+    "gt": lambda v, t: v > t,
+}
+
+
+class TestStepCurve:
+    """阈值阶梯曲线"""
+
+    @pytest.mark.parametrize("op,thresholds", [
+        ("le", [10, 20, 30, 50]),
+        ("lt", [3, 5, 10]),
+        ("ge", [30, 15, 5]),
+        ("gt", [800, 500, 200]),
+    ])
+    def test_matches_first_match_walk(self, op, thresholds):
+        """所有比较方式与逐项遍历结果一致 (含阈值边界与 NaN)"""
+        scores = list(range(len(thresholds) + 1, 0, -1))
+        curve = StepCurve(thresholds, scores, op=op)
+        values = sorted({v + d for v in thresholds for d in (-1, -0.5, 0, 0.5, 1)})
+        values += [-1e9, 1e9, float("nan"), float("inf")]
+        for v in values:
+            assert curve(v) == _first_match(v, thresholds, scores, _OP_FUNCS[op]), v
+
+    def test_array_matches_scalar(self):
+        """数组输入逐元素等于标量结果"""
+        curve = StepCurve([10, 30, 50], [25, 20, 10, 0])
+        values = np.array([0.0, 10.0, 10.1, 30.0, 49.9, 50.0, 80.0, np.nan])
+        result = curve(values)
+        assert isinstance(result, np.ndarray)
+        assert result.tolist() == [curve(float(v)) for v in values]
+
+    def test_scalar_keeps_score_type(self):
+        """标量返回配置中的原始分值 (int 不变为 numpy 类型)"""
+        curve = StepCurve([30, 60], [1.0, 0.7, 0.3])
+        assert curve(45) == 0.7
+        assert type(StepCurve([10], [5, 0])(3)) is int
+
+    def test_explicit_nan_score(self):
+        """nan= 指定缺失数据分值，标量与数组一致，非 NaN 输入不受影响"""
+        curve = StepCurve([20, 40], [0, 10, 30], nan=0)
+        assert curve(float("nan")) == 0
+        assert curve(50) == 30
+        values = np.array([10.0, np.nan, 30.0, 50.0])
+        assert curve(values).tolist() == [0, 0, 10, 30]
+
+    def test_length_mismatch_raises(self):
+        with pytest.raises(ValueError):
+            StepCurve([10, 20], [1, 2])
+
+    def test_unsorted_thresholds_raise(self):
+        """阈值方向与比较方式不符时报错"""
+        with pytest.raises(ValueError):
+            StepCurve([30, 15, 5], [1, 2, 3, 4], op="le")
+        with pytest.raises(ValueError):
+            StepCurve([5, 15, 30], [1, 2, 3, 4], op="ge")
+
+    def test_unknown_op_raises(self):
+        with pytest.raises(ValueError):
+            StepCurve([10], [1, 0], op="eq")
+
+
+class TestRangeCurve:
+    """区间查表曲线"""
+
+    _TEMP = {
+        "optimal": {"range": [-8, -2], "score": 40},
+        "good": {"range": [-15, -8], "score": 35},
+        "extreme": {"range": [-999, -15], "score": 25},
+    }
+    _CLOUD = {
+        "optimal": {"range": [30, 60], "score": 10},
+        "clear": {"range": [0, 30], "score": 5},
+        "heavy": {"range": [60, 100], "score": 3},
+    }
+
+    def test_half_open(self):
+        """lo <= x < hi，区间外为 default"""
+        curve = RangeCurve.from_config(self._TEMP)
+        assert curve(-15) == 35
+        assert curve(-8) == 40
+        assert curve(-2.0001) == 40
+        assert curve(-2) == 0
+        assert curve(-1000) == 0
+        assert curve(float("nan")) == 0
+
+    def test_closed_joint_follows_config_order(self):
+        """闭区间端点相接时配置中靠前的区间优先"""
+        curve = RangeCurve.from_config(self._CLOUD, closed=True)
+        assert curve(30) == 10
+        assert curve(60) == 10
+        assert curve(0) == 5
+        assert curve(100) == 3
+        assert curve(100.5) == 0
+
+    def test_array_matches_scalar(self):
+        curve = RangeCurve.from_config(self._CLOUD, closed=True)
+        values = np.array([-1.0, 0.0, 15.0, 30.0, 45.0, 60.0, 80.0, 101.0, np.nan])
+        assert curve(values).tolist() == [curve(float(v)) for v in values]
+
+    def test_custom_default(self):
+        curve = RangeCurve([(0, 10, 5)], default=-1)
+        assert curve(20) == -1
+
+    def test_empty_ranges_return_default(self):
+        curve = RangeCurve.from_config({})
+        assert curve(5) == 0
+        assert curve(np.array([1.0, 2.0])).tolist() == [0, 0]
+
+    def test_overlap_raises(self):
+        with pytest.raises(ValueError):
+            RangeCurve([(0, 20, 1), (10, 30, 2)])
+
+    def test_explicit_nan_score(self):
+        """nan= 与 default 分开指定"""
+        curve = RangeCurve([(0, 10, 5)], default=-1, nan=7)
+        assert curve(20) == -1
+        assert curve(float("nan")) == 7
+        assert curve(np.array([5.0, np.nan])).tolist() == [5, 7]
@@ -0,0 +1,105 @@
+"""tests/unit/test_scoring_features.py — WeatherFeatures 特征缓存 单元测试"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gmp.core.models import Location, Viewpoint
+from gmp.scoring.features import WeatherFeatures
+from gmp.scoring.models import DataContext
+
+
+def _weather() -> pd.DataFrame:
+    return pd.DataFrame({
+        "forecast_hour": [0, 6, 12, 18],
+        "cloud_cover_total": [10.0, np.nan, 50.0, 90.0],
+        "precipitation_probability": [0, 80, 20, 40],
+        "visibility": [20000, 30000, 500, 15000],
+    })
+
+
+def _context(weather: pd.DataFrame) -> DataContext:
+    return DataContext(
+        date=date(2026, 2, 11),
+        viewpoint=Viewpoint(
+            id="vp", name="vp",
+            location=Location(lat=29.6, lon=102.3, altitude=3660),
+            capabilities=[], targets=[],
+        ),
+        local_weather=weather,
+    )
+
+
+class TestStatistics:
+    """统计量与 pandas 直接计算一致"""
+
+    def test_mean_matches_pandas(self):
+        """mean 跳过 NaN"""
+        df = _weather()
+        assert WeatherFeatures(df).mean("cloud_cover_total") == df["cloud_cover_total"].mean()
+
+    def test_safety_mask(self):
+        """降水 <= 50 且能见度 >= 1000 的时段"""
+        mask = WeatherFeatures(_weather()).safety_mask(50, 1000)
+        assert mask.tolist() == [True, False, False, True]
+
+    def test_safety_mask_missing_column_raises(self):
+        """缺少能见度列 → KeyError (与逐日直接取列一致)"""
+        df = _weather().drop(columns=["visibility"])
+        with pytest.raises(KeyError):
+            WeatherFeatures(df).safety_mask(50, 1000)
+
+    def test_safety_mask_missing_ok_passes(self):
+        """missing_ok=True 且缺少能见度列 → 只按降水过滤"""
+        df = _weather().drop(columns=["visibility"])
+        mask = WeatherFeatures(df).safety_mask(50, 1000, missing_ok=True)
+        assert mask.tolist() == [True, False, True, True]
+
+    def test_safe_mean_and_count(self):
+        """安全时段均值/行数"""
+        features = WeatherFeatures(_weather())
+        assert features.safe_count(50, 1000) == 2
+        assert features.safe_mean("cloud_cover_total", 50, 1000) == 50.0
+
+    def test_window_mean(self):
+        """[6, 18) 时段均值"""
+        features = WeatherFeatures(_weather())
+        assert features.window_mean("visibility", 6, 18) == 15250.0
+
+
+class TestMemoization:
+    """同一统计量只计算一次"""
+
+    def test_mask_is_cached(self):
+        """相同阈值 → 返回同一数组；不同阈值 → 各自缓存"""
+        features = WeatherFeatures(_weather())
+        assert features.safety_mask(50, 1000) is features.safety_mask(50, 1000)
+        assert features.safety_mask(30, 1000) is not features.safety_mask(50, 1000)
+
+    def test_context_features_shared_across_plugins(self):
+        """DataContext.features 惰性创建并在多个 Plugin 间共享"""
+        from gmp.scoring.plugins.clear_sky import ClearSkyPlugin
+        from gmp.scoring.plugins.cloud_sea import CloudSeaPlugin
+
+        df = _weather().assign(
+            cloud_base_altitude=1000.0, cloud_cover_low=60.0,
+            cloud_cover_medium=5.0, wind_speed_10m=2.0,
+        )
+        ctx = _context(df)
+        features = ctx.features
+
+        ClearSkyPlugin({}).score(ctx)
+        CloudSeaPlugin(
+            {"weights": {"gap": 50, "density": 30, "wind": 20},
+             "thresholds": {"gap_meters": [800, 500, 200], "gap_scores": [50, 40, 20, 10],
+                            "density_pct": [80, 50, 30], "density_scores": [30, 20, 10, 5],
+                            "wind_speed": [3, 5, 8], "wind_scores": [20, 15, 10, 5],
+                            "mid_cloud_penalty": [30, 60], "mid_cloud_factors": [1.0, 0.7, 0.3]}},
+            {"precip_threshold": 50, "visibility_threshold": 1000},
+        ).score(ctx)
+
+        assert ctx.features is features
+        assert ("mean", "cloud_cover_total") in features._cache
+        assert ("safety_mask", 50, 1000, False) in features._cache
@@ -2,6 +2,7 @@
 
 from datetime import date
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -12,7 +13,7 @@ from gmp.core.models import (
     SunEvents,
     Viewpoint,
 )
-from gmp.scoring.models import DataContext, DataRequirement
+from gmp.scoring.models import DataContext, DataRequirement, WeatherBlock
 
 
 # ==================== DataRequirement 测试 ====================
@@ -115,3 +116,55 @@ class TestDataContext:
             data_freshness="degraded",
         )
         assert ctx.data_freshness == "degraded"
+
+
+# ==================== WeatherBlock 测试 ====================
+
+
+class TestWeatherBlock:
+    """WeatherBlock 列式分段归约"""
+
+    @staticmethod
+    def _ctx(values: list[float]) -> DataContext:
+        return DataContext(
+            date=date(2026, 2, 11),
+            viewpoint=Viewpoint(
+                id="vp", name="vp",
+                location=Location(lat=29.6, lon=102.3, altitude=3660),
+                capabilities=[], targets=[],
+            ),
+            local_weather=pd.DataFrame({"x": values}),
+        )
+
+    def test_offsets_and_column(self):
+        """offsets 标记每段行区间，列按段拼接"""
+        block = WeatherBlock([self._ctx([1.0, 2.0]), self._ctx([3.0])])
+
+        assert block.offsets.tolist() == [0, 2, 3]
+        assert block.column("x").tolist() == [1.0, 2.0, 3.0]
+
+    def test_segment_mean_matches_pandas(self):
+        """分段均值与 pandas mean 一致 (跳过 NaN)"""
+        frames = [[1.0, float("nan"), 5.0], [2.0, 4.0]]
+        block = WeatherBlock([self._ctx(v) for v in frames])
+
+        means = block.segment_mean(block.column("x"))
+
+        assert means.tolist() == [pd.Series(v).mean() for v in frames]
+
+    def test_segment_mean_with_mask_and_empty_segment(self):
+        """掩码过滤后无有效行的段 → NaN，计数为 0"""
+        block = WeatherBlock([self._ctx([1.0, 3.0]), self._ctx([10.0])])
+        mask = block.column("x") < 5
+
+        means = block.segment_mean(block.column("x"), mask)
+
+        assert means[0] == 2.0
+        assert np.isnan(means[1])
+        assert block.segment_count(mask).tolist() == [2, 0]
+
+    def test_missing_column_is_nan(self):
+        """缺列 → NaN 填充"""
+        block = WeatherBlock([self._ctx([1.0])])
+
+        assert np.isnan(block.column("absent")).all()
@@ -0,0 +1,51 @@
+"""tests/unit/test_single_flight.py — SingleFlight 单元测试"""
+
+from __future__ import annotations
+
+import pytest
+
+from gmp.data.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """相同 key 的并发登记"""
+
+    def test_first_claim_owns_key(self) -> None:
+        flights = SingleFlight()
+        own, shared = flights.claim(["a", "b"])
+        assert set(own) == {"a", "b"}
+        assert shared == {}
+        assert flights.in_flight() == 2
+
+    def test_second_claim_shares_in_flight_key(self) -> None:
+        """进行中的 key 由后来者等待，其余 key 归后来者负责"""
+        flights = SingleFlight()
+        own_a, _ = flights.claim(["a"])
+        own_b, shared_b = flights.claim(["a", "b"])
+
+        assert set(own_b) == {"b"}
+        assert shared_b["a"] is own_a["a"]
+
+    def test_resolve_publishes_result_and_releases(self) -> None:
+        flights = SingleFlight()
+        own, _ = flights.claim(["a"])
+        _, shared = flights.claim(["a"])
+
+        flights.resolve(own, {"a": 42})
+
+        assert shared["a"].result(timeout=1) == 42
+        assert flights.in_flight() == 0
+        # 完成后再次登记 → 重新成为负责者
+        own_again, _ = flights.claim(["a"])
+        assert "a" in own_again
+
+    def test_fail_propagates_exception(self) -> None:
+        flights = SingleFlight()
+        own, _ = flights.claim(["a"])
+        _, shared = flights.claim(["a"])
+
+        flights.fail(own, RuntimeError("boom"))
+
+        with pytest.raises(RuntimeError):
+            shared["a"].result(timeout=1)
+        assert flights.in_flight() == 0
@@ -0,0 +1,80 @@
+"""tests/unit/test_solar_noaa.py — 向量化 NOAA 太阳算法 单元测试
+
+与 AstroUtils (ephem) 交叉校验。容差:
+- 日出/日落/天文晨暮曦时刻: ±120 秒 (实测一般 < 10 秒)
+- 日出/日落方位角: ±0.1°
+覆盖中国境内纬度范围 (18°N–53°N) 全年每月一天。
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from gmp.data.astro_utils import AstroUtils
+from gmp.data.solar_noaa import sun_events_arrays, sun_events_bulk
+
+_TIME_TOLERANCE_S = 120
+_AZIMUTH_TOLERANCE_DEG = 0.1
+
+_POINTS = [
+    (18.25, 109.5),    # 三亚
+    (29.6014, 102.3689),  # 牛背山
+    (29.65, 91.1),     # 拉萨
+    (39.9, 116.4),     # 北京
+    (43.8, 87.6),      # 乌鲁木齐
+    (45.7, 126.6),     # 哈尔滨
+]
+
+_DATES = [date(2026, m, 15) for m in range(1, 13)]
+
+
+class TestCrossCheckEphem:
+    """与 ephem 逐点计算结果对比"""
+
+    @pytest.mark.parametrize("lat,lon", _POINTS)
+    def test_matches_ephem_within_tolerance(self, lat, lon):
+        results = sun_events_bulk([lat] * len(_DATES), [lon] * len(_DATES), _DATES)
+
+        for d, noaa in zip(_DATES, results):
+            assert noaa is not None
+            ref = AstroUtils.get_sun_events(lat, lon, d)
+            for name in ("sunrise", "sunset", "astronomical_dawn", "astronomical_dusk"):
+                diff = abs((getattr(noaa, name) - getattr(ref, name)).total_seconds())
+                assert diff < _TIME_TOLERANCE_S, (name, d, diff)
+            for name in ("sunrise_azimuth", "sunset_azimuth"):
+                diff = abs(getattr(noaa, name) - getattr(ref, name))
+                assert diff < _AZIMUTH_TOLERANCE_DEG, (name, d, diff)
+
+    def test_local_date_semantics(self):
+        """返回时刻落在 UTC+8 目标日期当天"""
+        d = date(2026, 2, 11)
+        (ev,) = sun_events_bulk([29.6014], [102.3689], [d])
+
+        assert ev.sunrise.date() == d
+        assert ev.sunset.date() == d
+        assert ev.sunrise.utcoffset() == timedelta(hours=8)
+
+
+class TestArrays:
+    """数组接口"""
+
+    def test_array_shapes(self):
+        """N 组输入 → 每个字段长度 N"""
+        n = 50
+        out = sun_events_arrays(
+            np.full(n, 29.6), np.full(n, 102.37),
+            [date(2026, 1, 1) + timedelta(days=i) for i in range(n)],
+        )
+
+        assert set(out) == {
+            "sunrise", "sunset", "sunrise_azimuth", "sunset_azimuth",
+            "astronomical_dawn", "astronomical_dusk",
+        }
+        assert all(len(v) == n for v in out.values())
+
+    def test_unreachable_twilight_is_none(self):
+        """高纬夏至无天文黑夜 → 该元素为 None"""
+        (ev,) = sun_events_bulk([60.0], [120.0], [date(2026, 6, 21)])
+
+        assert ev is None
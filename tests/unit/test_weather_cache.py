@@ -4,7 +4,7 @@
 """
 
 from datetime import date, datetime
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pandas as pd
 import pytest
@@ -111,6 +111,208 @@ class TestSetAndGet:
         assert expected_cols.issubset(set(result.columns))
 
 
+# ==================== set_many 批量写入 ====================
+
+
+class TestSetMany:
+    def test_writes_multiple_coords_and_days(self, cache):
+        """多坐标、多天数据一次写入, 按行内 forecast_date 落到对应日期"""
+        day1 = _make_df(hours=[0, 1]).assign(forecast_date="2026-02-11")
+        day2 = _make_df(hours=[0, 1]).assign(forecast_date="2026-02-12")
+        frames = {
+            (29.58, 101.88): pd.concat([day1, day2], ignore_index=True),
+            (30.0, 102.0): day1,
+        }
+        cache.set_many(frames)
+
+        assert len(cache.get(29.58, 101.88, date(2026, 2, 12))) == 2
+        assert len(cache.get(30.0, 102.0, date(2026, 2, 11))) == 2
+        assert cache.get(30.0, 102.0, date(2026, 2, 12)) is None
+
+    def test_empty_frames_skipped(self, cache):
+        """空 DataFrame 不写入"""
+        cache.set_many({(29.58, 101.88): pd.DataFrame()})
+        assert cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12)) is None
+
+
+# ==================== get_range / get_bulk ====================
+
+
+class TestRangeAndBulkGet:
+    def test_get_range_concatenates_days(self, cache):
+        """get_range 一次返回多天数据"""
+        cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0, 1]))
+        cache.set(29.58, 101.88, date(2026, 2, 12), _make_df(hours=[0, 1]))
+
+        result = cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12))
+        assert len(result) == 4
+        assert result["forecast_date"].tolist() == ["2026-02-11"] * 2 + ["2026-02-12"] * 2
+
+    def test_get_range_no_data_returns_none(self, cache):
+        """区间无数据 → None (与 get 一致)"""
+        assert cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12)) is None
+
+    def test_get_bulk_keyed_by_rounded_coords(self, cache):
+        """get_bulk 按 rounded 坐标分组, 无数据的坐标不出现"""
+        cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0, 1]))
+        cache.set(30.0, 102.0, date(2026, 2, 11), _make_df(hours=[0]))
+
+        result = cache.get_bulk(
+            [(29.5801, 101.8799), (30.0, 102.0), (31.0, 103.0)],
+            date(2026, 2, 11),
+            date(2026, 2, 11),
+        )
+        assert set(result) == {(29.58, 101.88), (30.0, 102.0)}
+        assert len(result[(29.58, 101.88)]) == 2
+        assert result[(30.0, 102.0)].index.tolist() == [0]
+
+
+class TestCacheMetrics:
+    """命中/未命中按 (坐标, 日期) 计入 metrics"""
+
+    def test_range_counts_hit_and_missing_days(self, cache):
+        from gmp.core import metrics
+
+        cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0, 1]))
+        with metrics.scope() as local:
+            cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 13))
+
+        assert local.counter("cache.hits") == 1
+        assert local.counter("cache.misses") == 2
+
+    def test_bulk_counts_per_coordinate(self, cache):
+        from gmp.core import metrics
+
+        cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0]))
+        with metrics.scope() as local:
+            cache.get_bulk([(29.58, 101.88), (30.0, 102.0)], date(2026, 2, 11), date(2026, 2, 11))
+
+        assert local.counter("cache.hits") == 1
+        assert local.counter("cache.misses") == 1
+
+
+# ==================== 内存 LRU 层 ====================
+
+
+@pytest.fixture
+def memory_cache(repo):
+    """启用内存层的 WeatherCache"""
+    return WeatherCache(repo, memory_config={"max_entries": 16, "ttl_seconds": 0})
+
+
+class TestMemoryTier:
+    def test_disabled_by_default(self, cache):
+        """未配置 memory_config 时不启用内存层"""
+        assert cache.memory_stats() is None
+
+    def test_repeated_get_skips_sqlite(self, memory_cache, repo):
+        """第二次读取同一 (坐标, 日期) 直接命中内存层"""
+        memory_cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0, 1]))
+        first = memory_cache.get(29.58, 101.88, date(2026, 2, 11))
+
+        with patch.object(repo, "query_weather") as mock_query:
+            second = memory_cache.get(29.58, 101.88, date(2026, 2, 11))
+            mock_query.assert_not_called()
+        assert second is first
+        assert memory_cache.memory_stats()["hits"] == 1
+
+    def test_get_with_hours_filters_memory_entry(self, memory_cache):
+        """指定 hours 时从内存条目中筛选"""
+        memory_cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0, 1, 2]))
+        memory_cache.get(29.58, 101.88, date(2026, 2, 11))
+
+        result = memory_cache.get(29.58, 101.88, date(2026, 2, 11), hours=[1])
+        assert result["forecast_hour"].tolist() == [1]
+
+    def test_range_and_bulk_served_from_memory(self, memory_cache, repo):
+        """区间/批量读取的每一天都在内存层时不查询 SQLite"""
+        for d in (11, 12):
+            memory_cache.set(29.58, 101.88, date(2026, 2, d), _make_df(hours=[0]))
+        memory_cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12))
+
+        with patch.object(repo, "query_weather_range") as mock_range, \
+                patch.object(repo, "query_weather_bulk") as mock_bulk:
+            ranged = memory_cache.get_range(
+                29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12)
+            )
+            bulk = memory_cache.get_bulk(
+                [(29.58, 101.88)], date(2026, 2, 11), date(2026, 2, 12)
+            )
+            mock_range.assert_not_called()
+            mock_bulk.assert_not_called()
+        assert len(ranged) == 2
+        assert len(bulk[(29.58, 101.88)]) == 2
+
+    def test_bulk_queries_only_non_resident_coords(self, memory_cache, repo):
+        """批量读取只查询不在内存层的坐标"""
+        memory_cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0]))
+        memory_cache.set(30.0, 102.0, date(2026, 2, 11), _make_df(hours=[0]))
+        memory_cache.get(29.58, 101.88, date(2026, 2, 11))
+
+        with patch.object(
+            repo, "query_weather_bulk", wraps=repo.query_weather_bulk
+        ) as mock_bulk:
+            result = memory_cache.get_bulk(
+                [(29.58, 101.88), (30.0, 102.0)], date(2026, 2, 11), date(2026, 2, 11)
+            )
+        assert mock_bulk.call_args.args[0] == [(30.0, 102.0)]
+        assert set(result) == {(29.58, 101.88), (30.0, 102.0)}
+
+    def test_set_invalidates_memory_entry(self, memory_cache):
+        """重新写入后读取到新数据"""
+        memory_cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0]))
+        memory_cache.get(29.58, 101.88, date(2026, 2, 11))
+        memory_cache.set_many({
+            (29.58, 101.88): _make_df(hours=[0], temperature=5.0).assign(
+                forecast_date="2026-02-11"
+            )
+        })
+
+        result = memory_cache.get(29.58, 101.88, date(2026, 2, 11))
+        assert result["temperature_2m"].iloc[0] == 5.0
+
+    def _new_frame(self):
+        return {
+            (29.58, 101.88): _make_df(hours=[0], temperature=5.0).assign(
+                forecast_date="2026-02-11"
+            )
+        }
+
+    def test_write_during_read_not_put_back(self, memory_cache, repo):
+        """读取 SQLite 后、写回内存层前发生写入 → 旧行不放回内存层"""
+        memory_cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0]))
+        original = repo.query_weather_range
+
+        def _read_then_write(*args):
+            df = original(*args)
+            memory_cache.set_many(self._new_frame())
+            return df
+
+        with patch.object(repo, "query_weather_range", side_effect=_read_then_write):
+            stale = memory_cache.get_range(
+                29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11)
+            )
+        assert stale["temperature_2m"].iloc[0] == -10.0
+
+        result = memory_cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11))
+        assert result["temperature_2m"].iloc[0] == 5.0
+
+    def test_read_during_write_not_served_after_commit(self, memory_cache, repo):
+        """写入提交前的并发读取放入的旧行在提交后失效"""
+        memory_cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0]))
+        original = repo.upsert_weather_frame
+
+        def _read_then_commit(df):
+            memory_cache.get_bulk([(29.58, 101.88)], date(2026, 2, 11), date(2026, 2, 11))
+            return original(df)
+
+        with patch.object(repo, "upsert_weather_frame", side_effect=_read_then_commit):
+            memory_cache.set_many(self._new_frame())
+
+        result = memory_cache.get(29.58, 101.88, date(2026, 2, 11))
+        assert result["temperature_2m"].iloc[0] == 5.0
+
+
 # ==================== is_fresh 新鲜度判断 ====================
 
 
@@ -121,6 +323,15 @@ class TestIsFresh:
         fetched_at = now.replace(hour=8, minute=0, second=0)
         assert cache.is_fresh(fetched_at, data_source="forecast") is True
 
+    def test_forecast_within_valid_hours_is_fresh(self, repo):
+        """forecast 按 forecast_valid_hours 计算 TTL, 与自然日无关"""
+        from datetime import timedelta, timezone
+
+        cache = WeatherCache(repo, {"forecast_valid_hours": 6, "mode": "strict"})
+        now = datetime.now(timezone.utc)
+        assert cache.is_fresh(now - timedelta(hours=5)) is True
+        assert cache.is_fresh(now - timedelta(hours=7)) is False
+
     def test_forecast_yesterday_is_stale(self, cache):
         """forecast 数据昨日获取 → False"""
         from datetime import timedelta
@@ -128,6 +339,16 @@ class TestIsFresh:
         yesterday = datetime.now() - timedelta(days=1)
         assert cache.is_fresh(yesterday, data_source="forecast") is False
 
+    def test_default_mode_keeps_same_day_semantics(self, repo):
+        """未配置 mode → 按北京时间自然日判断, 与 valid_hours 无关"""
+        from datetime import timedelta, timezone
+
+        cst = timezone(timedelta(hours=8))
+        cache = WeatherCache(repo, {"forecast_valid_hours": 1})
+        today_start = datetime.now(cst).replace(hour=0, minute=0, second=1)
+        assert cache.is_fresh(today_start) is True
+        assert cache.is_fresh(today_start - timedelta(seconds=2)) is False
+
     def test_archive_always_fresh(self, cache):
         """archive 数据无论何时获取 → True"""
         from datetime import timedelta
@@ -136,6 +357,100 @@ class TestIsFresh:
         assert cache.is_fresh(old_time, data_source="archive") is True
 
 
+# ==================== 新鲜度感知读取 ====================
+
+
+def _store_with_fetched_at(repo, target_date, fetched_at, api_source="open-meteo"):
+    """绕过 WeatherCache.set 直接写入指定 fetched_at 的数据"""
+    rows = [
+        {**row, "fetched_at": fetched_at, "api_source": api_source}
+        for row in _make_df(hours=[0, 1]).to_dict("records")
+    ]
+    repo.upsert_weather_batch(29.58, 101.88, target_date, rows)
+
+
+_OLD = "2020-01-01T00:00:00+00:00"
+
+
+class TestFreshnessAwareReads:
+    def test_strict_mode_treats_stale_as_miss(self, repo):
+        """strict: 过期日期视为未命中, 新鲜日期保留"""
+        cache = WeatherCache(repo, {"forecast_valid_hours": 24, "mode": "strict"})
+        _store_with_fetched_at(repo, date(2026, 2, 11), _OLD)
+        cache.set(29.58, 101.88, date(2026, 2, 12), _make_df(hours=[0]))
+
+        assert cache.get(29.58, 101.88, date(2026, 2, 11)) is None
+        result = cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 12))
+        assert result["forecast_date"].tolist() == ["2026-02-12"]
+        bulk = cache.get_bulk([(29.58, 101.88)], date(2026, 2, 11), date(2026, 2, 11))
+        assert bulk == {}
+
+    def test_default_mode_does_not_filter_reads(self, cache, repo):
+        """未配置 mode → 读取不检查新鲜度 (与引入 freshness.mode 之前一致)"""
+        _store_with_fetched_at(repo, date(2026, 2, 11), _OLD)
+        assert cache.get(29.58, 101.88, date(2026, 2, 11)) is not None
+        result = cache.get_range(29.58, 101.88, date(2026, 2, 11), date(2026, 2, 11))
+        assert result is not None
+
+    def test_off_mode_returns_stale(self, repo):
+        """off: 不检查新鲜度"""
+        cache = WeatherCache(repo, {"forecast_valid_hours": 24, "mode": "off"})
+        _store_with_fetched_at(repo, date(2026, 2, 11), _OLD)
+        assert cache.get(29.58, 101.88, date(2026, 2, 11)) is not None
+
+    def test_archive_rows_never_stale(self, repo):
+        """archive 数据 (archive_never_stale) 不因 fetched_at 过期"""
+        cache = WeatherCache(
+            repo,
+            {"forecast_valid_hours": 24, "archive_never_stale": True, "mode": "strict"},
+        )
+        _store_with_fetched_at(repo, date(2026, 2, 11), _OLD, api_source="open-meteo-archive")
+        assert cache.get(29.58, 101.88, date(2026, 2, 11)) is not None
+
+    def test_set_with_archive_source(self, cache, repo):
+        """set(data_source='archive') 写入 archive api_source"""
+        cache.set(29.58, 101.88, date(2026, 2, 11), _make_df(hours=[0]), data_source="archive")
+        rows = repo.query_weather(29.58, 101.88, date(2026, 2, 11))
+        assert rows[0]["api_source"] == "open-meteo-archive"
+
+    def test_stale_while_revalidate_serves_and_refreshes(self, repo):
+        """stale_while_revalidate: 立即返回过期数据, 后台刷新写回新数据"""
+        cache = WeatherCache(
+            repo, {"forecast_valid_hours": 24, "mode": "stale_while_revalidate"}
+        )
+        _store_with_fetched_at(repo, date(2026, 2, 11), _OLD)
+        refreshed = []
+
+        def _refresh(lat, lon, dates):
+            refreshed.append((lat, lon, dates))
+            cache.set(lat, lon, dates[0], _make_df(hours=[0, 1], temperature=5.0))
+
+        cache.set_revalidator(_refresh)
+        stale = cache.get(29.58, 101.88, date(2026, 2, 11))
+        assert stale["fetched_at"].iloc[0] == _OLD
+
+        cache.wait_revalidation()
+        cache.close()
+        assert refreshed == [(29.58, 101.88, [date(2026, 2, 11)])]
+        fresh = cache.get(29.58, 101.88, date(2026, 2, 11))
+        assert fresh["temperature_2m"].iloc[0] == 5.0
+
+    def test_revalidator_ignored_outside_swr_mode(self, repo):
+        """非 stale_while_revalidate 模式不注册后台刷新"""
+        cache = WeatherCache(repo, {"forecast_valid_hours": 24, "mode": "strict"})
+        refresh = MagicMock()
+        cache.set_revalidator(refresh)
+        _store_with_fetched_at(repo, date(2026, 2, 11), _OLD)
+        cache.get(29.58, 101.88, date(2026, 2, 11))
+        cache.wait_revalidation()
+        refresh.assert_not_called()
+
+    def test_invalid_mode_raises(self, repo):
+        """无效 mode → ValueError"""
+        with pytest.raises(ValueError):
+            WeatherCache(repo, {"mode": "sometimes"})
+
+
 # ==================== get_or_fetch ====================
 
 